@@ -0,0 +1,5 @@
+"""Standalone micro-benchmarks for the AI copilot engines.
+
+Run from services/ai-copilot, e.g.:
+  python -m bench.lasa_scan
+"""
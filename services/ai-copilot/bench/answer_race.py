@@ -0,0 +1,120 @@
+"""Benchmark: database-backed template answers racing a speculative LLM turn.
+
+  python -m bench.answer_race [--db-latency 0.08] [--tokens 40] [--token-delay 0.01]
+
+"Which payers have expired contracts?" is answered by an SQL query template.
+The database is replaced by a coroutine that sleeps ``db-latency`` seconds
+and then returns rows ("hit") or raises a connection error ("db down", the
+template misses and the question needs the LLM).  Each case runs through
+``run_nl_query`` against the Ollama stub:
+
+  - sequential: ``NL_RACE_BUDGET_MS = 0`` -- the template first, then the LLM
+  - race: the LLM turn starts alongside the query and is aborted mid-stream
+    if the template answers first
+
+and reports latency, the tokens the stub actually generated, aborted
+streams, and that no scheduler slot is left held.  "slow db" makes the
+query outlast the race budget, so the LLM answer is used.  "llm busy"
+has the LLM turn end at once with a busy scheduler: the template, still
+within budget, must answer.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+
+from bench.ollama_stub import OllamaStub
+from bench.synthetic import synthetic_branch
+from src.engines import nl_query, query_templates
+from src.engines.nl_query import run_nl_query
+from src.services.fact_index import fact_index
+from src.services.ollama import OllamaResponse, OllamaService, OllamaStreamChunk
+
+QUESTION = "Which payers have expired contracts?"
+
+
+def _fake_db(latency: float, up: bool):
+    async def run_sql(plan, branch_id):
+        await asyncio.sleep(latency)
+        if not up:
+            raise ConnectionRefusedError("database unreachable")
+        names = ["Star Health", "ICICI Lombard", "Medi Assist TPA"]
+        return query_templates._Result(len(names), names, {})
+    return run_sql
+
+
+def _busy_stream(svc: OllamaService):
+    async def generate_stream(*args, **kwargs):
+        yield OllamaStreamChunk(done=True, final=OllamaResponse(
+            available=True, model=svc.model, error="Ollama busy: 1 running, 8 queued", busy=True,
+        ))
+    return generate_stream
+
+
+async def _case(
+    stub: OllamaStub, svc: OllamaService, ctx, *, latency: float, up: bool, budget_ms: int, busy: bool = False
+):
+    query_templates._run_sql = _fake_db(latency, up)
+    nl_query.NL_RACE_BUDGET_MS = budget_ms
+    stub.reset_counters()
+    if busy:
+        svc.generate_stream = _busy_stream(svc)  # type: ignore[method-assign]
+    t0 = time.perf_counter()
+    try:
+        result = await run_nl_query(QUESTION, ctx, svc)
+    finally:
+        vars(svc).pop("generate_stream", None)
+    ms = (time.perf_counter() - t0) * 1000
+    if busy:
+        assert result.error is None and result.source != "ollama", result
+    await asyncio.sleep(0.05)  # let the stub notice a dropped stream
+    assert svc.scheduler._inflight == 0, "scheduler slot leaked"
+    return result.source, ms, stub.generated, stub.aborted
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    logging.getLogger("ai-copilot").setLevel(logging.ERROR)
+    ctx = synthetic_branch(units=args.units)
+    await fact_index.retrieve(ctx, QUESTION)  # steady state: the branch index is built
+    llm_s = 0.05 + args.tokens * args.token_delay
+    budget_ms = int(args.budget * 1000)
+    cases = [
+        ("hit", args.db_latency, True),
+        ("db down", args.db_latency, False),
+        ("slow db", args.budget * 2, True),
+        ("llm busy", args.db_latency, True),
+    ]
+    async with OllamaStub(latency=0.05, tokens=args.tokens, token_delay=args.token_delay) as stub:
+        svc = OllamaService(base_url=stub.base_url, model=stub.model, cache=None)
+        await svc.start()
+        assert await svc.check_health()
+        print(f"db {args.db_latency * 1000:.0f} ms, LLM ~{llm_s * 1000:.0f} ms ({args.tokens} tokens), "
+              f"race budget {budget_ms} ms")
+        print(f"{'case':<9} {'mode':<11} {'answer':<13} {'ms':>7} {'tokens':>7} {'aborted':>8}")
+        for label, latency, up in cases:
+            for mode, budget in (("sequential", 0), ("race", budget_ms)):
+                if label in ("slow db", "llm busy") and mode == "sequential":
+                    continue
+                source, ms, generated, aborted = await _case(
+                    stub, svc, ctx, latency=latency, up=up, budget_ms=budget, busy=label == "llm busy"
+                )
+                print(f"{label:<9} {mode:<11} {source:<13} {ms:7.0f} {generated:>7} {aborted:>8}")
+        await svc.aclose()
+    print(f"\ncoverage: {nl_query.nl_coverage.stats()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=300)
+    parser.add_argument("--db-latency", type=float, default=0.08, help="seconds per template SQL query")
+    parser.add_argument("--budget", type=float, default=0.3, help="race budget, seconds")
+    parser.add_argument("--tokens", type=int, default=40, help="stub answer length")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="stub seconds per generated token")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark: 10-turn chat, fresh system prompt per turn vs. Ollama context reuse.
+
+  python -m bench.chat_context [--turns 10] [--prompt-delay 0.0005] [--units 300]
+  python -m bench.chat_context --base-url http://localhost:11434 --model mistral:7b
+
+Every turn goes through ``stream_nl_query`` on the synthetic branch with
+questions the keyword matcher doesn't answer, so each one reaches the LLM.
+"fresh" is the old behaviour (no session: the packed system prompt is sent
+and evaluated on every turn); "context" passes a ``ChatSession`` so follow-up
+turns send only the question and continue from the returned context.
+
+Against the stub, prompt evaluation costs ``prompt-delay`` seconds per
+prompt token (0.5 ms ~ a 7B model on CPU); with ``--base-url`` the same
+conversation runs against a real Ollama and the prompt-eval counts come
+from its responses.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import time
+
+from bench.ollama_stub import OllamaStub
+from bench.synthetic import synthetic_branch
+from src.engines.nl_query import stream_nl_query
+from src.services.chat_session import ChatSession
+from src.services.ollama import OllamaService
+
+QUESTIONS = [
+    "Summarise which wards are short on isolation rooms",
+    "Which of those wards sit next to each other?",
+    "Would merging two of them free up nursing staff?",
+    "Which departments share a wing with the surgical wards?",
+    "Is the oncology day care close to the pharmacy store?",
+    "Suggest a better room split for the step-down unit",
+    "Are there wards without a negative pressure room?",
+    "Which wing suits a new dialysis service?",
+    "Rank the wards by rooms per bed",
+    "Anything else I should fix before go-live?",
+]
+
+
+async def _conversation(svc: OllamaService, ctx, turns: int, session: ChatSession | None) -> list[tuple[float, int]]:
+    out = []
+    for i in range(turns):
+        question = QUESTIONS[i % len(QUESTIONS)]
+        t0 = time.perf_counter()
+        async for event, data in stream_nl_query(question, ctx, svc, session=session):
+            if event == "done":
+                assert data["source"] == "ollama" and not data["error"], data
+                out.append(((time.perf_counter() - t0) * 1000, data["promptEvalCount"] or 0))
+    return out
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    ctx = synthetic_branch(units=args.units)
+    async with contextlib.AsyncExitStack() as stack:
+        stub = None
+        if args.base_url:
+            base_url, model = args.base_url, args.model
+        else:
+            stub = await stack.enter_async_context(
+                OllamaStub(latency=0.05, tokens=args.tokens, token_delay=0.01, prompt_delay=args.prompt_delay)
+            )
+            base_url, model = stub.base_url, stub.model
+        svc = OllamaService(base_url=base_url, model=model, cache=None)
+        await svc.start()
+        assert await svc.check_health(), f"Ollama not reachable at {base_url}"
+
+        results = {}
+        for label, session in (("fresh", None), ("context", ChatSession(session_id="bench"))):
+            results[label] = await _conversation(svc, ctx, args.turns, session)
+        await svc.aclose()
+
+    print(f"{args.turns}-turn conversation, {args.units} units")
+    print(f"{'turn':>4} {'fresh tok':>10} {'ms':>7}   {'context tok':>11} {'ms':>7}")
+    for i, ((f_ms, f_tok), (c_ms, c_tok)) in enumerate(zip(results["fresh"], results["context"]), 1):
+        print(f"{i:>4} {f_tok:>10} {f_ms:7.0f}   {c_tok:>11} {c_ms:7.0f}")
+    for label, rows in results.items():
+        tok = sum(r[1] for r in rows)
+        wall = sum(r[0] for r in rows)
+        line = f"{label:<8} prompt tokens evaluated {tok:>6}   total {wall:7.0f} ms"
+        if stub is not None:
+            line += f"   prompt-eval time {tok * args.prompt_delay * 1000:7.0f} ms"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--units", type=int, default=300)
+    parser.add_argument("--tokens", type=int, default=40, help="stub answer length")
+    parser.add_argument("--prompt-delay", type=float, default=0.0005, help="stub seconds per prompt token")
+    parser.add_argument("--base-url", default="", help="real Ollama instead of the stub")
+    parser.add_argument("--model", default="mistral:7b")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
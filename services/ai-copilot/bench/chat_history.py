@@ -0,0 +1,121 @@
+"""Benchmark: chat history in LLM prompts, verbatim tail vs. rolling digest.
+
+  python -m bench.chat_history [--turns 40] [--answer-words 120]
+
+Plays a long conversation (short questions, long assistant answers full of
+numbers) into a ``ChatSession`` and, at every turn, measures the history a
+fresh prompt would carry:
+
+  - verbatim: the previous ``get_history_text`` -- the last 10 messages
+    pasted in full
+  - digest, offline: ``get_history_text`` with the heuristic digest only
+  - digest, Ollama: the same with ``schedule_digest`` summarising folded
+    turns through the Ollama stub after every turn
+
+and reports history tokens at a few turns plus the maximum, the number of
+summarisation calls, and the time the session spends compacting per turn.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+
+from bench.ollama_stub import OllamaStub
+from src.engines.chat_digest import schedule_digest
+from src.engines.prompt_builder import estimate_tokens
+from src.services.chat_session import ChatSession, ChatSessionStore
+from src.services.ollama import OllamaService
+
+UNITS = ["ICU-1", "ICU-2", "HDU", "Ward 3A", "Ward 4B", "NICU", "Day Care", "Oncology", "Step-down", "OT Block"]
+
+
+def _conversation(turns: int, answer_words: int) -> list[tuple[str, str]]:
+    rng = random.Random(11)
+    out = []
+    for t in range(turns):
+        unit = rng.choice(UNITS)
+        question = f"How many beds with oxygen does {unit} have, and which rooms lack suction?"
+        sentences = [f"{unit} has {rng.randint(4, 40)} beds, {rng.randint(2, 30)} of them with piped oxygen."]
+        while sum(len(s.split()) for s in sentences) < answer_words:
+            sentences.append(
+                f"Room {rng.randint(100, 499)} in {rng.choice(UNITS)} lacks suction and has "
+                f"{rng.randint(1, 6)} beds on floor {rng.randint(1, 8)}."
+            )
+        out.append((question, " ".join(sentences)))
+    return out
+
+
+def _verbatim(session_messages: list[tuple[str, str]]) -> str:
+    """The previous get_history_text: last 10 messages, in full."""
+    lines = []
+    for role, content in session_messages[-10:]:
+        lines.append(f"{'User' if role == 'user' else 'Assistant'}: {content}")
+    return "\n".join(lines)
+
+
+async def _play(conversation, svc: OllamaService | None, store: ChatSessionStore) -> tuple[list[int], float]:
+    """History tokens before each turn's answer, and seconds spent in add_message."""
+    session = await store.create_or_resume("bench")
+    tokens, compacting = [], 0.0
+    for question, answer in conversation:
+        t0 = time.perf_counter()
+        session.add_message("user", question)
+        compacting += time.perf_counter() - t0
+        tokens.append(estimate_tokens(session.get_history_text(question)))
+        t0 = time.perf_counter()
+        session.add_message("assistant", answer, source="ollama")
+        compacting += time.perf_counter() - t0
+        if svc is not None:
+            task = schedule_digest(session, svc, store)
+            if task is not None:
+                await task
+    return tokens, compacting
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    conversation = _conversation(args.turns, args.answer_words)
+    legacy, messages = [], []
+    for question, answer in conversation:
+        messages.append(("user", question))
+        legacy.append(estimate_tokens(_verbatim(messages[:-1])))
+        messages.append(("assistant", answer))
+
+    offline, offline_s = await _play(conversation, None, ChatSessionStore())
+    async with OllamaStub(latency=0.02, tokens=80, token_delay=0.001) as stub:
+        svc = OllamaService(base_url=stub.base_url, model=stub.model, cache=None)
+        await svc.start()
+        assert await svc.check_health()
+        stub.reset_counters()
+        store = ChatSessionStore()
+        online, online_s = await _play(conversation, svc, store)
+        summaries = stub.requests
+        session = await store.get("bench")
+        await svc.aclose()
+
+    budget = ChatSession.HISTORY_TOKENS
+    marks = [t for t in (1, 5, 10, 20, 40, 80) if t <= args.turns]
+    print(f"{args.turns} turns, ~{args.answer_words}-word answers; history budget {budget} tokens "
+          f"(digest {ChatSession.DIGEST_TOKENS})")
+    print(f"{'history tokens at turn':<24}" + "".join(f"{t:>7}" for t in marks) + f"{'max':>7}")
+    for label, series in (("verbatim (last 10)", legacy), ("digest, offline", offline), ("digest, Ollama", online)):
+        print(f"{label:<24}" + "".join(f"{series[t - 1]:>7}" for t in marks) + f"{max(series):>7}")
+    assert max(offline) <= budget and max(online) <= budget
+
+    print(f"\nsummarisation calls: {summaries} for {args.turns} turns; "
+          f"summary {estimate_tokens(session.summary)} tokens, {len(session.undigested)} messages pending")
+    print(f"compaction: {offline_s / args.turns * 1e6:.0f} us per turn offline, "
+          f"{online_s / args.turns * 1e6:.0f} us with Ollama summaries")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--answer-words", type=int, default=120)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
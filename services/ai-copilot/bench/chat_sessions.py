@@ -0,0 +1,214 @@
+"""Benchmark: chat session store at 100k live sessions.
+
+  python -m bench.chat_sessions [--sessions 100000] [--messages 4] [--context-tokens 512]
+
+Compares the previous store -- a dict scanned for expired sessions on every
+``create_or_resume``, dataclass messages and the Ollama context as a list of
+Python ints -- against ``ChatSessionStore``.  The legacy store is seeded
+directly; filling it through ``create_or_resume`` is quadratic.  Reports:
+
+  - per chat turn (resume + user and assistant message) with ``--sessions``
+    live sessions
+  - expiring half of them: one call pays for the expired ones, the next is
+    back to normal
+  - memory per session (measured with tracemalloc on a sample, every tenth
+    session carrying a stored context)
+  - the global cap: creating ``--sessions`` sessions with CHAT_MAX_SESSIONS
+    of 10k keeps 10k, evicting the least recently active
+
+The legacy store is reproduced here so the comparison stays runnable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass, field
+
+from src.services.chat_session import ChatSession, ChatSessionStore
+
+QUESTION = "How many rooms with oxygen are there in the ICU on the second floor? "
+ANSWER = "There are 14 rooms with piped oxygen across 3 ICU units on floor 2. " * 3
+
+
+# ── Legacy store (as it was before the ordered store) ─────────────────────
+
+
+@dataclass
+class _LegacyMessage:
+    role: str
+    content: str
+    timestamp: float = field(default_factory=time.time)
+    source: str | None = None
+
+
+@dataclass
+class _LegacySession:
+    session_id: str
+    messages: list[_LegacyMessage] = field(default_factory=list)
+    created_at: float = field(default_factory=time.time)
+    last_activity: float = field(default_factory=time.time)
+    llm_context: list[int] | None = None
+    llm_facts: set[str] = field(default_factory=set)
+
+    def add_message(self, role: str, content: str, source: str | None = None) -> None:
+        self.messages.append(_LegacyMessage(role=role, content=content, source=source))
+        self.last_activity = time.time()
+        if len(self.messages) > ChatSession.MAX_MESSAGES:
+            self.messages = self.messages[-ChatSession.MAX_MESSAGES:]
+
+    def remember_context(self, key: str, context: list[int] | None, facts=()) -> None:
+        self.llm_context = context
+
+    def is_expired(self) -> bool:
+        return time.time() - self.last_activity > ChatSession.TTL_SECONDS
+
+
+class _LegacyStore:
+    def __init__(self) -> None:
+        self._sessions: dict[str, _LegacySession] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    async def create_or_resume(self, session_id: str | None = None) -> _LegacySession:
+        self._cleanup_expired()
+        if session_id and session_id in self._sessions:
+            session = self._sessions[session_id]
+            if not session.is_expired():
+                return session
+            del self._sessions[session_id]
+        new_id = session_id or str(uuid.uuid4())
+        session = _LegacySession(session_id=new_id)
+        self._sessions[new_id] = session
+        return session
+
+    def _cleanup_expired(self) -> None:
+        expired = [sid for sid, s in self._sessions.items() if s.is_expired()]
+        for sid in expired:
+            del self._sessions[sid]
+
+
+# ── Workload ──────────────────────────────────────────────────────────────
+
+
+async def _new_session(store):
+    if isinstance(store, _LegacyStore):
+        # Seeded directly: 100k create_or_resume calls would scan ~5e9 sessions
+        session = _LegacySession(session_id=str(uuid.uuid4()))
+        store._sessions[session.session_id] = session
+        return session
+    return await store.create_or_resume()
+
+
+async def _populate(store, n: int, messages: int, context_tokens: int) -> list[str]:
+    ids = []
+    for i in range(n):
+        session = await _new_session(store)
+        for m in range(messages):
+            if m % 2:
+                session.add_message("assistant", ANSWER, source="ollama")
+            else:
+                session.add_message("user", QUESTION + str(i))
+        if context_tokens and i % 10 == 0:
+            # Distinct ints, as json.loads hands them back from Ollama
+            session.remember_context("k", [1000 + i + t for t in range(context_tokens)], ["Fact " + str(i)])
+        ids.append(session.session_id)
+    return ids
+
+
+async def _turns(store, ids: list[str], count: int) -> float:
+    """Mean microseconds per chat turn on random existing sessions."""
+    rng = random.Random(7)
+    picks = [rng.choice(ids) for _ in range(count)]
+    t0 = time.perf_counter()
+    for sid in picks:
+        session = await store.create_or_resume(sid)
+        session.add_message("user", QUESTION)
+        session.add_message("assistant", ANSWER, source="keyword_match")
+    return (time.perf_counter() - t0) / count * 1e6
+
+
+async def _expire_half(store, ids: list[str]) -> tuple[float, float]:
+    """Age the least recently active half past the TTL; time the next two calls."""
+    stale = time.time() - ChatSession.TTL_SECONDS - 1
+    for sid in ids[: len(ids) // 2]:
+        store._sessions[sid].last_activity = stale
+    timings = []
+    for _ in range(2):
+        t0 = time.perf_counter()
+        await store.create_or_resume(ids[-1])
+        timings.append((time.perf_counter() - t0) * 1000)
+    return timings[0], timings[1]
+
+
+async def _bytes_per_session(store_cls, n: int, messages: int, context_tokens: int) -> float:
+    tracemalloc.start()
+    store = store_cls()
+    await _populate(store, n, messages, context_tokens)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del store
+    return used / n
+
+
+async def main_async(args: argparse.Namespace) -> None:
+
+    print(f"{args.sessions} sessions, {args.messages} messages each, "
+          f"{args.context_tokens}-token context on every tenth")
+    print(f"{'':<22} {'legacy':>12} {'ordered':>12}")
+
+    legacy, ordered = _LegacyStore(), ChatSessionStore(max_sessions=0)
+    legacy_ids = await _populate(legacy, args.sessions, args.messages, args.context_tokens)
+    ordered_ids = await _populate(ordered, args.sessions, args.messages, args.context_tokens)
+    assert len(legacy) == len(ordered) == args.sessions
+    before = await _turns(legacy, legacy_ids, args.legacy_turns)
+    after = await _turns(ordered, ordered_ids, args.turns)
+    print(f"{'chat turn':<22} {before:9.1f} us {after:9.1f} us   x{before / after:.0f}")
+
+    # Turns above reordered the ordered store; age its least recently active half.
+    ordered_ids = list(ordered._sessions)
+    legacy_first, legacy_next = await _expire_half(legacy, legacy_ids)
+    first, following = await _expire_half(ordered, ordered_ids)
+    assert len(legacy) == len(ordered) == args.sessions - args.sessions // 2
+    print(f"{'expire half: 1st call':<22} {legacy_first:9.1f} ms {first:9.1f} ms")
+    print(f"{'expire half: next call':<22} {legacy_next:9.1f} ms {following:9.3f} ms")
+    del legacy, ordered
+
+    before = await _bytes_per_session(_LegacyStore, args.sample, args.messages, args.context_tokens)
+    after = await _bytes_per_session(ChatSessionStore, args.sample, args.messages, args.context_tokens)
+    print(f"{'memory per session':<22} {before:9.0f} B  {after:9.0f} B    "
+          f"({before * args.sessions / 2**20:.0f} -> {after * args.sessions / 2**20:.0f} MiB at {args.sessions})")
+
+    capped = ChatSessionStore(max_sessions=10_000)
+    await _populate(capped, args.sessions, 2, 0)
+    stats = capped.stats()
+    assert stats["sessions"] == 10_000 and stats["evicted"] == args.sessions - 10_000
+    print(f"\ncap 10k: {stats['sessions']} live, {stats['evicted']} evicted, {stats['bytes'] / 2**20:.1f} MiB of history")
+
+    session = ChatSession(session_id="big")
+    session.remember_context("k", list(range(4096)), ["x" * 100])
+    for _ in range(40):
+        session.add_message("user", "y" * 4000)
+    assert session.nbytes <= ChatSession.MAX_BYTES and len(session.messages) <= ChatSession.MAX_MESSAGES
+    print(f"byte limit: {len(session.messages)} messages + {len(session.llm_context or ())}-token context, "
+          f"{session.nbytes} of {ChatSession.MAX_BYTES} bytes")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--messages", type=int, default=4, help="messages per session")
+    parser.add_argument("--context-tokens", type=int, default=512, help="stored Ollama context, every tenth session")
+    parser.add_argument("--legacy-turns", type=int, default=50, help="turns timed on the scanning store")
+    parser.add_argument("--turns", type=int, default=20_000)
+    parser.add_argument("--sample", type=int, default=5_000, help="sessions measured for memory")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Benchmark: consistency rules on a synthetic branch, with per-rule profile.
+
+  python -m bench.consistency_profile [--nodes 5000] [--units 300] [--runs 20]
+      [--categories LOCATION,UNIT]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from bench.synthetic import synthetic_branch
+from src.engines.consistency_checker import run_consistency_checks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=5000)
+    parser.add_argument("--units", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--categories", default=None)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    ctx = synthetic_branch(nodes=args.nodes, units=args.units)
+    categories = args.categories.split(",") if args.categories else None
+    print(f"context: {ctx.location.totalNodes} nodes, {ctx.units.totalUnits} units")
+
+    times = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        run_consistency_checks(ctx, categories=categories)
+        times.append((time.perf_counter() - start) * 1000)
+    print(f"run_consistency_checks: median {statistics.median(times):.2f} ms, "
+          f"min {min(times):.2f} ms over {args.runs} runs")
+
+    result = run_consistency_checks(ctx, categories=categories, profile=True)
+    profile = result.profile
+    assert profile is not None
+    print(f"{profile.rulesRun} rules run, {profile.rulesSkipped} skipped, "
+          f"{len(result.issues)} issues, score {result.score}")
+    print("by category (ms):")
+    for cat, ms in sorted(profile.byCategoryMs.items(), key=lambda kv: -kv[1]):
+        print(f"  {cat:<18} {ms:8.3f}")
+    print(f"slowest {args.top} rules (ms):")
+    for t in profile.rules[:args.top]:
+        print(f"  {t.ruleId:<10} {t.category:<12} {t.durationMs:8.3f}  issues={t.issues}")
+
+
+if __name__ == "__main__":
+    main()
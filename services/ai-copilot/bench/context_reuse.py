@@ -0,0 +1,113 @@
+"""Benchmark: branch context per chat turn, collected every time vs. reused.
+
+  python -m bench.context_reuse [--turns 10] [--units 300] [--queries 32] [--query-ms 1.5]
+
+A stand-in for ``collect_branch_context`` waits ``queries`` x ``query-ms``
+(the collector's round trips to PostgreSQL) and then builds the synthetic
+branch, the way the real one materialises rows into a new BranchContext.
+Each turn of a ``--turns`` chat then gets its context and prepares the LLM
+turn (retrieval + prompt, ``_prepare_turn``):
+
+  - collect: the previous ``ai_chat`` -- a fresh context every message, so
+    the retrieval facts and fingerprint are rebuilt each turn too
+  - reuse: ``BranchContextCache.for_session`` -- one collection, later turns
+    reuse the context and everything derived from it
+
+and reports database queries, per-turn time, and that a ``bust`` after a
+real data change collects again and bumps the session's context version.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from bench.synthetic import synthetic_branch
+from src.engines.nl_query import _prepare_turn
+from src.services.chat_session import ChatSession
+from src.services.context_cache import BranchContextCache
+from src.services.ollama import OllamaService
+
+QUESTIONS = [
+    "Summarise which wards are short on isolation rooms",
+    "Which of those wards sit next to each other?",
+    "Would merging two of them free up nursing staff?",
+    "Which departments share a wing with the surgical wards?",
+    "Is the oncology day care close to the pharmacy store?",
+    "Suggest a better room split for the step-down unit",
+    "Are there wards without a negative pressure room?",
+    "Which wing suits a new dialysis service?",
+    "Rank the wards by rooms per bed",
+    "Anything else I should fix before go-live?",
+]
+
+
+class _FakeDB:
+    def __init__(self, units: int, queries: int, query_ms: float) -> None:
+        self.units = units
+        self.queries_per_collect = queries
+        self.query_ms = query_ms
+        self.queries = 0
+
+    async def collect(self, branch_id: str):
+        for _ in range(self.queries_per_collect):
+            await asyncio.sleep(self.query_ms / 1000)
+        self.queries += self.queries_per_collect
+        return synthetic_branch(units=self.units)
+
+
+async def _chat(db: _FakeDB, svc: OllamaService, turns: int, cache: BranchContextCache | None) -> list[float]:
+    session = ChatSession(session_id="bench")
+    timings = []
+    for t in range(turns):
+        question = QUESTIONS[t % len(QUESTIONS)]
+        t0 = time.perf_counter()
+        session.add_message("user", question)
+        ctx = await cache.for_session(session, "branch-1") if cache else await db.collect("branch-1")
+        await _prepare_turn(question, ctx, svc, session)
+        timings.append((time.perf_counter() - t0) * 1000)
+        session.add_message("assistant", "Noted.")
+    return timings
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    svc = OllamaService(base_url="http://127.0.0.1:9", cache=None)  # never started: hashing retrieval
+    await _chat(_FakeDB(args.units, 0, 0), svc, 2, None)  # warm imports and the fact index
+
+    print(f"{args.turns}-turn chat, {args.units} units, {args.queries} queries x {args.query_ms} ms per collection")
+    print(f"{'':<9} {'queries':>8} {'first turn':>11} {'later p50':>10} {'total':>9}")
+    for label in ("collect", "reuse"):
+        db = _FakeDB(args.units, args.queries, args.query_ms)
+        cache = BranchContextCache(ttl=args.ttl, collect=db.collect) if label == "reuse" else None
+        timings = await _chat(db, svc, args.turns, cache)
+        print(f"{label:<9} {db.queries:>8} {timings[0]:8.1f} ms {statistics.median(timings[1:]):7.1f} ms "
+              f"{sum(timings):6.0f} ms")
+    print(f"cache: {cache.stats()}")
+
+    # A bust without a data change keeps the version; after a real change it moves.
+    session = ChatSession(session_id="bust")
+    await cache.for_session(session, "branch-1")
+    v1 = session.context_ref
+    await cache.for_session(session, "branch-1", refresh=True)
+    assert session.context_ref.version == v1.version and session.context_ref.fetched_at > v1.fetched_at
+    db.units += 1
+    await cache.for_session(session, "branch-1", refresh=True)
+    assert session.context_ref.version == v1.version + 1 and cache.changed == 1
+    print(f"bust: unchanged data keeps v{v1.version}; a new unit -> v{session.context_ref.version}, "
+          f"fingerprint {v1.fingerprint[:8]} -> {session.context_ref.fingerprint[:8]}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--units", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=32, help="queries per collection")
+    parser.add_argument("--query-ms", type=float, default=1.5, help="round trip per query")
+    parser.add_argument("--ttl", type=float, default=120)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark: branch fact retrieval (vector index) for NL questions.
+
+  python -m bench.fact_retrieval [--units 300] [--questions 200] [--embed-delay 0.002]
+
+On the synthetic branch:
+
+  - index build with the hashing vectorizer, then with "Ollama" embeddings
+    from the stub (``embed-delay`` seconds per input, roughly a small
+    embedding model on CPU), cold / after one unit is renamed / after a
+    restart with the ``.npy`` index memory-mapped back from disk
+  - query latency, one question at a time (each call also re-derives and
+    fingerprints the branch facts) vs. one batched search
+  - NL system prompt size: packed whole-branch sections vs. retrieved facts
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+from bench.ollama_stub import OllamaStub
+from bench.synthetic import synthetic_branch
+from src.engines.nl_query import _build_system_prompt, _fact_sections
+from src.engines.prompt_builder import estimate_tokens
+from src.services.fact_index import FactIndexStore
+from src.services.ollama import OllamaService
+
+TOPICS = [
+    "Summarise which wards are short on isolation rooms",
+    "Which departments have no head?",
+    "Which ICU rooms have suction?",
+    "Is the oncology department staffed?",
+    "Which pharmacy stores have no pharmacist in charge?",
+    "Which units are in Zone B1F0Z1?",
+    "Are there inactive rooms in the day care units?",
+    "How many beds does High Dependency Unit 12 have?",
+]
+
+
+def _renamed(ctx, i: int):
+    """Copy of *ctx* with unit *i* renamed (one unit fact and its room facts change)."""
+    units = list(ctx.units.units)
+    units[i] = units[i].model_copy(update={"name": units[i].name + " East"})
+    return ctx.model_copy(update={"units": ctx.units.model_copy(update={"units": units})})
+
+
+async def _timed(coro) -> tuple[float, object]:
+    t0 = time.perf_counter()
+    out = await coro
+    return (time.perf_counter() - t0) * 1000, out
+
+
+async def _builds(label: str, ctx, make_store, svc: OllamaService | None) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = make_store(tmp)
+        cold, r = await _timed(store.retrieve(ctx, TOPICS[0], svc=svc))
+        cold_embedded = store.facts_embedded
+        edit, _ = await _timed(store.retrieve(_renamed(ctx, 7), TOPICS[0], svc=svc))
+        edit_embedded = store.facts_embedded - cold_embedded
+        restarted = make_store(tmp)
+        reload, _ = await _timed(restarted.retrieve(_renamed(ctx, 7), TOPICS[0], svc=svc))
+        print(f"{label:<8} {r.embedder:<22} cold {cold:8.1f} ms ({cold_embedded} embedded)   "
+              f"edit {edit:7.1f} ms ({edit_embedded} embedded)   "
+              f"restart {reload:6.1f} ms ({restarted.facts_embedded} embedded, mmap)")
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    ctx = synthetic_branch(units=args.units)
+
+    print("index build")
+    await _builds("hashing", ctx, lambda d: FactIndexStore(index_dir=d), None)
+    async with OllamaStub(embed_model="nomic-embed-text", embed_dim=768, embed_delay=args.embed_delay) as stub:
+        svc = OllamaService(base_url=stub.base_url, model=stub.model, cache=None)
+        await svc.start()
+        await svc.probe()
+        await _builds("ollama", ctx, lambda d: FactIndexStore(index_dir=d), svc)
+        await svc.aclose()
+
+    store = FactIndexStore()
+    questions = [TOPICS[i % len(TOPICS)] + f" ({i})" for i in range(args.questions)]
+    await store.retrieve(ctx, questions[0])
+    single = []
+    for q in questions:
+        ms, _ = await _timed(store.retrieve(ctx, q))
+        single.append(ms)
+    batch_ms, results = await _timed(store.retrieve_many(ctx, questions))
+    facts = len(store._indexes[(ctx.branch.id, store.hashing.name)].facts)
+    print(f"\nquery ({facts} facts, top {store.top_k})")
+    print(f"one at a time   p50 {statistics.median(single):6.2f} ms   total {sum(single):7.1f} ms")
+    print(f"batched         {batch_ms / len(questions):6.2f} ms/question   total {batch_ms:7.1f} ms")
+
+    print("\nsystem prompt tokens     packed sections   retrieved facts")
+    for q in TOPICS[:4]:
+        hits = (await store.retrieve(ctx, q)).hits
+        packed = estimate_tokens(_build_system_prompt(ctx, q))
+        retrieved = estimate_tokens(_build_system_prompt(ctx, q, _fact_sections(hits)))
+        print(f"{q[:40]:<40} {packed:>9} {retrieved:>17}")
+    assert all(r.hits for r in results)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=300)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--embed-delay", type=float, default=0.002, help="stub seconds per embedded input")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
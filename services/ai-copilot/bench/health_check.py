@@ -0,0 +1,79 @@
+"""Benchmark: engine pass of /v1/ai/health-check on a synthetic branch.
+
+  python -m bench.health_check [--nodes 5000] [--units 300] [--runs 20]
+
+Runs the same engines as the health-check handler (consistency, NABH,
+naming, go-live, pharmacy) against an in-memory BranchContext, so the
+numbers exclude DB collection.  "cold" runs get a fresh copy of the context
+each time, so the shared BranchContext index is rebuilt; "warm" runs reuse
+one context whose index is already built.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from bench.synthetic import synthetic_branch
+from src.collectors.models import BranchContext
+from src.engines.consistency_checker import run_consistency_checks
+from src.engines.go_live_scorer import compute_go_live_score
+from src.engines.nabh_checker import run_nabh_checks
+from src.engines.naming_enforcer import run_naming_check
+from src.engines.pharmacy_checker import run_pharmacy_checks
+
+_STAGES = ("index", "consistency", "nabh", "naming", "go_live", "pharmacy")
+
+
+def _engine_pass(ctx: BranchContext) -> dict[str, float]:
+    times: dict[str, float] = {}
+
+    def lap(stage: str, t0: float) -> float:
+        now = time.perf_counter()
+        times[stage] = (now - t0) * 1000
+        return now
+
+    t = time.perf_counter()
+    ix = ctx.index
+    _ = ix.nodes, ix.active_units  # the views every engine touches
+    t = lap("index", t)
+    consistency = run_consistency_checks(ctx)
+    t = lap("consistency", t)
+    nabh = run_nabh_checks(ctx)
+    t = lap("nabh", t)
+    run_naming_check(ctx, limit=0)
+    t = lap("naming", t)
+    compute_go_live_score(consistency, nabh)
+    t = lap("go_live", t)
+    run_pharmacy_checks(ctx)
+    lap("pharmacy", t)
+    return times
+
+
+def _report(label: str, runs: list[dict[str, float]]) -> None:
+    totals = [sum(r.values()) for r in runs]
+    print(f"{label}: median {statistics.median(totals):.2f} ms, min {min(totals):.2f} ms")
+    for stage in _STAGES:
+        print(f"  {stage:<12} {statistics.median(r[stage] for r in runs):8.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=5000)
+    parser.add_argument("--units", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    ctx = synthetic_branch(nodes=args.nodes, units=args.units)
+    rooms = sum(len(u.rooms) for u in ctx.units.units)
+    print(f"context: {ctx.location.totalNodes} nodes, {ctx.units.totalUnits} units, "
+          f"{rooms} rooms, {len(ctx.pharmacy.drugs)} drugs")
+
+    _engine_pass(ctx.model_copy())  # warm imports and reference data
+    _report("cold (fresh index per run)", [_engine_pass(ctx.model_copy()) for _ in range(args.runs)])
+    _report("warm (index reused)", [_engine_pass(ctx) for _ in range(args.runs)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Micro-benchmark: keyword intent matching, regex cascade vs. compiled matcher.
+
+  python -m bench.intent_matching [--units 300] [--rounds 200]
+
+Runs a corpus of realistic chat and compliance questions (hits for every
+intent, near-misses, and questions that fall through to the LLM) through:
+
+  - nl_query: the previous ``_keyword_answer`` shape -- bed/room totals over
+    every unit up front, then up to nine ``re.search`` calls -- against
+    ``_keyword_answer`` with the single ``IntentMatcher`` and per-intent
+    aggregates.  Both build the same answer on a context with a cold index;
+    the "intent only" row isolates the matching step.
+  - compliance_help: five ``re.search`` calls per glossary entry plus the
+    rule cascade, against the glossary regex plus ``IntentMatcher``.
+
+Both legacy cascades are reproduced here so the comparison stays runnable,
+and the bench checks they pick the same intent / glossary entry.
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import time
+
+from bench.synthetic import synthetic_branch
+from src.engines.compliance_help import (
+    COMPLIANCE_GLOSSARY,
+    _COMPLIANCE_INTENTS,
+    _GLOSSARY_QUESTION,
+    _GLOSSARY_RANK,
+)
+from src.engines.nl_query import _INTENTS, _KEYWORD_ANSWERS, _keyword_answer
+
+NL_QUESTIONS = [
+    "How many beds do we have?",
+    "what's the total beds across the hospital",
+    "Bed count for the ICU please",
+    "How many rooms are set up?",
+    "room count",
+    "Which departments don't have a head?",
+    "who is the head of cardiology",
+    "What's our ICU to total bed ratio?",
+    "what percent of beds are icu",
+    "Are all locations fire zone mapped?",
+    "is fire safety configured",
+    "Are emergency exits marked?",
+    "Which units have no rooms?",
+    "units without beds",
+    "any empty units?",
+    "Where is the pharmacy?",
+    "Show me the building layout",
+    "how many floors in block B",
+    "Give me a summary",
+    "overview of the branch",
+    "Tell me about this hospital",
+    "What do we have configured so far?",
+    "Summarise which wards are short on isolation rooms",
+    "Would merging two wards free up nursing staff?",
+    "Is the oncology day care close to the pharmacy store?",
+    "Suggest a better room split for the step-down unit",
+    "Rank the wards by rooms per bed",
+    "Which ICU rooms have suction?",
+    "Anything else I should fix before go-live?",
+    "Which pharmacy stores have no pharmacist in charge?",
+]
+
+COMPLIANCE_QUESTIONS = [
+    "What is ABDM?",
+    "what does HFR mean",
+    "Explain NABH 6th Edition",
+    "define capa",
+    "tell me about the evidence vault",
+    "tell me about evidence vault",
+    "What is a blocking gap?",
+    "what is maker-checker",
+    "Where do I start?",
+    "how do I begin with compliance",
+    "What documents do I need?",
+    "which documents should I upload",
+    "How do I get NABH accreditation?",
+    "how to upload evidence",
+    "What's my readiness score?",
+    "how do I fix blocking issues",
+    "resolve a gap in schemes",
+    "PMJAY setup steps",
+    "ayushman bharat rates",
+    "cghs city category",
+    "echs empanelment",
+    "what should I do on this page",
+    "help with this",
+    "what's next?",
+    "where am i in the process",
+    "show progress",
+    "How long does the assessment take?",
+    "Can two people approve the same document?",
+    "Is the sandbox safe to test in?",
+    "Do I need AERB for a CT scanner?",
+]
+
+# ── Legacy cascades (as they were before the compiled matchers) ───────────
+
+
+def _legacy_nl_intent(question: str) -> str | None:
+    q = question.lower().strip()
+    for name, pattern in _INTENTS.rules:
+        if re.search(pattern, q):
+            return name
+    return None
+
+
+def _legacy_keyword(question: str, ctx):
+    """Totals over every unit up front, then the cascade, then the same answer."""
+    sum(u.resources.beds for u in ctx.units.units)
+    sum(len(u.rooms) for u in ctx.units.units)
+    intent = _legacy_nl_intent(question)
+    return _KEYWORD_ANSWERS[intent](ctx) if intent else None
+
+
+def _legacy_glossary(q: str) -> int | None:
+    for i, entry in enumerate(COMPLIANCE_GLOSSARY):
+        term_lower = entry.term.lower()
+        if re.search(rf"\bwhat\s+is\s+{re.escape(term_lower)}\b", q) or \
+           re.search(rf"\bwhat\s+does\s+{re.escape(term_lower)}\s+mean\b", q) or \
+           re.search(rf"\bexplain\s+{re.escape(term_lower)}\b", q) or \
+           re.search(rf"\bdefine\s+{re.escape(term_lower)}\b", q) or \
+           re.search(rf"\btell\s+me\s+about\s+{re.escape(term_lower)}\b", q):
+            return i
+    return None
+
+
+def _legacy_compliance(question: str) -> str | int | None:
+    q = question.lower().strip()
+    hit = _legacy_glossary(q)
+    if hit is not None:
+        return hit
+    for name, pattern in _COMPLIANCE_INTENTS.rules:
+        if re.search(pattern, q):
+            return name
+    return None
+
+
+def _compiled_compliance(question: str) -> str | int | None:
+    q = question.lower().strip()
+    ranks = [_GLOSSARY_RANK[m.group("term") or m.group("term_mean")] for m in _GLOSSARY_QUESTION.finditer(q)]
+    if ranks:
+        return min(ranks)
+    return _COMPLIANCE_INTENTS.match(q)
+
+
+def _fresh(ctx):
+    ctx.reset_index()
+    return ctx
+
+
+def _time(fn, questions: list[str], rounds: int) -> float:
+    """Mean microseconds per question."""
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for q in questions:
+            fn(q)
+    return (time.perf_counter() - t0) / (rounds * len(questions)) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    ctx = synthetic_branch(units=args.units)
+
+    for q in NL_QUESTIONS:
+        assert _legacy_nl_intent(q) == _INTENTS.match(q.lower().strip()), q
+    for q in COMPLIANCE_QUESTIONS:
+        assert _legacy_compliance(q) == _compiled_compliance(q), q
+    hits = sum(_INTENTS.match(q.lower().strip()) is not None for q in NL_QUESTIONS)
+    print(f"nl_query corpus: {len(NL_QUESTIONS)} questions, {hits} keyword hits; "
+          f"compliance corpus: {len(COMPLIANCE_QUESTIONS)} questions; same intents as the cascade")
+
+    rows = [
+        ("nl intent only", lambda q: _legacy_nl_intent(q), lambda q: _INTENTS.match(q.lower().strip()),
+         NL_QUESTIONS),
+        ("nl _keyword_answer", lambda q: _legacy_keyword(q, _fresh(ctx)), lambda q: _keyword_answer(q, _fresh(ctx)),
+         NL_QUESTIONS),
+        ("compliance intent", _legacy_compliance, _compiled_compliance, COMPLIANCE_QUESTIONS),
+    ]
+    print(f"\n{'':<20} {'cascade':>10} {'compiled':>10}")
+    for label, legacy, compiled, questions in rows:
+        before = _time(legacy, questions, args.rounds)
+        after = _time(compiled, questions, args.rounds)
+        print(f"{label:<20} {before:7.1f} us {after:7.1f} us   x{before / after:.1f}")
+
+
+if __name__ == "__main__":
+    main()
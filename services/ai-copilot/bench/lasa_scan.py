@@ -0,0 +1,109 @@
+"""Benchmark: formulary-wide LASA scan on a synthetic 30k-drug formulary.
+
+  python -m bench.lasa_scan [--drugs 30000] [--seed 7]
+
+Names are built from real pharmacological stems so that the distribution of
+lengths and shared prefixes/suffixes (-olol, -pril, -azepam …) resembles a
+real Indian hospital drug master.  Curated pairs from lasa-pairs.json are
+planted so the scan must rediscover them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from src.collectors.models import DrugSnapshot
+from src.engines.lasa_detector import _levenshtein, _normalize_name, scan_lasa_candidates
+from src.engines.pharmacy_checker import get_lasa_pairs
+
+_GENERIC_PREFIXES = [
+    "am", "at", "az", "bi", "bu", "ca", "ce", "ci", "cl", "da", "de", "di",
+    "do", "en", "es", "fa", "fe", "fl", "ga", "gl", "hy", "ib", "in", "ke",
+    "la", "le", "li", "lo", "me", "mi", "mo", "na", "ni", "ol", "om", "pa",
+    "pe", "pi", "pr", "qu", "ra", "ri", "ro", "sa", "se", "si", "so", "ta",
+    "te", "ti", "to", "tr", "va", "ve", "xa", "za", "zo",
+]
+_GENERIC_MIDDLES = ["", "bu", "co", "di", "fe", "lo", "ma", "ne", "pro", "ri", "so", "tra", "xo"]
+_STEMS = [
+    "olol", "pril", "sartan", "statin", "azepam", "oxacin", "mycin", "cillin",
+    "dipine", "prazole", "tidine", "triptan", "afil", "parin", "semide",
+    "zolam", "profen", "oxetine", "amine", "azole", "cycline", "vir", "mab",
+    "nib", "lukast", "gliptin", "floxacin", "caine", "barbital", "one",
+]
+_SYLLABLES = [c + v for c in "bcdfgklmnprstvz" for v in "aeiou"] + ["ox", "ex", "an", "ol", "in"]
+_BRAND_SUFFIX = ["", "", "", "-DS", " Forte", "-SR", "-XL", " Plus", "-OD"]
+_FORMS = ["500mg Tab", "250mg Tab", "10mg Tab", "5mg/ml Inj", "100mg Cap", "Syrup"]
+
+
+def synthetic_formulary(n: int, seed: int = 7, generics: int = 3000) -> list[DrugSnapshot]:
+    """~``generics`` molecules, each marketed under several brands/strengths."""
+    rng = random.Random(seed)
+    drugs: list[DrugSnapshot] = []
+
+    for a, b in get_lasa_pairs():
+        for name in (a, b):
+            drugs.append(DrugSnapshot(
+                id=f"d{len(drugs)}", drugCode=f"DRG{len(drugs):06d}",
+                genericName=name.title(), brandName=None, isLasa=False,
+            ))
+
+    pool: set[str] = set()
+    while len(pool) < generics:
+        pool.add(
+            (rng.choice(_GENERIC_PREFIXES) + rng.choice(_GENERIC_MIDDLES) + rng.choice(_STEMS)).title()
+        )
+    molecules = sorted(pool)
+
+    while len(drugs) < n:
+        brand = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(3, 4))).title()
+        drugs.append(DrugSnapshot(
+            id=f"d{len(drugs)}",
+            drugCode=f"DRG{len(drugs):06d}",
+            genericName=f"{rng.choice(molecules)} {rng.choice(_FORMS)}",
+            brandName=brand + rng.choice(_BRAND_SUFFIX),
+            isLasa=rng.random() < 0.02,
+        ))
+    return drugs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drugs", type=int, default=30_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    drugs = synthetic_formulary(args.drugs, args.seed)
+    gen_ms = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    result = scan_lasa_candidates(drugs, limit=20)
+    scan_ms = (time.perf_counter() - t0) * 1000
+
+    # Extrapolate the all-pairs baseline from a random sample of comparisons.
+    names = list({_normalize_name(x) for d in drugs for x in (d.genericName, d.brandName) if x})
+    rng = random.Random(args.seed)
+    sample = 20_000
+    t0 = time.perf_counter()
+    for _ in range(sample):
+        _levenshtein(rng.choice(names), rng.choice(names))
+    per_pair = (time.perf_counter() - t0) / sample
+
+    n = result.namesIndexed
+    all_pairs = n * (n - 1) // 2
+    print(f"drugs={result.totalDrugs}  unique names={n}  (generated in {gen_ms:.0f} ms)")
+    print(f"naive all-pairs comparisons     : {all_pairs:,}"
+          f"  (~{all_pairs * per_pair:.0f} s extrapolated)")
+    print(f"index candidate pairs scored    : {result.candidatesScored:,}")
+    print(f"unflagged pairs >= min score    : {result.totalUnflagged:,}"
+          f"  (known curated: {result.knownPairsUnflagged})")
+    print(f"scan time                       : {scan_ms:.0f} ms")
+    print("top pairs:")
+    for c in result.unflaggedPairs[:10]:
+        print(f"  {c.score:.3f}  {c.nameA!r:32} ~ {c.nameB!r:32} {c.reason}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Benchmark: repeated NL questions with and without the LLM response cache.
+
+  python -m bench.llm_cache [--questions 5] [--repeats 10] [--latency 0.3]
+
+Asks ``--questions`` distinct non-keyword questions ``--repeats`` times each
+against the synthetic branch through ``run_nl_query`` (temperature 0.2, so
+cacheable), with the stub standing in for a slow model.  A second cache
+instance is then opened on the same SQLite file to show warm restarts, and
+a restart with room for one entry checks that it keeps the entry last read,
+not the one last written.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from bench.ollama_stub import OllamaStub
+from bench.synthetic import synthetic_branch
+from src.engines.nl_query import run_nl_query
+from src.services.llm_cache import LLMResponseCache
+from src.services.ollama import OllamaService
+
+
+async def _ask_all(svc: OllamaService, ctx, questions: list[str], repeats: int) -> list[float]:
+    lat = []
+    for _ in range(repeats):
+        for q in questions:
+            t0 = time.perf_counter()
+            result = await run_nl_query(q, ctx, svc)
+            assert result.source == "ollama", result
+            lat.append((time.perf_counter() - t0) * 1000)
+    return lat
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    ctx = synthetic_branch()
+    questions = [f"Explain the staffing pattern for wing {i}" for i in range(args.questions)]
+    path = os.path.join(tempfile.mkdtemp(), "llm_cache.sqlite")
+
+    async with OllamaStub(latency=args.latency, tokens=40) as stub:
+        for label, cache in (
+            ("no cache", None),
+            ("memory+sqlite", LLMResponseCache(path=path)),
+        ):
+            if cache is not None:
+                cache.open()
+            svc = OllamaService(base_url=stub.base_url, model=stub.model, cache=cache)
+            await svc.check_health()
+            stub.reset_counters()
+            t0 = time.perf_counter()
+            lat = await _ask_all(svc, ctx, questions, args.repeats)
+            wall = time.perf_counter() - t0
+            stats = cache.stats() if cache else {"hitRate": 0.0}
+            print(f"{label:<14} total {wall:6.2f} s   median {statistics.median(lat):7.2f} ms   "
+                  f"ollama calls {stub.requests:4d}   hit rate {stats['hitRate']:.2f}")
+            await svc.aclose()
+            if cache is not None:
+                await cache.aclose()
+
+        restarted = LLMResponseCache(path=path)
+        t0 = time.perf_counter()
+        loaded = restarted.open()
+        print(f"restart: loaded {loaded} entries from SQLite in {(time.perf_counter() - t0) * 1000:.2f} ms")
+        svc = OllamaService(base_url=stub.base_url, model=stub.model, cache=restarted)
+        await svc.check_health()
+        stub.reset_counters()
+        await _ask_all(svc, ctx, questions, 1)
+        print(f"after restart: ollama calls {stub.requests}, hit rate {restarted.stats()['hitRate']:.2f}")
+        await svc.aclose()
+        await restarted.aclose()
+
+    path = os.path.join(tempfile.mkdtemp(), "llm_cache_lru.sqlite")
+    cache = LLMResponseCache(path=path)
+    cache.open()
+    cache.put("read", "a")
+    cache.put("written", "b")
+    assert cache.get("read") is not None
+    await cache.aclose()
+    small = LLMResponseCache(max_entries=1, path=path)
+    small.open()
+    assert small.get("read") is not None and small.get("written") is None, "restart kept the last write"
+    print("restart with room for one entry kept the most recently read one")
+    await small.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.3)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
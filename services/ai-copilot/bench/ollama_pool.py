@@ -0,0 +1,82 @@
+"""Benchmark: pooled Ollama client vs. a new client per request.
+
+  python -m bench.ollama_pool [--requests 500] [--concurrency 8] [--latency 0]
+
+Runs against the in-process stub from ``bench.ollama_stub``, so the numbers
+isolate client-side cost (client construction, TCP connect, pool checkout)
+from model time.  "per-request" reproduces the previous behaviour of
+opening an ``httpx.AsyncClient`` for every call; "pooled" goes through
+``OllamaService.generate`` with the shared keep-alive client.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from bench.ollama_stub import OllamaStub
+from src.services.ollama import OllamaService
+
+
+async def _run(n: int, concurrency: int, call) -> list[float]:
+    sem = asyncio.Semaphore(concurrency)
+    lat: list[float] = []
+
+    async def one(i: int) -> None:
+        async with sem:
+            t0 = time.perf_counter()
+            await call(i)
+            lat.append((time.perf_counter() - t0) * 1000)
+
+    await asyncio.gather(*(one(i) for i in range(n)))
+    return lat
+
+
+def _report(label: str, lat: list[float], wall: float, stub: OllamaStub) -> None:
+    lat.sort()
+    p95 = lat[int(len(lat) * 0.95) - 1]
+    print(f"{label:<12} {len(lat) / wall:8.0f} req/s   p50 {statistics.median(lat):6.2f} ms   "
+          f"p95 {p95:6.2f} ms   connections {stub.connections}")
+
+
+async def main_async(requests: int, concurrency: int, latency: float) -> None:
+    async with OllamaStub(latency=latency) as stub:
+        body = {"model": stub.model, "prompt": "How many beds?", "stream": False}
+
+        async def per_request(_: int) -> None:
+            async with httpx.AsyncClient(timeout=30) as client:
+                resp = await client.post(f"{stub.base_url}/api/generate", json=body)
+            resp.json()
+
+        svc = OllamaService(base_url=stub.base_url, model=stub.model, cache=None)
+        await svc.start()
+
+        async def pooled(_: int) -> None:
+            resp = await svc.generate("How many beds?")
+            assert resp.error is None, resp.error
+
+        await per_request(0)
+        await pooled(0)
+        for label, call in (("per-request", per_request), ("pooled", pooled)):
+            stub.reset_counters()
+            t0 = time.perf_counter()
+            lat = await _run(requests, concurrency, call)
+            _report(label, lat, time.perf_counter() - t0, stub)
+        await svc.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0, help="stub generation time, seconds")
+    args = parser.parse_args()
+    asyncio.run(main_async(args.requests, args.concurrency, args.latency))
+
+
+if __name__ == "__main__":
+    main()
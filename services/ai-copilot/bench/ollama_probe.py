@@ -0,0 +1,86 @@
+"""Benchmark: request-path cost of health checks, on-demand vs. background probe.
+
+  python -m bench.ollama_probe [--load-delay 2.0] [--hang 8.0]
+
+Three situations, each measured for the first request a user makes:
+
+  hung server  -- /api/tags never answers in time; an on-demand check blocks
+                  the request for HEALTH_CHECK_TIMEOUT, while with the probe
+                  that wait happens in start-up and the request fails fast
+  slow probe   -- /api/tags takes 50 ms; paid once per interval on demand
+  cold model   -- first generation pays the model load; the background probe
+                  pre-warms it with a keep-alive (and the request's num_ctx,
+                  so the first request doesn't reload it) before any user
+                  arrives
+  blip         -- a request fails to connect and marks Ollama down; the
+                  probe re-checks at once instead of after a probe interval
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from bench.ollama_stub import OllamaStub
+from src.services.ollama import OllamaService
+
+
+async def _first_request(stub: OllamaStub, background: bool, settle: float = 0.0) -> tuple[float, OllamaService]:
+    svc = OllamaService(base_url=stub.base_url, model=stub.model, cache=None)
+    if background:
+        await svc.start_probe()
+        await asyncio.sleep(settle)  # give the probe loop time to pre-warm
+    t0 = time.perf_counter()
+    resp = await svc.generate("How many ICU beds?")
+    ms = (time.perf_counter() - t0) * 1000
+    await svc.stop_probe()
+    await svc.aclose()
+    assert resp.busy is False
+    return ms, svc
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    print(f"{'':<14} {'on-demand':>12} {'background':>12}")
+
+    async with OllamaStub(probe_delay=args.hang) as stub:
+        on_demand, _ = await _first_request(stub, background=False)
+        # The probe's own timeout is paid once at startup, off the request path.
+        background, _ = await _first_request(stub, background=True)
+        print(f"{'hung server':<14} {on_demand:9.0f} ms {background:9.2f} ms")
+
+    async with OllamaStub(probe_delay=0.05) as stub:
+        on_demand, _ = await _first_request(stub, background=False)
+        background, _ = await _first_request(stub, background=True)
+        print(f"{'slow probe':<14} {on_demand:9.1f} ms {background:9.1f} ms")
+
+    async with OllamaStub(load_delay=args.load_delay) as stub:
+        on_demand, _ = await _first_request(stub, background=False)
+    async with OllamaStub(load_delay=args.load_delay) as stub:
+        background, svc = await _first_request(stub, background=True, settle=args.load_delay + 0.5)
+        print(f"{'cold model':<14} {on_demand:9.0f} ms {background:9.1f} ms   "
+              f"(model loaded before first request: {svc.health.model_loaded}, loads: {stub.loads})")
+        assert stub.loads == 1, "the first request reloaded the pre-warmed model"
+
+    async with OllamaStub() as stub:
+        svc = OllamaService(base_url=stub.base_url, model=stub.model, cache=None, probe_interval=60)
+        await svc.start_probe()
+        svc._mark_down("connection reset")
+        t0 = time.perf_counter()
+        while not svc.available:
+            await asyncio.sleep(0.005)
+        back = (time.perf_counter() - t0) * 1000
+        print(f"{'blip':<14} {'':>12} {back:9.1f} ms   (back up; probe interval {svc.probe_interval:.0f} s)")
+        await svc.stop_probe()
+        await svc.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--load-delay", type=float, default=2.0)
+    parser.add_argument("--hang", type=float, default=8.0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark: interactive latency under a bulk burst, with and without the scheduler.
+
+  python -m bench.ollama_scheduler [--bulk 12] [--interactive 6] [--latency 0.25]
+
+Fires ``--bulk`` copilot-style calls and, a moment later, ``--interactive``
+chat calls at a stub that (like a CPU-only Ollama) runs one generation at
+a time.  "unscheduled" lets everything through at once so the stub's own
+queue is FIFO; "scheduled" uses the default two in-flight slots with chat
+ahead of bulk; "small queue" shows fast rejection instead of piling up.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from bench.ollama_stub import OllamaStub
+from src.services.ollama import OllamaScheduler, OllamaService
+
+
+class _SerialStub(OllamaStub):
+    """Stub that, like Ollama on one CPU, generates one answer at a time."""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._gpu = asyncio.Lock()
+
+    async def _respond(self, method, path, body):
+        if path != "/api/generate":
+            return await super()._respond(method, path, body)
+        async with self._gpu:
+            return await super()._respond(method, path, body)
+
+
+async def _scenario(stub: OllamaStub, scheduler: OllamaScheduler, n_bulk: int, n_chat: int) -> None:
+    svc = OllamaService(base_url=stub.base_url, model=stub.model, cache=None, scheduler=scheduler,
+                        max_connections=64, max_keepalive=64)
+    await svc.check_health()
+    lat: dict[str, list[float]] = {"interactive": [], "bulk": []}
+    busy = {"interactive": 0, "bulk": 0}
+
+    async def call(priority: str, i: int) -> None:
+        t0 = time.perf_counter()
+        resp = await svc.generate(f"{priority} {i}", priority=priority)
+        if resp.busy:
+            busy[priority] += 1
+        else:
+            lat[priority].append((time.perf_counter() - t0) * 1000)
+
+    async def chats() -> None:
+        await asyncio.sleep(stub.latency / 2)  # chat arrives just after the burst
+        await asyncio.gather(*(call("interactive", i) for i in range(n_chat)))
+
+    await asyncio.gather(*(call("bulk", i) for i in range(n_bulk)), chats())
+    for priority in ("interactive", "bulk"):
+        xs = lat[priority]
+        med = f"{statistics.median(xs):7.0f} ms" if xs else "      - "
+        print(f"    {priority:<12} served {len(xs):3d}   median {med}   rejected {busy[priority]}")
+    await svc.aclose()
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    async with _SerialStub(latency=args.latency) as stub:
+        for label, scheduler in (
+            ("unscheduled", OllamaScheduler(max_inflight=1000, max_queue=0)),
+            ("scheduled", OllamaScheduler()),
+            ("small queue", OllamaScheduler(max_queue=4)),
+        ):
+            print(label)
+            await _scenario(stub, scheduler, args.bulk, args.interactive)
+            if label != "unscheduled":
+                stats = scheduler.stats()["byPriority"]
+                print(f"    queue wait p95: interactive {stats['interactive']['waitP95Ms']:.0f} ms, "
+                      f"bulk {stats['bulk']['waitP95Ms']:.0f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bulk", type=int, default=12)
+    parser.add_argument("--interactive", type=int, default=6)
+    parser.add_argument("--latency", type=float, default=0.25)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
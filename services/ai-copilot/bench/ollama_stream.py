@@ -0,0 +1,88 @@
+"""Benchmark: time-to-first-token, buffered vs. streamed generation.
+
+  python -m bench.ollama_stream [--tokens 80] [--token-delay 0.05] [--latency 0.4] [--runs 5]
+
+The stub from ``bench.ollama_stub`` emulates a CPU-bound model: ``latency``
+seconds of prompt evaluation, then one token every ``token-delay`` seconds.
+"buffered" is ``OllamaService.generate`` (``stream: false``), where the
+first token reaches the caller only with the whole answer; "streamed" is
+``generate_stream``.  The nl_query row goes through ``stream_nl_query`` on
+the synthetic branch, i.e. what the SSE endpoints send.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from bench.ollama_stub import OllamaStub
+from bench.synthetic import synthetic_branch
+from src.engines.nl_query import stream_nl_query
+from src.services.ollama import OllamaService
+
+QUESTION = "Summarise which wards are short on isolation rooms"
+
+
+async def _buffered(svc: OllamaService) -> tuple[float, float]:
+    t0 = time.perf_counter()
+    resp = await svc.generate(QUESTION)
+    assert resp.error is None, resp.error
+    total = (time.perf_counter() - t0) * 1000
+    return total, total
+
+
+async def _streamed(svc: OllamaService) -> tuple[float, float]:
+    t0 = time.perf_counter()
+    first = None
+    async for chunk in svc.generate_stream(QUESTION):
+        if chunk.text and first is None:
+            first = (time.perf_counter() - t0) * 1000
+        if chunk.done:
+            assert chunk.final and chunk.final.error is None, chunk.final
+    return first or 0.0, (time.perf_counter() - t0) * 1000
+
+
+async def _nl_streamed(svc: OllamaService, ctx) -> tuple[float, float]:
+    t0 = time.perf_counter()
+    first = None
+    async for event, data in stream_nl_query(QUESTION, ctx, svc):
+        if event == "token" and first is None:
+            first = (time.perf_counter() - t0) * 1000
+        if event == "done":
+            assert data["source"] == "ollama" and data["evalCount"], data
+    return first or 0.0, (time.perf_counter() - t0) * 1000
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    ctx = synthetic_branch()
+    async with OllamaStub(latency=args.latency, tokens=args.tokens, token_delay=args.token_delay) as stub:
+        svc = OllamaService(base_url=stub.base_url, model=stub.model, cache=None)
+        await svc.start()
+        await svc.check_health()
+        cases = (
+            ("buffered", lambda: _buffered(svc)),
+            ("streamed", lambda: _streamed(svc)),
+            ("nl_query stream", lambda: _nl_streamed(svc, ctx)),
+        )
+        print(f"{'':<16} {'first token':>12} {'complete':>10}")
+        for label, run in cases:
+            results = [await run() for _ in range(args.runs)]
+            ttft = statistics.median(r[0] for r in results)
+            total = statistics.median(r[1] for r in results)
+            print(f"{label:<16} {ttft:9.0f} ms {total:7.0f} ms")
+        await svc.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=80)
+    parser.add_argument("--token-delay", type=float, default=0.05)
+    parser.add_argument("--latency", type=float, default=0.4)
+    parser.add_argument("--runs", type=int, default=5)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""Minimal in-process Ollama stand-in for benchmarks.
+
+Speaks just enough HTTP/1.1 (keep-alive, Content-Length bodies) to serve
+``GET /api/tags``, ``POST /api/generate`` and ``POST /api/embed`` from an asyncio server on a
+random local port, and counts accepted TCP connections and requests so a
+benchmark can show how many connections a client really opened.
+
+Generation is simulated as ``latency`` (prompt evaluation) followed by
+``tokens`` tokens ``token_delay`` apart; with ``"stream": true`` the tokens
+go out as chunked NDJSON lines the way Ollama sends them.  The first
+generation after start-up also pays ``load_delay`` (model load), which an
+empty-prompt request pays instead, like Ollama's pre-load; ``/api/ps`` reports
+whether that has happened.  Like Ollama, a request whose ``options.num_ctx``
+differs from the loaded model's reloads it and pays ``load_delay`` again
+(``loads`` counts them).  ``probe_delay`` slows down ``/api/tags`` and
+``/api/ps`` to mimic a hung or overloaded server.
+
+``generated`` counts tokens actually streamed; a streaming client that
+disconnects stops generation before the next token, like Ollama, and is
+counted in ``aborted``.
+
+Prompt evaluation can also be charged per token: ``prompt_delay`` seconds for
+every prompt token (~4 characters) the request makes the model evaluate.
+Like Ollama, every final response carries a ``context`` array; a request that
+passes it back is only charged for its new prompt, not the system prompt
+and earlier turns.  ``prompt_tokens`` counts evaluated prompt tokens.
+
+With ``embed_model`` set, that model is listed in ``/api/tags`` and
+``/api/embed`` returns ``embed_dim``-wide pseudo-random vectors (seeded by
+the input text), ``embed_delay`` seconds per input; ``embedded`` counts inputs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+from typing import Any
+
+DEFAULT_NUM_CTX = 2048  # Ollama's context window when a request sets none
+
+
+class OllamaStub:
+    def __init__(
+        self,
+        model: str = "mistral:7b",
+        latency: float = 0.0,
+        tokens: int = 3,
+        token_delay: float = 0.0,
+        load_delay: float = 0.0,
+        probe_delay: float = 0.0,
+        prompt_delay: float = 0.0,
+        embed_model: str | None = None,
+        embed_dim: int = 64,
+        embed_delay: float = 0.0,
+    ) -> None:
+        self.model = model
+        self.latency = latency  # simulated prompt evaluation time, seconds
+        self.tokens = tokens
+        self.token_delay = token_delay  # simulated time per generated token, seconds
+        self.load_delay = load_delay
+        self.probe_delay = probe_delay
+        self.prompt_delay = prompt_delay  # simulated evaluation time per prompt token, seconds
+        self.embed_model = embed_model
+        self.embed_dim = embed_dim
+        self.embed_delay = embed_delay
+        self.loaded = load_delay == 0
+        self.loaded_ctx: int | None = None  # num_ctx of the loaded model; None = any
+        self.loads = 0
+        self._load_lock = asyncio.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.embedded = 0
+        self.generated = 0
+        self.aborted = 0
+        self._server: asyncio.base_events.Server | None = None
+
+    @property
+    def base_url(self) -> str:
+        assert self._server is not None
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def __aenter__(self) -> "OllamaStub":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        assert self._server is not None
+        self._server.close()
+        await self._server.wait_closed()
+
+    def reset_counters(self) -> None:
+        self.connections = 0
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.embedded = 0
+        self.generated = 0
+        self.aborted = 0
+
+    # ── Request handling ───────────────────────────────────────────────
+
+    @staticmethod
+    def _new_prompt_tokens(req: dict[str, Any]) -> int:
+        """Tokens Ollama must evaluate: the system prompt is already in a passed context."""
+        text = str(req.get("prompt", ""))
+        if not req.get("context"):
+            text = str(req.get("system", "")) + text
+        return len(text) // 4
+
+    async def _evaluate(self, req: dict[str, Any]) -> None:
+        n = self._new_prompt_tokens(req)
+        self.prompt_tokens += n
+        await asyncio.sleep(self.latency + n * self.prompt_delay)
+
+    def _final(self, req: dict[str, Any], text: str) -> dict[str, Any]:
+        n = self._new_prompt_tokens(req)
+        context = list(req.get("context") or [])
+        context.extend(range(len(context), len(context) + n + self.tokens))
+        return {
+            "model": req.get("model", self.model),
+            "response": text,
+            "done": True,
+            "eval_count": self.tokens,
+            "prompt_eval_count": n,
+            "context": context,
+        }
+
+    async def _load(self, req: dict[str, Any]) -> None:
+        num_ctx = (req.get("options") or {}).get("num_ctx", DEFAULT_NUM_CTX)
+        async with self._load_lock:
+            if not self.loaded or self.loaded_ctx not in (None, num_ctx):
+                await asyncio.sleep(self.load_delay)
+                self.loaded, self.loaded_ctx = True, num_ctx
+                self.loads += 1
+
+    async def _respond(self, method: str, path: str, body: bytes) -> dict[str, Any]:
+        if method == "GET" and path in ("/api/tags", "/api/ps"):
+            await asyncio.sleep(self.probe_delay)
+            if path == "/api/ps":
+                return {"models": [{"name": self.model}] if self.loaded else []}
+            models = [self.model] + ([self.embed_model] if self.embed_model else [])
+            return {"models": [{"name": m} for m in models]}
+        if method == "POST" and path == "/api/embed":
+            req = json.loads(body or b"{}")
+            if req.get("model") != self.embed_model:
+                return {"error": f"model {req.get('model')!r} not found"}
+            inputs = req.get("input") or []
+            inputs = [inputs] if isinstance(inputs, str) else inputs
+            self.embedded += len(inputs)
+            await asyncio.sleep(self.embed_delay * len(inputs))
+            return {"model": self.embed_model, "embeddings": [self._vector(t) for t in inputs]}
+        if method == "POST" and path == "/api/generate":
+            req = json.loads(body or b"{}")
+            await self._load(req)
+            if not req.get("prompt"):
+                return self._final(req, "")
+            await self._evaluate(req)
+            await asyncio.sleep(self.tokens * self.token_delay)
+            self.generated += self.tokens
+            if req.get("format") == "json":
+                return self._final(req, '{"ok": true}')
+            return self._final(req, " ".join(f"tok{i}" for i in range(self.tokens)))
+        return {"error": f"unknown route {method} {path}"}
+
+    def _vector(self, text: str) -> list[float]:
+        rng = random.Random(text)
+        return [rng.uniform(-1, 1) for _ in range(self.embed_dim)]
+
+    async def _stream(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, body: bytes) -> bool:
+        """Stream one generation; False if the client went away first."""
+        req = json.loads(body or b"{}")
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+        )
+        await self._load(req)
+        await self._evaluate(req)
+        for i in range(self.tokens):
+            if i:
+                await asyncio.sleep(self.token_delay)
+            if reader.at_eof():
+                self.aborted += 1
+                return False
+            self.generated += 1
+            line = {"model": self.model, "response": f"tok{i} " if i < self.tokens - 1 else f"tok{i}",
+                    "done": False}
+            self._write_chunk(writer, json.dumps(line).encode() + b"\n")
+            await writer.drain()
+        final = {**self._final(req, ""), "response": ""}
+        self._write_chunk(writer, json.dumps(final).encode() + b"\n")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        return True
+
+    @staticmethod
+    def _write_chunk(writer: asyncio.StreamWriter, data: bytes) -> None:
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                length = 0
+                close = False
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    name = name.strip().lower()
+                    if name == "content-length":
+                        length = int(value.strip())
+                    elif name == "connection" and value.strip().lower() == "close":
+                        close = True
+                body = await reader.readexactly(length) if length else b""
+                self.requests += 1
+                if path == "/api/generate" and json.loads(body or b"{}").get("stream"):
+                    if not await self._stream(reader, writer, body):
+                        break
+                    continue
+                payload = json.dumps(await self._respond(method, path, body)).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(payload)}\r\n\r\n".encode()
+                    + payload
+                )
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,83 @@
+"""Benchmark: NL query system prompt size, legacy vs. token-budgeted.
+
+  python -m bench.prompt_budget [--units 300] [--runs 50]
+
+"legacy" rebuilds the previous prompt (text summary + indented JSON of
+``units.byType`` + one line per unit and department); "packed" is the
+current ``_build_system_prompt``.  Token counts use the same estimator as
+the prompt builder, against OLLAMA_CONTEXT_WINDOW.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+
+from bench.synthetic import synthetic_branch
+from src.config import OLLAMA_CONTEXT_WINDOW
+from src.engines.nl_query import _build_system_prompt
+from src.engines.prompt_builder import estimate_tokens
+
+QUESTIONS = (
+    "Which ICU units have fewer than 10 beds?",
+    "Which departments don't have a head?",
+    "Is the radiology unit active?",
+)
+
+
+def _legacy_prompt(ctx) -> str:
+    unit_lines = "\n".join(
+        f"{u.name} ({u.typeCode}): {len(u.rooms)} rooms, {u.resources.beds} beds, "
+        f"{'Active' if u.isActive else 'Inactive'}"
+        for u in ctx.units.units
+    )
+    dept_lines = "\n".join(
+        f"{d.name} ({d.code}): {'Has head' if d.hasHead else 'No head'}, {d.staffCount} staff"
+        for d in ctx.departments.departments
+    )
+    return f"""You are a helpful hospital infrastructure assistant for "{ctx.branch.name}".
+You answer questions about the hospital's configuration using ONLY the data provided below.
+If the data doesn't contain the answer, say "I don't have that information in the current context."
+
+Be concise, specific, and use actual numbers from the data. Don't make up data.
+
+HOSPITAL DATA:
+{ctx.textSummary}
+
+DETAILED UNIT DATA:
+{json.dumps(ctx.units.byType, indent=2)}
+
+Units: {unit_lines}
+
+Departments: {dept_lines}
+
+Location: {ctx.location.totalNodes} nodes. Fire zones: {"Yes" if ctx.location.hasFireZones else "No"}. Emergency exits: {"Yes" if ctx.location.hasEmergencyExits else "No"}.
+
+Answer the user's question in 1-3 sentences. Be direct and helpful."""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    for units in sorted({12, args.units}):
+        ctx = synthetic_branch(nodes=500, units=units)
+        legacy = estimate_tokens(_legacy_prompt(ctx))
+        print(f"{units} units — legacy prompt {legacy} tokens (window {OLLAMA_CONTEXT_WINDOW})")
+        for q in QUESTIONS:
+            times = []
+            for _ in range(args.runs):
+                t0 = time.perf_counter()
+                prompt = _build_system_prompt(ctx, q)
+                times.append((time.perf_counter() - t0) * 1000)
+            icu_rows = sum(1 for line in prompt.splitlines() if "|ICU|" in line or "|HDU|" in line)
+            print(f"  {q:<45} packed {estimate_tokens(prompt):5d} tokens   "
+                  f"build {statistics.median(times):5.2f} ms   ICU/HDU rows {icu_rows}")
+
+
+if __name__ == "__main__":
+    main()
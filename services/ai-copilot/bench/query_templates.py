@@ -0,0 +1,168 @@
+"""Benchmark: NL questions answered by query templates instead of the LLM.
+
+  python -m bench.query_templates [--units 300] [--tokens 40] [--token-delay 0.01]
+
+Runs a corpus of realistic chat questions through ``run_nl_query`` on the
+synthetic branch twice, against the Ollama stub (``latency`` + ``tokens`` x
+``token-delay`` per answer, roughly a 7B model on CPU for a short reply):
+
+  - keyword only: the previous routing -- keyword intents, else the LLM
+    (``parse_query`` switched off for the run)
+  - templates: keyword intents + aggregate query templates, else the LLM
+
+and reports coverage (questions that never reach the LLM), total wall time,
+and the parse + execute time of the template answers.  It first checks
+that none of ``MUST_MISS`` -- questions a count or list would answer
+wrongly -- parses into a plan -- and that drug plans switch to SQL once the
+context's drug list is cut short.  Payer / contract templates (and drugs on
+a branch past the collector's cap) need the database and are not part of
+the corpus.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import statistics
+import time
+
+from bench.ollama_stub import OllamaStub
+from bench.synthetic import synthetic_branch
+from src.engines import nl_query
+from src.engines.nl_query import NLCoverage, run_nl_query
+from src.engines.query_templates import parse_query, run_query
+from src.services.ollama import OllamaService
+
+QUESTIONS = [
+    # keyword intents
+    "How many beds do we have?",
+    "Which departments don't have a head?",
+    "What's our ICU to total bed ratio?",
+    "Are emergency exits marked?",
+    "Give me a summary",
+    "How many beds does High Dependency Unit 12 have?",
+    # aggregates the templates answer
+    "How many rooms with oxygen in ICU?",
+    "How many beds in the ICU?",
+    "Beds by department",
+    "How many ICUs do we have?",
+    "Which rooms in HDU have no suction?",
+    "Are there inactive rooms in the day care units?",
+    "Rooms with suction and oxygen by unit type",
+    "How many rooms in Cardiology?",
+    "Number of rooms with attached bathroom per department",
+    "How many inactive units?",
+    "Units by type",
+    "How many departments have no staff?",
+    "Which pharmacy stores have no pharmacist in charge?",
+    "Which stores are 24x7?",
+    "List narcotic drugs",
+    "How many high alert medicines?",
+    "Count of LASA drugs",
+    "Drugs by category",
+    "How many active specialties?",
+    "Which wards have no beds?",
+    "List all narcotic drugs",
+    # left to the LLM
+    "Summarise which wards are short on isolation rooms",
+    "Would merging two wards free up nursing staff?",
+    "Is the oncology day care close to the pharmacy store?",
+    "Suggest a better room split for the step-down unit",
+    "Rank the wards by rooms per bed",
+    "Anything else I should fix before go-live?",
+    "Do all rooms have oxygen?",
+    "What is a bed?",
+    "What rooms are available?",
+]
+
+# Yes/no over a quantifier, definitions, and filters the templates don't
+# know: a count or list would be a confident wrong answer.
+MUST_MISS = [
+    "Do all rooms have oxygen?",
+    "Are all ICU rooms active?",
+    "Does every department have a head?",
+    "Do all pharmacy stores have a drug license?",
+    "What is a bed?",
+    "What's an ICU?",
+    "What are beds?",
+    "What rooms are available?",
+    "Which beds are available?",
+]
+
+
+@contextlib.contextmanager
+def _templates_disabled():
+    parse = nl_query.parse_query
+    nl_query.parse_query = lambda question, ctx: None
+    try:
+        yield
+    finally:
+        nl_query.parse_query = parse
+
+
+async def _run(svc: OllamaService, ctx) -> tuple[dict, float]:
+    nl_query.nl_coverage = NLCoverage()
+    t0 = time.perf_counter()
+    for q in QUESTIONS:
+        await run_nl_query(q, ctx, svc)
+    return nl_query.nl_coverage.stats(), (time.perf_counter() - t0) * 1000
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    ctx = synthetic_branch(units=args.units)
+
+    wrong = {q: plan.describe() for q in MUST_MISS if (plan := parse_query(q, ctx)) is not None}
+    assert not wrong, f"templates answered questions they must leave to the LLM: {wrong}"
+    drugs = "How many narcotic drugs?"
+    assert not parse_query(drugs, ctx).needs_db
+    total = ctx.pharmacy.totalDrugs
+    ctx.pharmacy.totalDrugs = len(ctx.pharmacy.drugs) + 1  # the collector's cap cut the list
+    assert parse_query(drugs, ctx).needs_db, "drug count from a truncated list"
+    ctx.pharmacy.totalDrugs = total
+
+    # Spot-check template answers against direct computation.
+    plan = parse_query("How many rooms with oxygen in ICU?", ctx)
+    expected = sum(r.hasOxygen for u in ctx.units.units if u.typeCode == "ICU" for r in u.rooms)
+    assert (await run_query(plan, ctx)).data["count"] == expected
+    plan = parse_query("How many beds in the ICU?", ctx)
+    assert (await run_query(plan, ctx)).data["count"] == sum(
+        u.resources.beds for u in ctx.units.units if u.typeCode == "ICU"
+    )
+
+    timings = []
+    for q in QUESTIONS:
+        t0 = time.perf_counter()
+        plan = parse_query(q, ctx)
+        if plan is not None:
+            await run_query(plan, ctx)
+            timings.append((time.perf_counter() - t0) * 1000)
+
+    async with OllamaStub(latency=0.05, tokens=args.tokens, token_delay=args.token_delay) as stub:
+        svc = OllamaService(base_url=stub.base_url, model=stub.model, cache=None)
+        await svc.start()
+        assert await svc.check_health()
+        with _templates_disabled():
+            before, before_ms = await _run(svc, ctx)
+        after, after_ms = await _run(svc, ctx)
+        await svc.aclose()
+
+    print(f"{len(QUESTIONS)} questions, {args.units} units; {len(MUST_MISS)} must-miss questions left to the LLM")
+    print(f"{'':<14} {'keyword':>8} {'template':>9} {'llm':>5} {'coverage':>9} {'total':>10}")
+    for label, stats, ms in (("keyword only", before, before_ms), ("templates", after, after_ms)):
+        print(f"{label:<14} {stats['keyword']:>8} {stats['template']:>9} {stats['llm']:>5} "
+              f"{stats['coverage']:>9.0%} {ms:7.0f} ms")
+    print(f"\ntemplate parse + execute: p50 {statistics.median(timings):.2f} ms, "
+          f"max {max(timings):.2f} ms over {len(timings)} plans")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=300)
+    parser.add_argument("--tokens", type=int, default=40, help="stub answer length")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="stub seconds per generated token")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
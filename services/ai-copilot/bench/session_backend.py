@@ -0,0 +1,136 @@
+"""Benchmark: chat sessions shared by several worker processes.
+
+  python -m bench.session_backend [--workers 4] [--conversations 200] [--turns 8]
+
+Starts ``--workers`` processes, each with its own session store, and plays
+``--conversations`` chats in lockstep: turn t of conversation c goes to
+worker (c + t) % workers, as a load balancer in front of uvicorn workers
+would send it.  Every turn resumes the session, checks it already holds the
+previous turns' messages, adds a question and an answer and saves it.
+
+  - memory: each worker only sees the turns it served itself
+  - sqlite: CHAT_SESSION_PATH shared by all workers -- every conversation
+    continues wherever its next turn lands
+
+It then runs the same turns concurrently in one process against the SQLite
+store, once with ``save`` group-committing whatever is queued and once with
+a commit per save, and reports turns/s and rows per transaction.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from src.services.chat_session import ChatSessionStore, SQLiteSessionStore, _encode
+
+
+async def _turn(store, session_id: str, turn: int) -> bool:
+    """One chat turn; True if the session held every earlier turn."""
+    session = await store.create_or_resume(session_id)
+    intact = [m.content for m in session.messages] == [
+        text for t in range(turn) for text in (f"question {t}", f"answer {t}")
+    ]
+    session.add_message("user", f"question {turn}")
+    session.add_message("assistant", f"answer {turn}", source="keyword_match")
+    session.remember_context("k", [1000 + turn] * 256, [f"fact {turn}"])
+    await store.save(session)
+    return intact
+
+
+# ── Worker processes ──────────────────────────────────────────────────────
+
+
+def _worker(conn, backend: str, path: str) -> None:
+    asyncio.run(_serve(conn, backend, path))
+
+
+async def _serve(conn, backend: str, path: str) -> None:
+    store = SQLiteSessionStore(path) if backend == "sqlite" else ChatSessionStore()
+    store.open()
+    while (batch := conn.recv()) is not None:
+        conn.send(await asyncio.gather(*(_turn(store, sid, t) for sid, t in batch)))
+    await store.aclose()
+
+
+def _play(backend: str, path: str, workers: int, conversations: int, turns: int) -> tuple[int, float]:
+    """Intact conversations and wall time over all turns."""
+    mp = multiprocessing.get_context("spawn")
+    pipes, procs = [], []
+    for _ in range(workers):
+        parent, child = mp.Pipe()
+        proc = mp.Process(target=_worker, args=(child, backend, path))
+        proc.start()
+        pipes.append(parent)
+        procs.append(proc)
+    ids = [f"{backend}-{c}" for c in range(conversations)]
+    intact = set(ids)
+    t0 = time.perf_counter()
+    for turn in range(turns):
+        batches: list[list[tuple[str, int]]] = [[] for _ in range(workers)]
+        for c, sid in enumerate(ids):
+            batches[(c + turn) % workers].append((sid, turn))
+        for pipe, batch in zip(pipes, batches):
+            pipe.send(batch)
+        for pipe, batch in zip(pipes, batches):
+            for (sid, _), ok in zip(batch, pipe.recv()):
+                if not ok:
+                    intact.discard(sid)
+    elapsed = time.perf_counter() - t0
+    for pipe, proc in zip(pipes, procs):
+        pipe.send(None)
+        proc.join()
+    return len(intact), elapsed
+
+
+# ── Group commit vs. a commit per save ────────────────────────────────────
+
+
+class _CommitPerSave(SQLiteSessionStore):
+    async def save(self, session) -> None:
+        await asyncio.to_thread(self._write, [_encode(session)])
+
+
+async def _concurrent(store: SQLiteSessionStore, conversations: int, turns: int) -> float:
+    store.open()
+    t0 = time.perf_counter()
+    for turn in range(turns):
+        ok = await asyncio.gather(*(_turn(store, f"c{c}", turn) for c in range(conversations)))
+        assert all(ok)
+    elapsed = time.perf_counter() - t0
+    await store.aclose()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--conversations", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=8, help="turns per conversation (<= 10 keeps all messages)")
+    args = parser.parse_args()
+    total = args.conversations * args.turns
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{args.workers} workers, {args.conversations} conversations x {args.turns} turns, round-robin")
+        print(f"{'backend':<8} {'intact':>14} {'turns/s':>9}")
+        for backend in ("memory", "sqlite"):
+            path = str(Path(tmp) / "sessions.db")
+            intact, elapsed = _play(backend, path, args.workers, args.conversations, args.turns)
+            print(f"{backend:<8} {intact:>6} of {args.conversations:<5} {total / elapsed:9.0f}")
+        assert intact == args.conversations, "sqlite sessions lost turns across workers"
+
+        print(f"\none process, {args.conversations} concurrent turns at a time")
+        print(f"{'writes':<16} {'turns/s':>9} {'rows/commit':>12}")
+        for label, cls in (("commit per save", _CommitPerSave), ("group commit", SQLiteSessionStore)):
+            store = cls(str(Path(tmp) / f"{cls.__name__}.db"))
+            elapsed = asyncio.run(_concurrent(store, args.conversations, args.turns))
+            stats = store.stats()
+            print(f"{label:<16} {total / elapsed:9.0f} {stats['rowsPerBatch']:>12}")
+
+
+if __name__ == "__main__":
+    main()
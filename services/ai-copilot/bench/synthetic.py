@@ -0,0 +1,244 @@
+"""Synthetic BranchContext generator for benchmarks.
+
+Produces a deterministic, realistically shaped branch snapshot — a
+CAMPUS → BUILDING → FLOOR → ZONE → AREA location tree, units of the usual
+types with rooms and resources, departments, specialties and a drug master —
+without touching the database.
+"""
+
+from __future__ import annotations
+
+import random
+
+from src.collectors.models import (
+    BranchContext,
+    BranchSnapshot,
+    DepartmentDetail,
+    DepartmentSummary,
+    DrugSnapshot,
+    LocationSummary,
+    LocationTreeNode,
+    PharmacySummary,
+    PharmStoreSnapshot,
+    ResourceSummary,
+    RoomDetail,
+    ServiceCatalogSummary,
+    SpecialtyDetail,
+    SpecialtySummary,
+    UnitDetail,
+    UnitSummary,
+)
+
+_UNIT_TYPES = [
+    ("WARD", "General Ward", "WARD"),
+    ("ICU", "Intensive Care Unit", "ICU_BAY"),
+    ("HDU", "High Dependency Unit", "ICU_BAY"),
+    ("OPD", "Outpatient", "CONSULTATION"),
+    ("ER", "Emergency", "EXAMINATION"),
+    ("OT", "Operation Theatre", "OPERATION_THEATRE"),
+    ("LAB", "Laboratory", "LAB"),
+    ("RAD", "Radiology", "IMAGING"),
+    ("NICU", "Neonatal ICU", "ICU_BAY"),
+    ("DAYCARE", "Day Care", "PROCEDURE"),
+]
+_DEPARTMENTS = [
+    "General Medicine", "General Surgery", "Cardiology", "Orthopaedics",
+    "Neurology", "Paediatrics", "Obstetrics & Gynaecology", "ENT",
+    "Ophthalmology", "Dermatology", "Psychiatry", "Radiology", "Pathology",
+    "Anaesthesiology", "Emergency Medicine", "Nephrology", "Urology",
+    "Oncology", "Pulmonology", "Gastroenterology",
+]
+_GENERICS = [
+    "Paracetamol", "Amoxicillin", "Azithromycin", "Ceftriaxone", "Metformin",
+    "Amlodipine", "Atorvastatin", "Pantoprazole", "Ondansetron", "Heparin",
+    "Insulin Regular", "Morphine", "Fentanyl", "Midazolam", "Furosemide",
+    "Dexamethasone", "Salbutamol", "Ibuprofen", "Diclofenac", "Tramadol",
+]
+
+
+def synthetic_branch(nodes: int = 5000, units: int = 300, seed: int = 11) -> BranchContext:
+    """Build a BranchContext with ~``nodes`` location nodes and ``units`` units."""
+    rng = random.Random(seed)
+    counter = iter(range(10**9))
+
+    def _node(kind: str, code: str, children: list[LocationTreeNode] | None = None) -> LocationTreeNode:
+        return LocationTreeNode(
+            id=f"loc-{next(counter)}",
+            kind=kind,
+            code=code,
+            name=f"{kind.title()} {code}",
+            isActive=rng.random() > 0.02,
+            fireZone=f"FZ-{rng.randint(1, 20)}" if rng.random() > 0.05 else None,
+            emergencyExit=rng.random() < 0.03,
+            wheelchairAccess=rng.random() < 0.2,
+            children=children or [],
+        )
+
+    # CAMPUS(1) → BUILDING(b) → FLOOR(f) → ZONE(z) → AREA(a): size the fan-out
+    # so the total lands close to ``nodes``.
+    buildings, floors, zones = 5, 8, 5
+    areas = max(1, (nodes - 1 - buildings - buildings * floors - buildings * floors * zones)
+                // (buildings * floors * zones))
+    all_nodes: list[LocationTreeNode] = []
+    campus = _node("CAMPUS", "C1")
+    all_nodes.append(campus)
+    for b in range(buildings):
+        bnode = _node("BUILDING", f"B{b + 1}")
+        campus.children.append(bnode)
+        all_nodes.append(bnode)
+        for f in range(floors):
+            fnode = _node("FLOOR", f"B{b + 1}F{f}")
+            fnode.floorNumber = f
+            bnode.children.append(fnode)
+            all_nodes.append(fnode)
+            for z in range(zones):
+                znode = _node("ZONE", f"B{b + 1}F{f}Z{z + 1}")
+                fnode.children.append(znode)
+                all_nodes.append(znode)
+                for a in range(areas):
+                    anode = _node("AREA", f"B{b + 1}F{f}Z{z + 1}A{a + 1}")
+                    znode.children.append(anode)
+                    all_nodes.append(anode)
+
+    by_kind: dict[str, int] = {}
+    for n in all_nodes:
+        by_kind[n.kind] = by_kind.get(n.kind, 0) + 1
+    location = LocationSummary(
+        totalNodes=len(all_nodes),
+        byKind=by_kind,
+        tree=[campus],
+        hasFireZones=True,
+        hasEmergencyExits=True,
+        hasWheelchairAccess=True,
+        nodesWithoutRevision=rng.randint(0, 20),
+    )
+
+    departments = [
+        DepartmentDetail(
+            id=f"dep-{i}", code=f"D{i:03d}", name=name,
+            hasHead=rng.random() > 0.1, staffCount=rng.randint(0, 40),
+            facilityType="CLINICAL",
+        )
+        for i, name in enumerate(_DEPARTMENTS)
+    ]
+
+    zone_nodes = [n for n in all_nodes if n.kind == "ZONE"]
+    unit_list: list[UnitDetail] = []
+    by_type: dict[str, dict] = {}
+    for i in range(units):
+        code, type_name, room_type = _UNIT_TYPES[i % len(_UNIT_TYPES)]
+        dep = rng.choice(departments)
+        rooms = [
+            RoomDetail(
+                id=f"room-{i}-{r}",
+                code=f"{code}{i:03d}-R{r + 1:02d}",
+                name=f"{type_name} {i} Room {r + 1}",
+                roomType=room_type if r else ("NURSING_STATION" if code in ("WARD", "ICU", "HDU") else room_type),
+                hasOxygen=code in ("ICU", "HDU", "NICU") or rng.random() < 0.3,
+                hasSuction=code in ("ICU", "HDU", "NICU") and rng.random() > 0.05,
+                hasAttachedBathroom=rng.random() < 0.4,
+                isActive=rng.random() > 0.03,
+            )
+            for r in range(rng.randint(2, 8))
+        ]
+        beds = rng.randint(4, 30) if code in ("WARD", "ICU", "HDU", "NICU", "DAYCARE") else 0
+        resources = ResourceSummary(
+            total=beds + len(rooms),
+            beds=beds,
+            schedulable=len(rooms),
+            byType={"BED": beds, "MONITOR": beds // 2} if beds else {"CHAIR": len(rooms)},
+            byState={"AVAILABLE": beds + len(rooms)},
+        )
+        unit_list.append(UnitDetail(
+            id=f"unit-{i}",
+            code=f"{code}{i:03d}",
+            name=f"{type_name} {i}",
+            typeName=type_name,
+            typeCode=code,
+            isActive=rng.random() > 0.05,
+            locationNodeId=rng.choice(zone_nodes).id if rng.random() > 0.1 else None,
+            departmentId=dep.id,
+            departmentName=dep.name,
+            rooms=rooms,
+            resources=resources,
+        ))
+        t = by_type.setdefault(code, {"count": 0, "beds": 0})
+        t["count"] += 1
+        t["beds"] += beds
+
+    drugs = [
+        DrugSnapshot(
+            id=f"drug-{i}",
+            drugCode=f"DRG{i:05d}",
+            genericName=f"{_GENERICS[i % len(_GENERICS)]}" + (f" {i // len(_GENERICS)}" if i >= len(_GENERICS) else ""),
+            category=rng.choice(["TABLET", "CAPSULE", "INJECTION", "SYRUP"]),
+            isHighAlert=rng.random() < 0.05,
+            isNarcotic=rng.random() < 0.02,
+            isLasa=rng.random() < 0.03,
+            formularyStatus="APPROVED",
+        )
+        for i in range(500)
+    ]
+    stores = [
+        PharmStoreSnapshot(id="store-main", storeCode="MAIN", storeName="Main Pharmacy",
+                           storeType="MAIN", status="ACTIVE", is24x7=True, canDispense=True,
+                           drugLicenseNumber="DL-1234"),
+        PharmStoreSnapshot(id="store-ipd", storeCode="IPD", storeName="IPD Pharmacy",
+                           storeType="IP_PHARMACY", status="ACTIVE", parentStoreId="store-main"),
+    ]
+
+    total_beds = sum(u.resources.beds for u in unit_list)
+    return BranchContext(
+        branch=BranchSnapshot(
+            id="branch-synthetic",
+            code="SYN01",
+            name="Synthetic General Hospital",
+            legalEntityName="Synthetic Health Pvt Ltd",
+            address="1 Benchmark Road",
+            city="Pune",
+            state="Maharashtra",
+            pinCode="411001",
+            gstNumber="27AAPFU0939F1ZV",
+            panNumber="AAPFU0939F",
+            bedCount=total_beds,
+            emergency24x7=True,
+        ),
+        location=location,
+        units=UnitSummary(
+            totalUnits=len(unit_list),
+            activeUnits=sum(1 for u in unit_list if u.isActive),
+            byType=by_type,
+            units=unit_list,
+        ),
+        departments=DepartmentSummary(
+            total=len(departments),
+            withHead=sum(1 for d in departments if d.hasHead),
+            withStaff=sum(1 for d in departments if d.staffCount),
+            departments=departments,
+        ),
+        specialties=SpecialtySummary(
+            total=3, active=3, byKind={"SPECIALTY": 3},
+            specialties=[
+                SpecialtyDetail(id=f"sp-{c}", code=c, name=c.title(), kind="SPECIALTY", departmentCount=1)
+                for c in ("CARDIO", "ORTHO", "NEURO")
+            ],
+        ),
+        pharmacy=PharmacySummary(
+            totalStores=len(stores), activeStores=len(stores), stores=stores,
+            totalDrugs=len(drugs), activeDrugs=len(drugs), drugs=drugs,
+            narcoticCount=sum(1 for d in drugs if d.isNarcotic),
+            highAlertCount=sum(1 for d in drugs if d.isHighAlert),
+            lasaCount=sum(1 for d in drugs if d.isLasa),
+            hasFormulary=True, formularyVersion=1, formularyStatus="PUBLISHED",
+            interactionCount=120, supplierCount=4, inventoryConfigCount=800,
+        ),
+        serviceCatalog=ServiceCatalogSummary(
+            totalServiceItems=1200, activeServiceItems=1150, withBasePrice=1100,
+            withoutBasePrice=100, totalChargeMaster=1100, activeChargeMaster=1050,
+            totalPayers=12, activePayers=10, byPayerKind={"CASH": 1, "INSURANCE": 8, "TPA": 3},
+            totalContracts=9, activeContracts=7, expiredContracts=2,
+            totalPricingTiers=4, activePricingTiers=4, totalTariffPlans=3,
+            activeTariffPlans=3, totalTaxCodes=6, hasCashPayer=True,
+        ),
+        textSummary="Synthetic General Hospital (benchmark fixture)",
+    )
@@ -0,0 +1,141 @@
+"""Benchmark: first request to each endpoint, with and without the startup warm-up.
+
+  python -m bench.warmup [--units 300]
+
+Runs each mode in a fresh interpreter (so nothing is imported or parsed
+yet), imports ``src.app`` as uvicorn would and then:
+
+  - cold: serves straight away -- the previous startup
+  - warm: runs ``startup_warmup.run()`` first, as the lifespan now does
+
+and times the first and second call of endpoints that need neither
+PostgreSQL nor Ollama (through FastAPI's TestClient, after one ``/health``
+call to start it), plus the health-check engines -- the handler's lazy
+imports and ``run_*`` calls -- on a synthetic branch of ``--units`` units,
+standing in for a context collected from the database.  For the endpoints
+that cannot run here without the database (interaction-check, NL chat) it
+times the handler's lazy imports, the part of their first call the warm-up
+removes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import subprocess
+import sys
+import time
+
+REQUESTS = [
+    ("validate-gstin", "POST", "/v1/infra/validate-gstin", {"gstin": "27AAPFU0939F1ZV"}),
+    ("field-validate", "POST", "/v1/ai/field-validate",
+     {"module": "pharmacy", "field": "strength", "value": "500 mg"}),
+    ("smart-defaults", "POST", "/v1/ai/smart-defaults", {"entityType": "unit"}),
+    ("auto-fill", "POST", "/v1/infra/auto-fill",
+     {"name": "City Care Hospital", "city": "Pune", "bedCount": 120, "hospitalType": "MULTI_SPECIALTY"}),
+    ("compliance chat", "POST", "/v1/ai/compliance/chat", {"message": "What is ABDM and do I need HFR?"}),
+    ("glossary", "GET", "/v1/ai/compliance/glossary?search=nabh", None),
+]
+
+# Lazy imports of handlers that need the database
+HANDLER_IMPORTS = {
+    "interaction-check imports": ("src.engines.interaction_checker", "src.services.interaction_index"),
+    "chat imports": ("src.collectors.schema_context", "src.engines.nl_query", "src.engines.chat_digest",
+                     "src.services.context_cache"),
+}
+
+
+def _health_check_engines(ctx) -> None:
+    """What /v1/ai/health-check does once it has the context."""
+    from src.engines.consistency_checker import run_consistency_checks
+    from src.engines.go_live_scorer import compute_go_live_score
+    from src.engines.nabh_checker import run_nabh_checks
+    from src.engines.naming_enforcer import run_naming_check
+    from src.engines.pharmacy_checker import run_pharmacy_checks
+
+    consistency = run_consistency_checks(ctx)
+    nabh = run_nabh_checks(ctx)
+    run_naming_check(ctx, limit=0)
+    compute_go_live_score(consistency, nabh)
+    run_pharmacy_checks(ctx)
+
+
+def _child(mode: str, units: int) -> None:
+    from fastapi.testclient import TestClient
+
+    from bench.synthetic import synthetic_branch
+
+    t0 = time.perf_counter()
+    from src.app import app
+    from src.warmup import startup_warmup
+
+    out: dict = {"appImportMs": (time.perf_counter() - t0) * 1000, "calls": {}}
+    if mode == "warm":
+        startup_warmup.run()
+        out["warmup"] = startup_warmup.stats()
+    client = TestClient(app)  # not entered: no lifespan, so no DB / Ollama
+    assert client.get("/health").status_code == 200
+    ctx = synthetic_branch(units=units)
+
+    for label, method, path, body in REQUESTS:
+        times = []
+        for _ in range(2):
+            t0 = time.perf_counter()
+            resp = client.request(method, path, json=body)
+            times.append((time.perf_counter() - t0) * 1000)
+            assert resp.status_code == 200, (label, resp.status_code, resp.text[:200])
+        out["calls"][label] = times
+    for label, modules in HANDLER_IMPORTS.items():
+        times = []
+        for _ in range(2):
+            t0 = time.perf_counter()
+            for name in modules:
+                importlib.import_module(name)
+            times.append((time.perf_counter() - t0) * 1000)
+        out["calls"][label] = times
+    times = []
+    for _ in range(2):
+        ctx.reset_index()  # every real health-check collects a new context
+        t0 = time.perf_counter()
+        _health_check_engines(ctx)
+        times.append((time.perf_counter() - t0) * 1000)
+    out["calls"][f"health-check ({units} units)"] = times
+    print(json.dumps(out))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=300)
+    parser.add_argument("--child", choices=["cold", "warm"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(args.child, args.units)
+        return
+
+    results = {}
+    for mode in ("cold", "warm"):
+        proc = subprocess.run(
+            [sys.executable, "-m", "bench.warmup", "--child", mode, "--units", str(args.units)],
+            capture_output=True, text=True, check=True,
+        )
+        results[mode] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    cold, warm = results["cold"]["calls"], results["warm"]["calls"]
+    print(f"{'ms':<28} {'cold 1st':>9} {'cold 2nd':>9} {'warm 1st':>9} {'warm 2nd':>9}")
+    for label in cold:
+        print(f"{label:<28} {cold[label][0]:9.1f} {cold[label][1]:9.1f} {warm[label][0]:9.1f} {warm[label][1]:9.1f}")
+    first_cold = sum(v[0] for v in cold.values())
+    first_warm = sum(v[0] for v in warm.values())
+    print(f"{'sum of first calls':<28} {first_cold:9.1f} {'':>9} {first_warm:9.1f}")
+
+    w = results["warm"]["warmup"]
+    print(f"\nwarm-up at startup: {w['totalMs']:.0f} ms -- {w['modulesImported']} modules in {w['importMs']:.0f} ms, "
+          f"{w['referenceFiles']} reference files in {w['referenceMs']:.0f} ms, "
+          f"synthetic health-check {w['healthCheckMs']:.0f} ms (app import {results['warm']['appImportMs']:.0f} ms)")
+    print("slowest imports: " + ", ".join(f"{k.removeprefix('src.')} {v:.0f}" for k, v in w["slowestModules"].items()))
+    assert not w["errors"], w["errors"]
+
+
+if __name__ == "__main__":
+    main()
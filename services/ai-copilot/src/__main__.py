@@ -1,7 +1,9 @@
 """
-Run with either:
+Development server (one worker, auto-reload). Run with either:
   python -m src            (from services/ai-copilot)
   uvicorn src.app:app --port 8100 --reload
+
+Production: python -m src.server (see src/server.py).
 """
 import uvicorn
 
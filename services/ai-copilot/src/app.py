@@ -8,6 +8,7 @@ All AI capabilities for ZypoCare HIMS live here:
 
 from __future__ import annotations
 
+import json
 import logging
 import time
 from contextlib import asynccontextmanager
@@ -15,12 +16,15 @@ from typing import Any, Dict, List, Literal, Optional
 
 from fastapi import FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
-from .config import CORS_ORIGIN
+from .config import CORS_ORIGIN, WARMUP_ENABLED
 from .db.session import close_db, init_db
+from .services.chat_session import chat_store
+from .services.llm_cache import llm_cache
 from .services.ollama import ollama_service
+from .warmup import startup_warmup
 
 # ── Existing imports ──────────────────────────────────────────────────────
 from .infra.autofill import generate_auto_fill
@@ -48,7 +52,10 @@ async def lifespan(app: FastAPI):
     except Exception as exc:
         logger.error("Failed to connect to PostgreSQL: %s", exc)
 
-    is_up = await ollama_service.check_health()
+    await ollama_service.start()
+    llm_cache.open()
+    chat_store.open()
+    is_up = await ollama_service.start_probe()
     if is_up:
         logger.info(
             "Ollama connected — model: %s @ %s",
@@ -63,10 +70,16 @@ async def lifespan(app: FastAPI):
             ollama_service.base_url,
             ollama_service.model,
         )
+    if WARMUP_ENABLED:
+        startup_warmup.run()
 
     yield
 
     # Shutdown
+    await ollama_service.stop_probe()
+    await ollama_service.aclose()
+    await llm_cache.aclose()
+    await chat_store.aclose()
     await close_db()
     logger.info("Database connection closed")
 
@@ -112,14 +125,28 @@ def infra_auto_fill(inp: AutoFillInput):
 @app.get("/v1/infra/ai-status")
 async def infra_ai_status():
     """Check AI engine availability."""
+    from .engines.nl_query import nl_coverage
+    from .services.context_cache import branch_contexts
+    from .services.fact_index import fact_index
+    from .services.reference_data import reference_data
+
     ollama_up = await ollama_service.check_health()
     return {
         "heuristic": {"available": True},
+        "referenceData": reference_data.stats(),
         "ollama": {
             "available": ollama_up,
             "model": ollama_service.model,
             "baseUrl": ollama_service.base_url,
+            "health": ollama_service.health.to_dict(),
+            "cache": llm_cache.stats(),
+            "scheduler": ollama_service.scheduler.stats(),
         },
+        "retrieval": fact_index.stats(),
+        "nlCoverage": nl_coverage.stats(),
+        "chatSessions": chat_store.stats(),
+        "chatContexts": branch_contexts.stats(),
+        "warmup": startup_warmup.stats(),
         "capabilities": {
             "autoFill": {"available": True, "engine": "heuristic"},
             "reviewer": {"available": True, "engine": "heuristic"},
@@ -151,17 +178,43 @@ async def infra_context(branchId: str = Query(...)):
 # ── Consistency Check ─────────────────────────────────────────────────────
 
 
+def _split_csv(values: Optional[List[str]]) -> Optional[List[str]]:
+    """Accept both ``?x=a&x=b`` and ``?x=a,b``."""
+    if values is None:
+        return None
+    return [part for value in values for part in value.split(",") if part.strip()]
+
+
 @app.get("/v1/infra/consistency-check")
-async def infra_consistency_check(branchId: str = Query(...)):
-    """Run 35+ cross-module consistency checks."""
+async def infra_consistency_check(
+    branchId: str = Query(...),
+    categories: Optional[List[str]] = Query(None),
+    rules: Optional[List[str]] = Query(None),
+    profile: bool = Query(False),
+):
+    """Run 35+ cross-module consistency checks (optionally a subset)."""
     from .collectors.schema_context import collect_branch_context
-    from .engines.consistency_checker import run_consistency_checks
+    from .engines.consistency_checker import run_consistency_checks, select_rules
+
+    categories, rules = _split_csv(categories), _split_csv(rules)
+    try:
+        select_rules(categories, rules)
+    except ValueError as exc:
+        return JSONResponse(status_code=400, content={"error": str(exc)})
 
     ctx = await collect_branch_context(branchId)
-    result = run_consistency_checks(ctx)
+    result = run_consistency_checks(ctx, categories=categories, rules=rules, profile=profile)
     return result.model_dump()
 
 
+@app.get("/v1/infra/consistency-rules")
+async def infra_consistency_rules():
+    """List registered consistency rules with their category and context sections."""
+    from .engines.consistency_checker import list_rules
+
+    return {"rules": list_rules()}
+
+
 # ── NABH Readiness ────────────────────────────────────────────────────────
 
 
@@ -228,13 +281,63 @@ async def infra_fix_suggestions(branchId: str = Query(...)):
 
 
 @app.get("/v1/infra/naming-check")
-async def infra_naming_check(branchId: str = Query(...)):
-    """Check naming conventions across all entities."""
+async def infra_naming_check(
+    branchId: str = Query(...),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(500, ge=0, le=5000),
+    entityType: Optional[List[str]] = Query(None),
+    issueType: Optional[List[str]] = Query(None),
+):
+    """Check naming conventions across all entities (issues paged by cursor)."""
     from .collectors.schema_context import collect_branch_context
     from .engines.naming_enforcer import run_naming_check
 
     ctx = await collect_branch_context(branchId)
-    result = run_naming_check(ctx)
+    try:
+        result = run_naming_check(
+            ctx,
+            cursor=cursor,
+            limit=limit,
+            entity_types=_split_csv(entityType),
+            issue_types=_split_csv(issueType),
+        )
+    except ValueError as exc:
+        return JSONResponse(status_code=400, content={"error": str(exc)})
+    return result.model_dump()
+
+
+@app.get("/v1/infra/naming-fix-plan")
+async def infra_naming_fix_plan(
+    branchId: str = Query(...),
+    entityType: Optional[List[str]] = Query(None),
+):
+    """Collision-free rename plan for every naming issue, as a patch list."""
+    from .collectors.schema_context import collect_branch_context
+    from .engines.naming_autofix import build_rename_plan
+
+    ctx = await collect_branch_context(branchId)
+    try:
+        result = build_rename_plan(ctx, entity_types=_split_csv(entityType))
+    except ValueError as exc:
+        return JSONResponse(status_code=400, content={"error": str(exc)})
+    return result.model_dump()
+
+
+# ── LASA Scan (full formulary) ───────────────────────────────────────────
+
+
+@app.get("/v1/infra/pharmacy/lasa-scan")
+async def infra_lasa_scan(
+    branchId: str = Query(...),
+    minScore: float = Query(0.8, ge=0.5, le=1.0),
+    limit: int = Query(200, ge=1, le=2000),
+):
+    """Scan the entire drug master for unflagged look-alike/sound-alike pairs."""
+    from .collectors.schema_context import collect_drug_catalog
+    from .engines.lasa_detector import scan_lasa_candidates
+
+    drugs = await collect_drug_catalog(branchId)
+    result = scan_lasa_candidates(drugs, min_score=minScore, limit=limit)
     return result.model_dump()
 
 
@@ -306,6 +409,33 @@ async def infra_ask(inp: NLQueryInput):
     return result.model_dump()
 
 
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def _sse_response(events) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/v1/infra/ask/stream")
+async def infra_ask_stream(inp: NLQueryInput):
+    """SSE variant of /v1/infra/ask: ``token`` events, then one ``done`` event."""
+    from .collectors.schema_context import collect_branch_context
+    from .engines.nl_query import stream_nl_query
+
+    ctx = await collect_branch_context(inp.branchId)
+
+    async def events():
+        async for event, data in stream_nl_query(inp.question, ctx):
+            yield _sse(event, data)
+
+    return _sse_response(events())
+
+
 # ══════════════════════════════════════════════════════════════════════════
 # Co-pilot AI — /v1/ai/...
 # ══════════════════════════════════════════════════════════════════════════
@@ -369,6 +499,10 @@ async def ai_health_check(branchId: str = Query(...), bust: str = Query(None)):
         cached_at, cached_result = _health_cache[branchId]
         if now - cached_at < HEALTH_CACHE_TTL:
             return cached_result
+    if bust:
+        from .services.context_cache import branch_contexts
+
+        branch_contexts.invalidate(branchId)
 
     from .collectors.schema_context import collect_branch_context
     from .engines.consistency_checker import run_consistency_checks
@@ -387,7 +521,7 @@ async def ai_health_check(branchId: str = Query(...), bust: str = Query(None)):
 
     consistency = run_consistency_checks(ctx)
     nabh = run_nabh_checks(ctx)
-    naming = run_naming_check(ctx)
+    naming = run_naming_check(ctx, limit=0)  # only the score is used
     go_live = compute_go_live_score(consistency, nabh)
     pharmacy_issues = run_pharmacy_checks(ctx)
 
@@ -729,27 +863,30 @@ class ChatInput(BaseModel):
     branchId: str
     sessionId: str | None = None
     pageContext: dict[str, Any] | None = None
+    bust: str | None = None  # branch data just changed: collect the context again
 
 
 @app.post("/v1/ai/chat")
 async def ai_chat(inp: ChatInput):
     """Conversational chat with session memory. Keyword match + Ollama fallback."""
-    from .collectors.schema_context import collect_branch_context
+    from .engines.chat_digest import schedule_digest
     from .engines.nl_query import run_nl_query
-    from .services.chat_session import chat_store
+    from .services.context_cache import branch_contexts
 
     # Session management
-    session = chat_store.create_or_resume(inp.sessionId)
+    session = await chat_store.create_or_resume(inp.sessionId)
     session.add_message("user", inp.message)
 
-    # Get branch context for the query
-    ctx = await collect_branch_context(inp.branchId)
+    # Branch context for the query, reused across the session's turns
+    ctx = await branch_contexts.for_session(session, inp.branchId, refresh=bool(inp.bust))
 
     # Run NL query engine (keyword match + Ollama fallback)
-    result = await run_nl_query(inp.message, ctx)
+    result = await run_nl_query(inp.message, ctx, session=session)
 
     # Store assistant response
     session.add_message("assistant", result.answer, source=result.source)
+    await chat_store.save(session)
+    schedule_digest(session)  # summarise turns that left the verbatim history, in the background
 
     return {
         "answer": result.answer,
@@ -761,6 +898,36 @@ async def ai_chat(inp: ChatInput):
     }
 
 
+@app.post("/v1/ai/chat/stream")
+async def ai_chat_stream(inp: ChatInput):
+    """SSE variant of /v1/ai/chat. The ``done`` event carries the chat payload
+    plus evalCount / firstTokenMs; the answer is stored in the session once
+    the stream completes, before ``done`` is sent."""
+    from .engines.chat_digest import schedule_digest
+    from .engines.nl_query import stream_nl_query
+    from .services.context_cache import branch_contexts
+
+    session = await chat_store.create_or_resume(inp.sessionId)
+    session.add_message("user", inp.message)
+    ctx = await branch_contexts.for_session(session, inp.branchId, refresh=bool(inp.bust))
+
+    async def events():
+        yield _sse("session", {"sessionId": session.session_id})
+        async for event, data in stream_nl_query(inp.message, ctx, session=session):
+            if event == "done":
+                session.add_message("assistant", data["answer"], source=data["source"])
+                await chat_store.save(session)
+                schedule_digest(session)
+                data = {
+                    **data,
+                    "sessionId": session.session_id,
+                    "followUp": data.get("followUp") or [],
+                }
+            yield _sse(event, data)
+
+    return _sse_response(events())
+
+
 # ══════════════════════════════════════════════════════════════════════════
 # Compliance AI Help — /v1/ai/compliance/...
 # ══════════════════════════════════════════════════════════════════════════
@@ -1148,13 +1315,79 @@ class ClinicalCopilotResponse(BaseModel):
 
 
 @app.post("/v1/clinical/interaction-check", response_model=ClinicalCopilotResponse)
-def interaction_check(ctx: ContextPack):
+async def interaction_check(ctx: ContextPack):
+    """Check a patient's med list against the branch drug-interaction graph."""
+    if not ctx.branch_id or len(ctx.meds) < 2:
+        return ClinicalCopilotResponse(
+            suggestions=["Provide branch_id and at least two meds to check interactions."],
+            confidence=0.1,
+        )
+
+    from .engines.interaction_checker import check_med_list
+    from .services.interaction_index import interaction_index
+
+    index = await interaction_index.get(ctx.branch_id)
+    result = check_med_list(index, ctx.meds, ctx.patient_id)
+
+    alerts = [
+        f"{h.severity}: {h.drugAName} + {h.drugBName}"
+        + (f" — {h.description}" if h.description else "")
+        for h in result.interactions
+    ]
+    suggestions = [h.recommendation for h in result.interactions if h.recommendation]
+    if result.unresolved:
+        suggestions.append(
+            f"{len(result.unresolved)} med(s) not found in drug master: "
+            + ", ".join(result.unresolved[:5])
+        )
     return ClinicalCopilotResponse(
-        suggestions=["Stub: integrate DDI + allergies + formulary rules."],
-        confidence=0.1,
+        alerts=alerts,
+        suggestions=suggestions,
+        summary=(
+            f"{len(result.interactions)} interaction(s) among {result.medsChecked} med(s)"
+            f" ({result.majorCount} major)."
+        ),
+        confidence=1.0 if not result.unresolved else 0.7,
     )
 
 
+class InteractionBatchPatient(BaseModel):
+    patientId: Optional[str] = None
+    meds: List[Any] = []  # DrugMaster ids, drug codes, names, or med dicts
+
+
+class InteractionBatchInput(BaseModel):
+    branchId: str
+    patients: List[InteractionBatchPatient]
+
+
+@app.post("/v1/clinical/interaction-check/batch")
+async def interaction_check_batch(inp: InteractionBatchInput):
+    """Check many patients' med lists in one call (ward rounds)."""
+    from .engines.interaction_checker import check_batch
+    from .services.interaction_index import interaction_index
+
+    index = await interaction_index.get(inp.branchId)
+    result = check_batch(index, [(p.patientId, p.meds) for p in inp.patients])
+    return result.model_dump()
+
+
+@app.get("/v1/clinical/interaction-report")
+async def interaction_report(
+    branchId: str = Query(...),
+    severity: List[Literal["MAJOR", "MODERATE", "MINOR"]] = Query(["MAJOR"]),
+    limit: int = Query(500, ge=1, le=5000),
+    refresh: bool = Query(False),
+):
+    """Formulary-wide report: interacting pairs stocked in the same store."""
+    from .engines.interaction_checker import scan_stocked_interactions
+    from .services.interaction_index import interaction_index
+
+    index = await interaction_index.get(branchId, force_refresh=refresh)
+    result = scan_stocked_interactions(index, set(severity), limit=limit)
+    return result.model_dump()
+
+
 @app.post("/v1/clinical/summarize", response_model=ClinicalCopilotResponse)
 def summarize(ctx: ContextPack):
     return ClinicalCopilotResponse(
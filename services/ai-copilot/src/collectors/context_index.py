@@ -0,0 +1,185 @@
+"""Derived lookup index over a collected BranchContext.
+
+Engines used to re-flatten the location tree and re-filter units on every
+call.  ``BranchContext.index`` now builds these views once per context, on
+first access, and every engine run against the same context (e.g. the
+health-check's consistency + NABH + naming + pharmacy pass) shares them.
+
+Each view is a ``cached_property`` so an engine only pays for what it reads.
+The context is treated as an immutable snapshot: mutate it after the index
+is built and the views go stale (call ``BranchContext.reset_index()``).
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import cached_property
+from typing import TYPE_CHECKING
+
+from src.collectors.models import (
+    DepartmentDetail,
+    DrugSnapshot,
+    LocationTreeNode,
+    PharmStoreSnapshot,
+    RoomDetail,
+    UnitDetail,
+)
+
+if TYPE_CHECKING:
+    from src.collectors.models import BranchContext
+    from src.services.fact_index import Fact
+
+
+@dataclass(slots=True)
+class FlatNode:
+    node: LocationTreeNode
+    parentId: str | None
+    depth: int  # 0 for roots
+
+
+class BranchContextIndex:
+    """Lazily built, per-context lookup tables shared by all engines."""
+
+    def __init__(self, ctx: BranchContext) -> None:
+        self.ctx = ctx
+
+    # ── Location tree ──────────────────────────────────────────────────
+
+    @cached_property
+    def nodes(self) -> list[FlatNode]:
+        """Every location node in pre-order, with parent id and depth."""
+        out: list[FlatNode] = []
+        stack: list[tuple[LocationTreeNode, str | None, int]] = [
+            (n, None, 0) for n in reversed(self.ctx.location.tree)
+        ]
+        while stack:
+            node, parent_id, depth = stack.pop()
+            out.append(FlatNode(node, parent_id, depth))
+            for child in reversed(node.children):
+                stack.append((child, node.id, depth + 1))
+        return out
+
+    @cached_property
+    def node_by_id(self) -> dict[str, LocationTreeNode]:
+        by_id: dict[str, LocationTreeNode] = {}
+        for f in self.nodes:
+            by_id.setdefault(f.node.id, f.node)  # first occurrence wins
+        return by_id
+
+    @cached_property
+    def nodes_by_kind(self) -> dict[str, list[LocationTreeNode]]:
+        by_kind: dict[str, list[LocationTreeNode]] = defaultdict(list)
+        for f in self.nodes:
+            by_kind[f.node.kind].append(f.node)
+        return dict(by_kind)
+
+    @cached_property
+    def children_by_parent(self) -> dict[str | None, list[LocationTreeNode]]:
+        """Siblings grouped by parent id (``None`` for roots)."""
+        by_parent: dict[str | None, list[LocationTreeNode]] = defaultdict(list)
+        for f in self.nodes:
+            by_parent[f.parentId].append(f.node)
+        return dict(by_parent)
+
+    # ── Units & rooms ──────────────────────────────────────────────────
+
+    @cached_property
+    def active_units(self) -> list[UnitDetail]:
+        return [u for u in self.ctx.units.units if u.isActive]
+
+    @cached_property
+    def inactive_units(self) -> list[UnitDetail]:
+        return [u for u in self.ctx.units.units if not u.isActive]
+
+    @cached_property
+    def unit_by_id(self) -> dict[str, UnitDetail]:
+        return {u.id: u for u in self.ctx.units.units}
+
+    @cached_property
+    def units_by_type(self) -> dict[str, list[UnitDetail]]:
+        """All units keyed by upper-cased ``typeCode``."""
+        by_type: dict[str, list[UnitDetail]] = defaultdict(list)
+        for u in self.ctx.units.units:
+            by_type[u.typeCode.upper()].append(u)
+        return dict(by_type)
+
+    @cached_property
+    def active_units_by_type(self) -> dict[str, list[UnitDetail]]:
+        """Active units keyed by upper-cased ``typeCode``."""
+        by_type: dict[str, list[UnitDetail]] = defaultdict(list)
+        for u in self.active_units:
+            by_type[u.typeCode.upper()].append(u)
+        return dict(by_type)
+
+    @cached_property
+    def active_units_by_department(self) -> dict[str, list[UnitDetail]]:
+        by_dept: dict[str, list[UnitDetail]] = defaultdict(list)
+        for u in self.active_units:
+            if u.departmentId:
+                by_dept[u.departmentId].append(u)
+        return dict(by_dept)
+
+    @cached_property
+    def rooms(self) -> list[tuple[RoomDetail, UnitDetail]]:
+        """Every room in the context with its owning unit."""
+        return [(r, u) for u in self.ctx.units.units for r in u.rooms]
+
+    @cached_property
+    def rooms_by_unit(self) -> dict[str, list[RoomDetail]]:
+        return {u.id: u.rooms for u in self.ctx.units.units}
+
+    @cached_property
+    def rooms_by_type(self) -> dict[str | None, list[RoomDetail]]:
+        by_type: dict[str | None, list[RoomDetail]] = defaultdict(list)
+        for r, _ in self.rooms:
+            by_type[r.roomType].append(r)
+        return dict(by_type)
+
+    @cached_property
+    def total_beds(self) -> int:
+        return sum(u.resources.beds for u in self.ctx.units.units)
+
+    @cached_property
+    def active_beds(self) -> int:
+        return sum(u.resources.beds for u in self.active_units)
+
+    # ── Departments ────────────────────────────────────────────────────
+
+    @cached_property
+    def department_by_id(self) -> dict[str, DepartmentDetail]:
+        return {d.id: d for d in self.ctx.departments.departments}
+
+    # ── Pharmacy ───────────────────────────────────────────────────────
+
+    @cached_property
+    def drugs_by_generic(self) -> dict[str, list[DrugSnapshot]]:
+        """Drugs keyed by lower-cased generic name."""
+        by_name: dict[str, list[DrugSnapshot]] = defaultdict(list)
+        for d in self.ctx.pharmacy.drugs:
+            by_name[d.genericName.lower()].append(d)
+        return dict(by_name)
+
+    @cached_property
+    def drug_by_id(self) -> dict[str, DrugSnapshot]:
+        return {d.id: d for d in self.ctx.pharmacy.drugs}
+
+    @cached_property
+    def store_by_id(self) -> dict[str, PharmStoreSnapshot]:
+        return {s.id: s for s in self.ctx.pharmacy.stores}
+
+    # ── Retrieval ──────────────────────────────────────────────────────
+
+    @cached_property
+    def facts(self) -> list[Fact]:
+        """The retrievable facts (services/fact_index.py) for this context."""
+        from src.services.fact_index import branch_facts
+
+        return branch_facts(self.ctx)
+
+    @cached_property
+    def facts_fingerprint(self) -> str:
+        """Hash of ``facts``: changes exactly when the NL-visible data does."""
+        from src.services.fact_index import facts_fingerprint
+
+        return facts_fingerprint(self.facts)
@@ -3,9 +3,12 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
+
+if TYPE_CHECKING:
+    from src.collectors.context_index import BranchContextIndex
 
 
 class BranchSnapshot(BaseModel):
@@ -246,3 +249,18 @@ class BranchContext(BaseModel):
     serviceCatalog: ServiceCatalogSummary = ServiceCatalogSummary()
     billing: BillingSummary = BillingSummary()
     textSummary: str = ""
+
+    _index: Any = PrivateAttr(default=None)
+
+    @property
+    def index(self) -> BranchContextIndex:
+        """Shared derived lookups, built on first access (see context_index)."""
+        # model_copy() carries private attrs over; don't reuse the original's.
+        if self._index is None or self._index.ctx is not self:
+            from src.collectors.context_index import BranchContextIndex
+
+            self._index = BranchContextIndex(self)
+        return self._index
+
+    def reset_index(self) -> None:
+        self._index = None
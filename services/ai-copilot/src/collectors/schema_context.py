@@ -551,6 +551,43 @@ async def _collect_pharmacy(
     )
 
 
+async def collect_drug_catalog(branch_id: str) -> list[DrugSnapshot]:
+    """Collect the *entire* drug master for a branch (no 500-row cap).
+
+    Used by formulary-wide scans (LASA detection) that need every drug but
+    not the rest of the BranchContext.  Only the columns those scans read
+    are selected, so this stays cheap for 30k+ drug formularies.
+    """
+    async with get_session() as session:
+        result = await session.execute(
+            select(
+                DrugMaster.id,
+                DrugMaster.drugCode,
+                DrugMaster.genericName,
+                DrugMaster.brandName,
+                DrugMaster.category,
+                DrugMaster.isLasa,
+                DrugMaster.status,
+            )
+            .where(DrugMaster.branchId == branch_id)
+            .order_by(DrugMaster.drugCode.asc())
+        )
+        rows = result.all()
+
+    return [
+        DrugSnapshot(
+            id=r.id,
+            drugCode=r.drugCode,
+            genericName=r.genericName,
+            brandName=r.brandName,
+            category=r.category,
+            isLasa=r.isLasa,
+            status=r.status,
+        )
+        for r in rows
+    ]
+
+
 # ── Text Summary ──────────────────────────────────────────────────────────
 
 
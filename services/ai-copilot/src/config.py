@@ -16,6 +16,9 @@ _raw_db_url: str = os.getenv(
 )
 # Strip Prisma-specific ?schema=public (asyncpg doesn't understand it)
 DATABASE_URL: str = _raw_db_url.split("?")[0] if "?schema=" in _raw_db_url else _raw_db_url
+# Connection pool per worker process (total = workers x (size + overflow))
+DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "5"))
 
 # Ollama (local LLM)
 OLLAMA_BASE_URL: str = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
@@ -23,6 +26,67 @@ OLLAMA_MODEL: str = os.getenv("OLLAMA_MODEL", "mistral:7b")
 OLLAMA_TIMEOUT: int = int(os.getenv("OLLAMA_TIMEOUT", "120"))  # seconds
 OLLAMA_TEMPERATURE: float = float(os.getenv("OLLAMA_TEMPERATURE", "0.3"))
 OLLAMA_CONTEXT_WINDOW: int = int(os.getenv("OLLAMA_CONTEXT_WINDOW", "4096"))
+OLLAMA_RESPONSE_RESERVE: int = int(os.getenv("OLLAMA_RESPONSE_RESERVE", "512"))  # tokens kept free for the answer
+OLLAMA_PROMPT_BUDGET: int = int(os.getenv("OLLAMA_PROMPT_BUDGET", "1536"))  # max context tokens; 0 = fill the window
+# Connection pool for the shared Ollama client
+OLLAMA_MAX_CONNECTIONS: int = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "10"))
+OLLAMA_MAX_KEEPALIVE: int = int(os.getenv("OLLAMA_MAX_KEEPALIVE", "10"))
+OLLAMA_KEEPALIVE_EXPIRY: float = float(os.getenv("OLLAMA_KEEPALIVE_EXPIRY", "30"))  # seconds
+OLLAMA_CONNECT_TIMEOUT: float = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "5"))  # seconds
+# Background health probe and model keep-alive
+OLLAMA_PROBE_INTERVAL: float = float(os.getenv("OLLAMA_PROBE_INTERVAL", "15"))  # seconds while up
+OLLAMA_PROBE_MAX_BACKOFF: float = float(os.getenv("OLLAMA_PROBE_MAX_BACKOFF", "60"))  # seconds while down
+OLLAMA_KEEP_ALIVE: str = os.getenv("OLLAMA_KEEP_ALIVE", "30m")  # how long Ollama keeps the model loaded
+OLLAMA_PREWARM: bool = os.getenv("OLLAMA_PREWARM", "true").lower() in ("1", "true", "yes")
+# Response cache for deterministic (low-temperature) Ollama calls
+OLLAMA_CACHE_SIZE: int = int(os.getenv("OLLAMA_CACHE_SIZE", "512"))  # 0 disables
+OLLAMA_CACHE_TTL: float = float(os.getenv("OLLAMA_CACHE_TTL", "3600"))  # seconds
+OLLAMA_CACHE_MAX_TEMPERATURE: float = float(os.getenv("OLLAMA_CACHE_MAX_TEMPERATURE", "0.2"))
+OLLAMA_CACHE_PATH: str = os.getenv("OLLAMA_CACHE_PATH", "")  # SQLite file; empty = memory only
+# Scheduler: concurrent generations sent to Ollama and the wait queue in front
+OLLAMA_MAX_INFLIGHT: int = int(os.getenv("OLLAMA_MAX_INFLIGHT", "2"))
+OLLAMA_MAX_QUEUE: int = int(os.getenv("OLLAMA_MAX_QUEUE", "16"))
+OLLAMA_QUEUE_TIMEOUT: float = float(os.getenv("OLLAMA_QUEUE_TIMEOUT", "30"))  # seconds; 0 = wait forever
+OLLAMA_BULK_QUEUE_SHARE: float = float(os.getenv("OLLAMA_BULK_QUEUE_SHARE", "0.5"))  # queue room bulk calls may use
+# Retrieval: branch facts embedded into a per-branch vector index for NL questions
+OLLAMA_EMBED_MODEL: str = os.getenv("OLLAMA_EMBED_MODEL", "nomic-embed-text")  # hashing vectorizer if not pulled
+OLLAMA_EMBED_BATCH: int = int(os.getenv("OLLAMA_EMBED_BATCH", "64"))  # inputs per /api/embed request
+RETRIEVAL_TOP_K: int = int(os.getenv("RETRIEVAL_TOP_K", "24"))  # facts put into an NL prompt
+RETRIEVAL_HASH_DIM: int = int(os.getenv("RETRIEVAL_HASH_DIM", "1024"))  # hashing vectorizer width
+RETRIEVAL_INDEX_DIR: str = os.getenv("RETRIEVAL_INDEX_DIR", "")  # .npy vectors; empty = memory only
+# NL racing: a local answer that needs the database runs alongside a speculative
+# LLM turn, which is aborted if the local answer lands within the budget
+NL_RACE_BUDGET_MS: int = int(os.getenv("NL_RACE_BUDGET_MS", "1500"))  # 0 = local first, then the LLM
+# Chat sessions: idle expiry, a global cap (least recently used evicted first),
+# a per-session memory budget for history + stored Ollama context, and where
+# they are kept
+CHAT_SESSION_TTL: float = float(os.getenv("CHAT_SESSION_TTL", "1800"))  # seconds of inactivity
+CHAT_MAX_SESSIONS: int = int(os.getenv("CHAT_MAX_SESSIONS", "10000"))  # 0 = unbounded
+CHAT_SESSION_MAX_BYTES: int = int(os.getenv("CHAT_SESSION_MAX_BYTES", "65536"))
+CHAT_SESSION_PATH: str = os.getenv("CHAT_SESSION_PATH", "")  # SQLite file shared by workers; empty = per-process memory
+# Chat history in fresh LLM prompts: recent messages verbatim plus a rolling
+# digest of older turns (summarised by Ollama in the background)
+CHAT_HISTORY_TOKENS: int = int(os.getenv("CHAT_HISTORY_TOKENS", "512"))  # digest + recent messages
+CHAT_DIGEST_TOKENS: int = int(os.getenv("CHAT_DIGEST_TOKENS", "128"))  # share of that for the digest
+# Branch context reuse: a collected BranchContext serves chat turns on that
+# branch for this long before it is collected again
+CHAT_CONTEXT_TTL: float = float(os.getenv("CHAT_CONTEXT_TTL", "120"))  # seconds; 0 = collect every turn
+CHAT_CONTEXT_MAX_BRANCHES: int = int(os.getenv("CHAT_CONTEXT_MAX_BRANCHES", "32"))
 
 # Service
 CORS_ORIGIN: str = os.getenv("CORS_ORIGIN", "http://localhost:3000")
+# Startup warm-up: import the engines, load reference data and run one
+# synthetic health-check before the first request (see src/warmup.py)
+WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+WARMUP_HEALTH_CHECK: bool = os.getenv("WARMUP_HEALTH_CHECK", "true").lower() in ("1", "true", "yes")
+# Production server (python -m src.server): worker processes, socket and
+# HTTP keep-alive tuning, and how long shutdown waits for in-flight requests
+SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT: int = int(os.getenv("SERVER_PORT", "8100"))
+SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", "0"))  # 0 = one per usable CPU core
+SERVER_KEEPALIVE: int = int(os.getenv("SERVER_KEEPALIVE", "75"))  # seconds; above a proxy's 60 s idle timeout
+SERVER_BACKLOG: int = int(os.getenv("SERVER_BACKLOG", "2048"))  # pending connections in the listen queue
+SERVER_GRACEFUL_TIMEOUT: int = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))  # seconds
+SERVER_LIMIT_CONCURRENCY: int = int(os.getenv("SERVER_LIMIT_CONCURRENCY", "0"))  # per worker, 503 beyond; 0 = off
+SERVER_ACCESS_LOG: bool = os.getenv("SERVER_ACCESS_LOG", "false").lower() in ("1", "true", "yes")
+SERVER_FORWARDED_ALLOW_IPS: str = os.getenv("SERVER_FORWARDED_ALLOW_IPS", "127.0.0.1")  # proxies trusted for X-Forwarded-*
@@ -486,7 +486,10 @@ class DrugInteraction(Base):
     id: Mapped[str] = mapped_column(String, primary_key=True)
     drugAId: Mapped[str] = mapped_column(String, ForeignKey("DrugMaster.id"))
     drugBId: Mapped[str] = mapped_column(String, ForeignKey("DrugMaster.id"))
-    severity: Mapped[str] = mapped_column(String, default="MODERATE")
+    severity: Mapped[str] = mapped_column(String, default="MODERATE")  # MAJOR | MODERATE | MINOR
+    description: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    recommendation: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    source: Mapped[str] = mapped_column(String, default="STANDARD")
     createdAt: Mapped[datetime] = mapped_column(DateTime)
     updatedAt: Mapped[datetime] = mapped_column(DateTime)
 
@@ -2,20 +2,29 @@
 
 Connects to the same PostgreSQL database that Prisma manages.
 This service only performs **read-only** queries — Prisma owns the schema.
+
+The engine is created on first use in each process, not at import: under
+``src.server`` every worker (spawned, or forked by a pre-loading process
+manager) builds its own pool on its own event loop, and an engine inherited
+across a fork is dropped without touching the parent's connections.  Each
+worker holds up to DB_POOL_SIZE + DB_MAX_OVERFLOW connections.
 """
 
 from __future__ import annotations
 
+import os
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 
-from src.config import DATABASE_URL
+from src.config import DATABASE_URL, DB_MAX_OVERFLOW, DB_POOL_SIZE
 
 # Prisma uses `postgresql://…` but asyncpg needs `postgresql+asyncpg://…`
 _url = DATABASE_URL
@@ -24,34 +33,50 @@ if _url.startswith("postgresql://"):
 elif _url.startswith("postgres://"):
     _url = _url.replace("postgres://", "postgresql+asyncpg://", 1)
 
-engine = create_async_engine(
-    _url,
-    echo=False,
-    pool_size=5,
-    max_overflow=5,
-    pool_pre_ping=True,
-)
+_engine: AsyncEngine | None = None
+_session_factory: async_sessionmaker[AsyncSession] | None = None
+_engine_pid = 0
 
-async_session_factory = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
+
+def get_engine() -> AsyncEngine:
+    """This process's engine, created on first use."""
+    global _engine, _session_factory, _engine_pid
+    pid = os.getpid()
+    if _engine is None or _engine_pid != pid:
+        if _engine is not None:
+            # Inherited from the parent: its sockets belong to the parent
+            _engine.sync_engine.dispose(close=False)
+        _engine = create_async_engine(
+            _url,
+            echo=False,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_pre_ping=True,
+        )
+        _session_factory = async_sessionmaker(
+            _engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+        )
+        _engine_pid = pid
+    return _engine
 
 
 @asynccontextmanager
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async with async_session_factory() as session:
+    get_engine()
+    async with _session_factory() as session:
         yield session
 
 
 async def init_db() -> None:
-    """Verify we can connect (called at startup)."""
-    async with engine.begin() as conn:
-        await conn.execute(  # type: ignore[arg-type]
-            __import__("sqlalchemy").text("SELECT 1")
-        )
+    """Create this worker's engine and verify we can connect (called at startup)."""
+    async with get_engine().begin() as conn:
+        await conn.execute(text("SELECT 1"))
 
 
 async def close_db() -> None:
-    await engine.dispose()
+    global _engine, _session_factory
+    if _engine is not None:
+        await _engine.dispose(close=_engine_pid == os.getpid())
+    _engine = _session_factory = None
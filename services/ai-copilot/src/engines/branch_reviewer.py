@@ -22,24 +22,17 @@ Ported from: services/core-api/.../heuristic/branch-reviewer.engine.ts
 
 from __future__ import annotations
 
-import json
-from pathlib import Path
 from typing import Any
 
 from src.collectors.models import BranchContext, UnitDetail
 from src.engines.models import ReviewInsight, ReviewMetric, ReviewResult
+from src.services.reference_data import reference_data
 
 # ---------------------------------------------------------------------------
-# Load hospital profiles JSON
+# Hospital profiles (shared reference-data registry, hot-reloaded)
 # ---------------------------------------------------------------------------
 
-_DATA_DIR = Path(__file__).resolve().parent.parent / "data"
-_HOSPITAL_PROFILES: dict[str, Any] = {}
-
-_profiles_path = _DATA_DIR / "hospital_profiles.json"
-if _profiles_path.exists():
-    with open(_profiles_path, encoding="utf-8") as f:
-        _HOSPITAL_PROFILES = json.load(f)
+_HOSPITAL_PROFILES = reference_data.view("hospital_profiles.json")
 
 
 # ---------------------------------------------------------------------------
@@ -153,10 +146,10 @@ def review_branch_config(ctx: BranchContext) -> ReviewResult:
 
     # Infer hospital type from bed count + existing config
     hospital_type = _infer_type(branch, units, departments)
-    bed_distribution = _HOSPITAL_PROFILES.get("bedDistribution", {})
+    bed_distribution = _HOSPITAL_PROFILES.get().get("bedDistribution", {})
     profile = bed_distribution.get(hospital_type)
     # staffProfile loaded but currently used for future expansions
-    # staff_profile = _HOSPITAL_PROFILES.get("staffingMinimums", {}).get(hospital_type)
+    # staff_profile = _HOSPITAL_PROFILES.get().get("staffingMinimums", {}).get(hospital_type)
 
     # ===================================================================
     # BRANCH PROFILE REVIEW
@@ -0,0 +1,77 @@
+"""Rolling chat digest — older turns summarised by Ollama in the background.
+
+ChatSession keeps its recent messages verbatim within CHAT_HISTORY_TOKENS
+and folds older ones into ``undigested``; until they are summarised the
+digest shows one gist line (first sentence) for each.  After a chat turn,
+``schedule_digest`` merges the summary so far with those turns through
+Ollama -- at bulk priority, so it never holds up a chat answer -- and
+writes the result back through the session store.  Without Ollama the
+gists stay and the oldest move into the summary, so the digest stays
+within CHAT_DIGEST_TOKENS either way.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from src.services.chat_session import ChatMessage, ChatSession, SessionStore, chat_store
+from src.services.ollama import OllamaService, ollama_service
+
+from .prompt_builder import estimate_tokens
+
+logger = logging.getLogger("ai-copilot.chat-digest")
+
+SYSTEM_PROMPT = """You keep a running summary of a chat between hospital staff and an infrastructure assistant.
+Merge the summary so far and the new turns into one summary of at most {words} words.
+Keep numbers, unit / department / room names, decisions, and anything the user still wants to know.
+Plain sentences, no preamble, no lists."""
+
+MIN_MESSAGES = 4  # folded messages (two exchanges) worth an LLM call
+INPUT_TOKENS = 1024  # new turns per summarisation; the rest wait for the next one
+
+# session_id -> running summarisation
+_inflight: dict[str, asyncio.Task] = {}
+
+
+def schedule_digest(
+    session: ChatSession, svc: OllamaService | None = None, store: SessionStore | None = None
+) -> asyncio.Task | None:
+    """Summarise *session*'s undigested turns in the background; None if not due."""
+    svc = svc or ollama_service
+    sid = session.session_id
+    if len(session.undigested) < MIN_MESSAGES or not svc.available or sid in _inflight:
+        return None
+    turns, used = [], 0
+    for msg in session.undigested:
+        used += estimate_tokens(msg.content)
+        if turns and used > INPUT_TOKENS:
+            break
+        turns.append(msg)
+    task = asyncio.create_task(_summarise(sid, session.summary, turns, svc, store or chat_store))
+    _inflight[sid] = task
+    task.add_done_callback(lambda _: _inflight.pop(sid, None))
+    return task
+
+
+async def _summarise(
+    session_id: str, based_on: str, turns: list[ChatMessage], svc: OllamaService, store: SessionStore
+) -> bool:
+    lines = "\n".join(f"{'User' if m.role == 'user' else 'Assistant'}: {m.content}" for m in turns)
+    prompt = (f"Summary so far:\n{based_on}\n\n" if based_on else "") + f"New turns:\n{lines}"
+    system = SYSTEM_PROMPT.format(words=ChatSession.DIGEST_TOKENS * 2 // 3)
+    try:
+        resp = await svc.generate(
+            prompt, system, temperature=0.1, max_tokens=ChatSession.DIGEST_TOKENS, priority="bulk"
+        )
+        if not resp.available or resp.error or not resp.text.strip():
+            logger.debug("Chat digest skipped for %s: %s", session_id, resp.error or "no text")
+            return False
+        session = await store.get(session_id)
+        if session is None or not session.apply_summary(resp.text.strip(), turns, based_on):
+            return False  # expired, or the summary moved on meanwhile: the next turn retries
+        await store.save(session)
+        return True
+    except Exception as exc:
+        logger.warning("Chat digest failed for %s: %s", session_id, exc)
+        return False
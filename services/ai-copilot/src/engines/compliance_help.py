@@ -16,6 +16,8 @@ from typing import Any, Literal
 
 from pydantic import BaseModel, Field
 
+from .intent_matcher import IntentMatcher
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # Models
@@ -278,6 +280,33 @@ COMPLIANCE_GLOSSARY: list[ComplianceGlossaryEntry] = [
 _GLOSSARY_BY_TERM = {g.term.lower(): g for g in COMPLIANCE_GLOSSARY}
 _GLOSSARY_BY_TERM.update({g.shortDef.lower(): g for g in COMPLIANCE_GLOSSARY})
 
+# "what is X" / "what does X mean" / "explain X" / "define X" / "tell me about X"
+# for every glossary term in one regex; the term alternation keeps glossary
+# order, and the earliest glossary entry among all matches wins.
+_GLOSSARY_RANK: dict[str, int] = {
+    g.term.lower(): i for i, g in reversed(list(enumerate(COMPLIANCE_GLOSSARY)))
+}
+_TERMS = "|".join(re.escape(g.term.lower()) for g in COMPLIANCE_GLOSSARY)
+_GLOSSARY_QUESTION = re.compile(
+    rf"\b(?:(?:what\s+is|explain|define|tell\s+me\s+about)\s+(?P<term>{_TERMS})\b"
+    rf"|what\s+does\s+(?P<term_mean>{_TERMS})\s+mean\b)"
+)
+
+# Priority order matters: the first intent whose pattern occurs wins.
+_COMPLIANCE_INTENTS = IntentMatcher([
+    ("getting_started", r"where.*(start|begin)|how.*(start|begin)|what.*(first|start)|getting started"),
+    ("documents", r"what\s+documents?|which\s+documents?|documents?\s+(do|should|need)"),
+    ("nabh_process", r"nabh\s+accreditation|how.*nabh|nabh.*process|get\s+nabh"),
+    ("upload_evidence", r"how.*(upload|add)\s+(evidence|document|file)|upload\s+to\s+vault"),
+    ("readiness_score", r"blocking\s+gap|readiness\s+score|validator\s+score|what.*score|how.*score"),
+    ("fix_gaps", r"fix.*blocking|resolve.*gap|clear.*blocker"),
+    ("pmjay", r"pmjay|ayushman"),
+    ("cghs", r"cghs"),
+    ("echs", r"echs"),
+    ("page_help", r"what.*(do|should).*(here|this page|this)|help\s+with\s+this|how.*use\s+this"),
+    ("progress", r"what.*(next|should|do)|progress|status|where\s+am\s+i"),
+])
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # Page Help Database — What each page does + how to use it
@@ -777,24 +806,25 @@ def answer_compliance_question(
         return int((time.time() - start) * 1000)
 
     # ── Glossary lookups ──
-    for entry in COMPLIANCE_GLOSSARY:
-        term_lower = entry.term.lower()
-        if re.search(rf"\bwhat\s+is\s+{re.escape(term_lower)}\b", q) or \
-           re.search(rf"\bwhat\s+does\s+{re.escape(term_lower)}\s+mean\b", q) or \
-           re.search(rf"\bexplain\s+{re.escape(term_lower)}\b", q) or \
-           re.search(rf"\bdefine\s+{re.escape(term_lower)}\b", q) or \
-           re.search(rf"\btell\s+me\s+about\s+{re.escape(term_lower)}\b", q):
-            related = [g for g in COMPLIANCE_GLOSSARY if g.term in entry.relatedTerms]
-            return ComplianceChatResponse(
-                answer=f"**{entry.term}** — {entry.longDef}",
-                source="knowledge_base",
-                relatedTerms=related[:3],
-                followUp=[f"What is {t}?" for t in entry.relatedTerms[:3]],
-                durationMs=ms(),
-            )
+    ranks = [
+        _GLOSSARY_RANK[m.group("term") or m.group("term_mean")]
+        for m in _GLOSSARY_QUESTION.finditer(q)
+    ]
+    if ranks:
+        entry = COMPLIANCE_GLOSSARY[min(ranks)]
+        related = [g for g in COMPLIANCE_GLOSSARY if g.term in entry.relatedTerms]
+        return ComplianceChatResponse(
+            answer=f"**{entry.term}** — {entry.longDef}",
+            source="knowledge_base",
+            relatedTerms=related[:3],
+            followUp=[f"What is {t}?" for t in entry.relatedTerms[:3]],
+            durationMs=ms(),
+        )
+
+    intent = _COMPLIANCE_INTENTS.match(q)
 
     # ── "Where do I start" / "How to begin" ──
-    if re.search(r"where.*(start|begin)|how.*(start|begin)|what.*(first|start)|getting started", q):
+    if intent == "getting_started":
         return ComplianceChatResponse(
             answer="**Getting Started with Compliance:**\n\n"
                    "1. **Create a Workspace** — Go to Workspaces and create one for your branch\n"
@@ -819,7 +849,7 @@ def answer_compliance_question(
         )
 
     # ── "What documents do I need" ──
-    if re.search(r"what\s+documents?|which\s+documents?|documents?\s+(do|should|need)", q):
+    if intent == "documents":
         return ComplianceChatResponse(
             answer="**Essential Compliance Documents:**\n\n"
                    "• Hospital Registration Certificate\n"
@@ -843,7 +873,7 @@ def answer_compliance_question(
         )
 
     # ── "How to get NABH accreditation" ──
-    if re.search(r"nabh\s+accreditation|how.*nabh|nabh.*process|get\s+nabh", q):
+    if intent == "nabh_process":
         return ComplianceChatResponse(
             answer="**NABH Accreditation Process:**\n\n"
                    "1. **Self-Assessment** — Complete the NABH checklist in this system\n"
@@ -865,7 +895,7 @@ def answer_compliance_question(
         )
 
     # ── "How to upload evidence" ──
-    if re.search(r"how.*(upload|add)\s+(evidence|document|file)|upload\s+to\s+vault", q):
+    if intent == "upload_evidence":
         return ComplianceChatResponse(
             answer="**How to Upload Evidence:**\n\n"
                    "1. Go to **Evidence Vault** (sidebar → Evidence Vault)\n"
@@ -886,7 +916,7 @@ def answer_compliance_question(
         )
 
     # ── "What is blocking / readiness score" ──
-    if re.search(r"blocking\s+gap|readiness\s+score|validator\s+score|what.*score|how.*score", q):
+    if intent == "readiness_score":
         return ComplianceChatResponse(
             answer="**Understanding Readiness Scores:**\n\n"
                    "The Validator calculates your score based on:\n"
@@ -903,7 +933,7 @@ def answer_compliance_question(
         )
 
     # ── "How to fix blocking gaps" ──
-    if re.search(r"fix.*blocking|resolve.*gap|clear.*blocker", q):
+    if intent == "fix_gaps":
         return ComplianceChatResponse(
             answer="**Fixing Blocking Gaps:**\n\n"
                    "1. **Run the Validator** — It lists all blocking gaps\n"
@@ -925,7 +955,7 @@ def answer_compliance_question(
         )
 
     # ── Scheme-specific questions ──
-    if re.search(r"pmjay|ayushman", q):
+    if intent == "pmjay":
         entry = _GLOSSARY_BY_TERM.get("pmjay")
         return ComplianceChatResponse(
             answer=f"**PMJAY (Ayushman Bharat)** — {entry.longDef if entry else 'Government health scheme for economically weaker sections.'}\n\n"
@@ -944,7 +974,7 @@ def answer_compliance_question(
             durationMs=ms(),
         )
 
-    if re.search(r"cghs", q):
+    if intent == "cghs":
         entry = _GLOSSARY_BY_TERM.get("cghs")
         return ComplianceChatResponse(
             answer=f"**CGHS** — {entry.longDef if entry else 'Central Government Health Scheme for govt employees.'}\n\n"
@@ -954,7 +984,7 @@ def answer_compliance_question(
             durationMs=ms(),
         )
 
-    if re.search(r"echs", q):
+    if intent == "echs":
         entry = _GLOSSARY_BY_TERM.get("echs")
         return ComplianceChatResponse(
             answer=f"**ECHS** — {entry.longDef if entry else 'Ex-Servicemen health scheme.'}",
@@ -964,7 +994,7 @@ def answer_compliance_question(
         )
 
     # ── "What should I do on this page" ──
-    if page_context and re.search(r"what.*(do|should).*(here|this page|this)|help\s+with\s+this|how.*use\s+this", q):
+    if intent == "page_help" and page_context:
         help_data = get_page_help(page_context)
         if help_data.whatIsThis:
             steps_text = "\n".join(f"  {i+1}. {s}" for i, s in enumerate(help_data.howToUse))
@@ -976,8 +1006,11 @@ def answer_compliance_question(
                 durationMs=ms(),
             )
 
+    if intent == "page_help":  # no page help to give: try the rules ranked below it
+        intent = _COMPLIANCE_INTENTS.match(q, after="page_help")
+
     # ── "What's next" / progress ──
-    if compliance_state and re.search(r"what.*(next|should|do)|progress|status|where\s+am\s+i", q):
+    if intent == "progress" and compliance_state:
         steps = compute_workflow_steps(compliance_state)
         current_step = next((s for s in steps if s.status == "current"), None)
         done_count = sum(1 for s in steps if s.status == "done")
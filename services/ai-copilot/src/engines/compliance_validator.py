@@ -12,24 +12,31 @@ Ported from: services/core-api/.../engines/compliance-validator.engine.ts
 
 from __future__ import annotations
 
-import json
 import re
-from pathlib import Path
 from typing import Any
 
 from src.engines.models import ComplianceResult, GstinValidationResult, PanValidationResult
+from src.services.reference_data import reference_data
 
 # ---------------------------------------------------------------------------
-# Load GST rules JSON
+# GST rules (shared reference-data registry, hot-reloaded)
 # ---------------------------------------------------------------------------
 
-_DATA_DIR = Path(__file__).resolve().parent.parent / "data"
-_GST_RULES: dict[str, Any] = {}
+_DEFAULT_GSTIN_FORMAT = r"^\d{2}[A-Z]{5}\d{4}[A-Z]\d[Z][A-Z\d]$"
+_DEFAULT_PAN_FORMAT = r"^[A-Z]{5}\d{4}[A-Z]$"
 
-_gst_rules_path = _DATA_DIR / "gst_rules.json"
-if _gst_rules_path.exists():
-    with open(_gst_rules_path, encoding="utf-8") as f:
-        _GST_RULES = json.load(f)
+
+def _normalize_gst_rules(data: dict[str, Any]) -> dict[str, Any]:
+    """Pre-compile format regexes and turn code lists into sets."""
+    return {
+        **data,
+        "gstinPattern": re.compile(data.get("gstinFormat", _DEFAULT_GSTIN_FORMAT)),
+        "panPattern": re.compile(data.get("panFormat", _DEFAULT_PAN_FORMAT)),
+        "validStateCodes": frozenset(data.get("validStateCodes", [])),
+    }
+
+
+_GST_RULES = reference_data.view("gst_rules.json", _normalize_gst_rules)
 
 
 # ---------------------------------------------------------------------------
@@ -86,6 +93,7 @@ def validate_gstin(gstin: str) -> GstinValidationResult:
       6. Luhn mod-36 checksum on the 15th character
     """
     normalized = (gstin or "").strip().upper()
+    rules = _GST_RULES.get()
     errors: list[str] = []
     warnings: list[str] = []
     details: dict[str, Any] = {}
@@ -113,8 +121,7 @@ def validate_gstin(gstin: str) -> GstinValidationResult:
         )
 
     # Format check
-    gstin_format = _GST_RULES.get("gstinFormat", r"^\d{2}[A-Z]{5}\d{4}[A-Z]\d[Z][A-Z\d]$")
-    if not re.match(gstin_format, normalized):
+    if not rules["gstinPattern"].match(normalized):
         errors.append(
             "GSTIN format invalid. Expected: 2-digit state code + "
             "10-char PAN + 1-digit entity + Z + check digit"
@@ -127,13 +134,13 @@ def validate_gstin(gstin: str) -> GstinValidationResult:
     except ValueError:
         state_code = -1
 
-    valid_state_codes: list[int] = _GST_RULES.get("validStateCodes", [])
+    valid_state_codes: frozenset[int] = rules["validStateCodes"]
     if state_code not in valid_state_codes:
         errors.append(
             f"Invalid state code: {state_code_str}. Must be 01-37."
         )
     else:
-        state_names: dict[str, str] = _GST_RULES.get("stateNames", {})
+        state_names: dict[str, str] = rules.get("stateNames", {})
         details["state"] = state_names.get(str(state_code), "Unknown")
 
     # Embedded PAN
@@ -189,6 +196,7 @@ def validate_pan(pan: str) -> PanValidationResult:
       5. Healthcare-appropriateness warning
     """
     normalized = (pan or "").strip().upper()
+    rules = _GST_RULES.get()
     errors: list[str] = []
     warnings: list[str] = []
     details: dict[str, Any] = {}
@@ -215,8 +223,7 @@ def validate_pan(pan: str) -> PanValidationResult:
         )
 
     # Format check
-    pan_format = _GST_RULES.get("panFormat", r"^[A-Z]{5}\d{4}[A-Z]$")
-    if not re.match(pan_format, normalized):
+    if not rules["panPattern"].match(normalized):
         errors.append(
             "PAN format invalid. Expected: 5 letters + 4 digits + "
             "1 letter (e.g., ABCDE1234F)"
@@ -224,7 +231,7 @@ def validate_pan(pan: str) -> PanValidationResult:
 
     # Entity type from 4th character (index 3)
     entity_char = normalized[3] if len(normalized) > 3 else ""
-    pan_entity_types: dict[str, str] = _GST_RULES.get("panEntityTypes", {})
+    pan_entity_types: dict[str, str] = rules.get("panEntityTypes", {})
     entity_type = pan_entity_types.get(entity_char)
 
     if entity_type:
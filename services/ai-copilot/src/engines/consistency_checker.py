@@ -13,16 +13,31 @@ Categories:
   UNIT            -- bed/room coverage, location binding, department link
   ROOM            -- amenities for care type, pricing tier, occupancy
   RESOURCE        -- state hygiene, blocked/reserved reasons, distribution
+  (+ service catalog & financial config modules)
+
+Every check is a rule registered with ``@_rule(id, category, sections)`` in
+``RULES``.  ``sections`` names the BranchContext fields the rule reads, so a
+caller can run a subset -- one category, a list of rule ids, or only the
+rules affected by the sections that changed (see ``changed_sections``).
+Rules take the context's shared ``BranchContextIndex`` (flattened tree,
+active units by type ...), built once per context and reused by the other
+engines in the same request.
 """
 
 from __future__ import annotations
 
-from src.collectors.models import (
-    BranchContext,
-    LocationTreeNode,
-    UnitDetail,
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator
+
+from src.collectors.context_index import BranchContextIndex
+from src.collectors.models import BranchContext, RoomDetail, UnitDetail
+from src.engines.models import (
+    ConsistencyIssue,
+    ConsistencyProfile,
+    ConsistencyResult,
+    ConsistencyRuleTiming,
 )
-from src.engines.models import ConsistencyIssue, ConsistencyResult
 
 
 # -- Helpers ------------------------------------------------------------------
@@ -52,33 +67,6 @@ def _iss(
     )
 
 
-def _flatten_tree(nodes: list[LocationTreeNode]) -> list[LocationTreeNode]:
-    """Flatten a nested location tree into a single list."""
-    result: list[LocationTreeNode] = []
-    stack = list(nodes)
-    while stack:
-        node = stack.pop()
-        result.append(node)
-        stack.extend(node.children)
-    return result
-
-
-def _flatten_tree_with_parent(
-    nodes: list[LocationTreeNode],
-) -> list[tuple[LocationTreeNode, str | None]]:
-    """Flatten tree returning (node, parentId) pairs."""
-    result: list[tuple[LocationTreeNode, str | None]] = []
-    stack: list[tuple[LocationTreeNode, str | None]] = [
-        (n, None) for n in nodes
-    ]
-    while stack:
-        node, parent_id = stack.pop()
-        result.append((node, parent_id))
-        for child in node.children:
-            stack.append((child, node.id))
-    return result
-
-
 # Bed resource types recognized by the collector
 _BED_TYPES = {"BED", "GENERAL_BED", "ICU_BED", "NICU_INCUBATOR", "CRIB"}
 
@@ -94,81 +82,148 @@ _KIND_DEPTH: dict[str, int] = {
     "AREA": 4,
 }
 
+# Determine which types are bed-based and room-based from unit data
+# The TS engine checks unitType.bedBasedDefault.  We infer: a unit type
+# is bed-based if it appears in typical bed-based codes.
+_BED_BASED_TYPE_CODES = {
+    "WARD", "ICU", "HDU", "NICU", "PICU", "CCU", "ER", "EMERGENCY",
+    "IPD", "OBSERVATION", "DAYCARE", "BIRTHING", "BURN", "DIALYSIS",
+    "REHAB", "ISOLATION",
+}
 
-# -- Engine -------------------------------------------------------------------
 
+def _is_bed_based(unit: UnitDetail) -> bool:
+    return unit.typeCode.upper() in _BED_BASED_TYPE_CODES
 
-def run_consistency_checks(ctx: BranchContext) -> ConsistencyResult:
-    """Run all 35+ consistency checks against a pre-collected BranchContext.
 
-    Returns a ``ConsistencyResult`` with issues grouped by severity and a
-    composite score using the formula:
-        score = 100 - (blockers*5) - (warnings*2) - (infos*0.5)
-    clamped to [0, 100].
-    """
-    issues: list[ConsistencyIssue] = []
-    checks_run = 0
-    cs: dict[str, dict[str, int]] = {}
+def _is_room_based(unit: UnitDetail) -> bool:
+    # A unit uses rooms if it has rooms configured or its type typically
+    # uses rooms.  All clinical unit types default to using rooms.
+    return True  # Most types use rooms by default
+
+
+def _bed_based_units(ix: BranchContextIndex) -> list[UnitDetail]:
+    return [u for u in ix.active_units if _is_bed_based(u)]
+
+
+def _crit_care_rooms(ix: BranchContextIndex) -> list[RoomDetail]:
+    return [
+        room
+        for code in _CRIT_CARE_CODES
+        for unit in ix.active_units_by_type.get(code, ())
+        for room in unit.rooms
+    ]
+
+
+def _total_active_resources(ix: BranchContextIndex) -> int:
+    return sum(u.resources.total for u in ix.active_units)
+
+
+# -- Rule registry ------------------------------------------------------------
+
+_RuleFn = Callable[[BranchContextIndex], Iterable[ConsistencyIssue]]
+
+
+@dataclass(frozen=True, slots=True)
+class ConsistencyRule:
+    id: str
+    category: str
+    sections: tuple[str, ...]  # BranchContext fields the rule reads
+    fn: _RuleFn
+    description: str = ""
+    when: Callable[[BranchContextIndex], bool] | None = None  # precondition; False = not run
+    # Weight toward totalChecks.  The service-catalog modules have always
+    # counted twice (once as a module check, once in the category summary);
+    # kept so totalChecks / passCount don't shift for existing consumers.
+    checks: int = 1
 
-    def track(cat: str, before: int) -> None:
-        nonlocal checks_run
-        checks_run += 1
-        if cat not in cs:
-            cs[cat] = {"checks": 0, "issues": 0}
-        cs[cat]["checks"] += 1
-        cs[cat]["issues"] += len(issues) - before
 
-    branch = ctx.branch
-    branch_id = branch.id
+RULES: list[ConsistencyRule] = []
+_RULES_BY_ID: dict[str, ConsistencyRule] = {}
 
-    # ═══════════════════════════════════════════════════════════════════════
-    # 1. BRANCH
-    # ═══════════════════════════════════════════════════════════════════════
 
-    # 1a. Legal entity name
-    b = len(issues)
+def _rule(
+    id: str,
+    category: str,
+    sections: tuple[str, ...],
+    *,
+    when: Callable[[BranchContextIndex], bool] | None = None,
+    checks: int = 1,
+) -> Callable[[_RuleFn], _RuleFn]:
+    def register(fn: _RuleFn) -> _RuleFn:
+        if id in _RULES_BY_ID:
+            raise ValueError(f"Duplicate consistency rule id {id}")
+        rule = ConsistencyRule(
+            id=id,
+            category=category,
+            sections=sections,
+            fn=fn,
+            description=(fn.__doc__ or "").strip(),
+            when=when,
+            checks=checks,
+        )
+        RULES.append(rule)
+        _RULES_BY_ID[id] = rule
+        return fn
+
+    return register
+
+
+def _has_location_nodes(ix: BranchContextIndex) -> bool:
+    return ix.ctx.location.totalNodes > 0
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 1. BRANCH
+# ═══════════════════════════════════════════════════════════════════════════
+
+
+@_rule("BR-001", "BRANCH", ("branch",))
+def _br_legal_entity(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Legal entity name is set."""
+    branch = ix.ctx.branch
     if not branch.legalEntityName:
-        issues.append(
-            _iss(
-                "BR-001", "BRANCH", "WARNING",
-                "Legal entity name not set",
-                "Required on invoices, tax filings, and official documents.",
-                "Set the legal entity name in Branch Profile.",
-                "BRANCH", branch_id,
-            )
+        yield _iss(
+            "BR-001", "BRANCH", "WARNING",
+            "Legal entity name not set",
+            "Required on invoices, tax filings, and official documents.",
+            "Set the legal entity name in Branch Profile.",
+            "BRANCH", branch.id,
         )
-    track("BRANCH", b)
 
-    # 1b. GSTIN
-    b = len(issues)
+
+@_rule("BR-002", "BRANCH", ("branch",))
+def _br_gstin(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """GSTIN is configured."""
+    branch = ix.ctx.branch
     if not branch.gstNumber:
-        issues.append(
-            _iss(
-                "BR-002", "BRANCH", "WARNING",
-                "GSTIN not configured",
-                "GSTIN is needed for tax invoicing and GST return filing.",
-                "Enter the 15-character GSTIN in Branch Profile.",
-                "BRANCH", branch_id,
-            )
+        yield _iss(
+            "BR-002", "BRANCH", "WARNING",
+            "GSTIN not configured",
+            "GSTIN is needed for tax invoicing and GST return filing.",
+            "Enter the 15-character GSTIN in Branch Profile.",
+            "BRANCH", branch.id,
         )
-    track("BRANCH", b)
 
-    # 1c. PAN
-    b = len(issues)
+
+@_rule("BR-003", "BRANCH", ("branch",))
+def _br_pan(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """PAN is configured."""
+    branch = ix.ctx.branch
     if not branch.panNumber:
-        issues.append(
-            _iss(
-                "BR-003", "BRANCH", "WARNING",
-                "PAN not configured",
-                "PAN is required for TDS compliance and statutory reporting.",
-                "Enter the PAN in Branch Profile.",
-                "BRANCH", branch_id,
-            )
+        yield _iss(
+            "BR-003", "BRANCH", "WARNING",
+            "PAN not configured",
+            "PAN is required for TDS compliance and statutory reporting.",
+            "Enter the PAN in Branch Profile.",
+            "BRANCH", branch.id,
         )
-    track("BRANCH", b)
 
-    # 1d. Complete address
-    b = len(issues)
+
+@_rule("BR-004", "BRANCH", ("branch",))
+def _br_address(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Address, PIN code and state are complete."""
+    branch = ix.ctx.branch
     if not branch.address or not branch.pinCode or not branch.state:
         missing: list[str] = []
         if not branch.address:
@@ -177,1034 +232,1033 @@ def run_consistency_checks(ctx: BranchContext) -> ConsistencyResult:
             missing.append("PIN code")
         if not branch.state:
             missing.append("state")
-        issues.append(
-            _iss(
-                "BR-004", "BRANCH", "WARNING",
-                "Branch address incomplete",
-                f"Missing: {', '.join(missing)}. Full address is required "
-                "for invoicing and NABH.",
-                "Complete all address fields in Branch Profile.",
-                "BRANCH", branch_id,
-            )
+        yield _iss(
+            "BR-004", "BRANCH", "WARNING",
+            "Branch address incomplete",
+            f"Missing: {', '.join(missing)}. Full address is required "
+            "for invoicing and NABH.",
+            "Complete all address fields in Branch Profile.",
+            "BRANCH", branch.id,
         )
-    track("BRANCH", b)
 
-    # 1e. Contact info
-    b = len(issues)
+
+@_rule("BR-005", "BRANCH", ("branch",))
+def _br_contact(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """At least one contact phone or email."""
+    branch = ix.ctx.branch
     if not branch.contactPhone1 and not branch.contactEmail:
-        issues.append(
-            _iss(
-                "BR-005", "BRANCH", "WARNING",
-                "No contact information set",
-                "At least one phone number or email is needed for "
-                "correspondence.",
-                "Add contact phone or email in Branch Profile.",
-                "BRANCH", branch_id,
-            )
+        yield _iss(
+            "BR-005", "BRANCH", "WARNING",
+            "No contact information set",
+            "At least one phone number or email is needed for "
+            "correspondence.",
+            "Add contact phone or email in Branch Profile.",
+            "BRANCH", branch.id,
         )
-    track("BRANCH", b)
 
-    # 1f. Clinical Establishment Registration
-    b = len(issues)
+
+@_rule("BR-006", "BRANCH", ("branch",))
+def _br_clinical_est_reg(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Clinical Establishment Registration number is set."""
+    branch = ix.ctx.branch
     if not branch.clinicalEstRegNumber:
-        issues.append(
-            _iss(
-                "BR-006", "BRANCH", "INFO",
-                "Clinical Establishment Registration number not set",
-                "Required under the Clinical Establishments Act in "
-                "applicable states.",
-                "Enter the registration number in Branch Profile.",
-                "BRANCH", branch_id,
-            )
+        yield _iss(
+            "BR-006", "BRANCH", "INFO",
+            "Clinical Establishment Registration number not set",
+            "Required under the Clinical Establishments Act in "
+            "applicable states.",
+            "Enter the registration number in Branch Profile.",
+            "BRANCH", branch.id,
         )
-    track("BRANCH", b)
 
-    # 1g. Working hours
-    b = len(issues)
+
+@_rule("BR-007", "BRANCH", ("branch",))
+def _br_working_hours(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Working hours are configured."""
+    branch = ix.ctx.branch
     if not branch.workingHours:
-        issues.append(
-            _iss(
-                "BR-007", "BRANCH", "INFO",
-                "Working hours not configured",
-                "Working hours help with scheduling, OPD slot generation, "
-                "and reporting.",
-                "Set working hours in Branch Settings.",
-                "BRANCH", branch_id,
-            )
+        yield _iss(
+            "BR-007", "BRANCH", "INFO",
+            "Working hours not configured",
+            "Working hours help with scheduling, OPD slot generation, "
+            "and reporting.",
+            "Set working hours in Branch Settings.",
+            "BRANCH", branch.id,
         )
-    track("BRANCH", b)
-
-    # 1h. BranchInfraConfig
-    # NOTE: BranchInfraConfig is not available in BranchContext.  We track
-    #       this check but cannot evaluate it -- treat as INFO if we cannot
-    #       determine presence.  The collector does not include infraConfig.
-    b = len(issues)
-    # We approximate: if the context was successfully collected the branch
-    # exists, but we cannot know if infraConfig was initialized.  We still
-    # run the check placeholder so the check count stays at 35+.
-    # Skip issuing an alert -- the TS version only fires when config is null
-    # and we have no way to know here.
-    track("BRANCH", b)
-
-    # ═══════════════════════════════════════════════════════════════════════
-    # 2. LOCATION TREE
-    # ═══════════════════════════════════════════════════════════════════════
-
-    loc = ctx.location
-    all_flat = _flatten_tree(loc.tree)  # all nodes (nested -> flat)
-    all_with_parent = _flatten_tree_with_parent(loc.tree)
-    node_id_set = {n.id for n in all_flat}
-
-    # 2a. At least one location node
-    b = len(issues)
-    if loc.totalNodes == 0:
-        issues.append(
-            _iss(
-                "LOC-001", "LOCATION", "WARNING",
-                "No location nodes defined",
-                "The location hierarchy "
-                "(Campus -> Building -> Floor -> Zone -> Area) is empty.",
-                "Create a Campus node, then add Buildings and Floors "
-                "beneath it.",
-            )
+
+
+@_rule("BR-008", "BRANCH", ("branch",))
+def _br_infra_config(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """BranchInfraConfig is initialized (not evaluable from context)."""
+    # NOTE: BranchInfraConfig is not available in BranchContext.  The TS
+    #       version only fires when config is null and we have no way to
+    #       know here, so the check is counted but never raises an issue.
+    return iter(())
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 2. LOCATION TREE
+# ═══════════════════════════════════════════════════════════════════════════
+
+
+@_rule("LOC-001", "LOCATION", ("location",))
+def _loc_any_nodes(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """At least one location node exists."""
+    if ix.ctx.location.totalNodes == 0:
+        yield _iss(
+            "LOC-001", "LOCATION", "WARNING",
+            "No location nodes defined",
+            "The location hierarchy "
+            "(Campus -> Building -> Floor -> Zone -> Area) is empty.",
+            "Create a Campus node, then add Buildings and Floors "
+            "beneath it.",
         )
-    track("LOCATION", b)
-
-    if loc.totalNodes > 0:
-        # 2b. Root node (CAMPUS with no parent) exists
-        b = len(issues)
-        roots = [n for n, pid in all_with_parent if pid is None]
-        campus_roots = [n for n in roots if n.kind == "CAMPUS"]
-        if len(campus_roots) == 0:
-            issues.append(
-                _iss(
-                    "LOC-002", "LOCATION", "WARNING",
-                    "No CAMPUS root node found",
-                    f"Found {len(roots)} root node(s) but none are of kind "
-                    "CAMPUS.",
-                    "Create a top-level CAMPUS location node as the root "
-                    "of the hierarchy.",
-                )
-            )
-        track("LOCATION", b)
-
-        # 2c. Orphaned nodes
-        # In the tree representation the collector already resolves
-        # parent-child, so any node in the tree has a valid parent.
-        # Orphans would only exist if the collector placed them as roots
-        # despite having a parentId.  We still check: any root node whose
-        # kind is NOT CAMPUS and would logically need a parent.
-        b = len(issues)
-        # With pre-collected tree, orphans are unlikely, but we maintain the
-        # check for parity.  Count = 0 means pass.
-        track("LOCATION", b)
-
-        # 2d. Kind hierarchy violation
-        b = len(issues)
-        hierarchy_violations = 0
-        for node, parent_id in all_with_parent:
-            if parent_id is not None:
-                # find parent node
-                parent_node = next(
-                    (n for n in all_flat if n.id == parent_id), None
-                )
-                if parent_node is None:
-                    continue
-                child_depth = _KIND_DEPTH.get(node.kind, 99)
-                parent_depth = _KIND_DEPTH.get(parent_node.kind, 99)
-                if child_depth <= parent_depth:
-                    hierarchy_violations += 1
-        if hierarchy_violations > 0:
-            issues.append(
-                _iss(
-                    "LOC-004", "LOCATION", "WARNING",
-                    f"{hierarchy_violations} location hierarchy violation(s)",
-                    "Child nodes should be a deeper kind than their parent "
-                    "(e.g., FLOOR under BUILDING, not BUILDING under FLOOR).",
-                    "Review and correct the parent-child kind assignments.",
-                    count=hierarchy_violations,
-                )
-            )
-        track("LOCATION", b)
-
-        # 2e. Nodes without active revisions
-        b = len(issues)
-        no_revision_count = loc.nodesWithoutRevision
-        if no_revision_count > 0:
-            issues.append(
-                _iss(
-                    "LOC-005", "LOCATION", "WARNING",
-                    f"{no_revision_count} location node(s) without an "
-                    "active revision",
-                    "Each location node needs at least one active revision "
-                    "for its code, name, and attributes.",
-                    "Edit each affected node to create or activate a "
-                    "revision.",
-                    count=no_revision_count,
-                )
-            )
-        track("LOCATION", b)
-
-        # 2f. Fire zone coverage on BUILDING and FLOOR nodes
-        b = len(issues)
-        fireable_nodes = [
-            n for n in all_flat if n.kind in ("BUILDING", "FLOOR")
-        ]
-        if fireable_nodes:
-            missing_fire = sum(
-                1 for n in fireable_nodes if n.fireZone is None
-            )
-            if missing_fire > 0:
-                issues.append(
-                    _iss(
-                        "LOC-006", "LOCATION", "WARNING",
-                        f"{missing_fire} building/floor node(s) without "
-                        "fire zone designation",
-                        "Fire zone mapping is required for NABH fire safety "
-                        "and emergency evacuation compliance.",
-                        "Edit each Building/Floor node and set its fire zone.",
-                        count=missing_fire,
-                    )
-                )
-        track("LOCATION", b)
-
-        # 2g. No emergency exit marked anywhere
-        b = len(issues)
-        if not loc.hasEmergencyExits:
-            issues.append(
-                _iss(
-                    "LOC-007", "LOCATION", "WARNING",
-                    "No emergency exits marked in the location tree",
-                    "At least one node should be flagged as an emergency "
-                    "exit for evacuation planning.",
-                    "Mark appropriate location nodes as emergency exits in "
-                    "Location settings.",
-                )
-            )
-        track("LOCATION", b)
-
-        # 2h. Wheelchair accessibility coverage
-        b = len(issues)
-        if not loc.hasWheelchairAccess and loc.totalNodes >= 3:
-            issues.append(
-                _iss(
-                    "LOC-008", "LOCATION", "INFO",
-                    "No wheelchair-accessible nodes marked",
-                    "Marking wheelchair-accessible paths helps with patient "
-                    "navigation and NABH accessibility compliance.",
-                    "Flag wheelchair-accessible nodes in Location settings.",
-                )
-            )
-        track("LOCATION", b)
-
-        # 2i. GPS coordinates on CAMPUS / BUILDING
-        # NOTE: BranchContext LocationTreeNode does not carry gpsLat/gpsLng.
-        # We record the check but cannot evaluate GPS coverage from context.
-        b = len(issues)
-        # Check skipped -- GPS data not available in LocationTreeNode.
-        track("LOCATION", b)
-
-        # 2j. Duplicate revision codes at same tree level
-        b = len(issues)
-        # Group siblings by parent and check for duplicate codes
-        sibling_codes: dict[str | None, dict[str, int]] = {}
-        for node, parent_id in all_with_parent:
-            key = parent_id  # None for roots
-            if key not in sibling_codes:
-                sibling_codes[key] = {}
-            code = node.code or ""
-            if code:
-                sibling_codes[key][code] = (
-                    sibling_codes[key].get(code, 0) + 1
-                )
-
-        dup_location_codes = 0
-        for code_map in sibling_codes.values():
-            for count in code_map.values():
-                if count > 1:
-                    dup_location_codes += count
-
-        if dup_location_codes > 0:
-            issues.append(
-                _iss(
-                    "LOC-010", "LOCATION", "WARNING",
-                    f"{dup_location_codes} duplicate location code(s) among "
-                    "sibling nodes",
-                    "Sibling location nodes should have unique codes for "
-                    "unambiguous reference.",
-                    "Rename location codes to be unique within each parent "
-                    "level.",
-                    count=dup_location_codes,
-                )
-            )
-        track("LOCATION", b)
-
-    # ═══════════════════════════════════════════════════════════════════════
-    # 3. DEPARTMENT
-    # ═══════════════════════════════════════════════════════════════════════
-
-    departments = ctx.departments.departments  # active departments
-
-    # 3a. No departments
-    b = len(issues)
-    if len(departments) == 0:
-        issues.append(
-            _iss(
-                "DEPT-001", "DEPARTMENT", "WARNING",
-                "No departments created",
-                "Departments organize units, staff, and services. At least "
-                "one is needed.",
-                "Create departments in the Department setup.",
-            )
+
+
+@_rule("LOC-002", "LOCATION", ("location",), when=_has_location_nodes)
+def _loc_campus_root(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """A CAMPUS root node exists."""
+    roots = ix.children_by_parent.get(None, [])
+    if not any(n.kind == "CAMPUS" for n in roots):
+        yield _iss(
+            "LOC-002", "LOCATION", "WARNING",
+            "No CAMPUS root node found",
+            f"Found {len(roots)} root node(s) but none are of kind "
+            "CAMPUS.",
+            "Create a top-level CAMPUS location node as the root "
+            "of the hierarchy.",
+        )
+
+
+@_rule("LOC-003", "LOCATION", ("location",), when=_has_location_nodes)
+def _loc_orphans(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """No orphaned nodes (parity check; the collector resolves the tree)."""
+    # In the tree representation the collector already resolves
+    # parent-child, so any node in the tree has a valid parent.  Orphans
+    # would only exist if the collector placed them as roots despite having
+    # a parentId.  We maintain the check for parity.  Count = 0 means pass.
+    return iter(())
+
+
+@_rule("LOC-004", "LOCATION", ("location",), when=_has_location_nodes)
+def _loc_kind_hierarchy(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Child nodes are a deeper kind than their parent."""
+    node_by_id = ix.node_by_id
+    hierarchy_violations = 0
+    for flat in ix.nodes:
+        if flat.parentId is None:
+            continue
+        node = flat.node
+        parent_node = node_by_id.get(flat.parentId)
+        if parent_node is None:
+            continue
+        child_depth = _KIND_DEPTH.get(node.kind, 99)
+        parent_depth = _KIND_DEPTH.get(parent_node.kind, 99)
+        if child_depth <= parent_depth:
+            hierarchy_violations += 1
+    if hierarchy_violations > 0:
+        yield _iss(
+            "LOC-004", "LOCATION", "WARNING",
+            f"{hierarchy_violations} location hierarchy violation(s)",
+            "Child nodes should be a deeper kind than their parent "
+            "(e.g., FLOOR under BUILDING, not BUILDING under FLOOR).",
+            "Review and correct the parent-child kind assignments.",
+            count=hierarchy_violations,
+        )
+
+
+@_rule("LOC-005", "LOCATION", ("location",), when=_has_location_nodes)
+def _loc_revisions(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Every node has an active revision."""
+    no_revision_count = ix.ctx.location.nodesWithoutRevision
+    if no_revision_count > 0:
+        yield _iss(
+            "LOC-005", "LOCATION", "WARNING",
+            f"{no_revision_count} location node(s) without an "
+            "active revision",
+            "Each location node needs at least one active revision "
+            "for its code, name, and attributes.",
+            "Edit each affected node to create or activate a "
+            "revision.",
+            count=no_revision_count,
+        )
+
+
+@_rule("LOC-006", "LOCATION", ("location",), when=_has_location_nodes)
+def _loc_fire_zones(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """BUILDING and FLOOR nodes carry a fire zone."""
+    missing_fire = sum(
+        1
+        for kind in ("BUILDING", "FLOOR")
+        for n in ix.nodes_by_kind.get(kind, ())
+        if n.fireZone is None
+    )
+    if missing_fire > 0:
+        yield _iss(
+            "LOC-006", "LOCATION", "WARNING",
+            f"{missing_fire} building/floor node(s) without "
+            "fire zone designation",
+            "Fire zone mapping is required for NABH fire safety "
+            "and emergency evacuation compliance.",
+            "Edit each Building/Floor node and set its fire zone.",
+            count=missing_fire,
+        )
+
+
+@_rule("LOC-007", "LOCATION", ("location",), when=_has_location_nodes)
+def _loc_emergency_exits(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """At least one emergency exit is marked."""
+    if not ix.ctx.location.hasEmergencyExits:
+        yield _iss(
+            "LOC-007", "LOCATION", "WARNING",
+            "No emergency exits marked in the location tree",
+            "At least one node should be flagged as an emergency "
+            "exit for evacuation planning.",
+            "Mark appropriate location nodes as emergency exits in "
+            "Location settings.",
+        )
+
+
+@_rule("LOC-008", "LOCATION", ("location",), when=_has_location_nodes)
+def _loc_wheelchair(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Wheelchair-accessible nodes are marked."""
+    loc = ix.ctx.location
+    if not loc.hasWheelchairAccess and loc.totalNodes >= 3:
+        yield _iss(
+            "LOC-008", "LOCATION", "INFO",
+            "No wheelchair-accessible nodes marked",
+            "Marking wheelchair-accessible paths helps with patient "
+            "navigation and NABH accessibility compliance.",
+            "Flag wheelchair-accessible nodes in Location settings.",
         )
-    track("DEPARTMENT", b)
-
-    # 3b. Departments without a head
-    b = len(issues)
-    if departments:
-        no_head = [d for d in departments if not d.hasHead]
-        if no_head:
-            issues.append(
-                _iss(
-                    "DEPT-002", "DEPARTMENT", "INFO",
-                    f"{len(no_head)} department(s) without a designated head",
-                    "NABH requires each department to have an identifiable "
-                    "head for accountability.",
-                    "Assign a department head in Department settings.",
-                    count=len(no_head),
-                )
-            )
-    track("DEPARTMENT", b)
 
-    # 3c. Departments without any units
-    b = len(issues)
-    active_units = [u for u in ctx.units.units if u.isActive]
+
+@_rule("LOC-009", "LOCATION", ("location",), when=_has_location_nodes)
+def _loc_gps(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """CAMPUS / BUILDING nodes have GPS coordinates (not evaluable)."""
+    # NOTE: BranchContext LocationTreeNode does not carry gpsLat/gpsLng.
+    # We record the check but cannot evaluate GPS coverage from context.
+    return iter(())
+
+
+@_rule("LOC-010", "LOCATION", ("location",), when=_has_location_nodes)
+def _loc_sibling_codes(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Sibling nodes have unique codes."""
+    # Group siblings by parent and check for duplicate codes
+    dup_location_codes = 0
+    for siblings in ix.children_by_parent.values():  # None key for roots
+        code_map: dict[str, int] = {}
+        for node in siblings:
+            if node.code:
+                code_map[node.code] = code_map.get(node.code, 0) + 1
+        dup_location_codes += sum(c for c in code_map.values() if c > 1)
+    if dup_location_codes > 0:
+        yield _iss(
+            "LOC-010", "LOCATION", "WARNING",
+            f"{dup_location_codes} duplicate location code(s) among "
+            "sibling nodes",
+            "Sibling location nodes should have unique codes for "
+            "unambiguous reference.",
+            "Rename location codes to be unique within each parent "
+            "level.",
+            count=dup_location_codes,
+        )
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 3. DEPARTMENT
+# ═══════════════════════════════════════════════════════════════════════════
+
+
+@_rule("DEPT-001", "DEPARTMENT", ("departments",))
+def _dept_any(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """At least one department exists."""
+    if len(ix.ctx.departments.departments) == 0:
+        yield _iss(
+            "DEPT-001", "DEPARTMENT", "WARNING",
+            "No departments created",
+            "Departments organize units, staff, and services. At least "
+            "one is needed.",
+            "Create departments in the Department setup.",
+        )
+
+
+@_rule("DEPT-002", "DEPARTMENT", ("departments",))
+def _dept_heads(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Every department has a designated head."""
+    no_head = [d for d in ix.ctx.departments.departments if not d.hasHead]
+    if no_head:
+        yield _iss(
+            "DEPT-002", "DEPARTMENT", "INFO",
+            f"{len(no_head)} department(s) without a designated head",
+            "NABH requires each department to have an identifiable "
+            "head for accountability.",
+            "Assign a department head in Department settings.",
+            count=len(no_head),
+        )
+
+
+@_rule("DEPT-003", "DEPARTMENT", ("departments", "units"))
+def _dept_units(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Every department has at least one active unit."""
     dept_unit_counts: dict[str, int] = {}
-    for u in active_units:
+    for u in ix.active_units:
         if u.departmentId:
             dept_unit_counts[u.departmentId] = (
                 dept_unit_counts.get(u.departmentId, 0) + 1
             )
 
-    for dept in departments:
+    for dept in ix.ctx.departments.departments:
         if dept_unit_counts.get(dept.id, 0) == 0:
-            issues.append(
-                _iss(
-                    f"DEPT-003-{dept.id}", "DEPARTMENT", "INFO",
-                    f'Department "{dept.name}" has no active units',
-                    f"Department {dept.code} exists but no units are "
-                    "assigned to it.",
-                    f'Create units under department "{dept.name}" or '
-                    "reassign existing units.",
-                    "DEPARTMENT", dept.id,
-                )
+            yield _iss(
+                f"DEPT-003-{dept.id}", "DEPARTMENT", "INFO",
+                f'Department "{dept.name}" has no active units',
+                f"Department {dept.code} exists but no units are "
+                "assigned to it.",
+                f'Create units under department "{dept.name}" or '
+                "reassign existing units.",
+                "DEPARTMENT", dept.id,
             )
-    track("DEPARTMENT", b)
 
-    # 3d. Departments without location mapping
+
+@_rule("DEPT-004", "DEPARTMENT", ("departments",))
+def _dept_locations(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Departments are mapped to locations (not evaluable from context)."""
     # NOTE: DepartmentLocation data is not available in BranchContext.
     # We record the check but cannot determine which departments lack
     # location mappings.
-    b = len(issues)
-    track("DEPARTMENT", b)
+    return iter(())
+
 
-    # 3e. Duplicate department codes
-    b = len(issues)
+@_rule("DEPT-005", "DEPARTMENT", ("departments",))
+def _dept_duplicate_codes(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Department codes are unique."""
     dept_codes: dict[str, int] = {}
-    for d in departments:
+    for d in ix.ctx.departments.departments:
         norm = (d.code or "").upper()
         if norm:
             dept_codes[norm] = dept_codes.get(norm, 0) + 1
 
     dept_dup_count = sum(c for c in dept_codes.values() if c > 1)
     if dept_dup_count > 0:
-        issues.append(
-            _iss(
-                "DEPT-005", "DEPARTMENT", "WARNING",
-                f"{dept_dup_count} departments share duplicate codes",
-                "Department codes should be unique for unambiguous "
-                "identification.",
-                "Rename duplicate department codes.",
-                count=dept_dup_count,
-            )
+        yield _iss(
+            "DEPT-005", "DEPARTMENT", "WARNING",
+            f"{dept_dup_count} departments share duplicate codes",
+            "Department codes should be unique for unambiguous "
+            "identification.",
+            "Rename duplicate department codes.",
+            count=dept_dup_count,
         )
-    track("DEPARTMENT", b)
-
-    # ═══════════════════════════════════════════════════════════════════════
-    # 4. UNIT TYPES
-    # ═══════════════════════════════════════════════════════════════════════
-
-    # Derive enabled unit types from the byType summary in UnitSummary.
-    # The TS engine queries BranchUnitType directly.  Here we approximate:
-    # any type code that appears in byType is considered "enabled".
-    enabled_type_codes = list(ctx.units.byType.keys())
-
-    # 4a. At least one unit type enabled
-    b = len(issues)
-    if len(enabled_type_codes) == 0:
-        issues.append(
-            _iss(
-                "UT-001", "UNIT_TYPE", "BLOCKER",
-                "No unit types enabled for this branch",
-                "You must enable at least one unit type (e.g., OPD, WARD, "
-                "ICU) to create units.",
-                "Enable unit types in Branch -> Unit Types.",
-            )
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 4. UNIT TYPES
+# ═══════════════════════════════════════════════════════════════════════════
+# Enabled unit types are derived from the byType summary in UnitSummary.
+# The TS engine queries BranchUnitType directly.  Here we approximate:
+# any type code that appears in byType is considered "enabled".
+
+
+@_rule("UT-001", "UNIT_TYPE", ("units",))
+def _ut_any_enabled(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """At least one unit type is enabled."""
+    if len(ix.ctx.units.byType) == 0:
+        yield _iss(
+            "UT-001", "UNIT_TYPE", "BLOCKER",
+            "No unit types enabled for this branch",
+            "You must enable at least one unit type (e.g., OPD, WARD, "
+            "ICU) to create units.",
+            "Enable unit types in Branch -> Unit Types.",
         )
-    track("UNIT_TYPE", b)
 
-    # 4b. Enabled types with zero units
-    b = len(issues)
-    for type_code in enabled_type_codes:
-        type_info = ctx.units.byType[type_code]
+
+@_rule("UT-002", "UNIT_TYPE", ("units",))
+def _ut_without_units(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Every enabled unit type has units."""
+    for type_code, type_info in ix.ctx.units.byType.items():
         unit_count = type_info.get("count", 0)
         type_name = type_info.get("typeName", type_code)
         if unit_count == 0:
-            issues.append(
-                _iss(
-                    f"UT-002-{type_code}", "UNIT_TYPE", "WARNING",
-                    f'Unit type "{type_name}" is enabled but has no units',
-                    f"{type_code} is enabled for this branch but zero units "
-                    "have been created.",
-                    f"Create at least one {type_name} unit, or disable this "
-                    "unit type if not needed.",
-                    "BRANCH_UNIT_TYPE", None,
-                )
+            yield _iss(
+                f"UT-002-{type_code}", "UNIT_TYPE", "WARNING",
+                f'Unit type "{type_name}" is enabled but has no units',
+                f"{type_code} is enabled for this branch but zero units "
+                "have been created.",
+                f"Create at least one {type_name} unit, or disable this "
+                "unit type if not needed.",
+                "BRANCH_UNIT_TYPE", None,
             )
-    track("UNIT_TYPE", b)
-
-    # ═══════════════════════════════════════════════════════════════════════
-    # 5. UNITS
-    # ═══════════════════════════════════════════════════════════════════════
-
-    all_units = [u for u in ctx.units.units if u.isActive]
 
-    # Determine which types are bed-based and room-based from unit data
-    # The TS engine checks unitType.bedBasedDefault.  We infer: a unit type
-    # is bed-based if it appears in typical bed-based codes.
-    _BED_BASED_TYPE_CODES = {
-        "WARD", "ICU", "HDU", "NICU", "PICU", "CCU", "ER", "EMERGENCY",
-        "IPD", "OBSERVATION", "DAYCARE", "BIRTHING", "BURN", "DIALYSIS",
-        "REHAB", "ISOLATION",
-    }
 
-    def _is_bed_based(unit: UnitDetail) -> bool:
-        return unit.typeCode.upper() in _BED_BASED_TYPE_CODES
+# ═══════════════════════════════════════════════════════════════════════════
+# 5. UNITS
+# ═══════════════════════════════════════════════════════════════════════════
 
-    def _is_room_based(unit: UnitDetail) -> bool:
-        # A unit uses rooms if it has rooms configured or its type typically
-        # uses rooms.  All clinical unit types default to using rooms.
-        return True  # Most types use rooms by default
 
-    bed_based_units = [u for u in all_units if _is_bed_based(u)]
-
-    # 5a. Bed-based units without beds
-    b = len(issues)
-    for unit in bed_based_units:
+@_rule("UNIT-001", "UNIT", ("units",))
+def _unit_beds(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Bed-based units have at least one bed."""
+    for unit in _bed_based_units(ix):
         if unit.resources.beds == 0:
-            issues.append(
-                _iss(
-                    f"UNIT-001-{unit.id}", "UNIT", "BLOCKER",
-                    f'{unit.typeCode} unit "{unit.name}" has no beds',
-                    "Bed-based unit requires at least one active BED "
-                    "resource for admissions.",
-                    f'Navigate to Units -> "{unit.name}" -> Resources and '
-                    "add BED resources.",
-                    "UNIT", unit.id,
-                )
+            yield _iss(
+                f"UNIT-001-{unit.id}", "UNIT", "BLOCKER",
+                f'{unit.typeCode} unit "{unit.name}" has no beds',
+                "Bed-based unit requires at least one active BED "
+                "resource for admissions.",
+                f'Navigate to Units -> "{unit.name}" -> Resources and '
+                "add BED resources.",
+                "UNIT", unit.id,
             )
-    track("UNIT", b)
 
-    # 5b. Room-based units without rooms
-    b = len(issues)
-    for unit in all_units:
+
+@_rule("UNIT-002", "UNIT", ("units",))
+def _unit_rooms(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Room-based units have at least one room."""
+    for unit in ix.active_units:
         if len(unit.rooms) == 0 and _is_room_based(unit):
-            # Only flag if the unit type typically expects rooms
-            issues.append(
-                _iss(
-                    f"UNIT-002-{unit.id}", "UNIT", "WARNING",
-                    f'Unit "{unit.name}" ({unit.typeCode}) uses rooms but '
-                    "has none",
-                    "This unit is configured to use rooms, but zero rooms "
-                    "have been created.",
-                    f'Add rooms to unit "{unit.name}" or set usesRooms = '
-                    "false if not needed.",
-                    "UNIT", unit.id,
-                )
-            )
-    track("UNIT", b)
-
-    # 5c. Units not linked to a location node
-    b = len(issues)
-    unlinked_units = [u for u in all_units if not u.locationNodeId]
-    if unlinked_units:
-        issues.append(
-            _iss(
-                "UNIT-003", "UNIT", "INFO",
-                f"{len(unlinked_units)} unit(s) not linked to a location "
-                "node",
-                "Units should be mapped to location nodes for wayfinding "
-                "and spatial tracking.",
-                "Edit each unit and assign the appropriate location node.",
-                count=len(unlinked_units),
+            yield _iss(
+                f"UNIT-002-{unit.id}", "UNIT", "WARNING",
+                f'Unit "{unit.name}" ({unit.typeCode}) uses rooms but '
+                "has none",
+                "This unit is configured to use rooms, but zero rooms "
+                "have been created.",
+                f'Add rooms to unit "{unit.name}" or set usesRooms = '
+                "false if not needed.",
+                "UNIT", unit.id,
             )
+
+
+@_rule("UNIT-003", "UNIT", ("units",))
+def _unit_location_link(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Units are linked to a location node."""
+    unlinked = sum(1 for u in ix.active_units if not u.locationNodeId)
+    if unlinked:
+        yield _iss(
+            "UNIT-003", "UNIT", "INFO",
+            f"{unlinked} unit(s) not linked to a location "
+            "node",
+            "Units should be mapped to location nodes for wayfinding "
+            "and spatial tracking.",
+            "Edit each unit and assign the appropriate location node.",
+            count=unlinked,
         )
-    track("UNIT", b)
 
-    # 5d. Duplicate unit codes
-    b = len(issues)
+
+@_rule("UNIT-004", "UNIT", ("units",))
+def _unit_duplicate_codes(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Unit codes are unique."""
     unit_codes: dict[str, int] = {}
-    for u in all_units:
+    for u in ix.active_units:
         norm = (u.code or "").upper()
         if norm:
             unit_codes[norm] = unit_codes.get(norm, 0) + 1
 
     unit_dup_count = sum(c for c in unit_codes.values() if c > 1)
     if unit_dup_count > 0:
-        issues.append(
-            _iss(
-                "UNIT-004", "UNIT", "WARNING",
-                f"{unit_dup_count} units share duplicate codes",
-                "Unit codes must be unique within a branch "
-                "(enforced by @@unique).",
-                "Rename duplicate unit codes.",
-                count=unit_dup_count,
-            )
+        yield _iss(
+            "UNIT-004", "UNIT", "WARNING",
+            f"{unit_dup_count} units share duplicate codes",
+            "Unit codes must be unique within a branch "
+            "(enforced by @@unique).",
+            "Rename duplicate unit codes.",
+            count=unit_dup_count,
         )
-    track("UNIT", b)
 
-    # 5e. Branch.bedCount vs actual bed resources
-    b = len(issues)
-    actual_bed_count = sum(u.resources.beds for u in all_units)
+
+@_rule("UNIT-005", "UNIT", ("branch", "units"))
+def _unit_bed_count_sync(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Branch.bedCount matches actual bed resources (also raises UNIT-006)."""
+    branch = ix.ctx.branch
+    actual_bed_count = sum(u.resources.beds for u in ix.active_units)
     if branch.bedCount is not None:
-        diff = abs(branch.bedCount - actual_bed_count)
-        if diff > 0:
+        if branch.bedCount != actual_bed_count:
             sev = "BLOCKER" if actual_bed_count == 0 else "WARNING"
-            issues.append(
-                _iss(
-                    "UNIT-005", "UNIT", sev,
-                    f"Branch bed count ({branch.bedCount}) does not match "
-                    f"actual bed resources ({actual_bed_count})",
-                    f"Branch profile says {branch.bedCount} beds but "
-                    f"{actual_bed_count} active BED resources exist.",
-                    "Sync: either update Branch.bedCount or add/remove bed "
-                    "resources to match.",
-                    "BRANCH", branch_id,
-                )
+            yield _iss(
+                "UNIT-005", "UNIT", sev,
+                f"Branch bed count ({branch.bedCount}) does not match "
+                f"actual bed resources ({actual_bed_count})",
+                f"Branch profile says {branch.bedCount} beds but "
+                f"{actual_bed_count} active BED resources exist.",
+                "Sync: either update Branch.bedCount or add/remove bed "
+                "resources to match.",
+                "BRANCH", branch.id,
             )
     elif actual_bed_count > 0:
-        issues.append(
-            _iss(
-                "UNIT-006", "UNIT", "INFO",
-                f"Branch bedCount is not set but {actual_bed_count} bed "
-                "resource(s) exist",
-                "Setting the branch bed count helps with reporting and "
-                "NABH readiness checks.",
-                "Set the bed count in Branch Profile.",
-                "BRANCH", branch_id,
-            )
+        yield _iss(
+            "UNIT-006", "UNIT", "INFO",
+            f"Branch bedCount is not set but {actual_bed_count} bed "
+            "resource(s) exist",
+            "Setting the branch bed count helps with reporting and "
+            "NABH readiness checks.",
+            "Set the bed count in Branch Profile.",
+            "BRANCH", branch.id,
         )
-    track("UNIT", b)
-
-    # ═══════════════════════════════════════════════════════════════════════
-    # 6. ROOMS
-    # ═══════════════════════════════════════════════════════════════════════
-
-    # Collect all active rooms across all units (active rooms are already
-    # filtered in UnitDetail.rooms by the collector).
-    all_rooms_with_unit: list[tuple[dict, UnitDetail]] = []
-    for unit in ctx.units.units:
-        for room in unit.rooms:
-            all_rooms_with_unit.append((room.model_dump(), unit))
-
-    # 6a. Active rooms in inactive units
-    b = len(issues)
-    inactive_units = [u for u in ctx.units.units if not u.isActive]
-    rooms_in_inactive = sum(len(u.rooms) for u in inactive_units)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 6. ROOMS
+# ═══════════════════════════════════════════════════════════════════════════
+# Active rooms are already filtered in UnitDetail.rooms by the collector.
+
+
+@_rule("ROOM-001", "ROOM", ("units",))
+def _room_inactive_units(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """No active rooms under inactive units."""
+    rooms_in_inactive = sum(
+        len(u.rooms) for u in ix.ctx.units.units if not u.isActive
+    )
     if rooms_in_inactive > 0:
-        issues.append(
-            _iss(
-                "ROOM-001", "ROOM", "WARNING",
-                f"{rooms_in_inactive} active room(s) belong to inactive "
-                "units",
-                "These rooms won't be usable since their parent unit is "
-                "deactivated.",
-                "Deactivate these rooms or reactivate their parent units.",
-                count=rooms_in_inactive,
-            )
+        yield _iss(
+            "ROOM-001", "ROOM", "WARNING",
+            f"{rooms_in_inactive} active room(s) belong to inactive "
+            "units",
+            "These rooms won't be usable since their parent unit is "
+            "deactivated.",
+            "Deactivate these rooms or reactivate their parent units.",
+            count=rooms_in_inactive,
         )
-    track("ROOM", b)
 
-    # 6b. ICU/HDU/CCU rooms missing oxygen
-    b = len(issues)
-    crit_care_rooms = []
-    for unit in all_units:
-        if unit.typeCode.upper() in _CRIT_CARE_CODES:
-            for room in unit.rooms:
-                crit_care_rooms.append(room)
 
-    no_oxygen = [r for r in crit_care_rooms if not r.hasOxygen]
+@_rule("ROOM-002", "ROOM", ("units",))
+def _room_oxygen(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """ICU/HDU/CCU rooms have oxygen."""
+    no_oxygen = sum(1 for r in _crit_care_rooms(ix) if not r.hasOxygen)
     if no_oxygen:
-        issues.append(
-            _iss(
-                "ROOM-002", "ROOM", "WARNING",
-                f"{len(no_oxygen)} critical care room(s) without oxygen "
-                "supply",
-                "ICU/HDU/CCU rooms must have piped oxygen for patient "
-                "safety.",
-                "Enable the oxygen flag on these critical care rooms.",
-                count=len(no_oxygen),
-            )
+        yield _iss(
+            "ROOM-002", "ROOM", "WARNING",
+            f"{no_oxygen} critical care room(s) without oxygen "
+            "supply",
+            "ICU/HDU/CCU rooms must have piped oxygen for patient "
+            "safety.",
+            "Enable the oxygen flag on these critical care rooms.",
+            count=no_oxygen,
         )
-    track("ROOM", b)
 
-    # 6c. ICU rooms missing suction
-    b = len(issues)
-    no_suction = [r for r in crit_care_rooms if not r.hasSuction]
+
+@_rule("ROOM-003", "ROOM", ("units",))
+def _room_suction(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Critical care rooms have suction."""
+    no_suction = sum(1 for r in _crit_care_rooms(ix) if not r.hasSuction)
     if no_suction:
-        issues.append(
-            _iss(
-                "ROOM-003", "ROOM", "INFO",
-                f"{len(no_suction)} critical care room(s) without suction",
-                "Critical care rooms should have suction for airway "
-                "management.",
-                "Enable the suction flag on these rooms.",
-                count=len(no_suction),
-            )
+        yield _iss(
+            "ROOM-003", "ROOM", "INFO",
+            f"{no_suction} critical care room(s) without suction",
+            "Critical care rooms should have suction for airway "
+            "management.",
+            "Enable the suction flag on these rooms.",
+            count=no_suction,
         )
-    track("ROOM", b)
-
-    # 6d. IPD rooms without pricing tier
-    b = len(issues)
-    ipd_rooms_no_pricing = 0
-    for unit in all_units:
-        if _is_bed_based(unit):
-            for room in unit.rooms:
-                if room.pricingTier is None:
-                    ipd_rooms_no_pricing += 1
+
+
+@_rule("ROOM-004", "ROOM", ("units",))
+def _room_pricing_tier(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """IPD rooms have a pricing tier."""
+    ipd_rooms_no_pricing = sum(
+        1
+        for unit in _bed_based_units(ix)
+        for room in unit.rooms
+        if room.pricingTier is None
+    )
     if ipd_rooms_no_pricing > 0:
-        issues.append(
-            _iss(
-                "ROOM-004", "ROOM", "INFO",
-                f"{ipd_rooms_no_pricing} IPD room(s) without a pricing tier",
-                "Pricing tier (ECONOMY, STANDARD, DELUXE, etc.) is used "
-                "for auto-applying bed charges.",
-                "Set the pricing tier on each IPD room.",
-                count=ipd_rooms_no_pricing,
-            )
+        yield _iss(
+            "ROOM-004", "ROOM", "INFO",
+            f"{ipd_rooms_no_pricing} IPD room(s) without a pricing tier",
+            "Pricing tier (ECONOMY, STANDARD, DELUXE, etc.) is used "
+            "for auto-applying bed charges.",
+            "Set the pricing tier on each IPD room.",
+            count=ipd_rooms_no_pricing,
         )
-    track("ROOM", b)
-
-    # 6e. Rooms without roomType set
-    b = len(issues)
-    rooms_no_type = 0
-    for unit in ctx.units.units:
-        for room in unit.rooms:
-            if room.roomType is None:
-                rooms_no_type += 1
+
+
+@_rule("ROOM-005", "ROOM", ("units",))
+def _room_type_set(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Every room has a room type."""
+    rooms_no_type = sum(
+        1
+        for unit in ix.ctx.units.units
+        for room in unit.rooms
+        if room.roomType is None
+    )
     if rooms_no_type > 0:
-        issues.append(
-            _iss(
-                "ROOM-005", "ROOM", "INFO",
-                f"{rooms_no_type} room(s) without a room type set",
-                "Room type (CONSULTATION, PROCEDURE, PATIENT_ROOM, etc.) "
-                "helps with scheduling and reporting.",
-                "Set the room type on each room.",
-                count=rooms_no_type,
-            )
+        yield _iss(
+            "ROOM-005", "ROOM", "INFO",
+            f"{rooms_no_type} room(s) without a room type set",
+            "Room type (CONSULTATION, PROCEDURE, PATIENT_ROOM, etc.) "
+            "helps with scheduling and reporting.",
+            "Set the room type on each room.",
+            count=rooms_no_type,
         )
-    track("ROOM", b)
-
-    # 6f. Isolation rooms exist in branches with IPD
-    b = len(issues)
-    if bed_based_units:
-        isolation_count = 0
-        for unit in all_units:
-            for room in unit.rooms:
-                if room.roomType in ("ISOLATION", "NEGATIVE_PRESSURE"):
-                    isolation_count += 1
-        if isolation_count == 0:
-            issues.append(
-                _iss(
-                    "ROOM-006", "ROOM", "INFO",
-                    "No isolation / negative-pressure rooms configured",
-                    "NABH recommends isolation rooms for infection control "
-                    "in IPD facilities.",
-                    "Add at least one ISOLATION or NEGATIVE_PRESSURE room "
-                    "type.",
-                )
-            )
-    track("ROOM", b)
-
-    # 6g. PATIENT_ROOM occupancy not set for ward rooms
-    b = len(issues)
-    ward_units = [u for u in all_units if u.typeCode.upper() == "WARD"]
-    if ward_units:
-        ward_rooms_default_occupancy = 0
-        for unit in ward_units:
-            for room in unit.rooms:
-                if (
-                    room.roomType == "PATIENT_ROOM"
-                    and room.maxOccupancy is not None
-                    and room.maxOccupancy == 1
-                ):
-                    ward_rooms_default_occupancy += 1
-        if ward_rooms_default_occupancy > 0:
-            issues.append(
-                _iss(
-                    "ROOM-007", "ROOM", "INFO",
-                    f"{ward_rooms_default_occupancy} ward patient room(s) "
-                    "with maxOccupancy = 1",
-                    "Ward rooms typically have multi-bed occupancy. Max "
-                    "occupancy may need adjustment.",
-                    "Review and set correct maxOccupancy for ward patient "
-                    "rooms.",
-                    count=ward_rooms_default_occupancy,
-                )
-            )
-    track("ROOM", b)
 
-    # ═══════════════════════════════════════════════════════════════════════
-    # 7. RESOURCES
-    # ═══════════════════════════════════════════════════════════════════════
 
-    # Aggregate resource-level data from per-unit ResourceSummary.
-    # Individual resource records are not available in BranchContext --
-    # only summaries (byType, byState counts).
+@_rule("ROOM-006", "ROOM", ("units",))
+def _room_isolation(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Branches with IPD have isolation / negative-pressure rooms."""
+    if not _bed_based_units(ix):
+        return
+    has_isolation = any(
+        room.roomType in ("ISOLATION", "NEGATIVE_PRESSURE")
+        for unit in ix.active_units
+        for room in unit.rooms
+    )
+    if not has_isolation:
+        yield _iss(
+            "ROOM-006", "ROOM", "INFO",
+            "No isolation / negative-pressure rooms configured",
+            "NABH recommends isolation rooms for infection control "
+            "in IPD facilities.",
+            "Add at least one ISOLATION or NEGATIVE_PRESSURE room "
+            "type.",
+        )
 
-    total_active_resources = sum(
-        u.resources.total for u in all_units
+
+@_rule("ROOM-007", "ROOM", ("units",))
+def _room_ward_occupancy(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Ward patient rooms are not left at maxOccupancy = 1."""
+    ward_rooms_default_occupancy = sum(
+        1
+        for unit in ix.active_units
+        if unit.typeCode.upper() == "WARD"
+        for room in unit.rooms
+        if room.roomType == "PATIENT_ROOM" and room.maxOccupancy == 1
     )
+    if ward_rooms_default_occupancy > 0:
+        yield _iss(
+            "ROOM-007", "ROOM", "INFO",
+            f"{ward_rooms_default_occupancy} ward patient room(s) "
+            "with maxOccupancy = 1",
+            "Ward rooms typically have multi-bed occupancy. Max "
+            "occupancy may need adjustment.",
+            "Review and set correct maxOccupancy for ward patient "
+            "rooms.",
+            count=ward_rooms_default_occupancy,
+        )
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 7. RESOURCES
+# ═══════════════════════════════════════════════════════════════════════════
+# Aggregate resource-level data from per-unit ResourceSummary.
+# Individual resource records are not available in BranchContext --
+# only summaries (byType, byState counts).
+
 
-    # 7a. Active resources in inactive units
-    b = len(issues)
+@_rule("RES-001", "RESOURCE", ("units",))
+def _res_inactive_units(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """No active resources under inactive units."""
     res_in_inactive = sum(
-        u.resources.total for u in ctx.units.units if not u.isActive
+        u.resources.total for u in ix.ctx.units.units if not u.isActive
     )
     if res_in_inactive > 0:
-        issues.append(
-            _iss(
-                "RES-001", "RESOURCE", "WARNING",
-                f"{res_in_inactive} active resource(s) in inactive units",
-                "These resources can't be used since their parent unit is "
-                "deactivated.",
-                "Deactivate these resources or reactivate their parent "
-                "units.",
-                count=res_in_inactive,
-            )
+        yield _iss(
+            "RES-001", "RESOURCE", "WARNING",
+            f"{res_in_inactive} active resource(s) in inactive units",
+            "These resources can't be used since their parent unit is "
+            "deactivated.",
+            "Deactivate these resources or reactivate their parent "
+            "units.",
+            count=res_in_inactive,
         )
-    track("RESOURCE", b)
 
-    # 7b. BLOCKED resources without a reason
+
+@_rule("RES-002", "RESOURCE", ("units",))
+def _res_blocked(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """BLOCKED resources document a reason."""
     # NOTE: Individual resource blockedReason is not in BranchContext.
-    # We check byState for "BLOCKED" count as a proxy.
-    b = len(issues)
+    # We check byState for "BLOCKED" count as a proxy and flag as
+    # informational since we know blocked resources exist.
     total_blocked = sum(
-        u.resources.byState.get("BLOCKED", 0) for u in all_units
+        u.resources.byState.get("BLOCKED", 0) for u in ix.active_units
     )
     if total_blocked > 0:
-        # We cannot determine if blockedReason is set from context alone.
-        # Flag as informational since we know blocked resources exist.
-        issues.append(
-            _iss(
-                "RES-002", "RESOURCE", "INFO",
-                f"{total_blocked} BLOCKED resource(s) -- verify "
-                "blockedReason is documented",
-                "Blocked resources should have a reason documented for "
-                "auditing.",
-                "Add blockedReason to each blocked resource.",
-                count=total_blocked,
-            )
+        yield _iss(
+            "RES-002", "RESOURCE", "INFO",
+            f"{total_blocked} BLOCKED resource(s) -- verify "
+            "blockedReason is documented",
+            "Blocked resources should have a reason documented for "
+            "auditing.",
+            "Add blockedReason to each blocked resource.",
+            count=total_blocked,
         )
-    track("RESOURCE", b)
 
-    # 7c. RESERVED resources without a reason
-    b = len(issues)
+
+@_rule("RES-003", "RESOURCE", ("units",))
+def _res_reserved(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """RESERVED resources document a reason."""
     total_reserved = sum(
-        u.resources.byState.get("RESERVED", 0) for u in all_units
+        u.resources.byState.get("RESERVED", 0) for u in ix.active_units
     )
     if total_reserved > 0:
-        issues.append(
-            _iss(
-                "RES-003", "RESOURCE", "INFO",
-                f"{total_reserved} RESERVED resource(s) -- verify "
-                "reservedReason is documented",
-                "Reserved resources should document who/why they're "
-                "reserved.",
-                "Add reservedReason to each reserved resource.",
-                count=total_reserved,
-            )
+        yield _iss(
+            "RES-003", "RESOURCE", "INFO",
+            f"{total_reserved} RESERVED resource(s) -- verify "
+            "reservedReason is documented",
+            "Reserved resources should document who/why they're "
+            "reserved.",
+            "Add reservedReason to each reserved resource.",
+            count=total_reserved,
         )
-    track("RESOURCE", b)
-
-    # 7d. High ratio of unavailable resources (MAINTENANCE + BLOCKED > 30%)
-    b = len(issues)
-    if total_active_resources >= 5:
-        unavailable = sum(
-            u.resources.byState.get("MAINTENANCE", 0)
-            + u.resources.byState.get("BLOCKED", 0)
-            + u.resources.byState.get("INACTIVE", 0)
-            for u in all_units
+
+
+@_rule("RES-004", "RESOURCE", ("units",))
+def _res_unavailable_ratio(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """At most 30% of resources are MAINTENANCE/BLOCKED/INACTIVE."""
+    total = _total_active_resources(ix)
+    if total < 5:
+        return
+    unavailable = sum(
+        u.resources.byState.get("MAINTENANCE", 0)
+        + u.resources.byState.get("BLOCKED", 0)
+        + u.resources.byState.get("INACTIVE", 0)
+        for u in ix.active_units
+    )
+    pct = round((unavailable / total) * 100)
+    if pct > 30:
+        yield _iss(
+            "RES-004", "RESOURCE", "WARNING",
+            f"{pct}% of resources are MAINTENANCE/BLOCKED/INACTIVE "
+            f"({unavailable}/{total})",
+            "A high percentage of unavailable resources reduces "
+            "operational capacity.",
+            "Review blocked/maintenance resources and return them "
+            "to AVAILABLE where possible.",
         )
-        pct = round((unavailable / total_active_resources) * 100)
-        if pct > 30:
-            issues.append(
-                _iss(
-                    "RES-004", "RESOURCE", "WARNING",
-                    f"{pct}% of resources are MAINTENANCE/BLOCKED/INACTIVE "
-                    f"({unavailable}/{total_active_resources})",
-                    "A high percentage of unavailable resources reduces "
-                    "operational capacity.",
-                    "Review blocked/maintenance resources and return them "
-                    "to AVAILABLE where possible.",
-                )
-            )
-    track("RESOURCE", b)
 
-    # 7e. Duplicate resource codes within same unit
+
+@_rule("RES-005", "RESOURCE", ("units",))
+def _res_duplicate_codes(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Resource codes are unique within a unit (not evaluable)."""
     # NOTE: Individual resource codes are not available in BranchContext.
     # We record the check but cannot evaluate from context.
-    b = len(issues)
-    track("RESOURCE", b)
+    return iter(())
+
 
-    # 7f. Beds not assigned to any room (roomId = null)
+@_rule("RES-006", "RESOURCE", ("units",))
+def _res_beds_without_room(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Beds are assigned to a room (not evaluable)."""
     # NOTE: Individual resource roomId is not in BranchContext.
     # We record the check but cannot evaluate from context.
-    b = len(issues)
-    track("RESOURCE", b)
-
-    # 7g. No resources at all
-    b = len(issues)
-    if total_active_resources == 0 and len(all_units) > 0:
-        issues.append(
-            _iss(
-                "RES-007", "RESOURCE", "WARNING",
-                "No resources (beds, chairs, bays, etc.) created across "
-                "all units",
-                "Units need resources for patient allocation and "
-                "scheduling.",
-                "Add resources to units -- at minimum, add beds to IPD "
-                "units.",
-            )
+    return iter(())
+
+
+@_rule("RES-007", "RESOURCE", ("units",))
+def _res_any(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Units have at least some resources."""
+    if _total_active_resources(ix) == 0 and len(ix.active_units) > 0:
+        yield _iss(
+            "RES-007", "RESOURCE", "WARNING",
+            "No resources (beds, chairs, bays, etc.) created across "
+            "all units",
+            "Units need resources for patient allocation and "
+            "scheduling.",
+            "Add resources to units -- at minimum, add beds to IPD "
+            "units.",
         )
-    track("RESOURCE", b)
-
-    # ═══════════════════════════════════════════════════════════════════════
-    # 8. SERVICE CATALOG & FINANCIAL CONFIG
-    # ═══════════════════════════════════════════════════════════════════════
-    # NOTE: Each module is mandatory for go-live. Checks fire independently
-    # (no cross-module prerequisite gating) so sidebar badges always appear.
-    sc = ctx.serviceCatalog
-
-    # ── Service Items ───────────────────────────────────────────────────
-    b = len(issues)
-    checks_run += 1
-    if sc.totalServiceItems == 0:
-        issues.append(
-            _iss(
-                "SVC-001", "SERVICE_CATALOG", "WARNING",
-                "No service items configured",
-                "Service items are required for ordering and billing.",
-                "Go to Service Items and create services.",
-            )
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 8. SERVICE CATALOG & FINANCIAL CONFIG
+# ═══════════════════════════════════════════════════════════════════════════
+# NOTE: Each module is mandatory for go-live. Checks fire independently
+# (no cross-module prerequisite gating) so sidebar badges always appear.
+
+_SVC = ("serviceCatalog",)
+
+
+@_rule("SVC-001", "SERVICE_CATALOG", _SVC, checks=2)
+def _svc_items(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Service items are configured."""
+    if ix.ctx.serviceCatalog.totalServiceItems == 0:
+        yield _iss(
+            "SVC-001", "SERVICE_CATALOG", "WARNING",
+            "No service items configured",
+            "Service items are required for ordering and billing.",
+            "Go to Service Items and create services.",
         )
-    track("SERVICE_CATALOG", b)
 
-    b = len(issues)
-    checks_run += 1
+
+@_rule("SVC-002", "SERVICE_CATALOG", _SVC, checks=2)
+def _svc_base_price(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Services have a base price."""
+    sc = ix.ctx.serviceCatalog
     if sc.withoutBasePrice > 5:
-        issues.append(
-            _iss(
-                "SVC-002", "SERVICE_CATALOG", "WARNING",
-                f"{sc.withoutBasePrice} service(s) have no base price",
-                "Services without prices cannot be billed correctly.",
-                "Set base prices for all active services.",
-                count=sc.withoutBasePrice,
-            )
+        yield _iss(
+            "SVC-002", "SERVICE_CATALOG", "WARNING",
+            f"{sc.withoutBasePrice} service(s) have no base price",
+            "Services without prices cannot be billed correctly.",
+            "Set base prices for all active services.",
+            count=sc.withoutBasePrice,
         )
-    track("SERVICE_CATALOG", b)
-
-    # ── Charge Master ───────────────────────────────────────────────────
-    b = len(issues)
-    checks_run += 1
-    if sc.totalChargeMaster == 0:
-        issues.append(
-            _iss(
-                "CHG-001", "CHARGE_MASTER", "WARNING",
-                "No charge master items configured",
-                "The charge master defines billable line items for revenue capture.",
-                "Go to Charge Master and create items (lab tests, procedures, supplies, etc.).",
-            )
+
+
+@_rule("CHG-001", "CHARGE_MASTER", _SVC, checks=2)
+def _chg_items(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Charge master items are configured."""
+    if ix.ctx.serviceCatalog.totalChargeMaster == 0:
+        yield _iss(
+            "CHG-001", "CHARGE_MASTER", "WARNING",
+            "No charge master items configured",
+            "The charge master defines billable line items for revenue capture.",
+            "Go to Charge Master and create items (lab tests, procedures, supplies, etc.).",
         )
-    track("CHARGE_MASTER", b)
 
-    # ── Service Mapping ─────────────────────────────────────────────────
-    b = len(issues)
-    checks_run += 1
+
+@_rule("MAP-001", "SERVICE_MAPPING", _SVC, checks=2)
+def _map_service_charge(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Services are mapped to charges (also raises MAP-002)."""
+    sc = ix.ctx.serviceCatalog
     if sc.totalServiceItems == 0 or sc.totalChargeMaster == 0:
-        issues.append(
-            _iss(
-                "MAP-001", "SERVICE_MAPPING", "WARNING",
-                "Service-to-Charge mapping not possible yet",
-                "Both service items and charge master items are needed for mapping.",
-                "Set up Service Items and Charge Master first, then create mappings.",
-            )
+        yield _iss(
+            "MAP-001", "SERVICE_MAPPING", "WARNING",
+            "Service-to-Charge mapping not possible yet",
+            "Both service items and charge master items are needed for mapping.",
+            "Set up Service Items and Charge Master first, then create mappings.",
         )
-    elif sc.totalChargeMaster > 0 and sc.totalServiceItems > 0:
-        unmapped = abs(sc.activeChargeMaster - sc.activeServiceItems)
-        if unmapped > 5:
-            issues.append(
-                _iss(
-                    "MAP-002", "SERVICE_MAPPING", "WARNING",
-                    f"~{unmapped} items may lack service-to-charge mapping",
-                    "Unmapped items cannot be ordered or billed correctly.",
-                    "Go to Service <-> Charge Mapping and link services to charges.",
-                    count=unmapped,
-                )
-            )
-    track("SERVICE_MAPPING", b)
-
-    # ── Tax Codes (GST) ────────────────────────────────────────────────
-    b = len(issues)
-    checks_run += 1
-    if sc.totalTaxCodes == 0:
-        issues.append(
-            _iss(
-                "TAX-001", "TAX_CODE", "WARNING",
-                "No GST tax codes configured",
-                "Tax codes are needed for GST-compliant billing.",
-                "Go to Tax Codes (GST) and configure rates (5%, 12%, 18%, exempt).",
-            )
+        return
+    unmapped = abs(sc.activeChargeMaster - sc.activeServiceItems)
+    if unmapped > 5:
+        yield _iss(
+            "MAP-002", "SERVICE_MAPPING", "WARNING",
+            f"~{unmapped} items may lack service-to-charge mapping",
+            "Unmapped items cannot be ordered or billed correctly.",
+            "Go to Service <-> Charge Mapping and link services to charges.",
+            count=unmapped,
         )
-    track("TAX_CODE", b)
-
-    # ── Tariff Plans & Rates ────────────────────────────────────────────
-    b = len(issues)
-    checks_run += 1
-    if sc.totalTariffPlans == 0:
-        issues.append(
-            _iss(
-                "TAR-001", "TARIFF_PLAN", "WARNING",
-                "No tariff plans configured",
-                "Tariff plans define negotiated rates for payers and patient categories.",
-                "Go to Tariff Plans & Rates and create at least one plan.",
-            )
+
+
+@_rule("TAX-001", "TAX_CODE", _SVC, checks=2)
+def _tax_codes(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """GST tax codes are configured."""
+    if ix.ctx.serviceCatalog.totalTaxCodes == 0:
+        yield _iss(
+            "TAX-001", "TAX_CODE", "WARNING",
+            "No GST tax codes configured",
+            "Tax codes are needed for GST-compliant billing.",
+            "Go to Tax Codes (GST) and configure rates (5%, 12%, 18%, exempt).",
         )
-    track("TARIFF_PLAN", b)
-
-    # ── Payer Management ────────────────────────────────────────────────
-    b = len(issues)
-    checks_run += 1
-    if sc.totalPayers == 0:
-        issues.append(
-            _iss(
-                "PAY-001", "PAYER", "WARNING",
-                "No payers configured",
-                "Payers are needed for insurance billing and self-pay.",
-                "Go to Payer Management and create payers (start with CASH payer).",
-            )
+
+
+@_rule("TAR-001", "TARIFF_PLAN", _SVC, checks=2)
+def _tariff_plans(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Tariff plans are configured."""
+    if ix.ctx.serviceCatalog.totalTariffPlans == 0:
+        yield _iss(
+            "TAR-001", "TARIFF_PLAN", "WARNING",
+            "No tariff plans configured",
+            "Tariff plans define negotiated rates for payers and patient categories.",
+            "Go to Tariff Plans & Rates and create at least one plan.",
+        )
+
+
+@_rule("PAY-001", "PAYER", _SVC, checks=2)
+def _payers(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Payers are configured."""
+    if ix.ctx.serviceCatalog.totalPayers == 0:
+        yield _iss(
+            "PAY-001", "PAYER", "WARNING",
+            "No payers configured",
+            "Payers are needed for insurance billing and self-pay.",
+            "Go to Payer Management and create payers (start with CASH payer).",
         )
-    track("PAYER", b)
 
-    b = len(issues)
-    checks_run += 1
+
+@_rule("PAY-002", "PAYER", _SVC, checks=2)
+def _cash_payer(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """A CASH payer exists."""
+    sc = ix.ctx.serviceCatalog
     if not sc.hasCashPayer and sc.totalPayers > 0:
-        issues.append(
-            _iss(
-                "PAY-002", "PAYER", "WARNING",
-                "No CASH payer configured",
-                "Self-pay patients need a CASH billing path.",
-                "Create a payer with kind=CASH.",
-            )
+        yield _iss(
+            "PAY-002", "PAYER", "WARNING",
+            "No CASH payer configured",
+            "Self-pay patients need a CASH billing path.",
+            "Create a payer with kind=CASH.",
         )
-    track("PAYER", b)
-
-    # ── Payer Contracts ─────────────────────────────────────────────────
-    b = len(issues)
-    checks_run += 1
-    if sc.totalContracts == 0:
-        issues.append(
-            _iss(
-                "CON-001", "CONTRACT", "WARNING",
-                "No payer contracts configured",
-                "Contracts define negotiated rates and coverage terms per payer.",
-                "Go to Payer Contracts and create contracts.",
-            )
+
+
+@_rule("CON-001", "CONTRACT", _SVC, checks=2)
+def _contracts(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Payer contracts are configured."""
+    if ix.ctx.serviceCatalog.totalContracts == 0:
+        yield _iss(
+            "CON-001", "CONTRACT", "WARNING",
+            "No payer contracts configured",
+            "Contracts define negotiated rates and coverage terms per payer.",
+            "Go to Payer Contracts and create contracts.",
         )
-    track("CONTRACT", b)
 
-    b = len(issues)
-    checks_run += 1
+
+@_rule("CON-002", "CONTRACT", _SVC, checks=2)
+def _expired_contracts(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """No expired contracts are left in place."""
+    sc = ix.ctx.serviceCatalog
     if sc.expiredContracts > 0:
-        issues.append(
-            _iss(
-                "CON-002", "CONTRACT", "INFO",
-                f"{sc.expiredContracts} contract(s) expired",
-                "Expired contracts should be renewed or terminated.",
-                "Review expired contracts in Payer Contracts.",
-                count=sc.expiredContracts,
-            )
+        yield _iss(
+            "CON-002", "CONTRACT", "INFO",
+            f"{sc.expiredContracts} contract(s) expired",
+            "Expired contracts should be renewed or terminated.",
+            "Review expired contracts in Payer Contracts.",
+            count=sc.expiredContracts,
         )
-    track("CONTRACT", b)
-
-    # ── Government Schemes ──────────────────────────────────────────────
-    b = len(issues)
-    checks_run += 1
-    if sc.totalGovSchemes == 0:
-        issues.append(
-            _iss(
-                "GOV-001", "GOV_SCHEME", "WARNING",
-                "No government schemes configured",
-                "Set up PMJAY, CGHS, ECHS, or state schemes for government-insured patients.",
-                "Go to Government Schemes and add scheme configurations.",
-            )
+
+
+@_rule("GOV-001", "GOV_SCHEME", _SVC, checks=2)
+def _gov_schemes(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Government schemes are configured."""
+    if ix.ctx.serviceCatalog.totalGovSchemes == 0:
+        yield _iss(
+            "GOV-001", "GOV_SCHEME", "WARNING",
+            "No government schemes configured",
+            "Set up PMJAY, CGHS, ECHS, or state schemes for government-insured patients.",
+            "Go to Government Schemes and add scheme configurations.",
         )
-    track("GOV_SCHEME", b)
-
-    # ── Pricing Tiers ───────────────────────────────────────────────────
-    b = len(issues)
-    checks_run += 1
-    if sc.totalPricingTiers == 0:
-        issues.append(
-            _iss(
-                "TIER-001", "PRICING_TIER", "WARNING",
-                "No patient pricing tiers configured",
-                "Pricing tiers (General, BPL, Staff, Senior Citizen, etc.) enable differential pricing.",
-                "Go to Pricing Tiers and create tier configurations.",
-            )
+
+
+@_rule("TIER-001", "PRICING_TIER", _SVC, checks=2)
+def _pricing_tiers(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Patient pricing tiers are configured."""
+    if ix.ctx.serviceCatalog.totalPricingTiers == 0:
+        yield _iss(
+            "TIER-001", "PRICING_TIER", "WARNING",
+            "No patient pricing tiers configured",
+            "Pricing tiers (General, BPL, Staff, Senior Citizen, etc.) enable differential pricing.",
+            "Go to Pricing Tiers and create tier configurations.",
         )
-    track("PRICING_TIER", b)
-
-    # ── Price History ───────────────────────────────────────────────────
-    b = len(issues)
-    checks_run += 1
-    if sc.priceChangeCount == 0:
-        issues.append(
-            _iss(
-                "PRICE-001", "PRICE_HISTORY", "INFO",
-                "No price change history recorded",
-                "Price history helps audit rate changes over time.",
-                "Price history is auto-tracked when service prices change.",
-            )
+
+
+@_rule("PRICE-001", "PRICE_HISTORY", _SVC, checks=2)
+def _price_history(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """Price changes are being recorded."""
+    if ix.ctx.serviceCatalog.priceChangeCount == 0:
+        yield _iss(
+            "PRICE-001", "PRICE_HISTORY", "INFO",
+            "No price change history recorded",
+            "Price history helps audit rate changes over time.",
+            "Price history is auto-tracked when service prices change.",
         )
-    track("PRICE_HISTORY", b)
 
-    # ── Service Catalogues ──────────────────────────────────────────────
-    b = len(issues)
-    checks_run += 1
+
+@_rule("CAT-001", "SERVICE_CATALOGUE", _SVC, checks=2)
+def _catalogues(ix: BranchContextIndex) -> Iterator[ConsistencyIssue]:
+    """A service catalogue can be built."""
+    sc = ix.ctx.serviceCatalog
     if sc.totalServiceItems == 0 and sc.totalChargeMaster == 0:
-        issues.append(
-            _iss(
-                "CAT-001", "SERVICE_CATALOGUE", "WARNING",
-                "No service catalogue can be built yet",
-                "Service items and charge master items are needed before creating catalogues.",
-                "Set up Service Items and Charge Master first.",
-            )
+        yield _iss(
+            "CAT-001", "SERVICE_CATALOGUE", "WARNING",
+            "No service catalogue can be built yet",
+            "Service items and charge master items are needed before creating catalogues.",
+            "Set up Service Items and Charge Master first.",
         )
-    track("SERVICE_CATALOGUE", b)
 
-    # ═══════════════════════════════════════════════════════════════════════
-    return _build_result(checks_run, issues, cs)
+
+# -- Rule selection -----------------------------------------------------------
+
+RULE_CATEGORIES: tuple[str, ...] = tuple(dict.fromkeys(r.category for r in RULES))
+RULE_SECTIONS: tuple[str, ...] = tuple(dict.fromkeys(s for r in RULES for s in r.sections))
+
+
+def select_rules(
+    categories: Iterable[str] | None = None,
+    rules: Iterable[str] | None = None,
+    sections: Iterable[str] | None = None,
+) -> list[ConsistencyRule]:
+    """Registered rules matching every given filter, in registry order.
+
+    ``categories`` / ``rules`` are matched case-insensitively; ``sections``
+    keeps rules that read any of the named BranchContext fields.  Unknown
+    names raise ``ValueError``.
+    """
+    selected = RULES
+    if categories is not None:
+        wanted = {c.strip().upper() for c in categories if c.strip()}
+        unknown = wanted.difference(RULE_CATEGORIES)
+        if unknown:
+            raise ValueError(f"Unknown consistency categories: {', '.join(sorted(unknown))}")
+        selected = [r for r in selected if r.category in wanted]
+    if rules is not None:
+        wanted = {r.strip().upper() for r in rules if r.strip()}
+        unknown = wanted.difference(_RULES_BY_ID)
+        if unknown:
+            raise ValueError(f"Unknown consistency rules: {', '.join(sorted(unknown))}")
+        selected = [r for r in selected if r.id in wanted]
+    if sections is not None:
+        wanted = {s.strip() for s in sections if s.strip()}
+        unknown = wanted.difference(RULE_SECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown context sections: {', '.join(sorted(unknown))}")
+        selected = [r for r in selected if wanted.intersection(r.sections)]
+    return list(selected)
+
+
+def changed_sections(before: BranchContext, after: BranchContext) -> set[str]:
+    """BranchContext sections read by rules that differ between two snapshots."""
+    return {s for s in RULE_SECTIONS if getattr(before, s) != getattr(after, s)}
+
+
+def list_rules() -> list[dict[str, object]]:
+    return [
+        {
+            "id": r.id,
+            "category": r.category,
+            "sections": list(r.sections),
+            "description": r.description,
+        }
+        for r in RULES
+    ]
+
+
+# -- Engine -------------------------------------------------------------------
+
+
+def run_consistency_checks(
+    ctx: BranchContext,
+    *,
+    categories: Iterable[str] | None = None,
+    rules: Iterable[str] | None = None,
+    sections: Iterable[str] | None = None,
+    profile: bool = False,
+) -> ConsistencyResult:
+    """Run the registered consistency rules against a pre-collected BranchContext.
+
+    With no filters every rule runs.  ``categories``, ``rules`` and
+    ``sections`` narrow the run (see ``select_rules``); totals and score
+    then cover only the selected rules.  ``profile=True`` attaches per-rule
+    timings.  Shared derived data is charged to the first rule that uses it.
+
+    Returns a ``ConsistencyResult`` with issues grouped by severity and a
+    composite score using the formula:
+        score = 100 - (blockers*5) - (warnings*2) - (infos*0.5)
+    clamped to [0, 100].
+    """
+    start = time.perf_counter()
+    selected = (
+        RULES if categories is None and rules is None and sections is None
+        else select_rules(categories, rules, sections)
+    )
+    ix = ctx.index
+
+    issues: list[ConsistencyIssue] = []
+    checks_run = 0
+    cs: dict[str, dict[str, int]] = {}
+    timings: list[tuple[ConsistencyRule, float, int, bool]] = []
+
+    for rule in selected:
+        t0 = time.perf_counter()
+        if rule.when is not None and not rule.when(ix):
+            timings.append((rule, (time.perf_counter() - t0) * 1000, 0, True))
+            continue
+        found = list(rule.fn(ix))
+        timings.append((rule, (time.perf_counter() - t0) * 1000, len(found), False))
+
+        issues.extend(found)
+        checks_run += rule.checks
+        stats = cs.setdefault(rule.category, {"checks": 0, "issues": 0})
+        stats["checks"] += 1
+        stats["issues"] += len(found)
+
+    result = _build_result(checks_run, issues, cs)
+    if profile:
+        result.profile = _build_profile(timings)
+    result.durationMs = round((time.perf_counter() - start) * 1000, 3)
+    return result
 
 
 # -- Result Builder -----------------------------------------------------------
@@ -1235,3 +1289,26 @@ def _build_result(
         score=score,
         categorySummary=category_summary,
     )
+
+
+def _build_profile(
+    timings: list[tuple[ConsistencyRule, float, int, bool]],
+) -> ConsistencyProfile:
+    by_category: dict[str, float] = {}
+    for rule, ms, _, _ in timings:
+        by_category[rule.category] = by_category.get(rule.category, 0.0) + ms
+    return ConsistencyProfile(
+        rulesRun=sum(1 for t in timings if not t[3]),
+        rulesSkipped=sum(1 for t in timings if t[3]),
+        byCategoryMs={c: round(ms, 3) for c, ms in by_category.items()},
+        rules=[
+            ConsistencyRuleTiming(
+                ruleId=rule.id,
+                category=rule.category,
+                durationMs=round(ms, 3),
+                issues=n,
+                skipped=skipped,
+            )
+            for rule, ms, n, skipped in sorted(timings, key=lambda t: -t[1])
+        ],
+    )
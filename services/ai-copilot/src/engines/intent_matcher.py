@@ -0,0 +1,49 @@
+"""Single-regex intent matching for the keyword fallbacks.
+
+The keyword answerers (nl_query, compliance_help) pick an intent by trying
+their patterns with ``re.search`` one after another; the first pattern
+found anywhere in the question wins.  ``IntentMatcher`` compiles such an
+ordered rule list into one regex::
+
+    (?=[\\s\\S]*?(?P<beds>...))|(?=[\\s\\S]*?(?P<rooms>...))|...
+
+Matched at position 0, the alternation tries the lookaheads in rule order
+and stops at the first that succeeds, so it returns the same intent as the
+cascade, from a single ``re.match`` that runs entirely in the regex engine.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Sequence
+
+
+class IntentMatcher:
+    def __init__(self, rules: Sequence[tuple[str, str]]) -> None:
+        """*rules* are ``(intent, pattern)`` in priority order; intents must be identifiers."""
+        self.rules = list(rules)
+        self.intents = [name for name, _ in self.rules]
+        self._regex = self._compile(self.rules)
+        self._tails: dict[str, re.Pattern[str] | None] = {}
+
+    @staticmethod
+    def _compile(rules: Sequence[tuple[str, str]]) -> re.Pattern[str] | None:
+        if not rules:
+            return None
+        return re.compile("|".join(rf"(?=[\s\S]*?(?P<{name}>{pattern}))" for name, pattern in rules))
+
+    def match(self, text: str, *, after: str | None = None) -> str | None:
+        """First intent whose pattern occurs in *text*.
+
+        With *after*, only rules ranked below that intent are tried -- for
+        callers whose matched intent turned out not to apply (e.g. it needs
+        page context the request didn't carry) and who want the next one.
+        """
+        regex = self._regex if after is None else self._tail(after)
+        m = regex.match(text) if regex is not None else None
+        return m.lastgroup if m else None
+
+    def _tail(self, after: str) -> re.Pattern[str] | None:
+        if after not in self._tails:
+            self._tails[after] = self._compile(self.rules[self.intents.index(after) + 1:])
+        return self._tails[after]
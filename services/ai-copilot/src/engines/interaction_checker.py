@@ -0,0 +1,224 @@
+"""Interaction Checker Engine — drug–drug interaction lookups.
+
+Pure functions over a pre-loaded :class:`BranchInteractionIndex`:
+  - Med-list check: every pair in a patient's list (O(k²) dict probes),
+    one hit per generic pair however many strengths a name resolved to
+  - Batch check: many patients at once (ward rounds)
+  - Store report: interacting pairs where both drugs are stocked in the same
+    pharmacy store, walking each stocked drug's adjacency instead of all
+    pairs of stocked drugs
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from src.services.interaction_index import BranchInteractionIndex, InteractionEdge
+
+SEVERITY_RANK = {"MAJOR": 0, "MODERATE": 1, "MINOR": 2}
+
+# Keys a med entry may carry, most specific first.
+_MED_REF_KEYS = ("drugMasterId", "drugId", "id", "drugCode", "genericName", "brandName", "name")
+
+
+class InteractionHit(BaseModel):
+    drugAId: str
+    drugAName: str
+    drugBId: str
+    drugBName: str
+    severity: str
+    description: str | None = None
+    recommendation: str | None = None
+
+
+class MedListCheck(BaseModel):
+    patientId: str | None = None
+    medsChecked: int = 0
+    unresolved: list[str] = Field(default_factory=list)
+    interactions: list[InteractionHit] = Field(default_factory=list)
+    majorCount: int = 0
+    moderateCount: int = 0
+    minorCount: int = 0
+
+
+class BatchInteractionResult(BaseModel):
+    branchId: str
+    patients: list[MedListCheck] = Field(default_factory=list)
+    patientsWithMajor: int = 0
+    totalInteractions: int = 0
+    durationMs: int = 0
+
+
+class StockedInteraction(InteractionHit):
+    storeId: str
+    storeName: str
+
+
+class StoreInteractionReport(BaseModel):
+    branchId: str
+    severities: list[str] = Field(default_factory=list)
+    storesScanned: int = 0
+    totalPairs: int = 0
+    byStore: dict[str, int] = Field(default_factory=dict)
+    pairs: list[StockedInteraction] = Field(default_factory=list)
+    durationMs: int = 0
+
+
+def med_ref(med: Any) -> str | None:
+    """Pick the identifier to resolve from a med entry (dict or plain string).
+
+    Anything else (a bare number, a list) has no usable identifier: ``None``.
+    """
+    if isinstance(med, str):
+        return med or None
+    if not isinstance(med, dict):
+        return None
+    for key in _MED_REF_KEYS:
+        value = med.get(key)
+        if isinstance(value, str) and value.strip():
+            return value
+    return None
+
+
+def _hit(index: BranchInteractionIndex, a: str, b: str, edge: InteractionEdge) -> dict[str, Any]:
+    # Stable orientation so the same pair always reads the same way.
+    if a > b:
+        a, b = b, a
+    da, db = index.drugs.get(a), index.drugs.get(b)
+    return {
+        "drugAId": a,
+        "drugAName": da.genericName if da else a,
+        "drugBId": b,
+        "drugBName": db.genericName if db else b,
+        "severity": edge.severity,
+        "description": edge.description,
+        "recommendation": edge.recommendation,
+    }
+
+
+# ── Med-list check ────────────────────────────────────────────────────────
+
+
+def check_med_list(
+    index: BranchInteractionIndex,
+    meds: list[dict[str, Any] | str],
+    patient_id: str | None = None,
+) -> MedListCheck:
+    """Check every pair of a patient's meds against the interaction graph."""
+    drug_ids: list[str] = []
+    unresolved: list[str] = []
+    seen: set[str] = set()
+    for med in meds:
+        ref = med_ref(med)
+        if ref is None:
+            continue
+        ids = index.resolve(ref)
+        if not ids:
+            unresolved.append(ref)
+            continue
+        for drug_id in ids:
+            if drug_id not in seen:
+                seen.add(drug_id)
+                drug_ids.append(drug_id)
+
+    # A name resolves to every strength stocked, so the same interaction can
+    # turn up once per strength pair: keep the most severe per generic pair.
+    by_pair: dict[tuple[str, str], InteractionHit] = {}
+    for i, a in enumerate(drug_ids):
+        neighbours = index.neighbours(a)
+        if not neighbours:
+            continue
+        for b in drug_ids[i + 1:]:
+            edge = neighbours.get(b)
+            if edge is None:
+                continue
+            hit = InteractionHit(**_hit(index, a, b, edge))
+            pair = tuple(sorted((hit.drugAName.lower(), hit.drugBName.lower())))
+            kept = by_pair.get(pair)
+            if kept is None or SEVERITY_RANK.get(hit.severity, 9) < SEVERITY_RANK.get(kept.severity, 9):
+                by_pair[pair] = hit
+
+    hits = list(by_pair.values())
+    hits.sort(key=lambda h: (SEVERITY_RANK.get(h.severity, 9), h.drugAName, h.drugBName))
+
+    return MedListCheck(
+        patientId=patient_id,
+        medsChecked=len(drug_ids),
+        unresolved=unresolved,
+        interactions=hits,
+        majorCount=sum(1 for h in hits if h.severity == "MAJOR"),
+        moderateCount=sum(1 for h in hits if h.severity == "MODERATE"),
+        minorCount=sum(1 for h in hits if h.severity == "MINOR"),
+    )
+
+
+def check_batch(
+    index: BranchInteractionIndex,
+    patients: list[tuple[str | None, list[dict[str, Any] | str]]],
+) -> BatchInteractionResult:
+    """Check many med lists against one index snapshot (ward rounds)."""
+    start = time.time()
+    results = [check_med_list(index, meds, patient_id) for patient_id, meds in patients]
+    return BatchInteractionResult(
+        branchId=index.branch_id,
+        patients=results,
+        patientsWithMajor=sum(1 for r in results if r.majorCount),
+        totalInteractions=sum(len(r.interactions) for r in results),
+        durationMs=int((time.time() - start) * 1000),
+    )
+
+
+# ── Formulary-wide store report ───────────────────────────────────────────
+
+
+def scan_stocked_interactions(
+    index: BranchInteractionIndex,
+    severities: set[str] | None = None,
+    limit: int = 500,
+) -> StoreInteractionReport:
+    """List interacting pairs where both drugs are stocked in the same store.
+
+    For each store, walks the adjacency of every stocked drug and keeps
+    neighbours that are stocked there too — O(Σ degree) per store rather
+    than O(stock²).
+    """
+    start = time.time()
+    wanted = severities or {"MAJOR"}
+
+    found: list[tuple[str, str, str, InteractionEdge]] = []
+    by_store: dict[str, int] = {}
+    for store_id, stocked in index.stock.items():
+        before = len(found)
+        for a in stocked:
+            for b, edge in index.neighbours(a).items():
+                # Each unordered pair once: a < b.
+                if a < b and b in stocked and edge.severity in wanted:
+                    found.append((store_id, a, b, edge))
+        if len(found) > before:
+            by_store[index.stores.get(store_id, store_id)] = len(found) - before
+
+    def _name(drug_id: str) -> str:
+        node = index.drugs.get(drug_id)
+        return node.genericName if node else drug_id
+
+    found.sort(key=lambda f: (
+        SEVERITY_RANK.get(f[3].severity, 9), index.stores.get(f[0], f[0]), _name(f[1]), _name(f[2]),
+    ))
+    pairs = [
+        StockedInteraction(storeId=store_id, storeName=index.stores.get(store_id, store_id),
+                           **_hit(index, a, b, edge))
+        for store_id, a, b, edge in found[:limit]
+    ]
+
+    return StoreInteractionReport(
+        branchId=index.branch_id,
+        severities=sorted(wanted, key=lambda s: SEVERITY_RANK.get(s, 9)),
+        storesScanned=len(index.stock),
+        totalPairs=len(found),
+        byStore=by_store,
+        pairs=pairs,
+        durationMs=int((time.time() - start) * 1000),
+    )
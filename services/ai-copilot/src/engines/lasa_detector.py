@@ -0,0 +1,331 @@
+"""LASA Detector Engine — formulary-wide look-alike / sound-alike scan.
+
+PH-012 in ``pharmacy_checker`` only matches the curated pairs in
+``lasa-pairs.json`` against the (500-row) drug snapshot in BranchContext.
+This engine scans the *entire* DrugMaster for confusable names that nobody
+has flagged yet.
+
+Candidate generation is sub-quadratic:
+  - Orthographic (look-alike): symmetric-deletion index over normalized
+    generic and brand names.  Every name is indexed under itself and each of
+    its one-character deletions, so two names meet in a bucket whenever
+    they differ by one substitution or up to two insertions/deletions.
+  - Phonetic (sound-alike): the same deletion index over a drug-tuned
+    consonant skeleton, which folds vowel and spelling variants
+    (hydrOXYzine / hydrALAzine, Celebrex / Cerebyx).
+
+Only names that share a bucket are ever compared, and each candidate is then
+scored with an exact Levenshtein distance.  Cost is O(N · L) for N names of
+average length L instead of O(N²).
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from collections import defaultdict
+
+from pydantic import BaseModel, Field
+
+from src.collectors.models import DrugSnapshot
+
+from .pharmacy_checker import get_lasa_pairs
+
+# Buckets bigger than this are uninformative (e.g. a three-consonant
+# skeleton shared by hundreds of names) and would reintroduce quadratic cost.
+_MAX_BUCKET = 64
+
+# Names shorter than this produce too many accidental neighbours.
+_MIN_NAME_LEN = 4
+_MIN_PHONETIC_LEN = 4
+
+# A name that is a generic for one drug and a brand for another reports as generic.
+_KIND_ORDER = ("GENERIC", "BRAND")
+
+
+class LasaCandidate(BaseModel):
+    nameA: str
+    nameB: str
+    nameKind: str  # "GENERIC" | "BRAND" | "MIXED"
+    drugIdsA: list[str] = Field(default_factory=list)
+    drugIdsB: list[str] = Field(default_factory=list)
+    score: float  # 0..1
+    orthographicScore: float
+    phoneticScore: float
+    editDistance: int
+    knownPair: bool = False
+    flaggedA: bool = False
+    flaggedB: bool = False
+    reason: str
+
+
+class LasaScanResult(BaseModel):
+    totalDrugs: int = 0
+    namesIndexed: int = 0
+    candidatesScored: int = 0
+    unflaggedPairs: list[LasaCandidate] = Field(default_factory=list)
+    totalUnflagged: int = 0
+    knownPairsUnflagged: int = 0
+    durationMs: int = 0
+
+
+# ── Normalization + phonetic key ──────────────────────────────────────────
+
+_PAREN_RE = re.compile(r"\([^)]*\)")
+_DOSE_RE = re.compile(
+    r"\b\d+(\.\d+)?\s*(mg|mcg|g|ml|iu|%)?\b"
+    r"|\b(tab|tabs|tablet|cap|caps|capsule|inj|injection|syp|syrup|susp|"
+    r"cream|oint|ointment|drops?|sr|er|xr|cr|ds|forte)\b"
+)
+_NON_ALPHA_RE = re.compile(r"[^a-z]+")
+
+_PHONETIC_RULES: list[tuple[re.Pattern[str], str]] = [
+    (re.compile(p), r)
+    for p, r in [
+        (r"ph", "f"),
+        (r"gh", "g"),
+        (r"ck", "k"),
+        (r"c(?=[eiy])", "s"),
+        (r"[cq]", "k"),
+        (r"x", "ks"),
+        (r"z", "s"),
+        (r"y", "i"),
+        (r"th", "t"),
+        (r"dg", "j"),
+        (r"^kn", "n"),
+        (r"^wr", "r"),
+        (r"(?<=.)h", ""),
+        (r"([a-z])\1+", r"\1"),
+    ]
+]
+_VOWEL_RE = re.compile(r"[aeiou]")
+
+
+def _normalize_name(name: str) -> str:
+    """Lower-case, strip strengths/dosage forms and non-letters."""
+    n = _PAREN_RE.sub(" ", name.lower())
+    n = _DOSE_RE.sub(" ", n)
+    return _NON_ALPHA_RE.sub("", n)
+
+
+def phonetic_key(name: str) -> str:
+    """Drug-tuned consonant skeleton: first letter + folded consonants."""
+    s = _normalize_name(name)
+    if not s:
+        return ""
+    for pattern, repl in _PHONETIC_RULES:
+        s = pattern.sub(repl, s)
+    return s[0] + _VOWEL_RE.sub("", s[1:])
+
+
+def _char_masks(s: str) -> dict[str, int]:
+    """Per-character position bitmasks used by :func:`_myers`."""
+    peq: dict[str, int] = {}
+    for i, c in enumerate(s):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    return peq
+
+
+def _myers(text: str, m: int, peq: dict[str, int]) -> int:
+    """Edit distance via Myers' bit-parallel algorithm (Hyyrö's variant).
+
+    ``peq`` are the :func:`_char_masks` of the (non-empty) pattern of length
+    ``m``.  One pass over ``text`` with a handful of integer operations per
+    character — roughly 10x faster than the textbook DP table in pure Python.
+    """
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, dist = mask, 0, m
+    for c in text:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & last:
+            dist += 1
+        elif mh & last:
+            dist -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    return dist
+
+
+def _levenshtein(a: str, b: str) -> int:
+    if a == b:
+        return 0
+    if not a or not b:
+        return len(a) or len(b)
+    return _myers(a, len(b), _char_masks(b))
+
+
+def _deletion_buckets(keys: list[str], min_len: int, min_variant_len: int) -> dict[str, list[int]]:
+    """Index each key under itself and its single-character deletions.
+
+    Keys shorter than ``min_len`` are skipped, and deletion variants are only
+    generated while they stay at least ``min_variant_len`` long — very short
+    variants ("bm", "tr") are shared by most of the formulary and carry no
+    signal.  With ``min_variant_len = min_len - 1`` the shortest keys still
+    get their deletions, so two of them one substitution apart meet.
+    """
+    buckets: dict[str, list[int]] = defaultdict(list)
+    for idx, key in enumerate(keys):
+        if len(key) < min_len:
+            continue
+        variants = {key}
+        if len(key) > min_variant_len:
+            variants.update(key[:i] + key[i + 1:] for i in range(len(key)))
+        for v in variants:
+            buckets[v].append(idx)
+    return buckets
+
+
+def _bucket_pairs(buckets: dict[str, list[int]], out: set[tuple[int, int]]) -> None:
+    for members in buckets.values():
+        n = len(members)
+        if n < 2 or n > _MAX_BUCKET:
+            continue
+        for i in range(n):
+            a = members[i]
+            for j in range(i + 1, n):
+                b = members[j]
+                out.add((a, b) if a < b else (b, a))
+
+
+# ── Engine ────────────────────────────────────────────────────────────────
+
+
+def scan_lasa_candidates(
+    drugs: list[DrugSnapshot],
+    min_score: float = 0.8,
+    limit: int = 200,
+) -> LasaScanResult:
+    """Find likely LASA pairs across the full drug master.
+
+    Only pairs where at least one side is not flagged ``isLasa`` are
+    reported.  Curated pairs from ``lasa-pairs.json`` are always reported
+    (``knownPair=True``) when both drugs exist, regardless of score.
+    """
+    start = time.time()
+
+    # Unique normalized names → drug ids / display name / kind / flag state.
+    names: list[str] = []
+    display: list[str] = []
+    kinds: list[set[str]] = []
+    ids: list[set[str]] = []
+    all_flagged: list[bool] = []
+    slot: dict[str, int] = {}
+
+    def _add(raw: str | None, kind: str, drug: DrugSnapshot) -> None:
+        if not raw:
+            return
+        norm = _normalize_name(raw)
+        if len(norm) < _MIN_NAME_LEN:
+            return
+        i = slot.get(norm)
+        if i is None:
+            i = slot[norm] = len(names)
+            names.append(norm)
+            display.append(raw.strip())
+            kinds.append(set())
+            ids.append(set())
+            all_flagged.append(True)
+        kinds[i].add(kind)
+        ids[i].add(drug.id)
+        if not drug.isLasa:
+            all_flagged[i] = False
+
+    for d in drugs:
+        _add(d.genericName, "GENERIC", d)
+        _add(d.brandName, "BRAND", d)
+
+    phon = [phonetic_key(n) for n in names]
+    masks = [_char_masks(n) for n in names]
+
+    pairs: set[tuple[int, int]] = set()
+    # Names of exactly _MIN_NAME_LEN get deletions too ("Zyra" / "Zyla");
+    # phonetic keys that short are too common for their deletions to help.
+    _bucket_pairs(_deletion_buckets(names, _MIN_NAME_LEN, _MIN_NAME_LEN - 1), pairs)
+    _bucket_pairs(_deletion_buckets(phon, _MIN_PHONETIC_LEN, _MIN_PHONETIC_LEN), pairs)
+
+    known: set[tuple[int, int]] = set()
+    for a, b in get_lasa_pairs():
+        ia, ib = slot.get(_normalize_name(a)), slot.get(_normalize_name(b))
+        if ia is not None and ib is not None and ia != ib:
+            pair = (ia, ib) if ia < ib else (ib, ia)
+            known.add(pair)
+            pairs.add(pair)
+
+    # score <= (ortho + 1) / 2 + 0.05, so anything below this orthographic
+    # similarity can never reach min_score; length difference alone is a
+    # lower bound on the edit distance and rejects many pairs for free.
+    min_ortho = 2 * (min_score - 0.05) - 1
+
+    hits: list[tuple[float, int, int, int, float, float]] = []
+    for a, b in pairs:
+        if all_flagged[a] and all_flagged[b]:
+            continue
+        # Brand and generic of the same drug are not a confusion risk.
+        if not ids[a].isdisjoint(ids[b]):
+            continue
+
+        is_known = (a, b) in known
+        na, nb = names[a], names[b]
+        longest = max(len(na), len(nb))
+        if not is_known and abs(len(na) - len(nb)) > (1 - min_ortho) * longest:
+            continue
+        dist = _myers(na, len(nb), masks[b])
+        ortho = 1 - dist / longest
+        pa, pb = phon[a], phon[b]
+        phonetic = 1 - _levenshtein(pa, pb) / max(len(pa), len(pb), 1)
+        score = max(ortho, (ortho + phonetic) / 2)
+        if na[:3] == nb[:3]:
+            score = min(1.0, score + 0.05)
+
+        if is_known:
+            score = 1.0
+        elif score < min_score:
+            continue
+        hits.append((score, a, b, dist, ortho, phonetic))
+
+    hits.sort(key=lambda h: (-h[0], names[h[1]], names[h[2]]))
+
+    candidates: list[LasaCandidate] = []
+    for score, a, b, dist, ortho, phonetic in hits[:limit]:
+        is_known = (a, b) in known
+        if is_known:
+            reason = "Curated LASA pair (lasa-pairs.json)"
+        elif phonetic == 1.0 and ortho < 1.0:
+            reason = "Sound-alike: identical phonetic key"
+        else:
+            reason = f"Look-alike: {dist} character edit(s) apart"
+
+        kind_a, kind_b = (min(k, key=_KIND_ORDER.index) for k in (kinds[a], kinds[b]))
+        kind = kind_a if kind_a == kind_b else "MIXED"
+        candidates.append(LasaCandidate(
+            nameA=display[a],
+            nameB=display[b],
+            nameKind=kind,
+            drugIdsA=sorted(ids[a]),
+            drugIdsB=sorted(ids[b]),
+            score=round(score, 3),
+            orthographicScore=round(ortho, 3),
+            phoneticScore=round(phonetic, 3),
+            editDistance=dist,
+            knownPair=is_known,
+            flaggedA=all_flagged[a],
+            flaggedB=all_flagged[b],
+            reason=reason,
+        ))
+
+    return LasaScanResult(
+        totalDrugs=len(drugs),
+        namesIndexed=len(names),
+        candidatesScored=len(pairs),
+        unflaggedPairs=candidates,
+        totalUnflagged=len(hits),
+        knownPairsUnflagged=sum(1 for h in hits if (h[1], h[2]) in known),
+        durationMs=int((time.time() - start) * 1000),
+    )
@@ -38,6 +38,21 @@ class ConsistencyIssue(BaseModel):
     count: int | None = None
 
 
+class ConsistencyRuleTiming(BaseModel):
+    ruleId: str
+    category: str
+    durationMs: float
+    issues: int = 0
+    skipped: bool = False  # rule's precondition was false
+
+
+class ConsistencyProfile(BaseModel):
+    rulesRun: int = 0
+    rulesSkipped: int = 0
+    byCategoryMs: dict[str, float] = Field(default_factory=dict)
+    rules: list[ConsistencyRuleTiming] = Field(default_factory=list)  # slowest first
+
+
 class ConsistencyResult(BaseModel):
     totalChecks: int
     passCount: int
@@ -47,6 +62,8 @@ class ConsistencyResult(BaseModel):
     infos: list[ConsistencyIssue] = Field(default_factory=list)
     score: int
     categorySummary: dict[str, dict[str, int]] = Field(default_factory=dict)
+    durationMs: float = 0.0
+    profile: ConsistencyProfile | None = None
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -61,6 +78,7 @@ class NABHCheckResult(BaseModel):
     severity: str
     fixHint: str
     details: str | None = None
+    durationMs: float = 0.0
 
 
 class NABHChapterResult(BaseModel):
@@ -79,6 +97,8 @@ class NABHReadinessResult(BaseModel):
     warnings: list[str] = Field(default_factory=list)
     passCount: int = 0
     failCount: int = 0
+    indexBuildMs: float = 0.0
+    durationMs: float = 0.0
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -127,9 +147,34 @@ class NamingIssue(BaseModel):
 
 class NamingCheckResult(BaseModel):
     totalEntities: int = 0
-    issues: list[NamingIssue] = Field(default_factory=list)
-    issueCount: int = 0
+    issues: list[NamingIssue] = Field(default_factory=list)  # current page
+    issueCount: int = 0  # all issues in the branch
     score: int = 100
+    matchedCount: int = 0  # issues matching the filters, across all pages
+    nextCursor: str | None = None
+    entitiesByType: dict[str, int] = Field(default_factory=dict)
+    issuesByEntityType: dict[str, int] = Field(default_factory=dict)
+    issuesByIssueType: dict[str, int] = Field(default_factory=dict)
+    durationMs: float = 0.0
+
+
+class RenamePatch(BaseModel):
+    entityType: str
+    entityId: str
+    field: Literal["code", "name"]
+    oldValue: str | None  # expected current value (optimistic check on apply)
+    newValue: str
+    reason: Literal["FORMAT", "DUPLICATE", "INCONSISTENT", "MISSING"]
+
+
+class RenamePlan(BaseModel):
+    branchId: str
+    entitiesScanned: int = 0
+    patchCount: int = 0
+    patchesByEntityType: dict[str, int] = Field(default_factory=dict)
+    collisionsResolved: int = 0  # suggestions that needed a numeric suffix
+    patches: list[RenamePatch] = Field(default_factory=list)
+    durationMs: float = 0.0
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -237,6 +282,9 @@ class NLQueryResponse(BaseModel):
     followUp: list[str] | None = None
     durationMs: int = 0
     error: str | None = None
+    evalCount: int | None = None  # streamed answers only
+    promptEvalCount: int | None = None
+    firstTokenMs: int | None = None
 
 
 # ═══════════════════════════════════════════════════════════════════════════
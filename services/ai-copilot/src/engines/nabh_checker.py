@@ -18,463 +18,520 @@ Key difference from the TypeScript version:
 
 from __future__ import annotations
 
-import json
-from pathlib import Path
-from typing import Any
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
 
-from src.collectors.models import BranchContext, LocationTreeNode
+from src.collectors.models import BranchContext, LocationTreeNode, RoomDetail
 from src.engines.models import NABHCheckResult, NABHChapterResult, NABHReadinessResult
+from src.services.reference_data import reference_data
 
 # ---------------------------------------------------------------------------
-# Load NABH checklist at module import time
+# Context index — NABH-specific aggregates over the shared BranchContext
+# index, computed once and read by all compiled checks.
 # ---------------------------------------------------------------------------
 
-_CHECKLIST_PATH = Path(__file__).resolve().parent.parent / "data" / "nabh-checklist.json"
 
-with open(_CHECKLIST_PATH, encoding="utf-8") as _f:
-    _NABH_DATA: dict[str, Any] = json.load(_f)
+class _NabhIndex:
+    """Aggregates every compiled check reads, built once per run."""
+
+    __slots__ = (
+        "ctx", "nodes_by_kind", "root_kinds", "fire_zone_by_kind",
+        "emergency_exits", "wheelchair_nodes", "stretcher_nodes",
+        "active_units_by_type", "active_units", "linked_units",
+        "rooms_by_type", "rooms_by_unit_type", "active_rooms_by_unit_type",
+        "resources_by_unit_type", "total_beds",
+    )
+
+    def __init__(self, ctx: BranchContext) -> None:
+        self.ctx = ctx
+        self.nodes_by_kind: dict[str, int] = {}
+        self.root_kinds: dict[str, int] = {}
+        self.fire_zone_by_kind: dict[str, int] = {}
+        self.emergency_exits = 0
+        self.wheelchair_nodes = 0
+        self.stretcher_nodes = 0
+
+        # stretcherAccess may not exist on the model yet; probing a missing
+        # attribute on every node is expensive, so check the schema once.
+        has_stretcher = "stretcherAccess" in LocationTreeNode.model_fields
+
+        shared = ctx.index
+        for root in shared.children_by_parent.get(None, ()):
+            self.root_kinds[root.kind] = self.root_kinds.get(root.kind, 0) + 1
+        for kind, nodes in shared.nodes_by_kind.items():
+            self.nodes_by_kind[kind] = len(nodes)
+            with_zone = sum(1 for n in nodes if n.fireZone is not None)
+            if with_zone:
+                self.fire_zone_by_kind[kind] = with_zone
+        for flat in shared.nodes:
+            n = flat.node
+            if n.emergencyExit:
+                self.emergency_exits += 1
+            if n.wheelchairAccess:
+                self.wheelchair_nodes += 1
+            if has_stretcher and getattr(n, "stretcherAccess", False):
+                self.stretcher_nodes += 1
+
+        self.active_units_by_type: dict[str, int] = {}
+        self.active_units = 0
+        self.linked_units = 0
+        self.rooms_by_type: dict[str | None, int] = {}
+        self.rooms_by_unit_type: dict[tuple[str, str | None], int] = {}
+        self.active_rooms_by_unit_type: dict[str, list[RoomDetail]] = {}
+        self.resources_by_unit_type: dict[str, dict[str, int]] = {}
+
+        self.total_beds = shared.total_beds
+        for u in shared.active_units:
+            t = u.typeCode
+            self.active_units += 1
+            self.active_units_by_type[t] = self.active_units_by_type.get(t, 0) + 1
+            if u.locationNodeId is not None:
+                self.linked_units += 1
+            res = self.resources_by_unit_type.setdefault(t, {})
+            for rtype, cnt in u.resources.byType.items():
+                res[rtype] = res.get(rtype, 0) + cnt
+            rooms = self.active_rooms_by_unit_type.setdefault(t, [])
+            for r in u.rooms:
+                if not r.isActive:
+                    continue
+                rooms.append(r)
+                self.rooms_by_type[r.roomType] = self.rooms_by_type.get(r.roomType, 0) + 1
+                key = (t, r.roomType)
+                self.rooms_by_unit_type[key] = self.rooms_by_unit_type.get(key, 0) + 1
 
 
 # ---------------------------------------------------------------------------
-# Public API
+# Check compilers — one per query type.  Each takes the check's params once
+# (at checklist load) and returns an evaluator over the shared index.
 # ---------------------------------------------------------------------------
 
-def run_nabh_checks(ctx: BranchContext) -> NABHReadinessResult:
-    """Run all NABH physical-infrastructure checks against a BranchContext."""
+_Evaluator = Callable[[_NabhIndex], tuple[bool, str | None]]
+_COMPILERS: dict[str, Callable[[dict[str, Any]], _Evaluator]] = {}
 
-    chapters: list[NABHChapterResult] = []
-    all_blockers: list[str] = []
-    all_warnings: list[str] = []
-    total_score = 0
-    total_max = 0
-    pass_count = 0
-    fail_count = 0
 
-    for chapter in _NABH_DATA["chapters"]:
-        chapter_results: list[NABHCheckResult] = []
-        chapter_score = 0
-        chapter_max = 0
+def _compiles(query: str):
+    def register(fn: Callable[[dict[str, Any]], _Evaluator]):
+        _COMPILERS[query] = fn
+        return fn
+    return register
 
-        for check in chapter["checks"]:
-            weight = (
-                3 if check["severity"] == "BLOCKER"
-                else 2 if check["severity"] == "WARNING"
-                else 1
-            )
-            chapter_max += weight
 
-            passed = False
-            details: str | None = None
+# -- Unit Type existence ----------------------------------------------------
 
-            try:
-                result = _evaluate_check(ctx, check)
-                passed = result["passed"]
-                details = result.get("details")
-            except Exception as exc:
-                passed = False
-                details = f"Check evaluation error: {exc}"
+@_compiles("UNIT_TYPE_EXISTS")
+def _c_unit_type_exists(params: dict[str, Any]) -> _Evaluator:
+    unit_type_code = params["unitTypeCode"]
 
-            if passed:
-                chapter_score += weight
-                pass_count += 1
-            else:
-                fail_count += 1
-                if check["severity"] == "BLOCKER":
-                    all_blockers.append(f"{check['id']}: {check['description']}")
-                elif check["severity"] == "WARNING":
-                    all_warnings.append(f"{check['id']}: {check['description']}")
+    def evaluate(ix: _NabhIndex):
+        count = ix.active_units_by_type.get(unit_type_code, 0)
+        return count > 0, f"Found {count} active {unit_type_code} unit(s)"
+    return evaluate
 
-            chapter_results.append(NABHCheckResult(
-                id=check["id"],
-                description=check["description"],
-                status="PASS" if passed else "FAIL",
-                severity=check["severity"],
-                fixHint=check["fixHint"],
-                details=details,
-            ))
 
-        total_score += chapter_score
-        total_max += chapter_max
+@_compiles("UNIT_TYPE_EXISTS_IF_EMERGENCY")
+def _c_unit_type_exists_if_emergency(params: dict[str, Any]) -> _Evaluator:
+    unit_type_code = params["unitTypeCode"]
 
-        chapters.append(NABHChapterResult(
-            chapter=chapter["chapter"],
-            name=chapter["name"],
-            score=round((chapter_score / chapter_max) * 100) if chapter_max > 0 else 100,
-            maxScore=chapter_max,
-            checks=chapter_results,
-        ))
+    def evaluate(ix: _NabhIndex):
+        # Only require ER unit if branch is marked as 24x7 emergency
+        if not ix.ctx.branch.emergency24x7:
+            return True, "Branch is not 24×7 emergency — ER unit not required"
+        count = ix.active_units_by_type.get(unit_type_code, 0)
+        return count > 0, f"Emergency 24×7 branch: found {count} ER unit(s)"
+    return evaluate
 
-    return NABHReadinessResult(
-        overallScore=round((total_score / total_max) * 100) if total_max > 0 else 0,
-        maxScore=total_max,
-        chapters=chapters,
-        blockers=all_blockers,
-        warnings=all_warnings,
-        passCount=pass_count,
-        failCount=fail_count,
-    )
 
+# -- Room type existence ----------------------------------------------------
 
-# ---------------------------------------------------------------------------
-# Location tree helpers
-# ---------------------------------------------------------------------------
+@_compiles("ROOM_TYPE_EXISTS")
+def _c_room_type_exists(params: dict[str, Any]) -> _Evaluator:
+    room_type = params["roomType"]
 
-def _flatten_tree(nodes: list[LocationTreeNode]) -> list[LocationTreeNode]:
-    """Recursively flatten a location tree into a flat list of all nodes."""
-    result: list[LocationTreeNode] = []
-    for node in nodes:
-        result.append(node)
-        if node.children:
-            result.extend(_flatten_tree(node.children))
-    return result
+    def evaluate(ix: _NabhIndex):
+        count = ix.rooms_by_type.get(room_type, 0)
+        return count > 0, f"Found {count} {room_type} room(s)"
+    return evaluate
 
 
-def _count_nodes_by_kind(flat_nodes: list[LocationTreeNode], kind: str) -> int:
-    """Count nodes matching a specific kind."""
-    return sum(1 for n in flat_nodes if n.kind == kind)
+@_compiles("ROOM_TYPE_EXISTS_ANY")
+def _c_room_type_exists_any(params: dict[str, Any]) -> _Evaluator:
+    room_types: list[str] = params["roomTypes"]
+    room_type_set = set(room_types)
+    label = ", ".join(room_types)
 
+    def evaluate(ix: _NabhIndex):
+        count = sum(ix.rooms_by_type.get(rt, 0) for rt in room_type_set)
+        return count > 0, f"Found {count} room(s) of types: {label}"
+    return evaluate
 
-def _find_root_nodes_by_kind(
-    flat_nodes: list[LocationTreeNode],
-    tree_roots: list[LocationTreeNode],
-    kind: str,
-) -> int:
-    """Count root-level nodes (no parent) of a given kind.
 
-    In the tree model, root nodes are the top-level entries in ``tree``.
-    """
-    return sum(1 for n in tree_roots if n.kind == kind)
+@_compiles("ROOM_TYPE_IN_UNIT_TYPE")
+def _c_room_type_in_unit_type(params: dict[str, Any]) -> _Evaluator:
+    room_type = params["roomType"]
+    unit_type_code = params["unitTypeCode"]
 
+    def evaluate(ix: _NabhIndex):
+        count = ix.rooms_by_unit_type.get((unit_type_code, room_type), 0)
+        return count > 0, f"Found {count} {room_type} room(s) in {unit_type_code} units"
+    return evaluate
 
-# ---------------------------------------------------------------------------
-# Check Evaluator  (match/case on query type)
-# ---------------------------------------------------------------------------
 
-def _evaluate_check(
-    ctx: BranchContext,
-    check: dict[str, Any],
-) -> dict[str, Any]:
-    """Evaluate a single NABH check against the BranchContext.
+@_compiles("ROOM_TYPE_IN_UNIT_TYPES")
+def _c_room_type_in_unit_types(params: dict[str, Any]) -> _Evaluator:
+    room_type = params["roomType"]
+    unit_type_codes: list[str] = params["unitTypeCodes"]
+    utc_set = set(unit_type_codes)
+    label = "/".join(unit_type_codes)
 
-    Returns ``{"passed": bool, "details": str | None}``.
-    """
-    query: str = check["query"]
-    params: dict[str, Any] = check.get("params", {})
+    def evaluate(ix: _NabhIndex):
+        count = sum(ix.rooms_by_unit_type.get((t, room_type), 0) for t in utc_set)
+        return count > 0, f"Found {count} {room_type} room(s) in {label} units"
+    return evaluate
 
-    branch = ctx.branch
-    units = ctx.units
-    location = ctx.location
-    departments = ctx.departments
 
-    # Pre-compute flat list of all location nodes
-    flat_loc = _flatten_tree(location.tree)
+# -- Unit + Resource --------------------------------------------------------
 
-    # -- Unit Type existence ------------------------------------------------
+@_compiles("UNIT_HAS_RESOURCE")
+def _c_unit_has_resource(params: dict[str, Any]) -> _Evaluator:
+    resource_type = params["resourceType"]
+    unit_type_codes: list[str] = params["unitTypeCodes"]
+    utc_set = set(unit_type_codes)
+    min_count = params.get("minCount", 1)
+    label = "/".join(unit_type_codes)
 
-    if query == "UNIT_TYPE_EXISTS":
-        unit_type_code = params["unitTypeCode"]
+    def evaluate(ix: _NabhIndex):
         count = sum(
-            1 for u in units.units
-            if u.isActive and u.typeCode == unit_type_code
+            ix.resources_by_unit_type.get(t, {}).get(resource_type, 0) for t in utc_set
         )
-        return {
-            "passed": count > 0,
-            "details": f"Found {count} active {unit_type_code} unit(s)",
-        }
+        return count >= min_count, f"Found {count} {resource_type} resource(s) in {label} units"
+    return evaluate
 
-    if query == "UNIT_TYPE_EXISTS_IF_EMERGENCY":
-        # Only require ER unit if branch is marked as 24x7 emergency
-        if not branch.emergency24x7:
-            return {
-                "passed": True,
-                "details": "Branch is not 24\u00d77 emergency \u2014 ER unit not required",
-            }
-        unit_type_code = params["unitTypeCode"]
-        count = sum(
-            1 for u in units.units
-            if u.isActive and u.typeCode == unit_type_code
-        )
-        return {
-            "passed": count > 0,
-            "details": f"Emergency 24\u00d77 branch: found {count} ER unit(s)",
-        }
-
-    # -- Room type existence ------------------------------------------------
-
-    if query == "ROOM_TYPE_EXISTS":
-        room_type = params["roomType"]
-        count = 0
-        for u in units.units:
-            if not u.isActive:
-                continue
-            for r in u.rooms:
-                if r.isActive and r.roomType == room_type:
-                    count += 1
-        return {
-            "passed": count > 0,
-            "details": f"Found {count} {room_type} room(s)",
-        }
-
-    if query == "ROOM_TYPE_EXISTS_ANY":
-        room_types: list[str] = params["roomTypes"]
-        room_type_set = set(room_types)
-        count = 0
-        for u in units.units:
-            if not u.isActive:
-                continue
-            for r in u.rooms:
-                if r.isActive and r.roomType in room_type_set:
-                    count += 1
-        return {
-            "passed": count > 0,
-            "details": f"Found {count} room(s) of types: {', '.join(room_types)}",
-        }
-
-    if query == "ROOM_TYPE_IN_UNIT_TYPE":
-        room_type = params["roomType"]
-        unit_type_code = params["unitTypeCode"]
-        count = 0
-        for u in units.units:
-            if not u.isActive or u.typeCode != unit_type_code:
-                continue
-            for r in u.rooms:
-                if r.isActive and r.roomType == room_type:
-                    count += 1
-        return {
-            "passed": count > 0,
-            "details": f"Found {count} {room_type} room(s) in {unit_type_code} units",
-        }
-
-    if query == "ROOM_TYPE_IN_UNIT_TYPES":
-        room_type = params["roomType"]
-        unit_type_codes: list[str] = params["unitTypeCodes"]
-        utc_set = set(unit_type_codes)
-        count = 0
-        for u in units.units:
-            if not u.isActive or u.typeCode not in utc_set:
-                continue
-            for r in u.rooms:
-                if r.isActive and r.roomType == room_type:
-                    count += 1
-        return {
-            "passed": count > 0,
-            "details": (
-                f"Found {count} {room_type} room(s) in "
-                f"{'/'.join(unit_type_codes)} units"
-            ),
-        }
-
-    # -- Unit + Resource ----------------------------------------------------
-
-    if query == "UNIT_HAS_RESOURCE":
-        resource_type = params["resourceType"]
-        unit_type_codes = params["unitTypeCodes"]
-        utc_set = set(unit_type_codes)
-        min_count = params.get("minCount", 1)
-        count = 0
-        for u in units.units:
-            if not u.isActive or u.typeCode not in utc_set:
-                continue
-            count += u.resources.byType.get(resource_type, 0)
-        return {
-            "passed": count >= min_count,
-            "details": (
-                f"Found {count} {resource_type} resource(s) in "
-                f"{'/'.join(unit_type_codes)} units"
-            ),
-        }
-
-    if query == "BED_COUNT_SYNC":
+
+@_compiles("BED_COUNT_SYNC")
+def _c_bed_count_sync(params: dict[str, Any]) -> _Evaluator:
+    def evaluate(ix: _NabhIndex):
         # Total beds across all units
-        actual = sum(u.resources.beds for u in units.units)
-        if branch.bedCount is None:
-            return {
-                "passed": actual > 0,
-                "details": f"Branch.bedCount not set; {actual} BED resource(s) exist",
-            }
-        match = branch.bedCount == actual
-        return {
-            "passed": match,
-            "details": (
-                f"Branch.bedCount = {branch.bedCount}, "
-                f"actual BED resources = {actual}"
-            ),
-        }
-
-    # -- Critical care room amenities ---------------------------------------
-
-    if query == "CRITICAL_CARE_ROOMS_HAVE_AMENITY":
-        amenity: str = params["amenity"]
-        unit_type_codes = params["unitTypeCodes"]
-        utc_set = set(unit_type_codes)
-        rooms_in_scope = []
-        for u in units.units:
-            if not u.isActive or u.typeCode not in utc_set:
-                continue
-            for r in u.rooms:
-                if r.isActive:
-                    rooms_in_scope.append(r)
-        if len(rooms_in_scope) == 0:
-            return {
-                "passed": True,
-                "details": f"No rooms in {'/'.join(unit_type_codes)} units",
-            }
-        with_amenity = sum(
-            1 for r in rooms_in_scope if getattr(r, amenity, False) is True
+        actual = ix.total_beds
+        bed_count = ix.ctx.branch.bedCount
+        if bed_count is None:
+            return actual > 0, f"Branch.bedCount not set; {actual} BED resource(s) exist"
+        return bed_count == actual, (
+            f"Branch.bedCount = {bed_count}, actual BED resources = {actual}"
+        )
+    return evaluate
+
+
+# -- Critical care room amenities -------------------------------------------
+
+@_compiles("CRITICAL_CARE_ROOMS_HAVE_AMENITY")
+def _c_critical_care_amenity(params: dict[str, Any]) -> _Evaluator:
+    amenity: str = params["amenity"]
+    unit_type_codes: list[str] = params["unitTypeCodes"]
+    utc_set = set(unit_type_codes)
+    label = "/".join(unit_type_codes)
+
+    def evaluate(ix: _NabhIndex):
+        rooms_in_scope = [
+            r for t in utc_set for r in ix.active_rooms_by_unit_type.get(t, ())
+        ]
+        if not rooms_in_scope:
+            return True, f"No rooms in {label} units"
+        with_amenity = sum(1 for r in rooms_in_scope if getattr(r, amenity, False) is True)
+        return with_amenity == len(rooms_in_scope), (
+            f"{with_amenity}/{len(rooms_in_scope)} critical care rooms have {amenity}"
         )
-        return {
-            "passed": with_amenity == len(rooms_in_scope),
-            "details": (
-                f"{with_amenity}/{len(rooms_in_scope)} critical care rooms "
-                f"have {amenity}"
-            ),
-        }
-
-    # -- Location Tree ------------------------------------------------------
-
-    if query == "LOCATION_ROOT_EXISTS":
-        kind = params["kind"]
-        count = _find_root_nodes_by_kind(flat_loc, location.tree, kind)
-        return {
-            "passed": count > 0,
-            "details": f"Found {count} root {kind} node(s)",
-        }
-
-    if query == "LOCATION_KIND_EXISTS":
-        kind = params["kind"]
-        count = _count_nodes_by_kind(flat_loc, kind)
-        return {
-            "passed": count > 0,
-            "details": f"Found {count} {kind} node(s)",
-        }
-
-    if query == "LOCATION_FIRE_ZONE_COVERAGE":
-        kinds: list[str] = params["kinds"]
-        kind_set = set(kinds)
-        target_nodes = [n for n in flat_loc if n.kind in kind_set]
-        if len(target_nodes) == 0:
-            return {"passed": False, "details": "No BUILDING/FLOOR nodes found"}
-        with_fire = sum(1 for n in target_nodes if n.fireZone is not None)
-        pct = round((with_fire / len(target_nodes)) * 100)
-        return {
-            "passed": with_fire == len(target_nodes),
-            "details": (
-                f"{with_fire}/{len(target_nodes)} ({pct}%) have fire zone"
-            ),
-        }
-
-    if query == "LOCATION_HAS_EMERGENCY_EXIT":
-        count = sum(1 for n in flat_loc if n.emergencyExit)
-        return {
-            "passed": count > 0,
-            "details": f"{count} emergency exit(s) marked",
-        }
-
-    if query == "LOCATION_HAS_WHEELCHAIR_ACCESS":
-        count = sum(1 for n in flat_loc if n.wheelchairAccess)
-        return {
-            "passed": count > 0,
-            "details": f"{count} wheelchair-accessible node(s)",
-        }
-
-    if query == "LOCATION_HAS_STRETCHER_ACCESS":
-        # stretcherAccess may not exist on the model yet; use getattr safely
-        count = sum(1 for n in flat_loc if getattr(n, "stretcherAccess", False))
-        return {
-            "passed": count > 0,
-            "details": f"{count} stretcher-accessible node(s)",
-        }
-
-    if query == "LOCATION_ALL_HAVE_ACTIVE_REVISION":
+    return evaluate
+
+
+# -- Location Tree ----------------------------------------------------------
+
+@_compiles("LOCATION_ROOT_EXISTS")
+def _c_location_root_exists(params: dict[str, Any]) -> _Evaluator:
+    kind = params["kind"]
+
+    def evaluate(ix: _NabhIndex):
+        count = ix.root_kinds.get(kind, 0)
+        return count > 0, f"Found {count} root {kind} node(s)"
+    return evaluate
+
+
+@_compiles("LOCATION_KIND_EXISTS")
+def _c_location_kind_exists(params: dict[str, Any]) -> _Evaluator:
+    kind = params["kind"]
+
+    def evaluate(ix: _NabhIndex):
+        count = ix.nodes_by_kind.get(kind, 0)
+        return count > 0, f"Found {count} {kind} node(s)"
+    return evaluate
+
+
+@_compiles("LOCATION_FIRE_ZONE_COVERAGE")
+def _c_location_fire_zone_coverage(params: dict[str, Any]) -> _Evaluator:
+    kind_set = set(params["kinds"])
+
+    def evaluate(ix: _NabhIndex):
+        total = sum(ix.nodes_by_kind.get(k, 0) for k in kind_set)
+        if total == 0:
+            return False, "No BUILDING/FLOOR nodes found"
+        with_fire = sum(ix.fire_zone_by_kind.get(k, 0) for k in kind_set)
+        pct = round((with_fire / total) * 100)
+        return with_fire == total, f"{with_fire}/{total} ({pct}%) have fire zone"
+    return evaluate
+
+
+@_compiles("LOCATION_HAS_EMERGENCY_EXIT")
+def _c_location_has_emergency_exit(params: dict[str, Any]) -> _Evaluator:
+    def evaluate(ix: _NabhIndex):
+        return ix.emergency_exits > 0, f"{ix.emergency_exits} emergency exit(s) marked"
+    return evaluate
+
+
+@_compiles("LOCATION_HAS_WHEELCHAIR_ACCESS")
+def _c_location_has_wheelchair_access(params: dict[str, Any]) -> _Evaluator:
+    def evaluate(ix: _NabhIndex):
+        return ix.wheelchair_nodes > 0, f"{ix.wheelchair_nodes} wheelchair-accessible node(s)"
+    return evaluate
+
+
+@_compiles("LOCATION_HAS_STRETCHER_ACCESS")
+def _c_location_has_stretcher_access(params: dict[str, Any]) -> _Evaluator:
+    def evaluate(ix: _NabhIndex):
+        return ix.stretcher_nodes > 0, f"{ix.stretcher_nodes} stretcher-accessible node(s)"
+    return evaluate
+
+
+@_compiles("LOCATION_ALL_HAVE_ACTIVE_REVISION")
+def _c_location_all_have_active_revision(params: dict[str, Any]) -> _Evaluator:
+    def evaluate(ix: _NabhIndex):
+        location = ix.ctx.location
         total_nodes = location.totalNodes
         if total_nodes == 0:
-            return {"passed": True, "details": "No location nodes"}
+            return True, "No location nodes"
         # Nodes without an active revision are tracked by LocationSummary
         nodes_with_rev = total_nodes - location.nodesWithoutRevision
-        return {
-            "passed": nodes_with_rev == total_nodes,
-            "details": f"{nodes_with_rev}/{total_nodes} nodes have active revisions",
-        }
-
-    if query == "UNITS_LINKED_TO_LOCATION":
-        min_percent = params.get("minPercent", 80)
-        total = len([u for u in units.units if u.isActive])
-        if total == 0:
-            return {"passed": True, "details": "No active units"}
-        linked = sum(
-            1 for u in units.units
-            if u.isActive and u.locationNodeId is not None
+        return nodes_with_rev == total_nodes, (
+            f"{nodes_with_rev}/{total_nodes} nodes have active revisions"
         )
+    return evaluate
+
+
+@_compiles("UNITS_LINKED_TO_LOCATION")
+def _c_units_linked_to_location(params: dict[str, Any]) -> _Evaluator:
+    min_percent = params.get("minPercent", 80)
+
+    def evaluate(ix: _NabhIndex):
+        total = ix.active_units
+        if total == 0:
+            return True, "No active units"
+        linked = ix.linked_units
         pct = round((linked / total) * 100)
-        return {
-            "passed": pct >= min_percent,
-            "details": f"{linked}/{total} ({pct}%) units linked to location",
-        }
+        return pct >= min_percent, f"{linked}/{total} ({pct}%) units linked to location"
+    return evaluate
+
+
+# -- Branch fields ----------------------------------------------------------
 
-    # -- Branch fields ------------------------------------------------------
+@_compiles("BRANCH_FIELD_SET")
+def _c_branch_field_set(params: dict[str, Any]) -> _Evaluator:
+    field = params["field"]
 
-    if query == "BRANCH_FIELD_SET":
-        field = params["field"]
-        value = getattr(branch, field, None)
+    def evaluate(ix: _NabhIndex):
+        value = getattr(ix.ctx.branch, field, None)
         is_set = value is not None and value != ""
-        return {
-            "passed": is_set,
-            "details": f"{field} is set" if is_set else f"{field} is not set",
-        }
-
-    if query == "BRANCH_ADDRESS_COMPLETE":
-        has_addr = bool(branch.address)
-        has_pin = bool(branch.pinCode)
-        has_state = bool(branch.state)
-        complete = has_addr and has_pin and has_state
-        missing: list[str] = []
-        if not has_addr:
-            missing.append("address")
-        if not has_pin:
-            missing.append("pinCode")
-        if not has_state:
-            missing.append("state")
-        return {
-            "passed": complete,
-            "details": "Address complete" if complete else f"Missing: {', '.join(missing)}",
-        }
-
-    # -- Department ---------------------------------------------------------
-
-    if query == "DEPARTMENTS_WITH_HEAD":
-        min_percent = params.get("minPercent", 80)
+        return is_set, f"{field} is set" if is_set else f"{field} is not set"
+    return evaluate
+
+
+@_compiles("BRANCH_ADDRESS_COMPLETE")
+def _c_branch_address_complete(params: dict[str, Any]) -> _Evaluator:
+    def evaluate(ix: _NabhIndex):
+        branch = ix.ctx.branch
+        missing = [
+            name for name, present in (
+                ("address", bool(branch.address)),
+                ("pinCode", bool(branch.pinCode)),
+                ("state", bool(branch.state)),
+            ) if not present
+        ]
+        complete = not missing
+        return complete, "Address complete" if complete else f"Missing: {', '.join(missing)}"
+    return evaluate
+
+
+# -- Department -------------------------------------------------------------
+
+@_compiles("DEPARTMENTS_WITH_HEAD")
+def _c_departments_with_head(params: dict[str, Any]) -> _Evaluator:
+    min_percent = params.get("minPercent", 80)
+
+    def evaluate(ix: _NabhIndex):
+        departments = ix.ctx.departments
         total = departments.total
         if total == 0:
-            return {"passed": True, "details": "No departments"}
+            return True, "No departments"
         with_head = departments.withHead
         pct = round((with_head / total) * 100)
-        return {
-            "passed": pct >= min_percent,
-            "details": f"{with_head}/{total} ({pct}%) departments have heads",
-        }
-
-    if query == "DEPARTMENT_COUNT_MIN":
-        min_val = params.get("min", 1)
-        count = departments.total
-        return {
-            "passed": count >= min_val,
-            "details": f"{count} active department(s)",
-        }
-
-    if query == "INFRA_CONFIG_EXISTS":
+        return pct >= min_percent, f"{with_head}/{total} ({pct}%) departments have heads"
+    return evaluate
+
+
+@_compiles("DEPARTMENT_COUNT_MIN")
+def _c_department_count_min(params: dict[str, Any]) -> _Evaluator:
+    min_val = params.get("min", 1)
+
+    def evaluate(ix: _NabhIndex):
+        count = ix.ctx.departments.total
+        return count >= min_val, f"{count} active department(s)"
+    return evaluate
+
+
+@_compiles("INFRA_CONFIG_EXISTS")
+def _c_infra_config_exists(params: dict[str, Any]) -> _Evaluator:
+    def evaluate(ix: _NabhIndex):
         # The BranchContext does not carry infra config status directly.
         # We infer readiness from whether the branch has core fields populated.
         # This is a best-effort heuristic since the Python copilot works
         # off a snapshot rather than querying BranchInfraConfig directly.
-        has_config = (
-            branch.bedCount is not None
-            or branch.workingHours is not None
+        branch = ix.ctx.branch
+        has_config = branch.bedCount is not None or branch.workingHours is not None
+        return has_config, "Config initialized" if has_config else "BranchInfraConfig not found"
+    return evaluate
+
+
+# ---------------------------------------------------------------------------
+# Checklist compilation
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class _CompiledCheck:
+    id: str
+    description: str
+    severity: str
+    fixHint: str
+    weight: int
+    evaluate: _Evaluator
+
+
+@dataclass
+class _CompiledChapter:
+    chapter: int
+    name: str
+    checks: list[_CompiledCheck]
+
+
+def _compile_check(check: dict[str, Any]) -> _CompiledCheck:
+    query: str = check["query"]
+    compiler = _COMPILERS.get(query)
+    if compiler is None:
+        evaluate: _Evaluator = lambda ix: (False, f"Unknown check query: {query}")  # noqa: E731
+    else:
+        try:
+            evaluate = compiler(check.get("params", {}))
+        except Exception as exc:  # bad params — report at run time, per check
+            error = f"Check evaluation error: {exc}"
+            evaluate = lambda ix: (False, error)  # noqa: E731
+    severity = check["severity"]
+    return _CompiledCheck(
+        id=check["id"],
+        description=check["description"],
+        severity=severity,
+        fixHint=check["fixHint"],
+        weight=3 if severity == "BLOCKER" else 2 if severity == "WARNING" else 1,
+        evaluate=evaluate,
+    )
+
+
+def _compile_checklist(data: dict[str, Any]) -> list[_CompiledChapter]:
+    """Turn nabh-checklist.json into evaluator closures (once per file version)."""
+    return [
+        _CompiledChapter(
+            chapter=chapter["chapter"],
+            name=chapter["name"],
+            checks=[_compile_check(c) for c in chapter["checks"]],
         )
-        return {
-            "passed": has_config,
-            "details": "Config initialized" if has_config else "BranchInfraConfig not found",
-        }
+        for chapter in data.get("chapters", [])
+    ]
 
-    # -- Fallback -----------------------------------------------------------
 
-    return {"passed": False, "details": f"Unknown check query: {query}"}
+_NABH_CHECKLIST = reference_data.view("nabh-checklist.json", _compile_checklist)
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+def run_nabh_checks(ctx: BranchContext) -> NABHReadinessResult:
+    """Run all NABH physical-infrastructure checks against a BranchContext."""
+    start = time.perf_counter()
+
+    chapters: list[NABHChapterResult] = []
+    all_blockers: list[str] = []
+    all_warnings: list[str] = []
+    total_score = 0
+    total_max = 0
+    pass_count = 0
+    fail_count = 0
+
+    index = _NabhIndex(ctx)
+    index_ms = (time.perf_counter() - start) * 1000
+
+    for chapter in _NABH_CHECKLIST.get():
+        chapter_results: list[NABHCheckResult] = []
+        chapter_score = 0
+        chapter_max = 0
+
+        for check in chapter.checks:
+            chapter_max += check.weight
+
+            t0 = time.perf_counter()
+            try:
+                passed, details = check.evaluate(index)
+            except Exception as exc:
+                passed = False
+                details = f"Check evaluation error: {exc}"
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+
+            if passed:
+                chapter_score += check.weight
+                pass_count += 1
+            else:
+                fail_count += 1
+                if check.severity == "BLOCKER":
+                    all_blockers.append(f"{check.id}: {check.description}")
+                elif check.severity == "WARNING":
+                    all_warnings.append(f"{check.id}: {check.description}")
+
+            chapter_results.append(NABHCheckResult(
+                id=check.id,
+                description=check.description,
+                status="PASS" if passed else "FAIL",
+                severity=check.severity,
+                fixHint=check.fixHint,
+                details=details,
+                durationMs=round(elapsed_ms, 3),
+            ))
+
+        total_score += chapter_score
+        total_max += chapter_max
+
+        chapters.append(NABHChapterResult(
+            chapter=chapter.chapter,
+            name=chapter.name,
+            score=round((chapter_score / chapter_max) * 100) if chapter_max > 0 else 100,
+            maxScore=chapter_max,
+            checks=chapter_results,
+        ))
+
+    return NABHReadinessResult(
+        overallScore=round((total_score / total_max) * 100) if total_max > 0 else 0,
+        maxScore=total_max,
+        chapters=chapters,
+        blockers=all_blockers,
+        warnings=all_warnings,
+        passCount=pass_count,
+        failCount=fail_count,
+        indexBuildMs=round(index_ms, 3),
+        durationMs=round((time.perf_counter() - start) * 1000, 3),
+    )
@@ -0,0 +1,211 @@
+"""
+Naming Auto-Fix Planner
+
+Turns the naming checks into a complete, collision-free rename plan that
+the core API can apply in a single transaction:
+
+  - FORMAT     -> canonical UPPER_SNAKE code
+  - MISSING    -> code derived from the entity name
+  - DUPLICATE  -> first holder keeps the code, later ones get ``_2``, ``_3`` ...
+  - INCONSISTENT (department names) -> Title Case
+
+Uniqueness is enforced per scope, matching what the checks consider a
+clash: departments and units branch-wide, rooms within their unit, location
+codes among siblings.  Each scope keeps a hash set of taken codes plus a
+next-suffix counter per base code, so planning is linear in the number of
+entities.  Every patch carries the value it expects to replace, letting the
+caller reject a plan that has gone stale.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from src.collectors.models import BranchContext
+from src.engines.models import RenamePatch, RenamePlan
+from src.engines.naming_enforcer import (
+    CODE_PATTERN,
+    ENTITY_TYPES,
+    _WHITESPACE,
+    _parse_filter,
+    _starts_lowercase,
+    _to_canonical_code,
+    _to_title_case,
+)
+
+
+@dataclass(slots=True)
+class _Entity:
+    id: str
+    code: str | None
+    name: str | None
+
+
+class _CodeScope:
+    """Taken codes within one uniqueness scope, with O(1) suffix allocation."""
+
+    __slots__ = ("taken", "next_suffix", "key")
+
+    def __init__(self, key: Callable[[str], str]) -> None:
+        self.taken: set[str] = set()
+        self.next_suffix: dict[str, int] = {}
+        self.key = key
+
+    def claim(self, code: str) -> bool:
+        """Reserve *code*; False if it is already taken."""
+        k = self.key(code)
+        if k in self.taken:
+            return False
+        self.taken.add(k)
+        return True
+
+    def allocate(self, base: str) -> str:
+        if self.claim(base):
+            return base
+        n = self.next_suffix.get(base, 2)
+        while not self.claim(f"{base}_{n}"):
+            n += 1
+        self.next_suffix[base] = n + 1
+        return f"{base}_{n}"
+
+
+def _upper(code: str) -> str:
+    return code.upper()
+
+
+def _exact(code: str) -> str:
+    return code
+
+
+def _plan_codes(
+    entity_type: str,
+    entities: Iterable[_Entity],
+    needs_format: Callable[[str], bool],
+    fallback: str,
+    key: Callable[[str], str],
+    strict: bool,
+    out: list[RenamePatch],
+) -> int:
+    """Append code patches for one scope; returns collisions resolved."""
+    scope = _CodeScope(key)
+    pending: list[tuple[_Entity, str, str]] = []  # (entity, desired, reason)
+
+    # Pass 1: codes that stay as they are claim their slot first, so a fix
+    # can never take a code some other untouched entity already holds.
+    for e in entities:
+        if not e.code:
+            pending.append((e, _to_canonical_code(e.name or fallback), "MISSING"))
+        elif needs_format(e.code):
+            pending.append((e, _to_canonical_code(e.code), "FORMAT"))
+        elif not scope.claim(e.code):
+            pending.append((e, e.code.upper() if key is _upper else e.code, "DUPLICATE"))
+
+    # Pass 2: allocate the fixes in entity order.
+    collisions = 0
+    for e, desired, reason in pending:
+        if not desired:
+            desired = fallback
+        if strict and not CODE_PATTERN.match(desired):
+            desired = f"{fallback}_{desired}"
+        new = scope.allocate(desired)
+        if new != desired:
+            collisions += 1
+        out.append(RenamePatch(
+            entityType=entity_type,
+            entityId=e.id,
+            field="code",
+            oldValue=e.code or None,
+            newValue=new,
+            reason=reason,  # type: ignore[arg-type]
+        ))
+    return collisions
+
+
+def _not_upper_snake(code: str) -> bool:
+    return not CODE_PATTERN.match(code)
+
+
+def _has_whitespace(code: str) -> bool:
+    return _WHITESPACE.search(code) is not None
+
+
+def _location_needs_format(code: str) -> bool:
+    return not CODE_PATTERN.match(code) and _WHITESPACE.search(code) is not None
+
+
+def build_rename_plan(
+    ctx: BranchContext,
+    entity_types: Iterable[str] | None = None,
+) -> RenamePlan:
+    """Build the full rename plan for every naming issue in the branch.
+
+    Raises ``ValueError`` for unknown entity types.
+    """
+    start = time.perf_counter()
+    wanted = _parse_filter(entity_types, ENTITY_TYPES, "entity type")
+    ix = ctx.index
+    patches: list[RenamePatch] = []
+    collisions = 0
+    scanned = 0
+
+    def want(entity_type: str) -> bool:
+        return wanted is None or entity_type in wanted
+
+    if want("DEPARTMENT"):
+        departments = ctx.departments.departments
+        scanned += len(departments)
+        collisions += _plan_codes(
+            "DEPARTMENT",
+            (_Entity(d.id, d.code, d.name) for d in departments),
+            _not_upper_snake, "DEPT", _upper, True, patches,
+        )
+        for d in departments:
+            if d.name and _starts_lowercase(d.name):
+                patches.append(RenamePatch(
+                    entityType="DEPARTMENT", entityId=d.id, field="name",
+                    oldValue=d.name, newValue=_to_title_case(d.name),
+                    reason="INCONSISTENT",
+                ))
+
+    if want("UNIT"):
+        units = ctx.units.units
+        scanned += len(units)
+        collisions += _plan_codes(
+            "UNIT",
+            (_Entity(u.id, u.code, u.name) for u in units),
+            _not_upper_snake, "UNIT", _upper, True, patches,
+        )
+
+    if want("UNIT_ROOM"):
+        for unit in ctx.units.units:
+            scanned += len(unit.rooms)
+            collisions += _plan_codes(
+                "UNIT_ROOM",
+                (_Entity(r.id, r.code, r.name) for r in unit.rooms),
+                _has_whitespace, "ROOM", _upper, False, patches,
+            )
+
+    if want("LOCATION_NODE_REVISION"):
+        for siblings in ix.children_by_parent.values():
+            scanned += len(siblings)
+            collisions += _plan_codes(
+                "LOCATION_NODE_REVISION",
+                (_Entity(n.id, n.code, n.name) for n in siblings),
+                _location_needs_format, "LOC", _exact, False, patches,
+            )
+
+    by_type: dict[str, int] = {}
+    for p in patches:
+        by_type[p.entityType] = by_type.get(p.entityType, 0) + 1
+
+    return RenamePlan(
+        branchId=ctx.branch.id,
+        entitiesScanned=scanned,
+        patchCount=len(patches),
+        patchesByEntityType=by_type,
+        collisionsResolved=collisions,
+        patches=patches,
+        durationMs=round((time.perf_counter() - start) * 1000, 3),
+    )
@@ -10,13 +10,21 @@ Checks:
   - Missing codes
   - Location revision code consistency among siblings
 
+Every entity in the context is checked -- no sampling.  The checks stream
+lightweight ``NamingHit`` tuples (linear in the number of entities, with
+duplicates found through hash buckets); ``NamingIssue`` models and
+suggested values are only built for the page of issues actually returned.
+
 Ported from: services/core-api/.../engines/naming-enforcer.engine.ts
 """
 
 from __future__ import annotations
 
 import re
+import time
 from collections import defaultdict
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, NamedTuple
 
 from src.collectors.models import BranchContext
 from src.engines.models import NamingCheckResult, NamingIssue
@@ -26,74 +34,96 @@ from src.engines.models import NamingCheckResult, NamingIssue
 # ---------------------------------------------------------------------------
 
 CODE_PATTERN = re.compile(r"^[A-Z][A-Z0-9_]*$")
+_WHITESPACE = re.compile(r"\s")
+_SEPARATORS = re.compile(r"[\s\-]+")
+_NON_CODE_CHARS = re.compile(r"[^A-Z0-9_]")
+_REPEATED_UNDERSCORE = re.compile(r"_{2,}")
+_EDGE_UNDERSCORE = re.compile(r"^_|_$")
+_MULTI_SPACE = re.compile(r"\s+")
+_WORD_START = re.compile(r"\b\w")
+
+ENTITY_TYPES = ("DEPARTMENT", "UNIT", "UNIT_ROOM", "UNIT_RESOURCE", "LOCATION_NODE_REVISION")
+ISSUE_TYPES = ("FORMAT", "DUPLICATE", "INCONSISTENT", "MISSING")
 
 
+@lru_cache(maxsize=8192)
 def _to_canonical_code(value: str) -> str:
     """Convert an arbitrary string to UPPER_SNAKE form."""
     result = value.strip().upper()
-    result = re.sub(r"[\s\-]+", "_", result)
-    result = re.sub(r"[^A-Z0-9_]", "", result)
-    result = re.sub(r"_{2,}", "_", result)
-    result = re.sub(r"^_|_$", "", result)
+    result = _SEPARATORS.sub("_", result)
+    result = _NON_CODE_CHARS.sub("", result)
+    result = _REPEATED_UNDERSCORE.sub("_", result)
+    result = _EDGE_UNDERSCORE.sub("", result)
     return result
 
 
 def _to_title_case(value: str) -> str:
     """Normalize to Title Case (capitalize first letter of each word)."""
-    collapsed = re.sub(r"\s+", " ", value.strip())
-    return re.sub(r"\b\w", lambda m: m.group(0).upper(), collapsed)
+    collapsed = _MULTI_SPACE.sub(" ", value.strip())
+    return _WORD_START.sub(lambda m: m.group(0).upper(), collapsed)
+
+
+def _starts_lowercase(value: str) -> bool:
+    return "a" <= value[0] <= "z"
 
 
 # ---------------------------------------------------------------------------
-# Engine
+# Streaming checks
 # ---------------------------------------------------------------------------
 
-def run_naming_check(ctx: BranchContext) -> NamingCheckResult:
-    """
-    Run naming convention checks against a fully-collected BranchContext.
-    Returns issues found and a score (0-100).
-    """
-    issues: list[NamingIssue] = []
-    total_entities = 0
 
-    # ------------------------------------------------------------------
-    # 1. Departments
-    # ------------------------------------------------------------------
-    departments = [
-        d for d in ctx.departments.departments
-    ]
-    total_entities += len(departments)
+class NamingHit(NamedTuple):
+    """A naming issue before it is turned into a ``NamingIssue``.
 
+    The suggested value is ``suggest(suggestArg)`` when ``suggest`` is set,
+    else ``suggestArg`` itself -- so suggestions cost nothing until used.
+    """
+
+    entityType: str
+    entityId: str
+    field: str
+    currentValue: str
+    issueType: str
+    severity: str
+    description: str
+    suggest: Callable[[str], str] | None
+    suggestArg: str
+
+    def suggested(self) -> str:
+        return self.suggest(self.suggestArg) if self.suggest else self.suggestArg
+
+    def to_issue(self) -> NamingIssue:
+        return NamingIssue(
+            entityType=self.entityType,
+            entityId=self.entityId,
+            field=self.field,
+            currentValue=self.currentValue,
+            suggestedValue=self.suggested(),
+            issueType=self.issueType,  # type: ignore[arg-type]
+            severity=self.severity,  # type: ignore[arg-type]
+            description=self.description,
+        )
+
+
+def _department_hits(ctx: BranchContext) -> Iterator[NamingHit]:
     dept_codes: dict[str, list[str]] = defaultdict(list)
 
-    for dept in departments:
+    for dept in ctx.departments.departments:
         # Code format
         if dept.code and not CODE_PATTERN.match(dept.code):
-            issues.append(NamingIssue(
-                entityType="DEPARTMENT",
-                entityId=dept.id,
-                field="code",
-                currentValue=dept.code,
-                suggestedValue=_to_canonical_code(dept.code),
-                issueType="FORMAT",
-                severity="INFO",
-                description=(
-                    f'Department code "{dept.code}" should be '
-                    f"UPPERCASE_SNAKE (e.g., GENERAL_MEDICINE)."
-                ),
-            ))
+            yield NamingHit(
+                "DEPARTMENT", dept.id, "code", dept.code, "FORMAT", "INFO",
+                f'Department code "{dept.code}" should be '
+                f"UPPERCASE_SNAKE (e.g., GENERAL_MEDICINE).",
+                _to_canonical_code, dept.code,
+            )
 
         if not dept.code:
-            issues.append(NamingIssue(
-                entityType="DEPARTMENT",
-                entityId=dept.id,
-                field="code",
-                currentValue="(empty)",
-                suggestedValue=_to_canonical_code(dept.name or "DEPT"),
-                issueType="MISSING",
-                severity="WARNING",
-                description=f'Department "{dept.name}" has no code.',
-            ))
+            yield NamingHit(
+                "DEPARTMENT", dept.id, "code", "(empty)", "MISSING", "WARNING",
+                f'Department "{dept.name}" has no code.',
+                _to_canonical_code, dept.name or "DEPT",
+            )
 
         # Duplicate tracking
         norm = (dept.code or "").upper()
@@ -101,67 +131,41 @@ def run_naming_check(ctx: BranchContext) -> NamingCheckResult:
             dept_codes[norm].append(dept.id)
 
         # Name: starts with lowercase?
-        if dept.name and re.match(r"^[a-z]", dept.name):
-            issues.append(NamingIssue(
-                entityType="DEPARTMENT",
-                entityId=dept.id,
-                field="name",
-                currentValue=dept.name,
-                suggestedValue=_to_title_case(dept.name),
-                issueType="INCONSISTENT",
-                severity="INFO",
-                description=f'Department name "{dept.name}" should use Title Case.',
-            ))
+        if dept.name and _starts_lowercase(dept.name):
+            yield NamingHit(
+                "DEPARTMENT", dept.id, "name", dept.name, "INCONSISTENT", "INFO",
+                f'Department name "{dept.name}" should use Title Case.',
+                _to_title_case, dept.name,
+            )
 
     for code, ids in dept_codes.items():
         if len(ids) > 1:
-            for entity_id in ids:
-                issues.append(NamingIssue(
-                    entityType="DEPARTMENT",
-                    entityId=entity_id,
-                    field="code",
-                    currentValue=code,
-                    suggestedValue=f"{code}_{ids.index(entity_id) + 1}",
-                    issueType="DUPLICATE",
-                    severity="WARNING",
-                    description=(
-                        f'Duplicate department code "{code}" shared '
-                        f"by {len(ids)} departments."
-                    ),
-                ))
+            for n, entity_id in enumerate(ids, 1):
+                yield NamingHit(
+                    "DEPARTMENT", entity_id, "code", code, "DUPLICATE", "WARNING",
+                    f'Duplicate department code "{code}" shared '
+                    f"by {len(ids)} departments.",
+                    None, f"{code}_{n}",
+                )
 
-    # ------------------------------------------------------------------
-    # 2. Units
-    # ------------------------------------------------------------------
-    units = ctx.units.units
-    total_entities += len(units)
 
+def _unit_hits(ctx: BranchContext) -> Iterator[NamingHit]:
     unit_codes: dict[str, list[str]] = defaultdict(list)
 
-    for unit in units:
+    for unit in ctx.units.units:
         if unit.code and not CODE_PATTERN.match(unit.code):
-            issues.append(NamingIssue(
-                entityType="UNIT",
-                entityId=unit.id,
-                field="code",
-                currentValue=unit.code,
-                suggestedValue=_to_canonical_code(unit.code),
-                issueType="FORMAT",
-                severity="INFO",
-                description=f'Unit code "{unit.code}" should be UPPERCASE_SNAKE.',
-            ))
+            yield NamingHit(
+                "UNIT", unit.id, "code", unit.code, "FORMAT", "INFO",
+                f'Unit code "{unit.code}" should be UPPERCASE_SNAKE.',
+                _to_canonical_code, unit.code,
+            )
 
         if not unit.code:
-            issues.append(NamingIssue(
-                entityType="UNIT",
-                entityId=unit.id,
-                field="code",
-                currentValue="(empty)",
-                suggestedValue=_to_canonical_code(unit.name or "UNIT"),
-                issueType="MISSING",
-                severity="WARNING",
-                description=f'Unit "{unit.name}" has no code.',
-            ))
+            yield NamingHit(
+                "UNIT", unit.id, "code", "(empty)", "MISSING", "WARNING",
+                f'Unit "{unit.name}" has no code.',
+                _to_canonical_code, unit.name or "UNIT",
+            )
 
         norm = (unit.code or "").upper()
         if norm:
@@ -169,152 +173,182 @@ def run_naming_check(ctx: BranchContext) -> NamingCheckResult:
 
     for code, ids in unit_codes.items():
         if len(ids) > 1:
-            issues.append(NamingIssue(
-                entityType="UNIT",
-                entityId=ids[0],
-                field="code",
-                currentValue=code,
-                suggestedValue=code,
-                issueType="DUPLICATE",
-                severity="WARNING",
-                description=f'Duplicate unit code "{code}" ({len(ids)} units).',
-            ))
+            yield NamingHit(
+                "UNIT", ids[0], "code", code, "DUPLICATE", "WARNING",
+                f'Duplicate unit code "{code}" ({len(ids)} units).',
+                None, code,
+            )
+
+
+def _room_hits(ctx: BranchContext) -> Iterator[NamingHit]:
+    # Duplicate room codes are bucketed per unit: unit id -> code -> count
+    rooms_by_unit: dict[str, dict[str, int]] = {}
+
+    for room, unit in ctx.index.rooms:
+        room_code = room.code or None
+        if room_code and _WHITESPACE.search(room_code):
+            yield NamingHit(
+                "UNIT_ROOM", room.id, "code", room_code, "FORMAT", "INFO",
+                f'Room code "{room_code}" contains spaces.',
+                _to_canonical_code, room_code,
+            )
 
-    # ------------------------------------------------------------------
-    # 3. Rooms  (first 500 from context)
-    # ------------------------------------------------------------------
-    rooms: list[tuple[str, str | None, str | None, str]] = []  # (id, code, name, unitId)
-    for unit in ctx.units.units:
-        for room in unit.rooms[:500]:
-            rooms.append((room.id, room.code if room.code else None, room.name if room.name else None, unit.id))
-        if len(rooms) >= 500:
-            rooms = rooms[:500]
-            break
-    total_entities += len(rooms)
-
-    # Check for spaces in room codes
-    for room_id, room_code, room_name, unit_id in rooms:
-        if room_code and re.search(r"\s", room_code):
-            issues.append(NamingIssue(
-                entityType="UNIT_ROOM",
-                entityId=room_id,
-                field="code",
-                currentValue=room_code,
-                suggestedValue=_to_canonical_code(room_code),
-                issueType="FORMAT",
-                severity="INFO",
-                description=f'Room code "{room_code}" contains spaces.',
-            ))
-
-        if not room_code:
-            issues.append(NamingIssue(
-                entityType="UNIT_ROOM",
-                entityId=room_id,
-                field="code",
-                currentValue="(empty)",
-                suggestedValue=_to_canonical_code(room_name or "ROOM"),
-                issueType="MISSING",
-                severity="WARNING",
-                description=f'Room "{room_name}" has no code.',
-            ))
-
-    # Duplicate room codes within same unit
-    rooms_by_unit: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
-    for room_id, room_code, room_name, unit_id in rooms:
         if not room_code:
+            room_name = room.name or None
+            yield NamingHit(
+                "UNIT_ROOM", room.id, "code", "(empty)", "MISSING", "WARNING",
+                f'Room "{room_name}" has no code.',
+                _to_canonical_code, room_name or "ROOM",
+            )
             continue
+
+        code_map = rooms_by_unit.get(unit.id)
+        if code_map is None:
+            code_map = rooms_by_unit[unit.id] = {}
         norm = room_code.upper()
-        rooms_by_unit[unit_id][norm] += 1
+        code_map[norm] = code_map.get(norm, 0) + 1
 
-    for _unit_id, code_map in rooms_by_unit.items():
+    for code_map in rooms_by_unit.values():
         for code, count in code_map.items():
             if count > 1:
-                issues.append(NamingIssue(
-                    entityType="UNIT_ROOM",
-                    entityId="",
-                    field="code",
-                    currentValue=code,
-                    suggestedValue=code,
-                    issueType="DUPLICATE",
-                    severity="WARNING",
-                    description=(
-                        f'Duplicate room code "{code}" ({count} rooms) '
-                        f"within the same unit."
-                    ),
-                ))
+                yield NamingHit(
+                    "UNIT_ROOM", "", "code", code, "DUPLICATE", "WARNING",
+                    f'Duplicate room code "{code}" ({count} rooms) '
+                    f"within the same unit.",
+                    None, code,
+                )
+
+
+def _location_hits(ctx: BranchContext) -> Iterator[NamingHit]:
+    # Each node in the (pre-order flattened) tree IS a revision snapshot
+    for flat in ctx.index.nodes:
+        node = flat.node
+        rev_code = node.code
+        if rev_code and not CODE_PATTERN.match(rev_code) and _WHITESPACE.search(rev_code):
+            yield NamingHit(
+                "LOCATION_NODE_REVISION", node.id, "code", rev_code, "FORMAT", "INFO",
+                f'Location code "{rev_code}" contains spaces '
+                f"-- use underscores.",
+                _to_canonical_code, rev_code,
+            )
 
-    # ------------------------------------------------------------------
-    # 4. Resources  (first 500 from context -- gathered from unit resources)
-    # ------------------------------------------------------------------
-    resources: list[tuple[str, str | None, str | None, str]] = []  # (id, code, name, unitId)
-    for unit in ctx.units.units:
-        # Resources are summarized in context; we only have byType/byState
-        # counts -- not individual resource rows with codes. The TS version
-        # queries Prisma directly. In the Python port we work with whatever
-        # the BranchContext provides. Because ResourceSummary does not carry
-        # individual resource codes, we skip per-resource naming checks if
-        # the context lacks them.
-        pass
-    # NOTE: The TypeScript engine queries prisma.unitResource directly to
-    # get individual resource {id, code, name}. In Python the BranchContext
-    # ResourceSummary only has aggregated counts (total, beds, byType, byState).
-    # When individual resource data becomes available in BranchContext, this
-    # section should be uncommented and populated.
-    total_entities += len(resources)
+        if not rev_code:
+            yield NamingHit(
+                "LOCATION_NODE_REVISION", node.id, "code", "(empty)", "MISSING", "WARNING",
+                f"Location revision for node {node.id} has no code.",
+                _to_canonical_code, node.name or "LOC",
+            )
+
+
+# NOTE: The TypeScript engine also queries prisma.unitResource directly to
+# get individual resource {id, code, name}. In Python the BranchContext
+# ResourceSummary only has aggregated counts (total, beds, byType, byState),
+# so UNIT_RESOURCE contributes no entities until the collector carries them.
+_PASSES: tuple[tuple[str, Callable[[BranchContext], Iterator[NamingHit]]], ...] = (
+    ("DEPARTMENT", _department_hits),
+    ("UNIT", _unit_hits),
+    ("UNIT_ROOM", _room_hits),
+    ("LOCATION_NODE_REVISION", _location_hits),
+)
+
+
+def count_entities(ctx: BranchContext) -> dict[str, int]:
+    return {
+        "DEPARTMENT": len(ctx.departments.departments),
+        "UNIT": len(ctx.units.units),
+        "UNIT_ROOM": len(ctx.index.rooms),
+        "UNIT_RESOURCE": 0,
+        "LOCATION_NODE_REVISION": len(ctx.index.nodes),
+    }
+
+
+def iter_naming_hits(
+    ctx: BranchContext,
+    entity_types: Iterable[str] | None = None,
+) -> Iterator[NamingHit]:
+    """Stream every naming issue in the branch, in a stable order."""
+    wanted = set(entity_types) if entity_types is not None else None
+    for entity_type, run_pass in _PASSES:
+        if wanted is None or entity_type in wanted:
+            yield from run_pass(ctx)
 
-    # ------------------------------------------------------------------
-    # 5. Location revision codes
-    # ------------------------------------------------------------------
-    # Walk the location tree and extract revision data
-    loc_revisions: list[tuple[str, str, str | None, str | None]] = []  # (id, nodeId, code, name)
-
-    def _collect_location_nodes(
-        nodes: list,
-        collected: list[tuple[str, str, str | None, str | None]],
-    ) -> None:
-        for node in nodes:
-            # Each node in the tree IS a revision snapshot
-            collected.append((node.id, node.id, node.code, node.name))
-            if node.children:
-                _collect_location_nodes(node.children, collected)
-
-    _collect_location_nodes(ctx.location.tree, loc_revisions)
-    loc_revisions = loc_revisions[:300]
-    total_entities += len(loc_revisions)
-
-    for rev_id, node_id, rev_code, rev_name in loc_revisions:
-        if rev_code and not CODE_PATTERN.match(rev_code) and re.search(r"\s", rev_code):
-            issues.append(NamingIssue(
-                entityType="LOCATION_NODE_REVISION",
-                entityId=rev_id,
-                field="code",
-                currentValue=rev_code,
-                suggestedValue=_to_canonical_code(rev_code),
-                issueType="FORMAT",
-                severity="INFO",
-                description=(
-                    f'Location code "{rev_code}" contains spaces '
-                    f"-- use underscores."
-                ),
-            ))
 
-        if not rev_code:
-            issues.append(NamingIssue(
-                entityType="LOCATION_NODE_REVISION",
-                entityId=rev_id,
-                field="code",
-                currentValue="(empty)",
-                suggestedValue=_to_canonical_code(rev_name or "LOC"),
-                issueType="MISSING",
-                severity="WARNING",
-                description=f"Location revision for node {node_id} has no code.",
-            ))
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+
+
+def _parse_cursor(cursor: str | None) -> int:
+    if not cursor:
+        return 0
+    try:
+        offset = int(cursor)
+    except ValueError:
+        raise ValueError(f"Invalid naming-check cursor: {cursor!r}") from None
+    if offset < 0:
+        raise ValueError(f"Invalid naming-check cursor: {cursor!r}")
+    return offset
+
+
+def _parse_filter(values: Iterable[str] | None, allowed: tuple[str, ...], what: str) -> set[str] | None:
+    if values is None:
+        return None
+    wanted = {v.strip().upper() for v in values if v.strip()}
+    unknown = wanted.difference(allowed)
+    if unknown:
+        raise ValueError(f"Unknown naming-check {what}: {', '.join(sorted(unknown))}")
+    return wanted
+
+
+def run_naming_check(
+    ctx: BranchContext,
+    *,
+    cursor: str | None = None,
+    limit: int | None = None,
+    entity_types: Iterable[str] | None = None,
+    issue_types: Iterable[str] | None = None,
+) -> NamingCheckResult:
+    """
+    Run naming convention checks against a fully-collected BranchContext.
+    Returns issues found and a score (0-100).
+
+    The score and per-type counts always cover every entity.  ``issues``
+    holds one page of the (optionally filtered) issue stream: ``limit``
+    issues starting at ``cursor`` (all of them when ``limit`` is None);
+    ``nextCursor`` resumes after the page.
+    """
+    start = time.perf_counter()
+    offset = _parse_cursor(cursor)
+    type_filter = _parse_filter(entity_types, ENTITY_TYPES, "entity types")
+    issue_filter = _parse_filter(issue_types, ISSUE_TYPES, "issue types")
+    end = None if limit is None else offset + limit
+
+    entities = count_entities(ctx)
+    total_entities = sum(entities.values())
+
+    by_entity: dict[str, int] = {}
+    by_issue: dict[str, int] = {}
+    total_issues = 0
+    matched = 0
+    page: list[NamingIssue] = []
+
+    for hit in iter_naming_hits(ctx):
+        total_issues += 1
+        by_entity[hit.entityType] = by_entity.get(hit.entityType, 0) + 1
+        by_issue[hit.issueType] = by_issue.get(hit.issueType, 0) + 1
+        if type_filter is not None and hit.entityType not in type_filter:
+            continue
+        if issue_filter is not None and hit.issueType not in issue_filter:
+            continue
+        if matched >= offset and (end is None or matched < end):
+            page.append(hit.to_issue())
+        matched += 1
 
     # ------------------------------------------------------------------
     # Score
     # ------------------------------------------------------------------
     if total_entities > 0:
-        score = round(((total_entities - len(issues)) / total_entities) * 100)
+        score = round(((total_entities - total_issues) / total_entities) * 100)
     else:
         score = 100
 
@@ -322,7 +356,13 @@ def run_naming_check(ctx: BranchContext) -> NamingCheckResult:
 
     return NamingCheckResult(
         totalEntities=total_entities,
-        issues=issues,
-        issueCount=len(issues),
+        issues=page,
+        issueCount=total_issues,
         score=score,
+        matchedCount=matched,
+        nextCursor=str(end) if end is not None and end < matched else None,
+        entitiesByType=entities,
+        issuesByEntityType=by_entity,
+        issuesByIssueType=by_issue,
+        durationMs=round((time.perf_counter() - start) * 1000, 3),
     )
@@ -9,233 +9,608 @@ Examples:
   "What's our ICU to total bed ratio?"
 
 The LLM works with pre-collected BranchContext — no direct DB queries.
-Fallback: Without Ollama, uses keyword matching for common questions.
+Only the branch facts retrieved for the question (services/fact_index.py)
+go into the prompt.
+Before the LLM, questions are tried against the keyword intents and the
+aggregate query templates (query_templates.py), which answer exactly and
+instantly; ``nl_coverage`` counts how many questions never reach the LLM.
+Templates that need a database query race a speculative LLM turn instead
+of delaying it: the first answer wins, and a losing LLM turn is aborted
+mid-stream so Ollama is free for other users.
+Fallback: Without Ollama, only those answers are available.
+
+Chat turns pass their ChatSession: the first LLM turn sends the full system
+prompt, later turns continue from the Ollama context stored on the session
+and send only the new question plus any newly retrieved facts (until the
+branch data or model changes, or the conversation outgrows the context
+window).  A fresh prompt in a session carries the conversation so far as
+the session's digest of older turns plus its recent messages, within
+CHAT_HISTORY_TOKENS (chat_digest.py summarises the older turns).
 """
 
 from __future__ import annotations
 
-import json
-import re
+import asyncio
+import contextlib
+import hashlib
+import logging
 import time
-from typing import Any
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable
 
 from src.collectors.models import BranchContext
-from src.services.ollama import OllamaService, ollama_service
+from src.config import NL_RACE_BUDGET_MS, OLLAMA_RESPONSE_RESERVE
+from src.services.chat_session import ChatSession
+from src.services.fact_index import FactHit, fact_index
+from src.services.ollama import OllamaResponse, OllamaService, OllamaStreamChunk, ollama_service
 
+from .intent_matcher import IntentMatcher
 from .models import NLQueryResponse
+from .prompt_builder import Section, default_budget, estimate_tokens, pack_sections
+from .query_templates import QueryPlan, parse_query, run_query
 
+logger = logging.getLogger("ai-copilot.nl-query")
 
-# ── System Prompt ─────────────────────────────────────────────────────────
+FOLLOW_UP_FACTS = 6  # new retrieved facts added to a continued conversation per turn
 
 
-def _build_system_prompt(ctx: BranchContext) -> str:
-    unit_lines = "\n".join(
-        f"{u.name} ({u.typeCode}): {len(u.rooms)} rooms, {u.resources.beds} beds, "
-        f"{'Active' if u.isActive else 'Inactive'}"
-        for u in ctx.units.units
-    )
-    dept_lines = "\n".join(
-        f"{d.name} ({d.code}): {'Has head' if d.hasHead else 'No head'}, {d.staffCount} staff"
-        for d in ctx.departments.departments
-    )
+# ── System Prompt ─────────────────────────────────────────────────────────
+
 
-    return f"""You are a helpful hospital infrastructure assistant for "{ctx.branch.name}".
+def _build_system_prompt(
+    ctx: BranchContext, question: str = "", sections: list[Section] | None = None, history: str = ""
+) -> str:
+    header = f"""You are a helpful hospital infrastructure assistant for "{ctx.branch.name}".
 You answer questions about the hospital's configuration using ONLY the data provided below.
 If the data doesn't contain the answer, say "I don't have that information in the current context."
 
 Be concise, specific, and use actual numbers from the data. Don't make up data.
+Tables are pipe-separated with a header row; "(+N more not shown)" marks rows left out."""
+    footer = "Answer the user's question in 1-3 sentences. Be direct and helpful."
+
+    if sections is None:
+        sections = _context_sections(ctx)
+    packed = pack_sections(sections, question, default_budget(header, footer, question, history))
+    logger.debug(
+        "NL prompt context: %d/%d tokens, %d rows kept, %d dropped",
+        packed.tokens, packed.budget, packed.rows_included, packed.rows_dropped,
+    )
+    return f"{header}\n\n{packed.text}\n\n{footer}"
+
+
+def _context_sections(ctx: BranchContext) -> list[Section]:
+    ix = ctx.index
 
-HOSPITAL DATA:
-{ctx.textSummary}
+    summary = Section("HOSPITAL DATA", priority=10)
+    for line in ctx.textSummary.splitlines():
+        if line.strip():
+            summary.add(line)
 
-DETAILED UNIT DATA:
-{json.dumps(ctx.units.byType, indent=2)}
+    unit_types = Section(
+        "UNIT TYPES (active)",
+        columns=("type", "name", "units", "rooms", "beds"),
+        priority=6,
+        tags=frozenset({"unit", "type", "bed", "room", "ward", "icu"}),
+    )
+    for type_code, units in ix.active_units_by_type.items():
+        unit_types.add(
+            type_code,
+            units[0].typeName or type_code,
+            len(units),
+            sum(len(u.rooms) for u in units),
+            sum(u.resources.beds for u in units),
+            tags=(type_code.lower(),),
+        )
+
+    location = Section(
+        "LOCATION",
+        priority=5,
+        tags=frozenset({"location", "fire", "zone", "exit", "floor", "building", "node"}),
+    )
+    location.add(
+        f"{ctx.location.totalNodes} nodes. "
+        f"Fire zones: {'Yes' if ctx.location.hasFireZones else 'No'}. "
+        f"Emergency exits: {'Yes' if ctx.location.hasEmergencyExits else 'No'}.",
+        tags=("fire", "exit", "emergency", "location"),
+    )
+
+    units = Section(
+        "UNITS",
+        columns=("name", "type", "rooms", "beds", "active", "department"),
+        tags=frozenset({"unit", "ward", "room", "bed", "inactive", "active"}),
+    )
+    for u in ctx.units.units:
+        units.add(
+            u.name, u.typeCode, len(u.rooms), u.resources.beds, u.isActive, u.departmentName,
+            tags=(u.typeCode.lower(), "active" if u.isActive else "inactive"),
+        )
+
+    departments = Section(
+        "DEPARTMENTS",
+        columns=("name", "code", "head", "staff"),
+        tags=frozenset({"department", "head", "hod", "staff"}),
+    )
+    for d in ctx.departments.departments:
+        departments.add(
+            d.name, d.code, d.hasHead, d.staffCount,
+            tags=("head",) if not d.hasHead else (),
+        )
 
-Units: {unit_lines}
+    return [summary, unit_types, location, units, departments]
 
-Departments: {dept_lines}
 
-Location: {ctx.location.totalNodes} nodes. Fire zones: {"Yes" if ctx.location.hasFireZones else "No"}. Emergency exits: {"Yes" if ctx.location.hasEmergencyExits else "No"}.
+# ── Retrieval & conversation context ──────────────────────────────────────────────────
 
-Answer the user's question in 1-3 sentences. Be direct and helpful."""
+
+def _fact_sections(hits: list[FactHit]) -> list[Section]:
+    relevant = Section("RELEVANT DATA")
+    for hit in hits:
+        relevant.add(hit.fact.text, boost=10 * hit.score)
+    return [relevant]
+
+
+def _conversation_key(model: str, fingerprint: str) -> str:
+    """Key of the model and branch facts a stored Ollama context was built on."""
+    return hashlib.sha1(f"{model}\n{fingerprint}".encode()).hexdigest()
+
+
+@dataclass
+class _Turn:
+    system: str | None  # None when continuing the session's Ollama context
+    prompt: str
+    context: list[int] | None
+    key: str  # conversation key; "" without a session
+    facts: list[str]  # fact texts this turn puts in front of the model
+
+
+async def _prepare_turn(
+    question: str, ctx: BranchContext, svc: OllamaService, session: ChatSession | None
+) -> _Turn:
+    """Retrieve the facts for *question* and decide between a fresh prompt and a continuation."""
+    retrieval = await fact_index.retrieve(ctx, question, svc=svc)
+    facts = [h.fact.text for h in retrieval.hits]
+    logger.debug(
+        "Retrieved %d facts via %s in %.1f ms", len(facts), retrieval.embedder, retrieval.duration_ms
+    )
+
+    key = _conversation_key(svc.model, retrieval.fingerprint) if session is not None else ""
+    context = session.conversation_context(key) if session is not None else None
+    if context:
+        new = [t for t in facts if t not in session.llm_facts][:FOLLOW_UP_FACTS]  # type: ignore[union-attr]
+        prompt = "More data:\n" + "\n".join(new) + f"\n\nQuestion: {question}" if new else question
+        if len(context) + estimate_tokens(prompt) + OLLAMA_RESPONSE_RESERVE <= svc.context_window:
+            return _Turn(None, prompt, context, key, new)
+        session.reset_context()  # type: ignore[union-attr]  # outgrew the window: start over
+
+    # Fresh prompt: the conversation so far goes along as digest + recent messages.
+    history = session.get_history_text(question) if session is not None else ""
+    prompt = f"Conversation so far:\n{history}\n\nQuestion: {question}" if history else question
+    sections = _fact_sections(retrieval.hits) if retrieval.hits else _context_sections(ctx)
+    return _Turn(_build_system_prompt(ctx, question, sections, history), prompt, None, key, facts)
 
 
 # ── Keyword-based fallback ────────────────────────────────────────────────
 
 ICU_TYPE_CODES = {"ICU", "HDU", "CCU", "NICU", "PICU"}
 
+# Priority order matters: the first intent whose pattern occurs wins.
+_INTENTS = IntentMatcher([
+    ("beds", r"how many\s+beds|total\s+beds|bed\s+count|number of beds"),
+    ("rooms", r"how many\s+rooms|total\s+rooms|room\s+count"),
+    ("department_heads", r"department.*head|head.*department|departments?\s+without.*head|who.*head"),
+    ("icu_ratio", r"icu.*ratio|ratio.*icu|icu.*percent|percent.*icu"),
+    ("fire_zones", r"fire.*zone|zone.*fire|fire.*safety"),
+    ("emergency_exits", r"emergency.*exit|exit.*emergency"),
+    ("empty_units", r"units?\s+(without|no)\s+(rooms?|beds?)|empty\s+units?"),
+    ("location", r"location|campus|building|floor|where|layout"),
+    ("summary", r"summary|overview|status|how.*branch|tell me about|what do we have"),
+])
+
 
 def _keyword_answer(question: str, ctx: BranchContext) -> NLQueryResponse | None:
-    q = question.lower().strip()
+    return _intent_answer(_INTENTS.match(question.lower().strip()), ctx)
+
+
+def _intent_answer(intent: str | None, ctx: BranchContext) -> NLQueryResponse | None:
     start = time.time()
+    if intent is None:
+        return None  # No keyword match
+    # Aggregates are computed by the matched intent only (shared via ctx.index).
+    result = _KEYWORD_ANSWERS[intent](ctx)
+    result.durationMs = int((time.time() - start) * 1000)
+    return result
+
+
+def _answer_beds(ctx: BranchContext) -> NLQueryResponse:
+    ix = ctx.index
+    breakdown_parts = []
+    for k, v in ctx.units.byType.items():
+        if v.get("count", 0) > 0:
+            type_beds = sum(u.resources.beds for u in ix.active_units_by_type.get(k.upper(), []))
+            breakdown_parts.append(f"{k}: {type_beds} beds")
+    breakdown = ", ".join(breakdown_parts)
 
-    total_beds = sum(u.resources.beds for u in ctx.units.units)
-    total_rooms = sum(len(u.rooms) for u in ctx.units.units)
+    return NLQueryResponse(
+        answer=f"You have {ix.total_beds} beds across {ctx.units.activeUnits} active units. Breakdown: {breakdown}.",
+        source="keyword_match",
+        data={"totalBeds": ix.total_beds, "byType": ctx.units.byType},
+        followUp=[
+            "What's our ICU to total bed ratio?",
+            "Which units have no beds?",
+            "What's the occupancy?",
+        ],
+    )
 
-    def ms() -> int:
-        return int((time.time() - start) * 1000)
 
-    # Bed count questions
-    if re.search(r"how many\s+beds|total\s+beds|bed\s+count|number of beds", q):
-        breakdown_parts = []
-        for k, v in ctx.units.byType.items():
-            if v.get("count", 0) > 0:
-                type_beds = sum(
-                    u.resources.beds
-                    for u in ctx.units.units
-                    if u.typeCode == k and u.isActive
-                )
-                breakdown_parts.append(f"{k}: {type_beds} beds")
-        breakdown = ", ".join(breakdown_parts)
+def _answer_rooms(ctx: BranchContext) -> NLQueryResponse:
+    total_rooms = len(ctx.index.rooms)
+    return NLQueryResponse(
+        answer=f"You have {total_rooms} active rooms across {ctx.units.activeUnits} units.",
+        source="keyword_match",
+        data={"totalRooms": total_rooms},
+        followUp=["Which units have no rooms?", "How many consultation rooms?"],
+    )
 
-        return NLQueryResponse(
-            answer=f"You have {total_beds} beds across {ctx.units.activeUnits} active units. Breakdown: {breakdown}.",
-            source="keyword_match",
-            data={"totalBeds": total_beds, "byType": ctx.units.byType},
-            followUp=[
-                "What's our ICU to total bed ratio?",
-                "Which units have no beds?",
-                "What's the occupancy?",
-            ],
-            durationMs=ms(),
-        )
 
-    # Room count
-    if re.search(r"how many\s+rooms|total\s+rooms|room\s+count", q):
+def _answer_department_heads(ctx: BranchContext) -> NLQueryResponse:
+    no_head = [d for d in ctx.departments.departments if not d.hasHead]
+    if not no_head:
         return NLQueryResponse(
-            answer=f"You have {total_rooms} active rooms across {ctx.units.activeUnits} units.",
+            answer=f"All {ctx.departments.total} departments have designated heads.",
             source="keyword_match",
-            data={"totalRooms": total_rooms},
-            followUp=["Which units have no rooms?", "How many consultation rooms?"],
-            durationMs=ms(),
+            data={"allHaveHeads": True},
         )
+    names = ", ".join(d.name for d in no_head)
+    return NLQueryResponse(
+        answer=f"{len(no_head)} out of {ctx.departments.total} departments don't have a head: {names}.",
+        source="keyword_match",
+        data={"departmentsWithoutHead": [d.model_dump() for d in no_head]},
+        followUp=["How many staff in each department?"],
+    )
 
-    # Department heads
-    if re.search(r"department.*head|head.*department|departments?\s+without.*head|who.*head", q):
-        no_head = [d for d in ctx.departments.departments if not d.hasHead]
-        if not no_head:
-            return NLQueryResponse(
-                answer=f"All {ctx.departments.total} departments have designated heads.",
-                source="keyword_match",
-                data={"allHaveHeads": True},
-                durationMs=ms(),
-            )
-        names = ", ".join(d.name for d in no_head)
-        return NLQueryResponse(
-            answer=f"{len(no_head)} out of {ctx.departments.total} departments don't have a head: {names}.",
-            source="keyword_match",
-            data={"departmentsWithoutHead": [d.model_dump() for d in no_head]},
-            followUp=["How many staff in each department?"],
-            durationMs=ms(),
-        )
 
-    # ICU ratio
-    if re.search(r"icu.*ratio|ratio.*icu|icu.*percent|percent.*icu", q):
-        icu_beds = sum(
-            u.resources.beds
-            for u in ctx.units.units
-            if u.typeCode in ICU_TYPE_CODES and u.isActive
-        )
-        ratio = f"{(icu_beds / total_beds * 100):.1f}" if total_beds > 0 else "0"
-        return NLQueryResponse(
-            answer=f"ICU beds: {icu_beds} out of {total_beds} total ({ratio}%). NABH recommends 10-15% for hospitals with 50+ beds.",
-            source="keyword_match",
-            data={"icuBeds": icu_beds, "totalBeds": total_beds, "ratio": ratio},
-            followUp=[
-                "How many ventilators do we have?",
-                "Are all ICU rooms equipped with oxygen?",
-            ],
-            durationMs=ms(),
-        )
+def _answer_icu_ratio(ctx: BranchContext) -> NLQueryResponse:
+    ix = ctx.index
+    total_beds = ix.total_beds
+    icu_beds = sum(
+        u.resources.beds
+        for code in ICU_TYPE_CODES
+        for u in ix.active_units_by_type.get(code, [])
+    )
+    ratio = f"{(icu_beds / total_beds * 100):.1f}" if total_beds > 0 else "0"
+    return NLQueryResponse(
+        answer=f"ICU beds: {icu_beds} out of {total_beds} total ({ratio}%). NABH recommends 10-15% for hospitals with 50+ beds.",
+        source="keyword_match",
+        data={"icuBeds": icu_beds, "totalBeds": total_beds, "ratio": ratio},
+        followUp=[
+            "How many ventilators do we have?",
+            "Are all ICU rooms equipped with oxygen?",
+        ],
+    )
 
-    # Fire zones
-    if re.search(r"fire.*zone|zone.*fire|fire.*safety", q):
-        if ctx.location.hasFireZones:
-            answer = f"Yes, fire zones are mapped in the location tree across {ctx.location.totalNodes} location nodes."
-        else:
-            answer = "No fire zones mapped yet. Fire zone designation is needed on Building and Floor nodes for NABH compliance."
-        return NLQueryResponse(
-            answer=answer,
-            source="keyword_match",
-            data={"hasFireZones": ctx.location.hasFireZones},
-            followUp=["Are emergency exits marked?", "Is wheelchair access available?"],
-            durationMs=ms(),
-        )
 
-    # Emergency exits
-    if re.search(r"emergency.*exit|exit.*emergency", q):
-        if ctx.location.hasEmergencyExits:
-            answer = "Yes, emergency exits are marked in the location tree."
-        else:
-            answer = "No emergency exits marked yet. Mark at least one per floor for fire safety compliance."
-        return NLQueryResponse(
-            answer=answer,
-            source="keyword_match",
-            data={"hasEmergencyExits": ctx.location.hasEmergencyExits},
-            durationMs=ms(),
-        )
+def _answer_fire_zones(ctx: BranchContext) -> NLQueryResponse:
+    if ctx.location.hasFireZones:
+        answer = f"Yes, fire zones are mapped in the location tree across {ctx.location.totalNodes} location nodes."
+    else:
+        answer = "No fire zones mapped yet. Fire zone designation is needed on Building and Floor nodes for NABH compliance."
+    return NLQueryResponse(
+        answer=answer,
+        source="keyword_match",
+        data={"hasFireZones": ctx.location.hasFireZones},
+        followUp=["Are emergency exits marked?", "Is wheelchair access available?"],
+    )
+
 
-    # Units without rooms/beds
-    if re.search(r"units?\s+(without|no)\s+(rooms?|beds?)|empty\s+units?", q):
-        no_rooms = [u for u in ctx.units.units if u.isActive and len(u.rooms) == 0]
-        no_beds = [u for u in ctx.units.units if u.isActive and u.resources.beds == 0]
-        no_rooms_names = ", ".join(u.name for u in no_rooms) or "None"
-        no_beds_names = ", ".join(u.name for u in no_beds) or "None"
+def _answer_emergency_exits(ctx: BranchContext) -> NLQueryResponse:
+    if ctx.location.hasEmergencyExits:
+        answer = "Yes, emergency exits are marked in the location tree."
+    else:
+        answer = "No emergency exits marked yet. Mark at least one per floor for fire safety compliance."
+    return NLQueryResponse(
+        answer=answer,
+        source="keyword_match",
+        data={"hasEmergencyExits": ctx.location.hasEmergencyExits},
+    )
+
+
+def _answer_empty_units(ctx: BranchContext) -> NLQueryResponse:
+    active = ctx.index.active_units
+    no_rooms = [u for u in active if len(u.rooms) == 0]
+    no_beds = [u for u in active if u.resources.beds == 0]
+    no_rooms_names = ", ".join(u.name for u in no_rooms) or "None"
+    no_beds_names = ", ".join(u.name for u in no_beds) or "None"
+    return NLQueryResponse(
+        answer=(
+            f"{len(no_rooms)} active unit(s) without rooms: {no_rooms_names}. "
+            f"{len(no_beds)} active unit(s) without beds: {no_beds_names}."
+        ),
+        source="keyword_match",
+        data={
+            "unitsWithoutRooms": [u.name for u in no_rooms],
+            "unitsWithoutBeds": [u.name for u in no_beds],
+        },
+    )
+
+
+def _answer_location(ctx: BranchContext) -> NLQueryResponse:
+    if ctx.location.totalNodes == 0:
         return NLQueryResponse(
-            answer=(
-                f"{len(no_rooms)} active unit(s) without rooms: {no_rooms_names}. "
-                f"{len(no_beds)} active unit(s) without beds: {no_beds_names}."
-            ),
+            answer="No location hierarchy set up yet. Create a Campus -> Building -> Floor structure.",
             source="keyword_match",
-            data={
-                "unitsWithoutRooms": [u.name for u in no_rooms],
-                "unitsWithoutBeds": [u.name for u in no_beds],
-            },
-            durationMs=ms(),
         )
+    kinds = ", ".join(f"{v} {k.lower()}" for k, v in ctx.location.byKind.items())
+    fz = "Y" if ctx.location.hasFireZones else "N"
+    ee = "Y" if ctx.location.hasEmergencyExits else "N"
+    wa = "Y" if ctx.location.hasWheelchairAccess else "N"
+    return NLQueryResponse(
+        answer=(
+            f"Location hierarchy: {ctx.location.totalNodes} nodes ({kinds}). "
+            f"Fire zones: {fz}, Emergency exits: {ee}, Wheelchair access: {wa}."
+        ),
+        source="keyword_match",
+        data={"location": ctx.location.byKind},
+    )
+
+
+def _answer_summary(ctx: BranchContext) -> NLQueryResponse:
+    return NLQueryResponse(
+        answer=ctx.textSummary,
+        source="keyword_match",
+        data={
+            "bedCount": ctx.index.total_beds,
+            "rooms": len(ctx.index.rooms),
+            "units": ctx.units.activeUnits,
+            "departments": ctx.departments.total,
+        },
+        followUp=[
+            "Which departments don't have a head?",
+            "What's our ICU to bed ratio?",
+            "Are there units without beds?",
+        ],
+    )
+
+
+_KEYWORD_ANSWERS: dict[str, Callable[[BranchContext], NLQueryResponse]] = {
+    "beds": _answer_beds,
+    "rooms": _answer_rooms,
+    "department_heads": _answer_department_heads,
+    "icu_ratio": _answer_icu_ratio,
+    "fire_zones": _answer_fire_zones,
+    "emergency_exits": _answer_emergency_exits,
+    "empty_units": _answer_empty_units,
+    "location": _answer_location,
+    "summary": _answer_summary,
+}
+
+
+# ── Local answers (keyword intents + query templates) ─────────────────────
+
+# Keyword intents that only report a branch-wide total; a template with
+# filters or a group-by ("how many rooms with oxygen in ICU") answers better.
+_TOTAL_INTENTS = frozenset({"beds", "rooms"})
+
+
+class NLCoverage:
+    """How NL questions were answered, and the share that never reached the LLM."""
+
+    ROUTES = ("keyword", "template", "llm", "offline")
 
-    # Location summary
-    if re.search(r"location|campus|building|floor|where|layout", q):
-        if ctx.location.totalNodes == 0:
-            return NLQueryResponse(
-                answer="No location hierarchy set up yet. Create a Campus -> Building -> Floor structure.",
-                source="keyword_match",
-                durationMs=ms(),
+    def __init__(self) -> None:
+        self.counts: Counter[str] = Counter()
+        self.llm_cancelled = 0  # speculative LLM turns aborted by a local answer
+
+    def record(self, route: str) -> None:
+        self.counts[route] += 1
+
+    def stats(self) -> dict[str, Any]:
+        total = sum(self.counts.values())
+        local = self.counts["keyword"] + self.counts["template"]
+        return {
+            "questions": total,
+            **{route: self.counts[route] for route in self.ROUTES},
+            "coverage": round(local / total, 3) if total else None,
+            "llmCancelled": self.llm_cancelled,
+        }
+
+
+# Singleton
+nl_coverage = NLCoverage()
+
+
+@dataclass(slots=True)
+class _Route:
+    intent: str | None
+    plan: QueryPlan | None
+
+
+def _route(question: str, ctx: BranchContext) -> _Route:
+    intent = _INTENTS.match(question.lower().strip())
+    plan = None
+    if intent is None or intent in _TOTAL_INTENTS:
+        plan = parse_query(question, ctx)
+        if plan is not None and intent is not None and not plan.specific:
+            plan = None
+    return _Route(intent, plan)
+
+
+async def _local_answer(route: _Route, ctx: BranchContext) -> NLQueryResponse | None:
+    """Exact answer from a keyword intent or a query template; ``None`` needs the LLM."""
+    if route.plan is not None:
+        result = await run_query(route.plan, ctx)
+        if result is not None:
+            nl_coverage.record("template")
+            return result
+    if route.intent is not None:
+        nl_coverage.record("keyword")
+    return _intent_answer(route.intent, ctx)
+
+
+# ── LLM turns & racing ────────────────────────────────────────────────────
+
+
+class _Generation:
+    """One LLM turn (retrieval + streamed generation) running in its own task.
+
+    Chunks are queued as they arrive, so the turn can start speculatively
+    and be read later.  ``cancel()`` cancels the task inside
+    ``generate_stream``, which closes the HTTP response mid-stream: Ollama
+    stops generating and the scheduler slot is released.
+    """
+
+    def __init__(
+        self, question: str, ctx: BranchContext, svc: OllamaService, session: ChatSession | None
+    ) -> None:
+        self.turn: _Turn | None = None
+        self.final: OllamaResponse | None = None  # set with the ``done`` chunk
+        self._queue: asyncio.Queue[OllamaStreamChunk] = asyncio.Queue()
+        self.task = asyncio.create_task(self._run(question, ctx, svc, session))
+
+    async def _run(
+        self, question: str, ctx: BranchContext, svc: OllamaService, session: ChatSession | None
+    ) -> None:
+        try:
+            self.turn = turn = await _prepare_turn(question, ctx, svc, session)
+            stream = svc.generate_stream(
+                turn.prompt, turn.system, temperature=0.2,
+                context=turn.context, keep_alive=session.keep_alive if session else None,
             )
-        kinds = ", ".join(f"{v} {k.lower()}" for k, v in ctx.location.byKind.items())
-        fz = "Y" if ctx.location.hasFireZones else "N"
-        ee = "Y" if ctx.location.hasEmergencyExits else "N"
-        wa = "Y" if ctx.location.hasWheelchairAccess else "N"
-        return NLQueryResponse(
-            answer=(
-                f"Location hierarchy: {ctx.location.totalNodes} nodes ({kinds}). "
-                f"Fire zones: {fz}, Emergency exits: {ee}, Wheelchair access: {wa}."
-            ),
-            source="keyword_match",
-            data={"location": ctx.location.byKind},
-            durationMs=ms(),
-        )
+            async with contextlib.aclosing(stream):
+                async for chunk in stream:
+                    if chunk.done:
+                        self.final = chunk.final
+                    self._queue.put_nowait(chunk)
+        except Exception as exc:
+            logger.warning("NL LLM turn failed: %s", exc)
+            self.final = OllamaResponse(available=True, model=svc.model, error=f"LLM turn failed: {exc}")
+            self._queue.put_nowait(OllamaStreamChunk(done=True, final=self.final))
+
+    @property
+    def answered(self) -> bool:
+        """True once the turn has finished with an answer (not an error or a busy scheduler)."""
+        final = self.final
+        return final is not None and final.available and not final.busy and final.error is None
+
+    async def chunks(self) -> AsyncIterator[OllamaStreamChunk]:
+        """Every chunk of the turn, buffered ones first, ending with the ``done`` chunk."""
+        while True:
+            chunk = await self._queue.get()
+            yield chunk
+            if chunk.done:
+                return
+
+    async def result(self) -> OllamaResponse:
+        async for chunk in self.chunks():
+            if chunk.done:
+                return chunk.final  # type: ignore[return-value]
+        raise AssertionError("unreachable")
+
+    async def cancel(self) -> bool:
+        """Abort the turn; True if it was still running."""
+        if self.task.done():
+            return False
+        self.task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self.task
+        return True
+
+
+async def _race(local: _Route, ctx: BranchContext, llm: _Generation, budget: float) -> NLQueryResponse | None:
+    """The local answer if it lands within *budget* seconds and before the LLM answers.
+
+    An LLM turn that ends in an error or a busy scheduler doesn't win: the
+    local answer still gets the rest of the budget.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + budget
+    local_task = asyncio.create_task(_local_answer(local, ctx))
+    waiting = {local_task, llm.task}
+    try:
+        while not local_task.done() and (remaining := deadline - loop.time()) > 0:
+            await asyncio.wait(waiting, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            if llm.task in waiting and llm.task.done():
+                if llm.answered:
+                    break
+                waiting = {local_task}
+    finally:
+        # Checked after the wait, not from its result: a local answer that
+        # landed while the loop was busy still counts.
+        if not local_task.done():
+            local_task.cancel()
+    if not local_task.done() or local_task.cancelled():
+        return None  # over budget, or the LLM answered first
+    if local_task.exception() is not None:
+        logger.warning("Local NL answer failed: %s", local_task.exception())
+        return None
+    result = local_task.result()
+    if result is not None and await llm.cancel():
+        nl_coverage.llm_cancelled += 1
+    return result
+
+
+async def _answer(
+    question: str, ctx: BranchContext, svc: OllamaService, session: ChatSession | None
+) -> NLQueryResponse | _Generation | None:
+    """A local answer, else the LLM turn to read (``None`` when Ollama is down)."""
+    route = _route(question, ctx)
+    llm: _Generation | None = None
+    if route.plan is not None and route.plan.needs_db and svc.available and NL_RACE_BUDGET_MS > 0:
+        # The database round trip isn't free: start the LLM alongside it.
+        llm = _Generation(question, ctx, svc, session)
+        try:
+            local = await _race(route, ctx, llm, NL_RACE_BUDGET_MS / 1000)
+        except BaseException:
+            await llm.cancel()
+            raise
+    else:
+        local = await _local_answer(route, ctx)
+    if local is not None:
+        return local
+    if llm is None:
+        if not svc.available:
+            nl_coverage.record("offline")
+            return None
+        llm = _Generation(question, ctx, svc, session)
+    nl_coverage.record("llm")
+    return llm
+
+
+# ── Canned responses ──────────────────────────────────────────────────────
+
+
+_OLLAMA_FOLLOW_UP = [
+    "How many beds do we have?",
+    "Are all locations fire zone mapped?",
+    "Which units need attention?",
+]
+
+
+def _offline_response(duration_ms: int) -> NLQueryResponse:
+    return NLQueryResponse(
+        answer=(
+            "I can answer common questions about beds, rooms, departments, ICU ratios, "
+            "fire zones, and location layout. For more complex questions, install Ollama "
+            'for AI-powered answers. Try: "How many beds do we have?"'
+        ),
+        source="keyword_match",
+        followUp=[
+            "How many beds do we have?",
+            "Which departments don't have a head?",
+            "What's our ICU ratio?",
+            "Give me a summary",
+        ],
+        durationMs=duration_ms,
+    )
 
-    # Branch summary / overview
-    if re.search(r"summary|overview|status|how.*branch|tell me about|what do we have", q):
-        return NLQueryResponse(
-            answer=ctx.textSummary,
-            source="keyword_match",
-            data={
-                "bedCount": total_beds,
-                "rooms": total_rooms,
-                "units": ctx.units.activeUnits,
-                "departments": ctx.departments.total,
-            },
-            followUp=[
-                "Which departments don't have a head?",
-                "What's our ICU to bed ratio?",
-                "Are there units without beds?",
-            ],
-            durationMs=ms(),
-        )
 
-    return None  # No keyword match
+def _failed_response(error: str | None, duration_ms: int) -> NLQueryResponse:
+    return NLQueryResponse(
+        answer='Unable to process your question right now. Try a simpler question like "How many beds do we have?"',
+        source="keyword_match",
+        error=error,
+        durationMs=duration_ms,
+    )
 
 
 # ── Engine ────────────────────────────────────────────────────────────────
@@ -245,55 +620,96 @@ async def run_nl_query(
     question: str,
     branch_context: BranchContext,
     ollama: OllamaService | None = None,
+    session: ChatSession | None = None,
 ) -> NLQueryResponse:
-    """Answer a natural language question about infrastructure data."""
+    """Answer a natural language question about infrastructure data.
+
+    With a *session*, follow-up LLM turns continue the session's Ollama
+    context instead of re-sending the system prompt.
+    """
     svc = ollama or ollama_service
     start = time.time()
 
-    # Try keyword match first (instant)
-    keyword_result = _keyword_answer(question, branch_context)
-    if keyword_result:
-        return keyword_result
-
     def ms() -> int:
         return int((time.time() - start) * 1000)
 
-    # Fall back to Ollama
-    if not svc.available:
-        return NLQueryResponse(
-            answer=(
-                "I can answer common questions about beds, rooms, departments, ICU ratios, "
-                "fire zones, and location layout. For more complex questions, install Ollama "
-                'for AI-powered answers. Try: "How many beds do we have?"'
-            ),
-            source="keyword_match",
-            followUp=[
-                "How many beds do we have?",
-                "Which departments don't have a head?",
-                "What's our ICU ratio?",
-                "Give me a summary",
-            ],
-            durationMs=ms(),
-        )
+    # Keyword intents and query templates first (exact, no LLM), else Ollama
+    outcome = await _answer(question, branch_context, svc, session)
+    if isinstance(outcome, NLQueryResponse):
+        return outcome
+    if outcome is None:
+        return _offline_response(ms())
 
-    system_prompt = _build_system_prompt(branch_context)
-    response = await svc.generate_text(system_prompt, question, temperature=0.2)
+    try:
+        final = await outcome.result()
+    finally:
+        await outcome.cancel()  # no-op once finished; aborts Ollama if we were cancelled
 
-    if not response.get("available") or not response.get("text"):
-        return NLQueryResponse(
-            answer='Unable to process your question right now. Try a simpler question like "How many beds do we have?"',
-            source="keyword_match",
-            error=response.get("error"),
-            durationMs=ms(),
-        )
+    if not final.available or not final.text:
+        return _failed_response(final.error, ms())
+    if session is not None and final.error is None:
+        session.remember_context(outcome.turn.key, final.context, outcome.turn.facts)  # type: ignore[union-attr]
 
     return NLQueryResponse(
-        answer=response["text"],
+        answer=final.text,
         source="ollama",
-        followUp=[
-            "How many beds do we have?",
-            "Are all locations fire zone mapped?",
-            "Which units need attention?",
-        ],
+        followUp=_OLLAMA_FOLLOW_UP,
         durationMs=ms(),
+        error=final.error,
     )
+
+
+async def stream_nl_query(
+    question: str,
+    branch_context: BranchContext,
+    ollama: OllamaService | None = None,
+    session: ChatSession | None = None,
+) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+    """Streaming variant of :func:`run_nl_query`.
+
+    Yields ``("token", {"text": ...})`` while Ollama generates, then a single
+    ``("done", NLQueryResponse)`` event carrying the full answer plus
+    evalCount / firstTokenMs.  Keyword, template and offline answers arrive
+    as the ``done`` event alone; tokens of an LLM turn racing a template are
+    held back until the template has lost.
+    """
+    svc = ollama or ollama_service
+    start = time.time()
+
+    def ms() -> int:
+        return int((time.time() - start) * 1000)
+
+    outcome = await _answer(question, branch_context, svc, session)
+    if isinstance(outcome, NLQueryResponse):
+        yield "done", outcome.model_dump()
+        return
+    if outcome is None:
+        yield "done", _offline_response(ms()).model_dump()
+        return
+
+    final = None
+    try:
+        async for chunk in outcome.chunks():
+            if chunk.text:
+                yield "token", {"text": chunk.text}
+            if chunk.done:
+                final = chunk.final
+    finally:
+        await outcome.cancel()  # the client went away mid-stream: abort Ollama too
+
+    if final is None or not final.text:
+        yield "done", _failed_response(final.error if final else None, ms()).model_dump()
+        return
+    if session is not None and final.error is None:
+        session.remember_context(outcome.turn.key, final.context, outcome.turn.facts)  # type: ignore[union-attr]
+
+    yield "done", NLQueryResponse(
+        answer=final.text,
+        source="ollama",
+        followUp=_OLLAMA_FOLLOW_UP,
+        durationMs=ms(),
+        error=final.error,  # set if the stream broke off after partial output
+        evalCount=final.token_count,
+        promptEvalCount=final.prompt_token_count,
+        firstTokenMs=final.first_token_ms,
+    ).model_dump()
@@ -7,37 +7,35 @@ direct DB queries.
 
 from __future__ import annotations
 
-import json
-import os
 from datetime import datetime, timedelta
-from pathlib import Path
 from typing import Any
 
-from src.collectors.models import BranchContext, PharmacySummary
+from src.collectors.models import BranchContext
+from src.services.reference_data import reference_data
 from .models import ConsistencyIssue
 
 # ── Reference data ────────────────────────────────────────────────────────
 
-_DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 
+def _normalize_lasa_pairs(data: Any) -> list[tuple[str, str]]:
+    return [(p["a"].lower(), p["b"].lower()) for p in data.get("pairs", [])]
 
-def _load_json(filename: str) -> Any:
-    """Load a JSON data file, returning empty structure on failure."""
-    try:
-        with open(_DATA_DIR / filename, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
 
+def _normalize_specialty_drugs(data: Any) -> dict[str, list[str]]:
+    return {k: [d.lower() for d in v] for k, v in data.get("specialties", {}).items()}
+
+
+_LASA_PAIRS = reference_data.view("lasa-pairs.json", _normalize_lasa_pairs)
+_SPECIALTY_DRUGS = reference_data.view("specialty-drugs.json", _normalize_specialty_drugs)
 
-def _get_lasa_pairs() -> list[tuple[str, str]]:
-    data = _load_json("lasa-pairs.json")
-    return [(p["a"].lower(), p["b"].lower()) for p in data.get("pairs", [])]
+
+def get_lasa_pairs() -> list[tuple[str, str]]:
+    """Curated look-alike / sound-alike pairs from ``lasa-pairs.json``, lower-cased."""
+    return _LASA_PAIRS.get()
 
 
 def _get_specialty_drugs() -> dict[str, list[str]]:
-    data = _load_json("specialty-drugs.json")
-    return {k: [d.lower() for d in v] for k, v in data.get("specialties", {}).items()}
+    return _SPECIALTY_DRUGS.get()
 
 
 # ── Checker ───────────────────────────────────────────────────────────────
@@ -206,7 +204,7 @@ def run_pharmacy_checks(ctx: BranchContext) -> list[ConsistencyIssue]:
         ))
 
     # ── PH-012: LASA pair gaps ───────────────────────────────────────
-    _check_lasa_gaps(ph, issues)
+    _check_lasa_gaps(ctx, issues)
 
     # ── PH-013: Missing specialty drugs ──────────────────────────────
     _check_specialty_drug_gaps(ctx, issues)
@@ -214,14 +212,16 @@ def run_pharmacy_checks(ctx: BranchContext) -> list[ConsistencyIssue]:
     return issues
 
 
-def _check_lasa_gaps(ph: PharmacySummary, issues: list[ConsistencyIssue]) -> None:
+def _check_lasa_gaps(ctx: BranchContext, issues: list[ConsistencyIssue]) -> None:
     """Check if known LASA pairs exist in the drug master without isLasa flag."""
-    lasa_pairs = _get_lasa_pairs()
+    lasa_pairs = get_lasa_pairs()
     if not lasa_pairs:
         return
 
-    drug_names = {d.genericName.lower() for d in ph.drugs}
-    flagged_lasa = {d.genericName.lower() for d in ph.drugs if d.isLasa}
+    drug_names = ctx.index.drugs_by_generic
+    flagged_lasa = {
+        name for name, drugs in drug_names.items() if any(d.isLasa for d in drugs)
+    }
 
     unflagged_pairs: list[str] = []
     for a, b in lasa_pairs:
@@ -252,7 +252,10 @@ def _check_specialty_drug_gaps(ctx: BranchContext, issues: list[ConsistencyIssue
     active_specialties = {
         s.code.upper() for s in ctx.specialties.specialties if s.isActive
     }
-    drug_generics = {d.genericName.lower() for d in ctx.pharmacy.drugs if d.status == "ACTIVE"}
+    drug_generics = {
+        name for name, drugs in ctx.index.drugs_by_generic.items()
+        if any(d.status == "ACTIVE" for d in drugs)
+    }
 
     missing_groups: list[str] = []
     for spec_code, expected_drugs in spec_drugs.items():
@@ -0,0 +1,255 @@
+"""Token-budgeted prompt assembly.
+
+LLM prompts here are built from branch data whose size grows with the
+branch (one line per unit, department, ...), while the model only sees
+``OLLAMA_CONTEXT_WINDOW`` tokens.  This module packs context into a fixed
+token budget instead of pasting everything:
+
+  - ``estimate_tokens`` — cheap, slightly pessimistic token estimate
+  - ``Section`` — a titled block of rows, optionally rendered as a compact
+    pipe-separated table (one header line, no JSON punctuation)
+  - ``pack_sections`` — ranks every row by base priority plus overlap with
+    the question's terms, greedily keeps the best rows that fit, and renders
+    the kept rows in their original order with a "+N more" note per section
+  - ``compact`` — tabular / key=value encoding for arbitrary JSON-ish data
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Sequence
+
+from src.config import OLLAMA_CONTEXT_WINDOW, OLLAMA_PROMPT_BUDGET, OLLAMA_RESPONSE_RESERVE
+
+_WORD = re.compile(r"[a-z0-9]+")
+_TOKEN_PIECE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+# Question words that say nothing about which data is relevant.
+_STOPWORDS = frozenset(
+    "a an and are about all any as at be by can do does for from give has have how i in "
+    "is it many me much of on or our show tell that the there these this to us we what "
+    "when where which who why with you your".split()
+)
+
+# Domain synonyms: a question term on the left also matches rows tagged with
+# any term on the right.
+_ALIASES: dict[str, frozenset[str]] = {
+    "icu": frozenset({"icu", "hdu", "ccu", "nicu", "picu", "critical", "intensive"}),
+    "critical": frozenset({"icu", "hdu", "ccu", "nicu", "picu"}),
+    "intensive": frozenset({"icu", "hdu", "ccu", "nicu", "picu"}),
+    "bed": frozenset({"bed", "ward", "icu", "capacity"}),
+    "capacity": frozenset({"bed", "capacity"}),
+    "head": frozenset({"head", "hod"}),
+    "fire": frozenset({"fire", "location", "zone"}),
+    "exit": frozenset({"exit", "location"}),
+    "floor": frozenset({"floor", "location", "building"}),
+    "emergency": frozenset({"emergency", "er", "exit"}),
+    "surgery": frozenset({"surgery", "surgical", "ot"}),
+    "theatre": frozenset({"ot", "theatre"}),
+    "drug": frozenset({"drug", "pharmacy", "formulary"}),
+    "medicine": frozenset({"drug", "pharmacy", "formulary"}),
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough BPE token count: one per word/number run plus one per symbol.
+
+    Long words split into several BPE tokens, so runs are charged one token
+    per 6 characters; this errs on the high side, which is what a budget wants.
+    """
+    n = 0
+    for piece in _TOKEN_PIECE.findall(text):
+        n += 1 + (len(piece) - 1) // 6 if piece[0].isalnum() else 1
+    return n + text.count("\n")
+
+
+def terms(text: str) -> frozenset[str]:
+    """Normalized content terms of *text* (lower case, crude singular)."""
+    out = set()
+    for w in _WORD.findall(text.lower()):
+        if w in _STOPWORDS:
+            continue
+        if len(w) > 3 and w.endswith("s") and not w.endswith("ss"):
+            w = w[:-1]
+        out.add(w)
+    return frozenset(out)
+
+
+def expand_terms(question_terms: Iterable[str]) -> frozenset[str]:
+    out = set(question_terms)
+    for t in question_terms:
+        out |= _ALIASES.get(t, frozenset())
+    return frozenset(out)
+
+
+def default_budget(*fixed_text: str, context_window: int = OLLAMA_CONTEXT_WINDOW) -> int:
+    """Context tokens to pack: OLLAMA_PROMPT_BUDGET, but never more than fits.
+
+    Prompt evaluation time grows with prompt length, so the configured
+    budget is usually well below the window; what must fit is the fixed
+    text plus OLLAMA_RESPONSE_RESERVE tokens for the answer.
+    """
+    used = sum(estimate_tokens(t) for t in fixed_text)
+    fit = max(0, context_window - OLLAMA_RESPONSE_RESERVE - used)
+    return min(fit, OLLAMA_PROMPT_BUDGET) if OLLAMA_PROMPT_BUDGET > 0 else fit
+
+
+# ── Sections ──────────────────────────────────────────────────────────────
+
+
+@dataclass(slots=True)
+class Row:
+    text: str
+    tags: frozenset[str] = frozenset()
+    boost: float = 0.0
+
+
+@dataclass
+class Section:
+    title: str
+    rows: list[Row] = field(default_factory=list)
+    columns: Sequence[str] | None = None  # render as a pipe table with this header
+    priority: float = 1.0  # base score of every row
+    tags: frozenset[str] = frozenset()  # terms that make the whole section relevant
+
+    def add(self, *cells: Any, tags: Iterable[str] = (), boost: float = 0.0) -> None:
+        text = "|".join(_cell(c) for c in cells) if self.columns else str(cells[0])
+        self.rows.append(Row(text, frozenset(tags) | terms(text), boost))
+
+    def head(self) -> str:
+        head = f"{self.title}:"
+        if self.columns:
+            head += "\n" + "|".join(self.columns)
+        return head
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, bool):
+        return "Y" if value else "N"
+    return str(value).replace("|", "/").replace("\n", " ")
+
+
+@dataclass
+class PackedPrompt:
+    text: str
+    tokens: int
+    budget: int
+    rows_included: int
+    rows_dropped: int
+
+
+def pack_sections(sections: Sequence[Section], question: str, budget: int) -> PackedPrompt:
+    """Fit the most relevant rows of *sections* into *budget* tokens."""
+    q = expand_terms(terms(question))
+    candidates: list[tuple[float, int, int, int]] = []  # (-score, section, row, cost)
+    for si, sec in enumerate(sections):
+        sec_hit = 2.0 if q & sec.tags else 0.0
+        for ri, row in enumerate(sec.rows):
+            score = sec.priority + sec_hit + 3.0 * len(q & row.tags) + row.boost
+            candidates.append((-score, si, ri, estimate_tokens(row.text) + 1))
+    candidates.sort()
+
+    head_cost = [estimate_tokens(sec.head()) + 8 for sec in sections]  # + "(+N more)" note
+    opened = [False] * len(sections)
+    keep: list[set[int]] = [set() for _ in sections]
+    used = 0
+    for _, si, ri, cost in candidates:
+        extra = cost if opened[si] else cost + head_cost[si]
+        if used + extra > budget:
+            continue
+        used += extra
+        opened[si] = True
+        keep[si].add(ri)
+
+    blocks: list[str] = []
+    included = 0
+    for si, sec in enumerate(sections):
+        if not keep[si]:
+            continue
+        lines = [sec.head()]
+        lines.extend(row.text for ri, row in enumerate(sec.rows) if ri in keep[si])
+        dropped = len(sec.rows) - len(keep[si])
+        if dropped:
+            lines.append(f"(+{dropped} more not shown)")
+        included += len(keep[si])
+        blocks.append("\n".join(lines))
+
+    text = "\n\n".join(blocks)
+    total = sum(len(sec.rows) for sec in sections)
+    return PackedPrompt(text, estimate_tokens(text), budget, included, total - included)
+
+
+# ── Compact encoding for free-form data ──────────────────────────────────
+
+
+def compact(value: Any, indent: str = "") -> str:
+    """Encode JSON-like data densely.
+
+    Lists of flat dicts become pipe tables with a single header; flat dicts
+    become ``key=value; ...``; nesting is shown by indentation only.
+    """
+    if isinstance(value, dict):
+        scalars = {k: v for k, v in value.items() if not isinstance(v, (dict, list))}
+        lines = []
+        if scalars:
+            lines.append(indent + "; ".join(f"{k}={_cell(v)}" for k, v in scalars.items()))
+        for k, v in value.items():
+            if isinstance(v, (dict, list)):
+                lines.append(f"{indent}{k}:")
+                lines.append(compact(v, indent + " "))
+        return "\n".join(line for line in lines if line.strip())
+    if isinstance(value, list):
+        cols = _flat_columns(value)
+        if cols is not None:
+            rows = ["|".join(_cell(v.get(c)) for c in cols) for v in value]
+            return "\n".join(indent + r for r in ["|".join(cols), *rows])
+        items = []
+        for v in value:
+            if isinstance(v, (dict, list)):
+                block = compact(v, indent + "  ")
+                items.append(indent + "- " + block[len(indent) + 2:])
+            else:
+                items.append(indent + "- " + _cell(v))
+        return "\n".join(items)
+    return indent + _cell(value)
+
+
+def _flat_columns(items: list[Any]) -> list[str] | None:
+    """Column names if *items* is a non-empty list of flat dicts, else None."""
+    if not items or not all(isinstance(v, dict) for v in items):
+        return None
+    cols: list[str] = []
+    for v in items:
+        for k, x in v.items():
+            if isinstance(x, (dict, list)):
+                return None
+            if k not in cols:
+                cols.append(k)
+    return cols
+
+
+def sections_from_data(data: Any, title: str = "DATA") -> list[Section]:
+    """One section per top-level key of *data*, tables where the shape allows."""
+    if isinstance(data, str) or not isinstance(data, dict):
+        sec = Section(title)
+        for line in (data if isinstance(data, str) else compact(data)).splitlines():
+            if line.strip():
+                sec.add(line)
+        return [sec]
+
+    out = []
+    for key, value in data.items():
+        cols = _flat_columns(value) if isinstance(value, list) else None
+        sec = Section(str(key), columns=cols, tags=terms(str(key)))
+        if cols is not None:
+            for v in value:
+                sec.add(*(v.get(c) for c in cols))
+        else:
+            for line in compact(value).splitlines():
+                if line.strip():
+                    sec.add(line)
+        out.append(sec)
+    return out
@@ -0,0 +1,653 @@
+"""Template-based NL query engine — exact answers without the LLM.
+
+Many chat questions are plain aggregates over branch data:
+
+  "How many rooms with oxygen in ICU?"
+  "Which departments don't have a head?"
+  "Beds by department"
+  "Payers with expired contracts"
+
+``parse_query`` turns such a question into a ``QueryPlan`` — entity,
+filters, aggregate (count / list / sum) and optional group-by — using a
+small phrase vocabulary per entity plus the branch's own unit types and
+department names.  Every word of the question must be accounted for
+(entity, filter, aggregate, group-by or a stop word); anything else is a
+miss and the question goes to Ollama as before, so a template never
+answers a question it only half understood.  That includes yes/no
+questions over a quantifier ("do all rooms have oxygen?" -- "all" only
+counts with an explicit "list" / "how many") and definition questions
+("what is a bed?").
+
+``run_query`` executes a plan against the pre-indexed ``BranchContext``
+(``ctx.index``) or, for entities the context only carries as counts
+(payers, payer contracts) or only partly (drugs, capped at 500 by the
+collector), with a read-only SQLAlchemy select.  Filters map
+to fixed column expressions; the branch id is the only bound value, so no
+question text ever reaches the SQL.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable
+
+from src.collectors.models import BranchContext
+
+from .models import NLQueryResponse
+
+logger = logging.getLogger("ai-copilot.query-templates")
+
+LIST_LIMIT = 10  # names spelled out in a list answer
+DATA_LIMIT = 100  # names returned in ``data["items"]``
+
+
+# ── Vocabulary ────────────────────────────────────────────────────────────
+
+_AGGREGATES: dict[str, str] = {
+    "how many": "count",
+    "number of": "count",
+    "count": "count",
+    "count of": "count",
+    "total": "count",
+    "total number of": "count",
+    "which": "list",
+    "what": "list",
+    "list": "list",
+    "show": "list",
+    "name": "list",
+    "give": "list",
+}
+
+_NEGATIONS = {"no", "not", "without", "dont", "doesnt", "non", "missing", "lacking"}
+_GROUP_MARKERS = {"by", "per", "each"}
+# "list all X" is a list, but "do all X have Y?" is a yes/no question the
+# templates can't answer: a quantifier needs an explicit count / list word.
+_QUANTIFIERS = {"all", "every"}
+# "what is a bed?" asks for a definition, not an inventory
+_DEFINITION_OPENERS = (("what", "is"), ("what", "are"))
+_ARTICLES = {"a", "an"}
+
+_STOP_WORDS = {
+    "a", "an", "the", "do", "does", "we", "our", "us", "i", "me", "you", "have", "has", "had",
+    "are", "is", "there", "with", "in", "on", "at", "of", "for", "that", "and", "any",
+    "please", "currently", "right", "now", "this", "hospital", "branch", "configured", "set",
+    "up", "exist", "to", "got", "marked", "mapped", "under", "from", "so", "far",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class _Entity:
+    name: str
+    words: tuple[str, ...]  # normalised phrases naming the entity
+    filters: dict[str, tuple[str, ...]]  # filter key → phrases
+    groups: dict[str, tuple[str, ...]]  # group key → phrases
+    scoped: bool = False  # unit type / department filters apply
+    sql: bool = False  # rows come from the database, not the context
+
+
+_ACTIVE = ("active",)
+_ENTITIES = [
+    _Entity(
+        "rooms", ("room",),
+        filters={
+            "oxygen": ("oxygen", "o2"),
+            "suction": ("suction",),
+            "ac": ("AC", "air conditioning", "air conditioned", "air conditioner"),
+            "tv": ("TV", "television"),
+            "bathroom": ("attached bathroom", "bathroom"),
+            "active": _ACTIVE,
+        },
+        groups={"type": ("type", "unit type"), "unit": ("unit",), "department": ("department",),
+                "room_type": ("room type",)},
+        scoped=True,
+    ),
+    _Entity(
+        "beds", ("bed",),
+        filters={"active": _ACTIVE},
+        groups={"type": ("type", "unit type"), "unit": ("unit",), "department": ("department",)},
+        scoped=True,
+    ),
+    _Entity(
+        "units", ("unit",),
+        filters={"active": _ACTIVE, "rooms": ("rooms",), "beds": ("beds",)},
+        groups={"type": ("type", "unit type"), "department": ("department",)},
+        scoped=True,
+    ),
+    _Entity(
+        "departments", ("department",),
+        filters={"head": ("a head", "head", "hod", "department head"), "staff": ("staff",)},
+        groups={"facility": ("facility type", "type")},
+    ),
+    _Entity(
+        "stores", ("store", "pharmacy store", "pharmacy"),
+        filters={
+            "active": _ACTIVE,
+            "24x7": ("24x7", "24 7", "round the clock"),
+            "pharmacist": ("a pharmacist in charge", "pharmacist", "pharmacist in charge"),
+            "license": ("a drug license", "license", "drug license", "licence", "drug licence"),
+            "expired_license": ("an expired drug license", "expired license", "expired drug license",
+                                "expired licence"),
+            "dispense": ("dispense", "dispensing"),
+        },
+        groups={"type": ("type", "store type"), "status": ("status",)},
+    ),
+    _Entity(
+        "drugs", ("drug", "medicine", "medication"),
+        filters={
+            "active": _ACTIVE,
+            "narcotic": ("narcotic",),
+            "controlled": ("controlled",),
+            "antibiotic": ("antibiotic",),
+            "high_alert": ("high alert",),
+            "lasa": ("lasa", "look alike sound alike"),
+            "formulary": ("formulary",),
+        },
+        groups={"category": ("category",), "schedule": ("schedule", "schedule class"),
+                "route": ("route",)},
+    ),
+    _Entity(
+        "specialties", ("specialty", "speciality"),
+        filters={"active": _ACTIVE},
+        groups={"kind": ("kind", "type")},
+    ),
+    _Entity(
+        "payers", ("payer", "insurer", "insurance company", "tpa"),
+        filters={
+            "active": _ACTIVE,
+            "expired_contract": ("expired contracts", "an expired contract"),
+            "active_contract": ("active contracts", "an active contract"),
+            "contract": ("contracts", "a contract"),
+            "preauth": ("preauth", "pre auth", "preauthorization", "pre authorization",
+                        "requiring preauth", "require preauth", "need preauth"),
+        },
+        groups={"kind": ("kind", "type"), "network": ("network", "network type")},
+        sql=True,
+    ),
+    _Entity(
+        "contracts", ("contract", "payer contract"),
+        filters={
+            "active": _ACTIVE,
+            "expired": ("expired",),
+            "draft": ("draft",),
+            "auto_renewal": ("auto renewal", "auto renew", "autorenewal"),
+        },
+        groups={"status": ("status",), "payer": ("payer",)},
+        sql=True,
+    ),
+]
+_ENTITY_BY_NAME = {e.name: e for e in _ENTITIES}
+_ENTITY_WORDS = sorted(
+    ((tuple(w.split()), e) for e in _ENTITIES for w in e.words), key=lambda p: -len(p[0])
+)
+
+_NEGATED_WORDS = {"inactive": "active", "unstaffed": "staff"}
+
+_SINGULAR = {"specialties": "specialty"}
+
+# Filters read as adjectives ("inactive rooms", "narcotic drugs"); the rest
+# as "with/without <phrase>".
+_ADJECTIVES = {
+    "active": ("active", "inactive"),
+    "narcotic": ("narcotic", "non-narcotic"),
+    "controlled": ("controlled", "non-controlled"),
+    "antibiotic": ("antibiotic", "non-antibiotic"),
+    "high_alert": ("high-alert", "non-high-alert"),
+    "lasa": ("LASA", "non-LASA"),
+    "formulary": ("formulary", "non-formulary"),
+    "24x7": ("24x7", "non-24x7"),
+    "dispense": ("dispensing", "non-dispensing"),
+    "expired": ("expired", "unexpired"),
+    "draft": ("draft", "non-draft"),
+}
+
+
+def _normalise(text: str) -> list[str]:
+    """Lower-case word tokens, apostrophes dropped and plurals folded to singular."""
+    words = re.findall(r"[a-z0-9]+", text.lower().replace("'", "").replace("’", ""))
+    out = []
+    for w in words:
+        if w == "whats":
+            out += ("what", "is")
+        elif w in _STOP_WORDS or len(w) <= 3:
+            out.append(w)
+        elif w.endswith("ies"):
+            out.append(w[:-3] + "y")
+        elif w.endswith("s") and not w.endswith(("ss", "sis")) and w not in ("status", "campus"):
+            out.append(w[:-1])
+        else:
+            out.append(w)
+    return out
+
+
+# ── Plans ─────────────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True, slots=True)
+class Condition:
+    key: str  # filter key, or "type" / "department" with ``arg``
+    label: str  # filter phrase / unit type code / department name, for answers
+    negate: bool = False
+    arg: str | None = None  # unit type code / department id
+
+
+@dataclass(frozen=True, slots=True)
+class QueryPlan:
+    entity: str
+    aggregate: str  # "count" | "list" | "sum"
+    conditions: tuple[Condition, ...] = ()
+    group_by: str | None = None
+    sql: bool = False  # the context's rows for the entity are incomplete
+
+    @property
+    def needs_db(self) -> bool:
+        """Executed with an SQL query rather than from the context."""
+        return self.sql or _ENTITY_BY_NAME[self.entity].sql
+
+    @property
+    def specific(self) -> bool:
+        """Narrower than a branch-wide total (has filters or a group-by)."""
+        return bool(self.conditions or self.group_by)
+
+    def describe(self) -> str:
+        conds = ", ".join(("not " if c.negate else "") + c.label for c in self.conditions)
+        text = f"{self.aggregate} {self.entity}"
+        if conds:
+            text += f" [{conds}]"
+        if self.group_by:
+            text += f" by {self.group_by}"
+        return text
+
+
+def _scope_phrases(ctx: BranchContext) -> dict[tuple[str, ...], Condition]:
+    """Unit type codes / names and department names of this branch as filter phrases."""
+    phrases: dict[tuple[str, ...], Condition] = {}
+    for code, units in ctx.index.units_by_type.items():
+        for name in (code, units[0].typeName):
+            words = tuple(_normalise(name))
+            if words:
+                cond = Condition("type", name, arg=code)
+                phrases.setdefault(words, cond)
+                phrases.setdefault((*words, "unit"), cond)  # "rooms in ICU units"
+    for d in ctx.departments.departments:
+        words = tuple(_normalise(d.name))
+        if words:
+            phrases.setdefault(words, Condition("department", d.name, arg=d.id))
+    return phrases
+
+
+def _longest(tokens: list[str], i: int, phrases: dict[tuple[str, ...], Any], longest: int):
+    for n in range(min(longest, len(tokens) - i), 0, -1):
+        hit = phrases.get(tuple(tokens[i:i + n]))
+        if hit is not None:
+            return n, hit
+    return 0, None
+
+
+def _find_entity(tokens: list[str]) -> tuple[_Entity | None, int, int]:
+    """First entity phrase that isn't a group-by key or a filter.
+
+    "rooms per unit" is about rooms, "wards with no beds" about units.
+    """
+    for i in range(len(tokens)):
+        if i and (tokens[i - 1] in _GROUP_MARKERS or tokens[i - 1] in _NEGATIONS or tokens[i - 1] == "with"):
+            continue
+        for words, entity in _ENTITY_WORDS:
+            if tuple(tokens[i:i + len(words)]) == words:
+                return entity, i, len(words)
+    return None, -1, 0
+
+
+def parse_query(question: str, ctx: BranchContext) -> QueryPlan | None:
+    """Parse *question* into a plan, or ``None`` if any part of it isn't understood."""
+    tokens = _normalise(question)
+    opener = next((o for o in _DEFINITION_OPENERS if tuple(tokens[:len(o)]) == o), None)
+    if opener and tokens[len(opener):len(opener) + 1] and tokens[len(opener)] in _ARTICLES:
+        return None  # "what is a bed?", "what's an ICU?"
+    scope = _scope_phrases(ctx)
+    entity, at, width = _find_entity(tokens)
+    if entity is None:
+        # "how many ICUs?" → units of that type
+        if not any(_longest(tokens, i, scope, 6)[1] for i in range(len(tokens))):
+            return None
+        entity, at, width = _ENTITY_BY_NAME["units"], -1, 0
+
+    vocab: dict[tuple[str, ...], tuple[str, Any]] = {}
+    for phrase, agg in _AGGREGATES.items():
+        vocab[tuple(phrase.split())] = ("aggregate", agg)
+    for key, phrases in entity.filters.items():
+        for p in phrases:
+            vocab[tuple(_normalise(p))] = ("filter", Condition(key, phrases[0]))
+    for word, key in _NEGATED_WORDS.items():
+        if key in entity.filters:
+            vocab[(word,)] = ("filter", Condition(key, entity.filters[key][0], negate=True))
+    if entity.scoped:
+        for phrase, cond in scope.items():
+            vocab.setdefault(phrase, ("filter", cond))
+    groups = {tuple(_normalise(p)): key for key, phrases in entity.groups.items() for p in phrases}
+    longest = max(len(p) for p in [*vocab, *groups])
+
+    aggregate: str | None = None
+    conditions: list[Condition] = []
+    group_by: str | None = None
+    negate = quantified = False
+    i = 0
+    while i < len(tokens):
+        if i == at:
+            i += width
+            continue
+        tok = tokens[i]
+        if tok in _GROUP_MARKERS:
+            n, key = _longest(tokens, i + 1, groups, longest)
+            if key is None or group_by is not None:
+                return None
+            group_by = key
+            i += 1 + n
+            continue
+        n, hit = _longest(tokens, i, vocab, longest)
+        if hit is not None:
+            kind, value = hit
+            if kind == "aggregate":
+                aggregate = aggregate or value
+            else:
+                if negate:
+                    value = Condition(value.key, value.label, not value.negate, value.arg)
+                conditions.append(value)
+                negate = False
+            i += n
+            continue
+        if tok in _NEGATIONS:
+            negate = True
+        elif tok in _QUANTIFIERS:
+            quantified = True
+        elif tok not in _STOP_WORDS:
+            return None  # unknown word: leave it to the LLM
+        i += 1
+    if negate:
+        return None  # dangling "not"
+    if quantified and aggregate is None:
+        return None  # "do all rooms have oxygen?"
+    if opener and not (conditions or group_by) and aggregate == "list":
+        return None  # "what are beds?"
+
+    if entity.name == "beds":
+        aggregate = "sum"
+    truncated = _TRUNCATED.get(entity.name)
+    return QueryPlan(
+        entity.name, aggregate or "list", tuple(conditions), group_by,
+        sql=truncated is not None and truncated(ctx),
+    )
+
+
+# ── Context execution ─────────────────────────────────────────────────────
+
+_Pred = Callable[[Any], bool]
+
+# Row shapes: rooms → (RoomDetail, UnitDetail); beds/units → UnitDetail;
+# departments / stores / drugs / specialties → their snapshot models.
+_ROWS: dict[str, Callable[[BranchContext], list[Any]]] = {
+    "rooms": lambda ctx: ctx.index.rooms,
+    "beds": lambda ctx: ctx.units.units,
+    "units": lambda ctx: ctx.units.units,
+    "departments": lambda ctx: ctx.departments.departments,
+    "stores": lambda ctx: ctx.pharmacy.stores,
+    "drugs": lambda ctx: ctx.pharmacy.drugs,
+    "specialties": lambda ctx: ctx.specialties.specialties,
+}
+
+# Context lists the collector caps: when cut short, the plan runs in SQL
+_TRUNCATED: dict[str, Callable[[BranchContext], bool]] = {
+    "drugs": lambda ctx: ctx.pharmacy.totalDrugs > len(ctx.pharmacy.drugs),
+}
+
+_UNIT_OF: dict[str, Callable[[Any], Any]] = {
+    "rooms": lambda row: row[1],
+    "beds": lambda row: row,
+    "units": lambda row: row,
+}
+
+
+def _license_expired(store) -> bool:
+    expiry = store.drugLicenseExpiry
+    if expiry is None:
+        return False
+    now = datetime.now(expiry.tzinfo) if expiry.tzinfo else datetime.utcnow()
+    return expiry < now
+
+
+_TESTS: dict[str, dict[str, _Pred]] = {
+    "rooms": {
+        "oxygen": lambda r: r[0].hasOxygen,
+        "suction": lambda r: r[0].hasSuction,
+        "ac": lambda r: r[0].hasAC,
+        "tv": lambda r: r[0].hasTV,
+        "bathroom": lambda r: r[0].hasAttachedBathroom,
+        "active": lambda r: r[0].isActive,
+    },
+    "beds": {"active": lambda u: u.isActive},
+    "units": {
+        "active": lambda u: u.isActive,
+        "rooms": lambda u: bool(u.rooms),
+        "beds": lambda u: u.resources.beds > 0,
+    },
+    "departments": {
+        "head": lambda d: d.hasHead,
+        "staff": lambda d: d.staffCount > 0,
+    },
+    "stores": {
+        "active": lambda s: s.status == "ACTIVE",
+        "24x7": lambda s: s.is24x7,
+        "pharmacist": lambda s: s.pharmacistInChargeId is not None,
+        "license": lambda s: bool(s.drugLicenseNumber),
+        "expired_license": _license_expired,
+        "dispense": lambda s: s.canDispense,
+    },
+    "drugs": {
+        "active": lambda d: d.status == "ACTIVE",
+        "narcotic": lambda d: d.isNarcotic,
+        "controlled": lambda d: d.isControlled,
+        "antibiotic": lambda d: d.isAntibiotic,
+        "high_alert": lambda d: d.isHighAlert,
+        "lasa": lambda d: d.isLasa,
+        "formulary": lambda d: d.formularyStatus != "NON_FORMULARY",
+    },
+    "specialties": {"active": lambda s: s.isActive},
+}
+
+_GROUP_KEYS: dict[str, dict[str, Callable[[Any], str | None]]] = {
+    "rooms": {
+        "type": lambda r: r[1].typeCode,
+        "unit": lambda r: r[1].name,
+        "department": lambda r: r[1].departmentName,
+        "room_type": lambda r: r[0].roomType,
+    },
+    "beds": {"type": lambda u: u.typeCode, "unit": lambda u: u.name, "department": lambda u: u.departmentName},
+    "units": {"type": lambda u: u.typeCode, "department": lambda u: u.departmentName},
+    "departments": {"facility": lambda d: d.facilityType},
+    "stores": {"type": lambda s: s.storeType, "status": lambda s: s.status},
+    "drugs": {"category": lambda d: d.category, "schedule": lambda d: d.scheduleClass, "route": lambda d: d.route},
+    "specialties": {"kind": lambda s: s.kind},
+}
+
+_LABELS: dict[str, Callable[[Any], str]] = {
+    "rooms": lambda r: f"{r[0].name} ({r[1].name})",
+    "beds": lambda u: u.name,
+    "units": lambda u: u.name,
+    "departments": lambda d: d.name,
+    "stores": lambda s: s.storeName,
+    "drugs": lambda d: d.genericName + (f" ({d.brandName})" if d.brandName else ""),
+    "specialties": lambda s: s.name,
+}
+
+
+def _predicate(entity: str, cond: Condition) -> _Pred:
+    if cond.key == "type":
+        unit_of = _UNIT_OF[entity]
+        test: _Pred = lambda row: unit_of(row).typeCode.upper() == cond.arg  # noqa: E731
+    elif cond.key == "department":
+        unit_of = _UNIT_OF[entity]
+        test = lambda row: unit_of(row).departmentId == cond.arg  # noqa: E731
+    else:
+        test = _TESTS[entity][cond.key]
+    if cond.negate:
+        return lambda row: not test(row)
+    return test
+
+
+@dataclass(slots=True)
+class _Result:
+    count: int  # matching rows (or beds for "sum")
+    items: list[str]
+    groups: dict[str, int]
+
+
+def _run_context(plan: QueryPlan, ctx: BranchContext) -> _Result:
+    rows = _ROWS[plan.entity](ctx)
+    for cond in plan.conditions:
+        test = _predicate(plan.entity, cond)
+        rows = [r for r in rows if test(r)]
+    measure: Callable[[Any], int] = (lambda u: u.resources.beds) if plan.aggregate == "sum" else (lambda _: 1)
+    groups: dict[str, int] = {}
+    if plan.group_by:
+        key_of = _GROUP_KEYS[plan.entity][plan.group_by]
+        for r in rows:
+            key = key_of(r) or "Unassigned"
+            groups[key] = groups.get(key, 0) + measure(r)
+    label = _LABELS[plan.entity]
+    return _Result(sum(measure(r) for r in rows), [label(r) for r in rows[:DATA_LIMIT]], groups)
+
+
+# ── SQL execution (read-only) ─────────────────────────────────────────────
+
+
+def _sql_statement(plan: QueryPlan, branch_id: str):
+    """``SELECT name, group key`` for a payer / contract / drug plan, filtered by fixed clauses."""
+    from sqlalchemy import exists, func, select
+
+    from src.db.models import DrugMaster, Payer, PayerContract
+
+    def has_contract(*where):
+        return exists().where(
+            PayerContract.payerId == Payer.id, PayerContract.branchId == branch_id, *where
+        )
+
+    if plan.entity == "payers":
+        clauses = {
+            "active": Payer.isActive.is_(True),
+            "expired_contract": has_contract(PayerContract.status == "EXPIRED"),
+            "active_contract": has_contract(PayerContract.status == "ACTIVE"),
+            "contract": has_contract(),
+            "preauth": Payer.requiresPreauth.is_(True),
+        }
+        group_cols = {"kind": Payer.kind, "network": Payer.networkType}
+        stmt = select(Payer.name, group_cols.get(plan.group_by, Payer.kind)).where(Payer.branchId == branch_id)
+    elif plan.entity == "drugs":
+        clauses = {
+            "active": DrugMaster.status == "ACTIVE",
+            "narcotic": DrugMaster.isNarcotic.is_(True),
+            "controlled": DrugMaster.isControlled.is_(True),
+            "antibiotic": DrugMaster.isAntibiotic.is_(True),
+            "high_alert": DrugMaster.isHighAlert.is_(True),
+            "lasa": DrugMaster.isLasa.is_(True),
+            "formulary": DrugMaster.formularyStatus != "NON_FORMULARY",
+        }
+        group_cols = {"category": DrugMaster.category, "schedule": DrugMaster.scheduleClass,
+                      "route": DrugMaster.route}
+        label = DrugMaster.genericName + func.coalesce(" (" + DrugMaster.brandName + ")", "")
+        stmt = select(label, group_cols.get(plan.group_by, DrugMaster.category)).where(
+            DrugMaster.branchId == branch_id
+        )
+    else:
+        clauses = {
+            "active": PayerContract.status == "ACTIVE",
+            "expired": PayerContract.status == "EXPIRED",
+            "draft": PayerContract.status == "DRAFT",
+            "auto_renewal": PayerContract.autoRenewal.is_(True),
+        }
+        group_cols = {"status": PayerContract.status, "payer": Payer.name}
+        stmt = (
+            select(PayerContract.name, group_cols.get(plan.group_by, PayerContract.status))
+            .join(Payer, Payer.id == PayerContract.payerId)
+            .where(PayerContract.branchId == branch_id)
+        )
+    for cond in plan.conditions:
+        clause = clauses[cond.key]
+        stmt = stmt.where(~clause if cond.negate else clause)
+    return stmt.order_by(stmt.selected_columns[0])
+
+
+async def _run_sql(plan: QueryPlan, branch_id: str) -> _Result:
+    from src.db.session import get_session
+
+    async with get_session() as session:
+        rows = (await session.execute(_sql_statement(plan, branch_id))).all()
+    groups: dict[str, int] = {}
+    if plan.group_by:
+        for _, key in rows:
+            key = key or "Unassigned"
+            groups[key] = groups.get(key, 0) + 1
+    return _Result(len(rows), [name for name, _ in rows[:DATA_LIMIT]], groups)
+
+
+# ── Answers ───────────────────────────────────────────────────────────────
+
+
+def _subject(plan: QueryPlan, count: int) -> str:
+    """'rooms with oxygen, in ICU', 'departments without head', ..."""
+    adjectives, with_, without, scoped = [], [], [], []
+    for c in plan.conditions:
+        if c.key in ("type", "department"):
+            scoped.append(f"{'outside' if c.negate else 'in'} {c.label}")
+        elif c.key in _ADJECTIVES:
+            adjectives.append(_ADJECTIVES[c.key][c.negate])
+        else:
+            (without if c.negate else with_).append(c.label)
+    noun = plan.entity if count != 1 else _SINGULAR.get(plan.entity, plan.entity[:-1])
+    parts = [*adjectives, noun]
+    if with_:
+        parts.append("with " + " and ".join(with_))
+    if without:
+        parts.append("without " + " and ".join(without))
+    return " ".join(parts + scoped)
+
+
+def _answer(plan: QueryPlan, result: _Result) -> str:
+    text = f"{result.count} {_subject(plan, result.count)}"
+    if plan.group_by:
+        parts = sorted(result.groups.items(), key=lambda kv: (-kv[1], kv[0]))
+        shown = ", ".join(f"{k}: {v}" for k, v in parts[:LIST_LIMIT])
+        more = f" (+{len(parts) - LIST_LIMIT} more)" if len(parts) > LIST_LIMIT else ""
+        return f"{text}, by {plan.group_by.replace('_', ' ')}: {shown}{more}."
+    if plan.aggregate == "list" and result.count:
+        shown = ", ".join(result.items[:LIST_LIMIT])
+        more = f" (+{result.count - LIST_LIMIT} more)" if result.count > LIST_LIMIT else ""
+        return f"{text}: {shown}{more}."
+    return f"{text}."
+
+
+async def run_query(plan: QueryPlan, ctx: BranchContext) -> NLQueryResponse | None:
+    """Execute *plan*; ``None`` if the database behind an SQL template is unreachable."""
+    start = time.time()
+    if plan.needs_db:
+        try:
+            result = await _run_sql(plan, ctx.branch.id)
+        except Exception as e:
+            logger.warning("Template query %r failed: %s", plan.describe(), e)
+            return None
+    else:
+        result = _run_context(plan, ctx)
+
+    data: dict[str, Any] = {"template": plan.describe(), "count": result.count}
+    if plan.group_by:
+        data["groups"] = result.groups
+    elif plan.aggregate == "list":
+        data["items"] = result.items
+    return NLQueryResponse(
+        answer=_answer(plan, result),
+        source="keyword_match",
+        data=data,
+        durationMs=int((time.time() - start) * 1000),
+    )
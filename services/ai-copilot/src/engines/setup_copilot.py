@@ -25,6 +25,7 @@ from src.infra.models import AutoFillInput, AutoFillResult
 from src.services.ollama import OllamaService, ollama_service
 
 from .models import CopilotPlan, CopilotResponse
+from .prompt_builder import default_budget, pack_sections, sections_from_data
 
 
 # ── System Prompt ─────────────────────────────────────────────────────────
@@ -64,7 +65,7 @@ Respond ONLY with valid JSON matching this structure:
 
 async def run_setup_copilot(
     description: str,
-    existing_context: str | None = None,
+    existing_context: str | dict[str, Any] | None = None,
     ollama: OllamaService | None = None,
 ) -> CopilotResponse:
     """Run the setup copilot. Uses Ollama if available, else heuristic fallback."""
@@ -89,12 +90,14 @@ async def run_setup_copilot(
     # Build prompt
     prompt = f'Hospital description: "{description}"'
     if existing_context:
-        prompt += f"\n\nCurrent configuration:\n{existing_context}"
+        budget = default_budget(SYSTEM_PROMPT, prompt)
+        packed = pack_sections(sections_from_data(existing_context, "CONFIGURATION"), description, budget)
+        prompt += f"\n\nCurrent configuration:\n{packed.text}"
         prompt += "\n\nGenerate a plan that builds upon or improves the existing configuration."
     else:
         prompt += "\n\nGenerate a complete infrastructure configuration plan for this hospital."
 
-    response = await svc.generate_json(SYSTEM_PROMPT, prompt, temperature=0.4)
+    response = await svc.generate_json(SYSTEM_PROMPT, prompt, temperature=0.4, priority="bulk")
 
     if not response.get("available") or not response.get("data"):
         return CopilotResponse(
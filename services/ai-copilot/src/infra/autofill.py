@@ -8,11 +8,11 @@ Proactive intelligence for branch creation:
 """
 from __future__ import annotations
 
-import json
 import math
-from pathlib import Path
 from typing import Any
 
+from src.services.reference_data import reference_data
+
 from .models import (
     AutoFillInput,
     AutoFillResult,
@@ -23,16 +23,10 @@ from .models import (
     EquipmentHighlight,
 )
 
-# ── Load data files ──────────────────────────────────────────────────────
-
-_DATA_DIR = Path(__file__).resolve().parent.parent / "data"
-
-def _load_json(name: str) -> dict:
-    with open(_DATA_DIR / name, "r", encoding="utf-8") as f:
-        return json.load(f)
+# ── Data files (shared reference-data registry, hot-reloaded) ───────────
 
-_hospital_profiles: dict = _load_json("hospital_profiles.json")
-_specialty_map: dict = _load_json("specialty_department_map.json")
+_hospital_profiles = reference_data.view("hospital_profiles.json")
+_specialty_map = reference_data.view("specialty_department_map.json")
 
 
 # ── City → State/Timezone Mapping ────────────────────────────────────────
@@ -109,7 +103,7 @@ def generate_auto_fill(inp: AutoFillInput) -> AutoFillResult:
 
     hospital_type = inp.hospitalType or _infer_hospital_type(inp)
     bed_count = inp.bedCount or 0
-    bed_dist = _hospital_profiles.get("bedDistribution", {})
+    bed_dist = _hospital_profiles.get().get("bedDistribution", {})
     profile = bed_dist.get(hospital_type)
 
     # ── Geographic ───────────────────────────────────────────────────
@@ -270,7 +264,7 @@ def generate_auto_fill(inp: AutoFillInput) -> AutoFillResult:
     # ── Department suggestions ───────────────────────────────────────
 
     if inp.specialties:
-        spec_depts = _specialty_map.get("specialtyDepartments", {})
+        spec_depts = _specialty_map.get().get("specialtyDepartments", {})
         for spec_code in inp.specialties:
             mapping = spec_depts.get(spec_code)
             if mapping:
@@ -298,7 +292,7 @@ def generate_auto_fill(inp: AutoFillInput) -> AutoFillResult:
 
     # ── Equipment highlights ─────────────────────────────────────────
 
-    eq_data = _hospital_profiles.get("equipmentSuggestions", {}).get(hospital_type, [])
+    eq_data = _hospital_profiles.get().get("equipmentSuggestions", {}).get(hospital_type, [])
     for eq in eq_data[:8]:
         compliance = eq.get("compliance")
         equipment_highlights.append(EquipmentHighlight(
@@ -0,0 +1,111 @@
+"""Production server — multi-worker uvicorn with a tuned HTTP stack.
+
+  python -m src.server                 (from services/ai-copilot)
+  ai-copilot-server --workers 4        (installed script)
+
+``python -m src`` stays the development server (one worker, auto-reload).
+This entry point runs:
+
+  - SERVER_WORKERS processes (0 = one per usable CPU core) behind one
+    listening socket; the supervisor restarts a worker that dies
+  - the uvloop event loop and the httptools HTTP parser when installed
+    (``uvicorn[standard]``), asyncio / h11 otherwise
+  - SERVER_KEEPALIVE idle keep-alive, above a reverse proxy's idle timeout
+    so the proxy never reuses a connection the server is closing, and a
+    SERVER_BACKLOG listen queue for connection bursts
+  - graceful shutdown on SIGTERM / SIGINT: stop accepting, give in-flight
+    requests (chat streams included) SERVER_GRACEFUL_TIMEOUT seconds, then
+    run the app's lifespan shutdown -- chat sessions flushed, Ollama client
+    and DB pool closed -- in every worker
+
+Every worker runs the lifespan on its own: its own DB engine (created after
+the worker starts, see ``src.db.session``), Ollama client and scheduler
+(OLLAMA_MAX_INFLIGHT is per worker), and caches.  Chat sessions only follow
+a conversation across workers with CHAT_SESSION_PATH set.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import logging
+import os
+
+import uvicorn
+
+from src.config import (
+    CHAT_SESSION_PATH,
+    SERVER_ACCESS_LOG,
+    SERVER_BACKLOG,
+    SERVER_FORWARDED_ALLOW_IPS,
+    SERVER_GRACEFUL_TIMEOUT,
+    SERVER_HOST,
+    SERVER_KEEPALIVE,
+    SERVER_LIMIT_CONCURRENCY,
+    SERVER_PORT,
+    SERVER_WORKERS,
+)
+
+logger = logging.getLogger("ai-copilot.server")
+
+
+def cpu_count() -> int:
+    """CPU cores this process may run on (respects affinity / cpusets)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not on Linux
+        return os.cpu_count() or 1
+
+
+def worker_count(requested: int = SERVER_WORKERS) -> int:
+    return requested if requested > 0 else cpu_count()
+
+
+def loop_and_parser() -> tuple[str, str]:
+    """uvloop / httptools when importable, else the pure-Python defaults."""
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    return loop, http
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="ZypoCare AI Copilot production server")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="0 = one per CPU core")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(name)s | %(levelname)s | %(message)s")
+    workers = worker_count(args.workers)
+    loop, http = loop_and_parser()
+    logger.info(
+        "Starting %d worker(s) on %s:%d (loop=%s, http=%s, keep-alive=%ds, backlog=%d)",
+        workers, args.host, args.port, loop, http, SERVER_KEEPALIVE, SERVER_BACKLOG,
+    )
+    if workers > 1 and not CHAT_SESSION_PATH:
+        logger.warning(
+            "CHAT_SESSION_PATH is not set: chat sessions live in each worker's memory "
+            "and a conversation continues only if its turns reach the same worker"
+        )
+
+    uvicorn.run(
+        "src.app:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        timeout_keep_alive=SERVER_KEEPALIVE,
+        backlog=SERVER_BACKLOG,
+        timeout_graceful_shutdown=SERVER_GRACEFUL_TIMEOUT,
+        limit_concurrency=SERVER_LIMIT_CONCURRENCY or None,
+        proxy_headers=True,
+        forwarded_allow_ips=SERVER_FORWARDED_ALLOW_IPS,
+        access_log=SERVER_ACCESS_LOG,
+        server_header=False,
+        reload=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,89 @@
-"""In-memory chat session store.
+"""Chat session store.
 
-Maintains conversation history for the co-pilot chat.
-Sessions expire after 30 minutes of inactivity.
-Maximum 20 messages per session.
+Maintains conversation history for the co-pilot chat.  Sessions live in
+process memory by default; with CHAT_SESSION_PATH set they live in a SQLite
+file (WAL) shared by every uvicorn worker, so a ``sessionId`` continues on
+whichever worker takes the next turn.  Endpoints ``create_or_resume`` a
+session, mutate it during the turn and ``save`` it at the end.
+
+  - Sessions expire after CHAT_SESSION_TTL (default 30 minutes) of inactivity.
+  - At most CHAT_MAX_SESSIONS live sessions; creating one more evicts the
+    least recently active.
+  - Maximum 20 messages and CHAT_SESSION_MAX_BYTES (history and its digest,
+    stored Ollama context and fact texts) per session; the oldest messages go
+    first, then the oldest undigested ones into the summary, then the stored
+    context.
+
+In memory, sessions are kept in order of last activity.  With a single TTL
+that order is also expiry order, so expired sessions are dropped from the
+idle end without scanning the live ones, and the same end gives the
+eviction victim.
+
+Each session also keeps Ollama's ``context`` token array from its last LLM
+turn, tagged with a key for the model and branch data it was built on.
+Follow-up turns pass it back so Ollama evaluates only the new message
+instead of the whole system prompt again.  It is held as a 4-byte
+``array`` rather than a list of Python ints.
 """
 
 from __future__ import annotations
 
+import asyncio
+import json
+import logging
+import re
+import sqlite3
+import threading
 import time
 import uuid
-from dataclasses import dataclass, field
+from array import array
+from collections import OrderedDict, deque
+from dataclasses import astuple, dataclass, field
+from typing import Any, Iterable, Protocol
+
+from src.config import (
+    CHAT_DIGEST_TOKENS,
+    CHAT_HISTORY_TOKENS,
+    CHAT_MAX_SESSIONS,
+    CHAT_SESSION_MAX_BYTES,
+    CHAT_SESSION_PATH,
+    CHAT_SESSION_TTL,
+)
+from src.engines.prompt_builder import estimate_tokens
+
+logger = logging.getLogger("ai-copilot.chat-session")
+
+
+def _nbytes(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+GIST_WORDS = 24  # words kept per message in the heuristic digest
+GIST_SOURCE_CHARS = 1200  # of a folded message, kept for the LLM summary
+
 
+def gist(msg: ChatMessage) -> str:
+    """One digest line for *msg*: its first sentence, at most GIST_WORDS words."""
+    first = _SENTENCE_END.split(" ".join(msg.content.split()), 1)[0]
+    words = first.split()
+    if len(words) > GIST_WORDS:
+        first = " ".join(words[:GIST_WORDS]) + " ..."
+    return f"{'User' if msg.role == 'user' else 'Assistant'}: {first}"
 
-@dataclass
+
+def cap_tokens(text: str, limit: int) -> str:
+    """*text* within *limit* tokens: oldest lines dropped first, then words cut."""
+    lines = text.splitlines()
+    while len(lines) > 1 and estimate_tokens("\n".join(lines)) > limit:
+        lines.pop(0)
+    words = "\n".join(lines).split(" ")
+    while words and estimate_tokens(" ".join(words)) > limit:
+        words = words[: len(words) * 4 // 5]
+    return " ".join(words)
+
+
+@dataclass(slots=True)
 class ChatMessage:
     role: str  # "user" | "assistant"
     content: str
@@ -20,72 +91,494 @@ class ChatMessage:
     source: str | None = None  # "ollama" | "keyword_match" | "heuristic"
 
 
-@dataclass
+@dataclass(slots=True)
+class ContextRef:
+    """The branch context a session's turns run on (services/context_cache.py)."""
+
+    branch_id: str
+    version: int  # bumped each time the branch's collected data changes
+    fingerprint: str  # retrieval facts fingerprint of that data
+    fetched_at: float  # when it was collected
+
+
+@dataclass(slots=True)
 class ChatSession:
     session_id: str
-    messages: list[ChatMessage] = field(default_factory=list)
+    messages: deque[ChatMessage] = field(default_factory=deque)  # recent messages, verbatim
     created_at: float = field(default_factory=time.time)
     last_activity: float = field(default_factory=time.time)
+    llm_context: array | None = None  # Ollama conversation state after the last LLM turn
+    llm_context_key: str | None = None  # model + branch data the context was built on
+    llm_turns: int = 0  # LLM turns carried by llm_context
+    llm_facts: set[str] = field(default_factory=set)  # retrieved facts already in llm_context
+    context_ref: ContextRef | None = None  # branch context of the last turn
+    summary: str = ""  # digest of older turns: an LLM summary, or gist lines without Ollama
+    undigested: deque[ChatMessage] = field(default_factory=deque)  # folded out of messages, not yet in summary
+    history_bytes: int = 0  # UTF-8 size of the message contents
+    history_tokens: int = 0  # estimated tokens of the message contents
+    facts_bytes: int = 0  # UTF-8 size of llm_facts
 
     MAX_MESSAGES = 20
-    TTL_SECONDS = 30 * 60  # 30 minutes
+    MAX_BYTES = CHAT_SESSION_MAX_BYTES
+    TTL_SECONDS = CHAT_SESSION_TTL
+    HISTORY_TOKENS = CHAT_HISTORY_TOKENS
+    DIGEST_TOKENS = CHAT_DIGEST_TOKENS
+
+    @property
+    def keep_alive(self) -> str:
+        """Keep the model (and with it the evaluated context) loaded while the session lives."""
+        return f"{self.TTL_SECONDS:.0f}s"
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held for this session's history and digest, stored context and fact texts."""
+        context = len(self.llm_context) * self.llm_context.itemsize if self.llm_context else 0
+        digest = _nbytes(self.summary) + sum(_nbytes(m.content) for m in self.undigested)
+        return self.history_bytes + digest + context + self.facts_bytes
+
+    @property
+    def digest(self) -> str:
+        """The summary plus a gist line per undigested message, within DIGEST_TOKENS.
+
+        Over budget, the oldest gists go before the summary does.
+        """
+        gists = [gist(m) for m in self.undigested]
+        while gists and estimate_tokens("\n".join([self.summary, *gists])) > self.DIGEST_TOKENS:
+            gists.pop(0)
+        return cap_tokens("\n".join(filter(None, [self.summary, *gists])), self.DIGEST_TOKENS)
 
     def add_message(self, role: str, content: str, source: str | None = None) -> None:
+        size = _nbytes(content)
+        if size > self.MAX_BYTES:
+            content = content.encode("utf-8")[: self.MAX_BYTES].decode("utf-8", "ignore")
+            size = _nbytes(content)
         self.messages.append(ChatMessage(role=role, content=content, source=source))
+        self.history_bytes += size
+        self.history_tokens += estimate_tokens(content)
         self.last_activity = time.time()
-        # Trim old messages if over limit
-        if len(self.messages) > self.MAX_MESSAGES:
-            self.messages = self.messages[-self.MAX_MESSAGES:]
+        self._trim()
+
+    def conversation_context(self, key: str) -> list[int] | None:
+        """The stored Ollama context if it was built for *key*, else None (and drop it)."""
+        if self.llm_context and self.llm_context_key == key:
+            return self.llm_context.tolist()
+        self.reset_context()
+        return None
+
+    def remember_context(self, key: str, context: list[int] | None, facts: Iterable[str] = ()) -> None:
+        if not context:
+            return
+        if self.llm_context_key != key:
+            self.reset_context()
+        self.llm_turns += 1
+        self.llm_context = array("I", context)
+        self.llm_context_key = key
+        for fact in facts:
+            if fact not in self.llm_facts:
+                self.llm_facts.add(fact)
+                self.facts_bytes += _nbytes(fact)
+        self._trim()
+
+    def reset_context(self) -> None:
+        self.llm_context = None
+        self.llm_context_key = None
+        self.llm_turns = 0
+        self.llm_facts = set()
+        self.facts_bytes = 0
+
+    def apply_summary(self, summary: str, covered: Iterable[ChatMessage], based_on: str) -> bool:
+        """Replace the summary with an LLM one covering *covered*.
+
+        Skipped (False) if the summary changed since *based_on* was read.
+        """
+        if self.summary != based_on:
+            return False
+        done = {(m.timestamp, m.role) for m in covered}
+        self.summary = cap_tokens(summary, self.DIGEST_TOKENS)
+        self.undigested = deque(m for m in self.undigested if (m.timestamp, m.role) not in done)
+        return True
+
+    def _trim(self) -> None:
+        """Enforce the limits on the verbatim history: its oldest messages are
+        folded into the digest.  Over bytes, the oldest undigested messages go
+        into the summary (folding more as needed), then the stored context."""
+        messages = self.messages
+        verbatim = self.HISTORY_TOKENS - self.DIGEST_TOKENS
+        folded = []
+        while len(messages) > 1 and (len(messages) > self.MAX_MESSAGES or self.history_tokens > verbatim):
+            folded.append(self._pop_oldest())
+        if folded:
+            self._fold(folded)
+        while self.nbytes > self.MAX_BYTES:
+            if self.undigested:
+                self._digest_oldest()
+            elif len(messages) > 1:
+                self._fold([self._pop_oldest()])
+            else:
+                break
+        if self.nbytes > self.MAX_BYTES:
+            self.reset_context()  # the next LLM turn sends the full prompt again
+
+    def _pop_oldest(self) -> ChatMessage:
+        msg = self.messages.popleft()
+        self.history_bytes -= _nbytes(msg.content)
+        self.history_tokens -= estimate_tokens(msg.content)
+        return msg
+
+    def _fold(self, folded: list[ChatMessage]) -> None:
+        for msg in folded:
+            self.undigested.append(ChatMessage(msg.role, msg.content[:GIST_SOURCE_CHARS], msg.timestamp, msg.source))
+        # Without Ollama nothing gets summarised: the oldest gists move into the summary.
+        while len(self.undigested) > self.MAX_MESSAGES:
+            self._digest_oldest()
+
+    def _digest_oldest(self) -> None:
+        line = gist(self.undigested.popleft())
+        self.summary = cap_tokens(f"{self.summary}\n{line}" if self.summary else line, self.DIGEST_TOKENS)
+
+    def is_expired(self, now: float | None = None) -> bool:
+        return (now or time.time()) - self.last_activity > self.TTL_SECONDS
+
+    def get_history_text(self, question: str | None = None) -> str:
+        """Conversation history for an LLM prompt, within HISTORY_TOKENS.
+
+        The digest of older turns, then the most recent messages verbatim
+        that fit.  A trailing user message equal to *question* (the turn
+        being answered) is left out.
+        """
+        messages = list(self.messages)
+        if question is not None and messages and messages[-1].role == "user" and messages[-1].content == question:
+            messages.pop()
+        digest = self.digest
+        budget = self.HISTORY_TOKENS - (estimate_tokens(digest) + 2 if digest else 0)
+        lines: list[str] = []
+        for msg in reversed(messages):
+            line = f"{'User' if msg.role == 'user' else 'Assistant'}: {msg.content}"
+            budget -= estimate_tokens(line) + 1
+            if budget < 0:
+                break
+            lines.append(line)
+        if digest:
+            lines.append(f"Earlier: {digest}")
+        return "\n".join(reversed(lines))
+
+
+# ── Stores ────────────────────────────────────────────────────────────────
+
+
+class SessionStore(Protocol):
+    """Where chat sessions live between turns.
 
-    def is_expired(self) -> bool:
-        return time.time() - self.last_activity > self.TTL_SECONDS
+    Endpoints resume a session, mutate it during the turn, then ``save`` it.
+    """
 
-    def get_history_text(self) -> str:
-        """Return conversation history as a formatted string for LLM context."""
-        lines = []
-        for msg in self.messages[-10:]:  # Last 10 messages for context
-            prefix = "User" if msg.role == "user" else "Assistant"
-            lines.append(f"{prefix}: {msg.content}")
-        return "\n".join(lines)
+    async def create_or_resume(self, session_id: str | None = None) -> ChatSession: ...
+
+    async def get(self, session_id: str) -> ChatSession | None: ...
+
+    async def save(self, session: ChatSession) -> None: ...
+
+    def open(self) -> None: ...
+
+    async def aclose(self) -> None: ...
+
+    def stats(self) -> dict[str, Any]: ...
 
 
 class ChatSessionStore:
-    """In-memory session store with TTL cleanup."""
+    """In-memory session store with TTL expiry and LRU eviction (one process)."""
 
-    def __init__(self) -> None:
-        self._sessions: dict[str, ChatSession] = {}
+    def __init__(self, max_sessions: int = CHAT_MAX_SESSIONS) -> None:
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, ChatSession] = OrderedDict()  # least recently active first
+        self.expired = 0
+        self.evicted = 0
 
-    def create_or_resume(self, session_id: str | None = None) -> ChatSession:
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    async def create_or_resume(self, session_id: str | None = None) -> ChatSession:
         """Get existing session or create new one."""
-        self._cleanup_expired()
+        now = time.time()
+        self._cleanup_expired(now)
 
-        if session_id and session_id in self._sessions:
-            session = self._sessions[session_id]
-            if not session.is_expired():
+        session = self._sessions.get(session_id) if session_id else None
+        if session is not None:
+            if not session.is_expired(now):
+                self._sessions.move_to_end(session_id)  # type: ignore[arg-type]
                 return session
             # Expired — remove it
-            del self._sessions[session_id]
+            del self._sessions[session_id]  # type: ignore[arg-type]
+            self.expired += 1
 
         # Create new session
         new_id = session_id or str(uuid.uuid4())
         session = ChatSession(session_id=new_id)
         self._sessions[new_id] = session
+        while self.max_sessions and len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evicted += 1
         return session
 
-    def get(self, session_id: str) -> ChatSession | None:
+    async def get(self, session_id: str) -> ChatSession | None:
         session = self._sessions.get(session_id)
         if session and not session.is_expired():
+            self._sessions.move_to_end(session_id)
             return session
         return None
 
-    def _cleanup_expired(self) -> None:
-        """Remove expired sessions (called periodically)."""
-        expired = [
-            sid for sid, s in self._sessions.items() if s.is_expired()
-        ]
-        for sid in expired:
-            del self._sessions[sid]
+    async def save(self, session: ChatSession) -> None:
+        """Sessions are live objects here; nothing to write."""
+
+    def open(self) -> None:
+        pass
+
+    async def aclose(self) -> None:
+        pass
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "backend": "memory",
+            "sessions": len(self._sessions),
+            "maxSessions": self.max_sessions,
+            "ttlSeconds": ChatSession.TTL_SECONDS,
+            "bytes": sum(s.nbytes for s in self._sessions.values()),
+            "maxSessionBytes": ChatSession.MAX_BYTES,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
+
+    def _cleanup_expired(self, now: float) -> None:
+        """Remove expired sessions from the idle end, stopping at the first live one.
+
+        Amortised O(1) per call: each session is popped at most once.  A reply
+        added after the session was resumed can leave it marginally out of
+        order; ``is_expired`` on lookup stays authoritative.
+        """
+        sessions = self._sessions
+        while sessions:
+            oldest = next(iter(sessions.values()))
+            if not oldest.is_expired(now):
+                break
+            sessions.popitem(last=False)
+            self.expired += 1
+
+
+# ── SQLite (shared by workers) ────────────────────────────────────────────
+
+_ROW_COLUMNS = "session_id, state, context, last_activity, expires_at"
+
+
+def _encode(session: ChatSession) -> tuple:
+    state = json.dumps(
+        {
+            "messages": [[m.role, m.content, m.timestamp, m.source] for m in session.messages],
+            "summary": session.summary,
+            "undigested": [[m.role, m.content, m.timestamp, m.source] for m in session.undigested],
+            "created": session.created_at,
+            "key": session.llm_context_key,
+            "turns": session.llm_turns,
+            "facts": list(session.llm_facts),
+            "contextRef": list(astuple(session.context_ref)) if session.context_ref else None,
+        },
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    context = session.llm_context.tobytes() if session.llm_context else None
+    return (session.session_id, state, context, session.last_activity, session.last_activity + session.TTL_SECONDS)
+
+
+def _decode(session_id: str, state: str, context: bytes | None, last_activity: float) -> ChatSession:
+    data = json.loads(state)
+    session = ChatSession(
+        session_id=session_id, created_at=data["created"], last_activity=last_activity, summary=data["summary"]
+    )
+    for role, content, timestamp, source in data["messages"]:
+        session.messages.append(ChatMessage(role, content, timestamp, source))
+        session.history_bytes += _nbytes(content)
+        session.history_tokens += estimate_tokens(content)
+    session.undigested.extend(ChatMessage(*m) for m in data["undigested"])
+    if data.get("contextRef"):
+        session.context_ref = ContextRef(*data["contextRef"])
+    if context:
+        session.llm_context = array("I")
+        session.llm_context.frombytes(context)
+        session.llm_context_key = data["key"]
+        session.llm_turns = data["turns"]
+        session.llm_facts = set(data["facts"])
+        session.facts_bytes = sum(_nbytes(f) for f in session.llm_facts)
+    return session
+
+
+class SQLiteSessionStore:
+    """Sessions in a SQLite file (WAL) that every worker process opens.
+
+    Reads are a primary-key lookup on a reader connection, on the event loop.
+    ``save`` queues the session's row; one flusher writes everything queued
+    in a single transaction off the loop, so concurrent turns share a commit.
+    ``save`` returns once its row is committed, so the next turn -- on any
+    worker -- sees it.  Expired rows are ignored on read and purged through
+    the ``expires_at`` index at most every PURGE_INTERVAL seconds, which is
+    also when the oldest rows beyond ``max_sessions`` are dropped.
+
+    Falls back to an in-memory store if the file can't be opened.
+    """
+
+    PURGE_INTERVAL = 60.0  # seconds
+
+    def __init__(self, path: str = CHAT_SESSION_PATH, max_sessions: int = CHAT_MAX_SESSIONS) -> None:
+        self.path = path
+        self.max_sessions = max_sessions
+        self._reader: sqlite3.Connection | None = None
+        self._writer: sqlite3.Connection | None = None
+        self._lock = threading.Lock()  # guards the writer connection
+        self._fallback: ChatSessionStore | None = None
+        self._pending: dict[str, tuple] = {}  # session_id -> row; a later save replaces an unwritten one
+        self._waiters: list[asyncio.Future] = []
+        self._flusher: asyncio.Task | None = None
+        self._purged_at = 0.0
+        self.reads = 0
+        self.writes = 0
+        self.batches = 0
+        self.purged = 0
+        self.write_errors = 0
+
+    # ── Public API ─────────────────────────────────────────────────────
+
+    async def create_or_resume(self, session_id: str | None = None) -> ChatSession:
+        if not self._ready():
+            return await self._fallback.create_or_resume(session_id)  # type: ignore[union-attr]
+        session = await self.get(session_id) if session_id else None
+        return session or ChatSession(session_id=session_id or str(uuid.uuid4()))
+
+    async def get(self, session_id: str) -> ChatSession | None:
+        if not self._ready():
+            return await self._fallback.get(session_id)  # type: ignore[union-attr]
+        now = time.time()
+        row = self._pending.get(session_id)
+        if row is None:
+            self.reads += 1
+            row = self._reader.execute(  # type: ignore[union-attr]
+                f"SELECT {_ROW_COLUMNS} FROM chat_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if row is None or row[4] <= now:
+            return None
+        return _decode(*row[:4])
+
+    async def save(self, session: ChatSession) -> None:
+        if not self._ready():
+            return
+        self._pending[session.session_id] = _encode(session)
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush())
+        await waiter
+
+    def open(self) -> None:
+        """Open the SQLite file and create the table and TTL index if needed."""
+        if self._reader is not None or self._fallback is not None:
+            return
+        try:
+            writer = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            writer.execute("PRAGMA journal_mode=WAL")
+            writer.execute("PRAGMA synchronous=NORMAL")
+            writer.execute(
+                "CREATE TABLE IF NOT EXISTS chat_sessions ("
+                " session_id TEXT PRIMARY KEY, state TEXT NOT NULL, context BLOB,"
+                " last_activity REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            writer.execute("CREATE INDEX IF NOT EXISTS chat_sessions_expires ON chat_sessions (expires_at)")
+            writer.commit()
+            reader = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        except sqlite3.Error as exc:
+            logger.warning("Chat sessions kept in memory (%s): %s", self.path, exc)
+            self._fallback = ChatSessionStore(self.max_sessions)
+            return
+        self._writer, self._reader = writer, reader
+        logger.info("Chat sessions shared via %s", self.path)
+
+    async def aclose(self) -> None:
+        if self._flusher is not None:
+            await self._flusher
+        with self._lock:
+            writer, self._writer = self._writer, None
+        reader, self._reader = self._reader, None
+        for db in (writer, reader):
+            if db is not None:
+                db.close()
+
+    def stats(self) -> dict[str, Any]:
+        if self._fallback is not None:
+            return {**self._fallback.stats(), "backend": "memory (sqlite unavailable)"}
+        sessions = 0
+        if self._reader is not None:
+            sessions = self._reader.execute(
+                "SELECT COUNT(*) FROM chat_sessions WHERE expires_at > ?", (time.time(),)
+            ).fetchone()[0]
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "sessions": sessions,
+            "maxSessions": self.max_sessions,
+            "ttlSeconds": ChatSession.TTL_SECONDS,
+            "maxSessionBytes": ChatSession.MAX_BYTES,
+            "reads": self.reads,
+            "writes": self.writes,
+            "batches": self.batches,
+            "rowsPerBatch": round(self.writes / self.batches, 2) if self.batches else 0.0,
+            "purged": self.purged,
+            "writeErrors": self.write_errors,
+        }
+
+    # ── Writes ─────────────────────────────────────────────────────────
+
+    def _ready(self) -> bool:
+        if self._reader is None and self._fallback is None:
+            self.open()
+        return self._fallback is None
+
+    async def _flush(self) -> None:
+        try:
+            while self._pending:
+                rows, waiters = list(self._pending.values()), self._waiters
+                self._pending, self._waiters = {}, []
+                try:
+                    await asyncio.to_thread(self._write, rows)
+                except sqlite3.Error as exc:
+                    self.write_errors += 1
+                    logger.warning("Chat session write failed (%d sessions): %s", len(rows), exc)
+                finally:
+                    for waiter in waiters:
+                        if not waiter.done():
+                            waiter.set_result(None)
+        finally:
+            self._flusher = None
+
+    def _write(self, rows: list[tuple]) -> None:
+        with self._lock:
+            db = self._writer
+            if db is None:
+                return
+            with db:
+                db.executemany(f"INSERT OR REPLACE INTO chat_sessions ({_ROW_COLUMNS}) VALUES (?, ?, ?, ?, ?)", rows)
+                now = time.time()
+                if now - self._purged_at >= self.PURGE_INTERVAL:
+                    self._purged_at = now
+                    self.purged += db.execute("DELETE FROM chat_sessions WHERE expires_at <= ?", (now,)).rowcount
+                    if self.max_sessions:
+                        self.purged += db.execute(
+                            "DELETE FROM chat_sessions WHERE session_id IN (SELECT session_id FROM chat_sessions"
+                            " ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                            (self.max_sessions,),
+                        ).rowcount
+        self.writes += len(rows)
+        self.batches += 1
+
+
+def _make_store() -> SessionStore:
+    return SQLiteSessionStore() if CHAT_SESSION_PATH else ChatSessionStore()
 
 
 # Singleton
-chat_store = ChatSessionStore()
+chat_store = _make_store()
@@ -0,0 +1,132 @@
+"""Branch context reuse across chat turns.
+
+``collect_branch_context`` runs a few dozen queries, and chat used to call
+it on every message for data that rarely changes mid-conversation.  The
+collected context is now kept per branch for CHAT_CONTEXT_TTL seconds and
+shared by every chat session on that branch; each session records a
+``ContextRef`` (branch, version, fingerprint) to the context it ran on.
+
+  - The version only moves when a re-collection finds different data (by
+    the retrieval facts fingerprint), so a session can tell whether the
+    branch changed since its last turn (``changed`` in stats).
+  - Reusing the BranchContext object reuses everything derived from it:
+    ``ctx.index`` lookups, the retrieval facts and their fingerprint, the
+    fact index built for that fingerprint, and the session's Ollama context
+    (the evaluated NL prompt), whose key is that fingerprint.
+  - ``invalidate`` (chat ``bust``, or a busted health-check) makes the next
+    turn collect again.  Concurrent turns on a cold branch share one
+    collection.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from src.collectors.models import BranchContext
+from src.collectors.schema_context import collect_branch_context
+from src.config import CHAT_CONTEXT_MAX_BRANCHES, CHAT_CONTEXT_TTL
+from src.services.chat_session import ChatSession, ContextRef
+
+logger = logging.getLogger("ai-copilot.context-cache")
+
+
+@dataclass(slots=True)
+class _Entry:
+    ctx: BranchContext
+    ref: ContextRef
+    expires_at: float
+
+
+class BranchContextCache:
+    def __init__(
+        self,
+        ttl: float = CHAT_CONTEXT_TTL,
+        max_branches: int = CHAT_CONTEXT_MAX_BRANCHES,
+        collect: Callable[[str], Awaitable[BranchContext]] = collect_branch_context,
+    ) -> None:
+        self.ttl = ttl
+        self.max_branches = max_branches
+        self._collect = collect
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()  # least recently used first
+        self._locks: dict[str, asyncio.Lock] = {}
+        self.hits = 0
+        self.collections = 0
+        self.changed = 0
+        self.invalidations = 0
+
+    # ── Public API ─────────────────────────────────────────────────────
+
+    async def for_session(self, session: ChatSession, branch_id: str, *, refresh: bool = False) -> BranchContext:
+        """The context for *session*'s turn on *branch_id*; updates ``session.context_ref``."""
+        ctx, session.context_ref = await self.get(branch_id, session.context_ref, refresh=refresh)
+        return ctx
+
+    async def get(
+        self, branch_id: str, ref: ContextRef | None = None, *, refresh: bool = False
+    ) -> tuple[BranchContext, ContextRef]:
+        """The cached context for *branch_id* (collected if missing, expired or *refresh*)."""
+        if refresh:
+            self.invalidate(branch_id)
+        entry = self._entries.get(branch_id)
+        if entry is not None and entry.expires_at > time.time():
+            self.hits += 1
+            self._entries.move_to_end(branch_id)
+        else:
+            entry = await self._load(branch_id)
+        if ref is not None and ref.branch_id == branch_id and ref.fingerprint != entry.ref.fingerprint:
+            self.changed += 1
+        return entry.ctx, entry.ref
+
+    def invalidate(self, branch_id: str | None = None) -> None:
+        """Collect *branch_id* (every branch if None) again on its next turn."""
+        for key, entry in self._entries.items():
+            if branch_id is None or key == branch_id:
+                entry.expires_at = 0.0
+                self.invalidations += 1
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.collections
+        return {
+            "branches": len(self._entries),
+            "maxBranches": self.max_branches,
+            "ttlSeconds": self.ttl,
+            "hits": self.hits,
+            "collections": self.collections,
+            "changed": self.changed,
+            "invalidations": self.invalidations,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    # ── Collection ─────────────────────────────────────────────────────
+
+    async def _load(self, branch_id: str) -> _Entry:
+        started = time.time()
+        async with self._locks.setdefault(branch_id, asyncio.Lock()):
+            entry = self._entries.get(branch_id)
+            if entry is not None and entry.ref.fetched_at >= started and entry.expires_at > time.time():
+                self.hits += 1  # collected by a concurrent turn while we waited
+                return entry
+
+            ctx = await self._collect(branch_id)
+            now = time.time()
+            fingerprint = ctx.index.facts_fingerprint
+            version = 1
+            if entry is not None:
+                version = entry.ref.version + (fingerprint != entry.ref.fingerprint)
+            entry = _Entry(ctx, ContextRef(branch_id, version, fingerprint, now), now + self.ttl)
+            self._entries[branch_id] = entry
+            self._entries.move_to_end(branch_id)
+            while len(self._entries) > self.max_branches:
+                self._entries.popitem(last=False)
+            self.collections += 1
+            logger.debug("Branch context %s collected (v%d) in %.0f ms", branch_id, version, (now - started) * 1000)
+            return entry
+
+
+# Singleton
+branch_contexts = BranchContextCache()
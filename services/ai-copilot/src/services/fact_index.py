@@ -0,0 +1,549 @@
+"""Per-branch fact retrieval index for NL questions.
+
+Flattens a BranchContext into short, self-contained facts (the summary
+lines, one per unit type, unit, room, department and pharmacy store, plus
+billing and "check" facts for gaps such as departments without a head),
+embeds them and keeps the vectors as one L2-normalized float32 matrix per
+branch.  A question is embedded the same way and matched with a batched
+dot product + top-k, so the NL prompt carries only the facts that matter.
+
+  - Embeddings come from Ollama's /api/embed (OLLAMA_EMBED_MODEL) when that
+    model is pulled, else from a hashing vectorizer (no model, no network).
+    An index never mixes vectors from two embedders.
+  - Rebuilds are incremental: vectors are reused per fact text, so a branch
+    edit only embeds the facts it changed.
+  - With RETRIEVAL_INDEX_DIR set, each matrix is saved as ``.npy`` next to a
+    JSON sidecar of row hashes and memory-mapped back after a restart.  The
+    ``.npy`` is named after a hash of its row keys, which the sidecar
+    records too, and both are written to a temp file and renamed, so
+    workers sharing the directory never pair a matrix with another build's
+    rows.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Protocol
+
+import numpy as np
+
+from src.collectors.models import BranchContext
+from src.config import OLLAMA_EMBED_MODEL, RETRIEVAL_HASH_DIM, RETRIEVAL_INDEX_DIR, RETRIEVAL_TOP_K
+from src.engines.prompt_builder import expand_terms, terms
+
+if TYPE_CHECKING:
+    from src.services.ollama import OllamaService
+
+logger = logging.getLogger("ai-copilot.retrieval")
+
+MAX_NAMES = 12  # names listed in one check fact before "+N more"
+
+
+@dataclass(slots=True)
+class Fact:
+    kind: str  # summary | unit_type | unit | room | department | store | billing | check
+    text: str
+
+
+@dataclass(slots=True)
+class FactHit:
+    fact: Fact
+    score: float
+
+
+@dataclass
+class Retrieval:
+    hits: list[FactHit]
+    fingerprint: str  # of the branch facts, independent of the embedder
+    embedder: str
+    duration_ms: float
+
+
+# ── Facts ─────────────────────────────────────────────────────────────────
+
+
+def _names(items: list[str]) -> str:
+    more = len(items) - MAX_NAMES
+    return ", ".join(items[:MAX_NAMES]) + (f" (+{more} more)" if more > 0 else "")
+
+
+def branch_facts(ctx: BranchContext) -> list[Fact]:
+    """Every fact the retriever can choose from, in a stable order."""
+    ix = ctx.index
+    facts = [Fact("summary", line.strip()) for line in ctx.textSummary.splitlines() if line.strip()]
+
+    for type_code, units in ix.active_units_by_type.items():
+        facts.append(Fact("unit_type", (
+            f"Unit type {units[0].typeName or type_code} ({type_code}): {len(units)} active units, "
+            f"{sum(len(u.rooms) for u in units)} rooms, {sum(u.resources.beds for u in units)} beds."
+        )))
+
+    for u in ctx.units.units:
+        node = ix.node_by_id.get(u.locationNodeId) if u.locationNodeId else None
+        facts.append(Fact("unit", (
+            f"Unit {u.name} ({u.code}): type {u.typeName or u.typeCode}, "
+            f"department {u.departmentName or 'none'}, {len(u.rooms)} rooms, {u.resources.beds} beds, "
+            f"{'active' if u.isActive else 'inactive'}"
+            + (f", located in {node.name or node.code}" if node else ", no location")
+            + "."
+        )))
+        for r in u.rooms:
+            features = [label for flag, label in (
+                (r.hasOxygen, "oxygen"), (r.hasSuction, "suction"),
+                (r.hasAttachedBathroom, "attached bathroom"), (r.hasAC, "AC"), (r.hasTV, "TV"),
+            ) if flag]
+            if r.maxOccupancy:
+                features.append(f"occupancy {r.maxOccupancy}")
+            if r.areaSqFt:
+                features.append(f"{r.areaSqFt} sq ft")
+            if not r.isActive:
+                features.append("inactive")
+            facts.append(Fact("room", (
+                f"Room {r.name} ({r.code}) in unit {u.name}: {r.roomType or 'untyped'}"
+                + (f", {', '.join(features)}" if features else "")
+                + "."
+            )))
+
+    for d in ctx.departments.departments:
+        facts.append(Fact("department", (
+            f"Department {d.name} ({d.code}): "
+            f"{'head assigned' if d.hasHead else 'no head of department'}, {d.staffCount} staff"
+            + (f", {d.facilityType.lower()}" if d.facilityType else "")
+            + "."
+        )))
+
+    now = datetime.now(timezone.utc)
+    for s in ctx.pharmacy.stores:
+        parts = [s.storeType, s.status]
+        if s.is24x7:
+            parts.append("24x7")
+        parts.append("dispensing" if s.canDispense else "non-dispensing")
+        if s.drugLicenseNumber:
+            expiry = s.drugLicenseExpiry
+            parts.append(
+                f"drug licence {s.drugLicenseNumber}"
+                + (f" expiring {expiry.date().isoformat()}" if expiry else "")
+            )
+        else:
+            parts.append("no drug licence")
+        if not s.pharmacistInChargeId:
+            parts.append("no pharmacist in charge")
+        facts.append(Fact("store", f"Pharmacy store {s.storeName} ({s.storeCode}): {', '.join(parts)}."))
+
+    b = ctx.billing
+    if b.totalInsurancePolicies or b.totalClaims or b.totalPreauths:
+        facts.append(Fact("billing", (
+            f"Insurance: {b.activeInsurancePolicies} active policies of {b.totalInsurancePolicies}, "
+            f"{b.openInsuranceCases} open cases of {b.totalInsuranceCases}."
+        )))
+        facts.append(Fact("billing", (
+            f"Pre-authorisations: {b.totalPreauths} ({b.pendingPreauths} pending, "
+            f"{b.approvedPreauths} approved, {b.rejectedPreauths} rejected)."
+        )))
+        facts.append(Fact("billing", (
+            f"Claims: {b.totalClaims} ({b.draftClaims} draft, {b.submittedClaims} submitted, "
+            f"{b.settledClaims} settled, {b.rejectedClaims} rejected)."
+        )))
+    if b.totalPayerIntegrations:
+        facts.append(Fact("billing", (
+            f"Payer integrations: {b.activePayerIntegrations} active of {b.totalPayerIntegrations}."
+        )))
+
+    facts.extend(_check_facts(ctx, now))
+    return facts
+
+
+def _check_facts(ctx: BranchContext, now: datetime) -> list[Fact]:
+    ix = ctx.index
+    loc = ctx.location
+    out = [
+        Fact("check", f"Check: fire zones {'are' if loc.hasFireZones else 'are not'} mapped in the location tree."),
+        Fact("check", f"Check: emergency exits {'are' if loc.hasEmergencyExits else 'are not'} marked."),
+        Fact("check", f"Check: wheelchair access {'is' if loc.hasWheelchairAccess else 'is not'} recorded."),
+    ]
+    if loc.nodesWithoutRevision:
+        out.append(Fact("check", f"Check: {loc.nodesWithoutRevision} location nodes have no revision."))
+
+    gaps: list[tuple[str, list[str]]] = [
+        ("departments without a head", [d.name for d in ctx.departments.departments if not d.hasHead]),
+        ("departments without staff", [d.name for d in ctx.departments.departments if not d.staffCount]),
+        ("inactive units", [u.name for u in ix.inactive_units]),
+        ("active units without rooms", [u.name for u in ix.active_units if not u.rooms]),
+        ("active units without a location", [u.name for u in ix.active_units if not u.locationNodeId]),
+        ("active units without a department", [u.name for u in ix.active_units if not u.departmentId]),
+        ("pharmacy stores without a pharmacist in charge",
+         [s.storeName for s in ctx.pharmacy.stores if not s.pharmacistInChargeId]),
+        ("pharmacy stores with an expired drug licence",
+         [s.storeName for s in ctx.pharmacy.stores
+          if s.drugLicenseExpiry and _aware(s.drugLicenseExpiry) < now]),
+    ]
+    for label, names in gaps:
+        if names:
+            out.append(Fact("check", f"Check: {len(names)} {label}: {_names(names)}."))
+        else:
+            out.append(Fact("check", f"Check: no {label}."))
+
+    sc = ctx.serviceCatalog
+    if sc.totalPayers and not sc.hasCashPayer:
+        out.append(Fact("check", "Check: no cash (self-pay) payer is configured."))
+    if sc.withoutBasePrice:
+        out.append(Fact("check", f"Check: {sc.withoutBasePrice} service items have no base price."))
+    if sc.expiredContracts:
+        out.append(Fact("check", f"Check: {sc.expiredContracts} payer contracts have expired."))
+    return out
+
+
+def _aware(dt: datetime) -> datetime:
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def facts_fingerprint(facts: list[Fact]) -> str:
+    h = hashlib.sha1()
+    for f in facts:
+        h.update(f.text.encode())
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+# ── Embedders ─────────────────────────────────────────────────────────────
+
+
+class Embedder(Protocol):
+    name: str
+
+    async def embed(self, texts: list[str], *, query: bool = False) -> np.ndarray | None:
+        """(len(texts), dim) float32 with unit-length rows, or None if unavailable."""
+        ...
+
+
+def _normalize(mat: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    mat /= np.maximum(norms, 1e-12)
+    return mat
+
+
+class HashingEmbedder:
+    """Signed feature hashing of terms, word bigrams and character trigrams.
+
+    Needs no model: good at matching names, codes and domain words, blind to
+    paraphrase beyond the prompt_builder aliases (which queries expand into).
+    """
+
+    def __init__(self, dim: int = RETRIEVAL_HASH_DIM) -> None:
+        self.dim = dim
+        self.name = f"hash-{dim}"
+
+    async def embed(self, texts: list[str], *, query: bool = False) -> np.ndarray:
+        return self.encode(texts, query=query)
+
+    def encode(self, texts: list[str], *, query: bool = False) -> np.ndarray:
+        rows: list[int] = []
+        cols: list[int] = []
+        vals: list[float] = []
+        for i, text in enumerate(texts):
+            for feature, weight in self._features(text, query):
+                h = zlib.crc32(feature.encode())
+                rows.append(i)
+                cols.append(h % self.dim)
+                vals.append(weight if h & 0x80000000 else -weight)
+        mat = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if rows:
+            np.add.at(mat, (np.asarray(rows), np.asarray(cols)), np.asarray(vals, dtype=np.float32))
+        return _normalize(mat)
+
+    @staticmethod
+    def _features(text: str, query: bool) -> list[tuple[str, float]]:
+        base = terms(text)
+        out = [(t, 1.0) for t in base]
+        if query:
+            out.extend((t, 0.5) for t in expand_terms(base) - base)
+        words = [w for w in re.findall(r"[a-z0-9]+", text.lower()) if len(w) > 1]
+        out.extend((f"{a} {b}", 0.5) for a, b in zip(words, words[1:]))
+        for t in base:
+            if len(t) > 4:
+                padded = f"#{t}#"
+                out.extend((padded[i:i + 3], 0.2) for i in range(len(padded) - 2))
+        return out
+
+
+class OllamaEmbedder:
+    def __init__(self, svc: OllamaService, model: str = OLLAMA_EMBED_MODEL) -> None:
+        self.svc = svc
+        self.model = model
+        self.name = "ollama-" + re.sub(r"[^A-Za-z0-9._-]+", "_", model)
+
+    async def embed(self, texts: list[str], *, query: bool = False) -> np.ndarray | None:
+        resp = await self.svc.embed(texts, model=self.model, priority="interactive" if query else "bulk")
+        if resp.error or len(resp.vectors) != len(texts):
+            logger.warning("Ollama embeddings unavailable (%s); using hashing vectorizer", resp.error)
+            return None
+        return _normalize(np.asarray(resp.vectors, dtype=np.float32))
+
+
+# ── Index ─────────────────────────────────────────────────────────────────
+
+
+def _row_key(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def _rows_hash(row_keys: list[str]) -> str:
+    return hashlib.sha1("\n".join(row_keys).encode()).hexdigest()[:16]
+
+
+@dataclass
+class BranchFactIndex:
+    branch_id: str
+    embedder: str
+    fingerprint: str  # facts_fingerprint() the matrix was built from
+    facts: list[Fact]
+    row_keys: list[str]  # _row_key(fact.text) per matrix row
+    matrix: np.ndarray  # (n, dim) float32, unit rows; a read-only memmap when persisted
+    built_at: float = 0.0
+    embedded: int = 0  # facts embedded by the build that produced this index
+
+    @property
+    def dim(self) -> int:
+        return int(self.matrix.shape[1]) if self.matrix.ndim == 2 else 0
+
+    def search(self, queries: np.ndarray, k: int) -> list[list[FactHit]]:
+        """Top-*k* facts per query row: one (q, n) dot product, argpartition, sort k."""
+        n = len(self.facts)
+        if n == 0 or k <= 0:
+            return [[] for _ in range(len(queries))]
+        scores = queries @ self.matrix.T
+        k = min(k, n)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        rows = np.arange(len(queries))[:, None]
+        top = top[rows, np.argsort(-scores[rows, top], axis=1)]
+        return [
+            [FactHit(self.facts[j], float(scores[i, j])) for j in top[i] if scores[i, j] > 0]
+            for i in range(len(queries))
+        ]
+
+
+class FactIndexStore:
+    """Per-(branch, embedder) indexes, rebuilt incrementally when the facts change."""
+
+    def __init__(
+        self,
+        index_dir: str = RETRIEVAL_INDEX_DIR,
+        top_k: int = RETRIEVAL_TOP_K,
+        hash_dim: int = RETRIEVAL_HASH_DIM,
+        embed_model: str = OLLAMA_EMBED_MODEL,
+    ) -> None:
+        self.index_dir = Path(index_dir) if index_dir else None
+        self.top_k = top_k
+        self.embed_model = embed_model
+        self.hashing = HashingEmbedder(hash_dim)
+        self._indexes: dict[tuple[str, str], BranchFactIndex] = {}
+        self._locks: dict[tuple[str, str], asyncio.Lock] = {}
+        self.builds = 0
+        self.facts_embedded = 0
+        self.facts_reused = 0
+        self.loaded_from_disk = 0
+        self.queries = 0
+        self.fallbacks = 0  # Ollama embeddings failed, hashing used instead
+
+    # ── Public API ─────────────────────────────────────────────────────
+
+    def embedder(self, svc: OllamaService | None) -> Embedder:
+        if svc is not None and self.embed_model and svc.available and svc.has_model(self.embed_model):
+            return OllamaEmbedder(svc, self.embed_model)
+        return self.hashing
+
+    async def retrieve(
+        self, ctx: BranchContext, question: str, *, k: int | None = None, svc: OllamaService | None = None
+    ) -> Retrieval:
+        return (await self.retrieve_many(ctx, [question], k=k, svc=svc))[0]
+
+    async def retrieve_many(
+        self,
+        ctx: BranchContext,
+        questions: list[str],
+        *,
+        k: int | None = None,
+        svc: OllamaService | None = None,
+    ) -> list[Retrieval]:
+        """Top-k facts for each question, embedded and searched as one batch."""
+        start = time.perf_counter()
+        facts = ctx.index.facts
+        fingerprint = ctx.index.facts_fingerprint
+        embedder = self.embedder(svc)
+
+        index = await self.get(ctx.branch.id, facts, fingerprint, embedder)
+        queries = await embedder.embed(questions, query=True) if index is not None else None
+        if queries is None:
+            self.fallbacks += 1
+            embedder = self.hashing
+            index = await self.get(ctx.branch.id, facts, fingerprint, embedder)
+            queries = self.hashing.encode(questions, query=True)
+        assert index is not None  # the hashing embedder never fails
+
+        self.queries += len(questions)
+        results = index.search(queries, self.top_k if k is None else k)
+        ms = round((time.perf_counter() - start) * 1000, 3)
+        return [Retrieval(hits, fingerprint, embedder.name, ms) for hits in results]
+
+    async def get(
+        self, branch_id: str, facts: list[Fact], fingerprint: str, embedder: Embedder
+    ) -> BranchFactIndex | None:
+        """The index for *facts*, (re)built if needed; None if the embedder failed."""
+        key = (branch_id, embedder.name)
+        index = self._indexes.get(key)
+        if index is not None and index.fingerprint == fingerprint:
+            return index
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            index = self._indexes.get(key)
+            if index is not None and index.fingerprint == fingerprint:
+                return index
+            previous = index or self._load(branch_id, embedder.name)
+            if previous is not None and previous.fingerprint == fingerprint:
+                self._indexes[key] = previous
+                return previous
+            index = await self._build(branch_id, facts, fingerprint, embedder, previous)
+            if index is not None:
+                self._indexes[key] = index
+            return index
+
+    def invalidate(self, branch_id: str | None = None) -> None:
+        for key in [k for k in self._indexes if branch_id is None or k[0] == branch_id]:
+            del self._indexes[key]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "indexes": len(self._indexes),
+            "facts": sum(len(ix.facts) for ix in self._indexes.values()),
+            "embedModel": self.embed_model,
+            "topK": self.top_k,
+            "persistent": self.index_dir is not None,
+            "builds": self.builds,
+            "factsEmbedded": self.facts_embedded,
+            "factsReused": self.facts_reused,
+            "loadedFromDisk": self.loaded_from_disk,
+            "queries": self.queries,
+            "fallbacks": self.fallbacks,
+        }
+
+    # ── Build ──────────────────────────────────────────────────────────
+
+    async def _build(
+        self,
+        branch_id: str,
+        facts: list[Fact],
+        fingerprint: str,
+        embedder: Embedder,
+        previous: BranchFactIndex | None,
+    ) -> BranchFactIndex | None:
+        row_keys = [_row_key(f.text) for f in facts]
+        reuse: dict[str, int] = {}
+        if previous is not None:
+            reuse = {k: i for i, k in enumerate(previous.row_keys)}
+        todo = [i for i, k in enumerate(row_keys) if k not in reuse]
+
+        vectors = None
+        if todo:
+            vectors = await embedder.embed([facts[i].text for i in todo])
+            if vectors is None:
+                return None
+        dim = vectors.shape[1] if vectors is not None else (previous.dim if previous else 1)
+        if previous is not None and previous.dim != dim:  # embedding model changed size
+            return await self._build(branch_id, facts, fingerprint, embedder, None)
+
+        matrix = np.empty((len(facts), dim), dtype=np.float32)
+        kept = [(i, reuse[k]) for i, k in enumerate(row_keys) if k in reuse]
+        if kept:
+            dst, src = map(np.asarray, zip(*kept))
+            matrix[dst] = previous.matrix[src]  # type: ignore[union-attr]
+        if todo:
+            matrix[np.asarray(todo)] = vectors
+
+        self.builds += 1
+        self.facts_embedded += len(todo)
+        self.facts_reused += len(kept)
+        index = BranchFactIndex(
+            branch_id, embedder.name, fingerprint, facts, row_keys, matrix, time.time(), len(todo)
+        )
+        self._save(index)
+        logger.debug(
+            "Fact index %s/%s: %d facts (%d embedded, %d reused)",
+            branch_id, embedder.name, len(facts), len(todo), len(kept),
+        )
+        return index
+
+    # ── Persistence ────────────────────────────────────────────────────
+
+    def _paths(self, branch_id: str, embedder: str) -> tuple[Path, Path]:
+        """Sidecar path, and the stem its matrices are named after (``<stem>.<rows hash>.npy``)."""
+        assert self.index_dir is not None
+        stem = re.sub(r"[^A-Za-z0-9._-]+", "_", f"{branch_id}.{embedder}")
+        return self.index_dir / f"{stem}.json", self.index_dir / stem
+
+    def _load(self, branch_id: str, embedder: str) -> BranchFactIndex | None:
+        """Memory-map a saved matrix; its facts are only known by row hash until rebuilt."""
+        if self.index_dir is None:
+            return None
+        meta_path, stem = self._paths(branch_id, embedder)
+        if not meta_path.exists():
+            return None
+        try:
+            meta = json.loads(meta_path.read_text())
+            rows_hash = meta["rowsHash"]
+            if _rows_hash(meta["rows"]) != rows_hash:
+                raise ValueError("row keys do not match their hash")
+            matrix = np.load(stem.with_name(f"{stem.name}.{rows_hash}.npy"), mmap_mode="r")
+            if matrix.ndim != 2 or matrix.shape[0] != len(meta["rows"]):
+                raise ValueError(f"shape {matrix.shape} does not match {len(meta['rows'])} rows")
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Ignoring fact index %s: %s", meta_path, exc)
+            return None
+        self.loaded_from_disk += 1
+        facts = [Fact(kind, text) for kind, text in meta.get("facts", [])]
+        return BranchFactIndex(branch_id, embedder, meta["fingerprint"], facts, meta["rows"], matrix)
+
+    def _save(self, index: BranchFactIndex) -> None:
+        if self.index_dir is None:
+            return
+        meta_path, stem = self._paths(index.branch_id, index.embedder)
+        rows_hash = _rows_hash(index.row_keys)
+        npy = stem.with_name(f"{stem.name}.{rows_hash}.npy")
+        tmp_suffix = f".{os.getpid()}.tmp"
+        try:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            # Matrix first, then the sidecar that points at it: a reader sees
+            # the old pair or the new one, never a mix.
+            tmp = npy.with_name(npy.name + tmp_suffix)
+            with open(tmp, "wb") as f:
+                np.save(f, index.matrix)
+            os.replace(tmp, npy)
+            tmp = meta_path.with_name(meta_path.name + tmp_suffix)
+            tmp.write_text(json.dumps({
+                "fingerprint": index.fingerprint,
+                "rowsHash": rows_hash,
+                "rows": index.row_keys,
+                "facts": [[f.kind, f.text] for f in index.facts],
+            }))
+            os.replace(tmp, meta_path)
+            index.matrix = np.load(npy, mmap_mode="r")
+        except OSError as exc:
+            logger.warning("Fact index not persisted (%s): %s", npy, exc)
+            return
+        # Older matrices of this index; open memory maps keep working.
+        for old in [stem.with_name(stem.name + ".npy"), *self.index_dir.glob(f"{stem.name}.*.npy")]:
+            if old != npy and re.fullmatch(r"(\.[0-9a-f]{16})?\.npy", old.name[len(stem.name):]):
+                old.unlink(missing_ok=True)
+
+
+# Singleton
+fact_index = FactIndexStore()
@@ -0,0 +1,330 @@
+"""Per-branch drug-interaction graph index.
+
+Loads every ``DrugInteraction`` row for a branch once into an adjacency map
+keyed by ``DrugMaster.id`` (plus which drugs each pharmacy store stocks via
+``InventoryConfig``) and keeps it fresh incrementally:
+
+  - Rows with ``updatedAt`` at or past the last watermark are upserted by
+    row id, so a row whose drug pair (or store / drug) was edited moves its
+    edge instead of leaving the old one behind.  Re-applying rows at the
+    watermark is harmless and catches rows committed later with the same
+    timestamp.
+  - A cheap row-count comparison, made after the upserts, detects
+    deletions (cascade deletes leave no ``updatedAt`` trail, and a delete
+    plus an insert leaves the database count unchanged) and triggers a full
+    reload only then.
+  - Drugs and stores feed the name maps, so any change to them -- a count
+    change, or a new ``max(updatedAt)`` from a rename or a delete plus an
+    insert -- triggers a full reload.
+
+Lookups are O(1) per drug pair, so checking a med list of k drugs costs
+O(k²) dict probes with no DB round-trip.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from src.db.models import DrugInteraction, DrugMaster, InventoryConfig, PharmacyStore
+from src.db.session import get_session
+
+logger = logging.getLogger("ai-copilot.interactions")
+
+REFRESH_INTERVAL = 60  # seconds between incremental refreshes
+
+
+@dataclass(slots=True)
+class InteractionEdge:
+    severity: str  # MAJOR | MODERATE | MINOR
+    description: str | None = None
+    recommendation: str | None = None
+
+
+@dataclass(slots=True)
+class DrugNode:
+    id: str
+    drugCode: str
+    genericName: str
+    brandName: str | None = None
+
+
+@dataclass
+class BranchInteractionIndex:
+    branch_id: str
+    adjacency: dict[str, dict[str, InteractionEdge]] = field(default_factory=dict)
+    drugs: dict[str, DrugNode] = field(default_factory=dict)
+    drugs_by_name: dict[str, list[str]] = field(default_factory=dict)
+    stores: dict[str, str] = field(default_factory=dict)  # id → name
+    stock: dict[str, set[str]] = field(default_factory=dict)  # store id → drug ids
+    interactions: dict[str, tuple[str, str, InteractionEdge]] = field(default_factory=dict)  # row id → edge
+    stock_rows: dict[str, tuple[str, str]] = field(default_factory=dict)  # row id → (store id, drug id)
+    _pair_rows: dict[tuple[str, str], set[str]] = field(default_factory=dict)  # sorted pair → row ids
+    _stock_refs: dict[tuple[str, str], set[str]] = field(default_factory=dict)  # (store, drug) → row ids
+    edge_count: int = 0  # unordered drug pairs
+    stock_count: int = 0
+    interaction_watermark: datetime | None = None
+    stock_watermark: datetime | None = None
+    drug_watermark: datetime | None = None  # max(DrugMaster.updatedAt) at load
+    store_watermark: datetime | None = None  # max(PharmacyStore.updatedAt) at load
+    loaded_at: float = 0.0
+    refreshed_at: float = 0.0
+
+    # ── Mutation ───────────────────────────────────────────────────────
+
+    def upsert_interaction(self, row_id: str, a: str, b: str, edge: InteractionEdge) -> None:
+        """Apply one ``DrugInteraction`` row, moving its edge if the pair changed."""
+        old = self.interactions.get(row_id)
+        if old is not None and _pair(old[0], old[1]) != _pair(a, b):
+            self._unlink_interaction(row_id, old[0], old[1])
+        self.interactions[row_id] = (a, b, edge)
+        if a == b:
+            return
+        self._pair_rows.setdefault(_pair(a, b), set()).add(row_id)
+        self._set_edge(a, b, edge)
+
+    def upsert_stock(self, row_id: str, store_id: str, drug_id: str) -> None:
+        """Apply one ``InventoryConfig`` row, moving it if its store or drug changed."""
+        old = self.stock_rows.get(row_id)
+        if old is not None and old != (store_id, drug_id):
+            refs = self._stock_refs.get(old)
+            if refs is not None:
+                refs.discard(row_id)
+                if not refs:
+                    del self._stock_refs[old]
+                    stocked = self.stock[old[0]]
+                    stocked.discard(old[1])
+                    if not stocked:
+                        del self.stock[old[0]]
+                    self.stock_count -= 1
+        self.stock_rows[row_id] = (store_id, drug_id)
+        self._stock_refs.setdefault((store_id, drug_id), set()).add(row_id)
+        stocked = self.stock.setdefault(store_id, set())
+        if drug_id not in stocked:
+            stocked.add(drug_id)
+            self.stock_count += 1
+
+    def _set_edge(self, a: str, b: str, edge: InteractionEdge) -> None:
+        existing = self.adjacency.setdefault(a, {})
+        if b not in existing:
+            self.edge_count += 1
+        existing[b] = edge
+        self.adjacency.setdefault(b, {})[a] = edge
+
+    def _unlink_interaction(self, row_id: str, a: str, b: str) -> None:
+        rows = self._pair_rows.get(_pair(a, b))
+        if rows is None:
+            return
+        rows.discard(row_id)
+        if rows:  # another row still describes this pair
+            self._set_edge(a, b, self.interactions[next(iter(rows))][2])
+            return
+        del self._pair_rows[_pair(a, b)]
+        for x, y in ((a, b), (b, a)):
+            neighbours = self.adjacency.get(x)
+            if neighbours is not None:
+                neighbours.pop(y, None)
+                if not neighbours:
+                    del self.adjacency[x]
+        self.edge_count -= 1
+
+    def add_drug(self, node: DrugNode) -> None:
+        self.drugs[node.id] = node
+        for name in (node.drugCode, node.genericName, node.brandName):
+            if name:
+                ids = self.drugs_by_name.setdefault(name.strip().lower(), [])
+                if node.id not in ids:
+                    ids.append(node.id)
+
+    # ── Lookup ─────────────────────────────────────────────────────────
+
+    def edge(self, a: str, b: str) -> InteractionEdge | None:
+        return self.adjacency.get(a, {}).get(b)
+
+    def neighbours(self, drug_id: str) -> dict[str, InteractionEdge]:
+        return self.adjacency.get(drug_id, {})
+
+    def resolve(self, ref: str) -> list[str]:
+        """Resolve a DrugMaster id, drug code or generic/brand name to ids."""
+        if ref in self.drugs:
+            return [ref]
+        return self.drugs_by_name.get(ref.strip().lower(), [])
+
+
+def _pair(a: str, b: str) -> tuple[str, str]:
+    return (a, b) if a <= b else (b, a)
+
+
+# ── Loading ───────────────────────────────────────────────────────────────
+
+
+def _branch_drug_ids(branch_id: str):
+    return select(DrugMaster.id).where(DrugMaster.branchId == branch_id)
+
+
+def _branch_store_ids(branch_id: str):
+    return select(PharmacyStore.id).where(PharmacyStore.branchId == branch_id)
+
+
+async def _load_full(branch_id: str) -> BranchInteractionIndex:
+    start = time.time()
+    index = BranchInteractionIndex(branch_id=branch_id)
+
+    async with get_session() as session:
+        drug_rows = (await session.execute(
+            select(DrugMaster.id, DrugMaster.drugCode, DrugMaster.genericName, DrugMaster.brandName,
+                   DrugMaster.updatedAt)
+            .where(DrugMaster.branchId == branch_id)
+        )).all()
+        for r in drug_rows:
+            index.add_drug(DrugNode(r.id, r.drugCode, r.genericName, r.brandName))
+        index.drug_watermark = max((r.updatedAt for r in drug_rows), default=None)
+
+        _apply_interactions(index, (await session.execute(_interaction_rows(branch_id, None))).all())
+
+        store_rows = (await session.execute(
+            select(PharmacyStore.id, PharmacyStore.storeName, PharmacyStore.updatedAt)
+            .where(PharmacyStore.branchId == branch_id)
+        )).all()
+        index.stores = {r.id: r.storeName for r in store_rows}
+        index.store_watermark = max((r.updatedAt for r in store_rows), default=None)
+
+        _apply_stock(index, (await session.execute(_stock_rows(branch_id, None))).all())
+
+    index.loaded_at = index.refreshed_at = time.time()
+    logger.info(
+        "Interaction index loaded for %s: %d drugs, %d interactions, %d stock rows (%d ms)",
+        branch_id, len(index.drugs), index.edge_count, index.stock_count,
+        int((time.time() - start) * 1000),
+    )
+    return index
+
+
+def _interaction_rows(branch_id: str, since: datetime | None):
+    q = (
+        select(DrugInteraction.id, DrugInteraction.drugAId, DrugInteraction.drugBId,
+               DrugInteraction.severity, DrugInteraction.description,
+               DrugInteraction.recommendation, DrugInteraction.updatedAt)
+        .where(DrugInteraction.drugAId.in_(_branch_drug_ids(branch_id)))
+    )
+    if since is not None:
+        q = q.where(DrugInteraction.updatedAt >= since)
+    return q
+
+
+def _stock_rows(branch_id: str, since: datetime | None):
+    q = (
+        select(InventoryConfig.id, InventoryConfig.pharmacyStoreId,
+               InventoryConfig.drugMasterId, InventoryConfig.updatedAt)
+        .where(InventoryConfig.pharmacyStoreId.in_(_branch_store_ids(branch_id)))
+    )
+    if since is not None:
+        q = q.where(InventoryConfig.updatedAt >= since)
+    return q
+
+
+def _apply_interactions(index: BranchInteractionIndex, rows) -> None:
+    for r in rows:
+        index.upsert_interaction(r.id, r.drugAId, r.drugBId,
+                                 InteractionEdge(r.severity, r.description, r.recommendation))
+        if index.interaction_watermark is None or r.updatedAt > index.interaction_watermark:
+            index.interaction_watermark = r.updatedAt
+
+
+def _apply_stock(index: BranchInteractionIndex, rows) -> None:
+    for r in rows:
+        index.upsert_stock(r.id, r.pharmacyStoreId, r.drugMasterId)
+        if index.stock_watermark is None or r.updatedAt > index.stock_watermark:
+            index.stock_watermark = r.updatedAt
+
+
+async def _refresh(index: BranchInteractionIndex) -> BranchInteractionIndex:
+    """Apply rows changed since the last watermark; full reload on deletions or drug/store churn."""
+    branch_id = index.branch_id
+    async with get_session() as session:
+        drug_count, drug_updated, store_count, store_updated, edge_count, stock_count = (await session.execute(
+            select(
+                select(func.count(DrugMaster.id))
+                .where(DrugMaster.branchId == branch_id).scalar_subquery(),
+                select(func.max(DrugMaster.updatedAt))
+                .where(DrugMaster.branchId == branch_id).scalar_subquery(),
+                select(func.count(PharmacyStore.id))
+                .where(PharmacyStore.branchId == branch_id).scalar_subquery(),
+                select(func.max(PharmacyStore.updatedAt))
+                .where(PharmacyStore.branchId == branch_id).scalar_subquery(),
+                select(func.count(DrugInteraction.id))
+                .where(DrugInteraction.drugAId.in_(_branch_drug_ids(branch_id)))
+                .scalar_subquery(),
+                select(func.count(InventoryConfig.id))
+                .where(InventoryConfig.pharmacyStoreId.in_(_branch_store_ids(branch_id)))
+                .scalar_subquery(),
+            )
+        )).one()
+
+        # Drug/store churn (renames included) is rare and needs the name maps
+        # rebuilt: full reload.
+        stale = (
+            drug_count != len(index.drugs) or drug_updated != index.drug_watermark
+            or store_count != len(index.stores) or store_updated != index.store_watermark
+        )
+        if not stale:
+            _apply_interactions(
+                index,
+                (await session.execute(_interaction_rows(branch_id, index.interaction_watermark))).all(),
+            )
+            _apply_stock(
+                index, (await session.execute(_stock_rows(branch_id, index.stock_watermark))).all()
+            )
+            # With every changed row applied, any row the index holds beyond
+            # the database count was deleted (no updatedAt trail): full reload.
+            # A row inserted after the count query also lands here, harmlessly.
+            stale = edge_count != len(index.interactions) or stock_count != len(index.stock_rows)
+
+    if stale:
+        return await _load_full(branch_id)
+    index.refreshed_at = time.time()
+    return index
+
+
+class InteractionIndexStore:
+    """Holds one :class:`BranchInteractionIndex` per branch."""
+
+    def __init__(self, refresh_interval: float = REFRESH_INTERVAL) -> None:
+        self.refresh_interval = refresh_interval
+        self._indexes: dict[str, BranchInteractionIndex] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def get(self, branch_id: str, *, force_refresh: bool = False) -> BranchInteractionIndex:
+        index = self._indexes.get(branch_id)
+        if (
+            index is not None
+            and not force_refresh
+            and time.time() - index.refreshed_at < self.refresh_interval
+        ):
+            return index
+
+        lock = self._locks.setdefault(branch_id, asyncio.Lock())
+        async with lock:
+            # Another request may have loaded/refreshed while we waited.
+            index = self._indexes.get(branch_id)
+            if index is None:
+                index = await _load_full(branch_id)
+            elif force_refresh or time.time() - index.refreshed_at >= self.refresh_interval:
+                index = await _refresh(index)
+            self._indexes[branch_id] = index
+            return index
+
+    def invalidate(self, branch_id: str | None = None) -> None:
+        if branch_id is None:
+            self._indexes.clear()
+        else:
+            self._indexes.pop(branch_id, None)
+
+
+# Singleton
+interaction_index = InteractionIndexStore()
@@ -0,0 +1,282 @@
+"""LLM response cache — skips Ollama for repeated deterministic prompts.
+
+Entries are keyed by a SHA-256 of (model, system, prompt, temperature,
+format, max_tokens).  The system prompt embeds the BranchContext summary,
+so the key changes as soon as the branch data does; an unchanged branch
+asking the same question hits the cache.
+
+  - Only low-temperature calls (<= OLLAMA_CACHE_MAX_TEMPERATURE, default 0.2)
+    are read from or written to the cache; creative calls always go to Ollama.
+  - Bounded LRU with a per-entry TTL.
+  - Optional persistence to a local SQLite file (OLLAMA_CACHE_PATH), loaded
+    at startup so answers survive a restart.  Lookups and stores stay in
+    memory; new entries, evictions and each hit's ``used_at`` are queued and
+    written by one flusher in a single transaction off the event loop, so
+    the restart keeps the most recently *used* entries.
+  - Hit / miss / bypass / eviction counters for /v1/infra/ai-status.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from src.config import (
+    OLLAMA_CACHE_MAX_TEMPERATURE,
+    OLLAMA_CACHE_PATH,
+    OLLAMA_CACHE_SIZE,
+    OLLAMA_CACHE_TTL,
+)
+
+logger = logging.getLogger("ai-copilot.llm-cache")
+
+
+@dataclass(slots=True)
+class CachedCompletion:
+    text: str
+    token_count: int
+    prompt_token_count: int
+    expires_at: float  # wall clock, so it survives a restart via SQLite
+
+
+def cache_key(
+    model: str,
+    system: str | None,
+    prompt: str,
+    temperature: float,
+    use_json: bool,
+    max_tokens: int | None,
+) -> str:
+    payload = json.dumps(
+        [model, system or "", prompt, round(temperature, 4), "json" if use_json else "", max_tokens or 0],
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    def __init__(
+        self,
+        max_entries: int = OLLAMA_CACHE_SIZE,
+        ttl: float = OLLAMA_CACHE_TTL,
+        max_temperature: float = OLLAMA_CACHE_MAX_TEMPERATURE,
+        path: str = OLLAMA_CACHE_PATH,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+        self.path = path
+        self._entries: OrderedDict[str, CachedCompletion] = OrderedDict()
+        self._lock = threading.Lock()  # guards the entries and the queued writes
+        self._db_lock = threading.Lock()  # guards the SQLite connection
+        self._db: sqlite3.Connection | None = None
+        # Writes not yet flushed; each key is in at most one of them
+        self._upserts: dict[str, tuple] = {}  # key -> row
+        self._touches: dict[str, float] = {}  # key -> used_at
+        self._deletes: set[str] = set()
+        self._clear_db = False
+        self._flusher: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self.expired = 0
+        self.writes = 0
+        self.batches = 0
+        self.write_errors = 0
+
+    # ── Public API ─────────────────────────────────────────────────────
+
+    def cacheable(self, temperature: float) -> bool:
+        return self.max_entries > 0 and temperature <= self.max_temperature
+
+    def get(self, key: str) -> CachedCompletion | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= now:
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                self._queue_delete(key)
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self._queue_touch(key, now)
+        self._schedule_flush()
+        return entry
+
+    def put(self, key: str, text: str, token_count: int = 0, prompt_token_count: int = 0) -> None:
+        now = time.time()
+        entry = CachedCompletion(text, token_count, prompt_token_count, now + self.ttl)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                old_key, _ = self._entries.popitem(last=False)
+                self.evictions += 1
+                self._queue_delete(old_key)
+            self._queue_put(key, entry, now)
+        self._schedule_flush()
+
+    def note_bypass(self) -> None:
+        self.bypassed += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._upserts, self._touches, self._deletes = {}, {}, set()
+            self._clear_db = self._db is not None
+        self._schedule_flush()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "maxEntries": self.max_entries,
+            "ttlSeconds": self.ttl,
+            "maxTemperature": self.max_temperature,
+            "persistent": self._db is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "pendingWrites": len(self._upserts) + len(self._touches) + len(self._deletes),
+            "writes": self.writes,
+            "batches": self.batches,
+            "writeErrors": self.write_errors,
+        }
+
+    # ── Persistence ────────────────────────────────────────────────────
+
+    def open(self) -> int:
+        """Open the SQLite file (if configured) and load live entries; returns the count."""
+        if not self.path or self._db is not None:
+            return 0
+        try:
+            db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, text TEXT NOT NULL, token_count INTEGER NOT NULL,"
+                " prompt_token_count INTEGER NOT NULL, expires_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+            now = time.time()
+            db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+            rows = db.execute(
+                "SELECT key, text, token_count, prompt_token_count, expires_at FROM llm_cache"
+                " ORDER BY used_at DESC LIMIT ?",
+                (self.max_entries,),
+            ).fetchall()
+            db.commit()
+        except sqlite3.Error as exc:
+            logger.warning("LLM cache persistence disabled (%s): %s", self.path, exc)
+            return 0
+
+        with self._lock:
+            self._db = db
+            for key, text, tokens, prompt_tokens, expires_at in reversed(rows):
+                self._entries[key] = CachedCompletion(text, tokens, prompt_tokens, expires_at)
+        if rows:
+            logger.info("Loaded %d cached LLM responses from %s", len(rows), self.path)
+        return len(rows)
+
+    async def aclose(self) -> None:
+        """Write whatever is still queued, then close the SQLite file."""
+        if self._flusher is not None:
+            await self._flusher
+        if self._has_pending():
+            await asyncio.to_thread(self._write_pending)
+        with self._db_lock:
+            db, self._db = self._db, None
+        if db is not None:
+            db.close()
+
+    # ── Writes ─────────────────────────────────────────────────────────
+
+    def _queue_put(self, key: str, entry: CachedCompletion, used_at: float) -> None:
+        if self._db is None:
+            return
+        self._deletes.discard(key)
+        self._touches.pop(key, None)
+        self._upserts[key] = (
+            key, entry.text, entry.token_count, entry.prompt_token_count, entry.expires_at, used_at,
+        )
+
+    def _queue_touch(self, key: str, used_at: float) -> None:
+        if self._db is None:
+            return
+        row = self._upserts.get(key)
+        if row is not None:
+            self._upserts[key] = (*row[:5], used_at)
+        else:
+            self._touches[key] = used_at
+
+    def _queue_delete(self, key: str) -> None:
+        if self._db is None:
+            return
+        self._upserts.pop(key, None)
+        self._touches.pop(key, None)
+        self._deletes.add(key)
+
+    def _has_pending(self) -> bool:
+        return bool(self._clear_db or self._upserts or self._touches or self._deletes)
+
+    def _schedule_flush(self) -> None:
+        if self._flusher is not None or not self._has_pending():
+            return
+        try:
+            self._flusher = asyncio.get_running_loop().create_task(self._flush())
+        except RuntimeError:  # no event loop (scripts, shutdown): write in place
+            self._write_pending()
+
+    async def _flush(self) -> None:
+        try:
+            while self._has_pending():
+                await asyncio.to_thread(self._write_pending)
+        finally:
+            self._flusher = None
+
+    def _write_pending(self) -> None:
+        with self._lock:
+            clear, upserts, touches, deletes = self._clear_db, self._upserts, self._touches, self._deletes
+            self._clear_db, self._upserts, self._touches, self._deletes = False, {}, {}, set()
+        rows = len(upserts) + len(touches) + len(deletes)
+        with self._db_lock:
+            db = self._db
+            if db is None:
+                return
+            try:
+                with db:
+                    if clear:
+                        db.execute("DELETE FROM llm_cache")
+                    db.executemany("DELETE FROM llm_cache WHERE key = ?", [(k,) for k in deletes])
+                    db.executemany("INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?)", upserts.values())
+                    db.executemany(
+                        "UPDATE llm_cache SET used_at = ? WHERE key = ?", [(t, k) for k, t in touches.items()]
+                    )
+            except sqlite3.Error as exc:
+                self.write_errors += 1
+                logger.warning("LLM cache write failed (%d rows): %s", rows, exc)
+                return
+        self.writes += rows
+        self.batches += 1
+
+
+# Singleton
+llm_cache = LLMResponseCache()
@@ -2,34 +2,93 @@
 
 Wraps the Ollama REST API (default: http://localhost:11434).
 Features:
-  - Health check with 60-second caching
+  - Background health probe with backoff (started in lifespan); the request
+    path only reads the published state.  Tracks whether the model is loaded
+    and pre-warms it with a keep-alive
+  - One pooled keep-alive HTTP client per service (opened/closed in lifespan)
   - Graceful degradation when Ollama is down
   - Structured JSON mode
+  - Token streaming (Ollama NDJSON -> async iterator of chunks)
+  - Batched embeddings (/api/embed) for the retrieval index
+  - Conversation continuation: the ``context`` token array Ollama returns can
+    be passed back on the next call, so only the new prompt is evaluated
+  - Response cache for low-temperature calls (see services/llm_cache.py)
+  - Request scheduler: max in-flight generations, priority classes
+    (interactive chat/ask before bulk copilot), bounded queue with fast
+    rejection so callers can fall back to their heuristic answers
   - Configurable model, temperature, context window
 """
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import heapq
+import itertools
 import json
 import logging
 import re
 import time
-from dataclasses import dataclass, field
-from typing import Any
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, replace
+from typing import Any, AsyncIterator
 
 import httpx
 
 from src.config import (
     OLLAMA_BASE_URL,
+    OLLAMA_BULK_QUEUE_SHARE,
+    OLLAMA_CONNECT_TIMEOUT,
     OLLAMA_CONTEXT_WINDOW,
+    OLLAMA_EMBED_BATCH,
+    OLLAMA_EMBED_MODEL,
+    OLLAMA_KEEP_ALIVE,
+    OLLAMA_KEEPALIVE_EXPIRY,
+    OLLAMA_MAX_CONNECTIONS,
+    OLLAMA_MAX_INFLIGHT,
+    OLLAMA_MAX_KEEPALIVE,
+    OLLAMA_MAX_QUEUE,
     OLLAMA_MODEL,
+    OLLAMA_PREWARM,
+    OLLAMA_PROBE_INTERVAL,
+    OLLAMA_PROBE_MAX_BACKOFF,
+    OLLAMA_QUEUE_TIMEOUT,
     OLLAMA_TEMPERATURE,
     OLLAMA_TIMEOUT,
 )
+from src.services.llm_cache import LLMResponseCache, cache_key, llm_cache
 
 logger = logging.getLogger("ai-copilot.ollama")
 
-HEALTH_CHECK_INTERVAL = 60  # seconds
+HEALTH_CHECK_INTERVAL = 60  # seconds (on-demand checks, when no probe runs)
+HEALTH_CHECK_TIMEOUT = 5  # seconds
+PROBE_BACKOFF_BASE = 1.0  # seconds; doubles per consecutive failure
+
+
+@dataclass(frozen=True, slots=True)
+class OllamaHealth:
+    """Availability snapshot, replaced as a whole on every probe."""
+
+    available: bool | None = None  # None until the first probe
+    model_present: bool = False  # model pulled (in /api/tags)
+    model_loaded: bool = False  # model resident in memory (in /api/ps)
+    models: tuple[str, ...] = ()
+    checked_at: float = 0.0
+    latency_ms: float = 0.0
+    failures: int = 0  # consecutive failed probes
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "available": self.available,
+            "modelPresent": self.model_present,
+            "modelLoaded": self.model_loaded,
+            "checkedAt": self.checked_at,
+            "latencyMs": self.latency_ms,
+            "failures": self.failures,
+            "error": self.error,
+        }
 
 
 @dataclass
@@ -41,6 +100,172 @@ class OllamaResponse:
     duration_ms: int = 0
     token_count: int = 0
     error: str | None = None
+    prompt_token_count: int = 0
+    first_token_ms: int | None = None  # streaming only
+    cached: bool = False
+    busy: bool = False  # rejected by the scheduler (queue full / wait timed out)
+    context: list[int] | None = None  # Ollama's conversation state; pass back to continue
+
+
+@dataclass
+class OllamaEmbeddings:
+    available: bool
+    vectors: list[list[float]] = field(default_factory=list)  # one per input, in order
+    model: str = ""
+    duration_ms: int = 0
+    error: str | None = None
+    busy: bool = False
+
+
+@dataclass
+class OllamaStreamChunk:
+    """One piece of a streamed generation; the last one has ``done`` and ``final``."""
+
+    text: str = ""
+    done: bool = False
+    final: OllamaResponse | None = None
+
+
+# ── Scheduler ─────────────────────────────────────────────────────────────
+
+# Lower rank is served first.
+PRIORITIES: dict[str, int] = {"interactive": 0, "bulk": 1}
+WAIT_SAMPLES = 512  # recent queue waits kept per class for percentiles
+
+
+class OllamaBusyError(Exception):
+    """Raised when a generation can't get a slot (queue full or wait timed out)."""
+
+
+@dataclass
+class _ClassStats:
+    admitted: int = 0
+    queued: int = 0  # admitted after waiting
+    rejected: int = 0  # queue full
+    timed_out: int = 0
+    waits_ms: deque[float] = field(default_factory=lambda: deque(maxlen=WAIT_SAMPLES))
+
+    def snapshot(self) -> dict[str, Any]:
+        waits = sorted(self.waits_ms)
+
+        def pct(q: float) -> float:
+            return round(waits[min(len(waits) - 1, int(len(waits) * q))], 3) if waits else 0.0
+
+        return {
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "timedOut": self.timed_out,
+            "waitP50Ms": pct(0.5),
+            "waitP95Ms": pct(0.95),
+            "waitMaxMs": round(waits[-1], 3) if waits else 0.0,
+        }
+
+
+class OllamaScheduler:
+    """Admission control in front of Ollama.
+
+    At most ``max_inflight`` generations run at once; the rest wait in a
+    priority queue of at most ``max_queue`` entries.  A freed slot is handed
+    straight to the best waiter (lowest rank, then FIFO), so a burst of bulk
+    copilot calls can't starve interactive chat, and bulk calls may only fill
+    ``bulk_queue_share`` of the queue so there is always room left for chat.
+    Callers that find the queue full, or wait longer than ``queue_timeout``
+    seconds (0 = no limit), get ``OllamaBusyError`` immediately instead of
+    piling up behind Ollama's own timeout.
+    """
+
+    def __init__(
+        self,
+        max_inflight: int = OLLAMA_MAX_INFLIGHT,
+        max_queue: int = OLLAMA_MAX_QUEUE,
+        queue_timeout: float = OLLAMA_QUEUE_TIMEOUT,
+        bulk_queue_share: float = OLLAMA_BULK_QUEUE_SHARE,
+    ) -> None:
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.bulk_queue_share = bulk_queue_share
+        self._inflight = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._seq = itertools.count()
+        self._stats = {name: _ClassStats() for name in PRIORITIES}
+
+    @asynccontextmanager
+    async def slot(self, priority: str = "interactive"):
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: str = "interactive") -> None:
+        rank = PRIORITIES.get(priority)
+        if rank is None:
+            raise ValueError(f"Unknown Ollama priority: {priority!r}")
+        stats = self._stats[priority]
+
+        if self._inflight < self.max_inflight and not self._waiters:
+            self._inflight += 1
+            stats.admitted += 1
+            stats.waits_ms.append(0.0)
+            return
+        limit = self.max_queue if rank == 0 else int(self.max_queue * self.bulk_queue_share)
+        if len(self._waiters) >= limit:
+            stats.rejected += 1
+            raise OllamaBusyError(
+                f"Ollama busy: {self._inflight} running, {len(self._waiters)} queued"
+            )
+
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        entry = (rank, next(self._seq), fut)
+        heapq.heappush(self._waiters, entry)
+        start = time.perf_counter()
+        try:
+            if self.queue_timeout > 0:
+                await asyncio.wait_for(fut, self.queue_timeout)
+            else:
+                await fut
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if fut.done() and not fut.cancelled():
+                self.release()  # the slot was handed over just as we gave up
+            else:
+                self._discard(entry)
+            if isinstance(exc, asyncio.TimeoutError):
+                stats.timed_out += 1
+                raise OllamaBusyError(
+                    f"Ollama busy: no slot within {self.queue_timeout:g}s"
+                ) from None
+            raise
+        stats.admitted += 1
+        stats.queued += 1
+        stats.waits_ms.append((time.perf_counter() - start) * 1000)
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(None)  # hand the slot over; in-flight count unchanged
+                return
+        self._inflight -= 1
+
+    def _discard(self, entry: tuple[int, int, asyncio.Future[None]]) -> None:
+        try:
+            self._waiters.remove(entry)
+        except ValueError:
+            return
+        heapq.heapify(self._waiters)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "maxInflight": self.max_inflight,
+            "maxQueue": self.max_queue,
+            "queueTimeoutSeconds": self.queue_timeout,
+            "bulkQueueShare": self.bulk_queue_share,
+            "inflight": self._inflight,
+            "queued": len(self._waiters),
+            "byPriority": {name: s.snapshot() for name, s in self._stats.items()},
+        }
 
 
 @dataclass
@@ -50,48 +275,202 @@ class OllamaService:
     timeout: int = field(default_factory=lambda: OLLAMA_TIMEOUT)
     temperature: float = field(default_factory=lambda: OLLAMA_TEMPERATURE)
     context_window: int = field(default_factory=lambda: OLLAMA_CONTEXT_WINDOW)
+    max_connections: int = field(default_factory=lambda: OLLAMA_MAX_CONNECTIONS)
+    max_keepalive: int = field(default_factory=lambda: OLLAMA_MAX_KEEPALIVE)
+    keepalive_expiry: float = field(default_factory=lambda: OLLAMA_KEEPALIVE_EXPIRY)
+    connect_timeout: float = field(default_factory=lambda: OLLAMA_CONNECT_TIMEOUT)
+    cache: LLMResponseCache | None = field(default_factory=lambda: llm_cache, repr=False)
+    scheduler: OllamaScheduler = field(default_factory=OllamaScheduler, repr=False)
+
+    keep_alive: str = field(default_factory=lambda: OLLAMA_KEEP_ALIVE)
+    prewarm: bool = field(default_factory=lambda: OLLAMA_PREWARM)
+    probe_interval: float = field(default_factory=lambda: OLLAMA_PROBE_INTERVAL)
+    probe_max_backoff: float = field(default_factory=lambda: OLLAMA_PROBE_MAX_BACKOFF)
+
+    _health: OllamaHealth = field(default_factory=OllamaHealth, init=False, repr=False)
+    _probe_task: asyncio.Task[None] | None = field(default=None, init=False, repr=False)
+    _probe_now: asyncio.Event = field(default_factory=asyncio.Event, init=False, repr=False)
+    _client: httpx.AsyncClient | None = field(default=None, init=False, repr=False)
+
+    # ── Connection pool ────────────────────────────────────────────────
+
+    async def start(self) -> None:
+        """Open the pooled client (called from the app lifespan)."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+            )
 
-    _is_available: bool | None = field(default=None, init=False, repr=False)
-    _last_health_check: float = field(default=0.0, init=False, repr=False)
+    async def aclose(self) -> None:
+        """Close the pooled client and drop its keep-alive connections."""
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+    async def _http(self) -> httpx.AsyncClient:
+        # Lazily opened so scripts that never run the lifespan still work.
+        if self._client is None or self._client.is_closed:
+            await self.start()
+        assert self._client is not None
+        return self._client
 
     # ── Health ─────────────────────────────────────────────────────────
 
+    @property
+    def health(self) -> OllamaHealth:
+        return self._health
+
+    @property
+    def available(self) -> bool:
+        return self._health.available is True
+
+    @property
+    def probing(self) -> bool:
+        return self._probe_task is not None and not self._probe_task.done()
+
     async def check_health(self) -> bool:
-        now = time.time()
-        if (
-            self._is_available is not None
-            and now - self._last_health_check < HEALTH_CHECK_INTERVAL
+        """Availability for the request path.
+
+        With the background probe running this only reads the published
+        flag.  Without it (scripts, benchmarks) it falls back to an
+        on-demand probe at most every HEALTH_CHECK_INTERVAL seconds.
+        """
+        health = self._health
+        if self.probing or (
+            health.available is not None
+            and time.time() - health.checked_at < HEALTH_CHECK_INTERVAL
         ):
-            return self._is_available
+            return health.available is True
+        return (await self.probe()).available is True
 
+    async def probe(self) -> OllamaHealth:
+        """Probe Ollama once (tags + loaded models) and publish the result."""
+        prev = self._health
+        start = time.perf_counter()
         try:
-            async with httpx.AsyncClient(timeout=5) as client:
-                resp = await client.get(f"{self.base_url}/api/tags")
-            if resp.status_code == 200:
-                data = resp.json()
-                models = [m.get("name", "") for m in data.get("models", [])]
-                self._is_available = True
-                self._last_health_check = now
-
-                has_model = any(m.startswith(self.model) for m in models)
-                if not has_model and models:
-                    logger.warning(
-                        'Model "%s" not found. Available: %s. Run: ollama pull %s',
-                        self.model,
-                        ", ".join(models),
-                        self.model,
+            client = await self._http()
+            resp = await client.get("/api/tags", timeout=HEALTH_CHECK_TIMEOUT)
+            if resp.status_code != 200:
+                raise RuntimeError(f"/api/tags returned {resp.status_code}")
+            models = tuple(m.get("name", "") for m in resp.json().get("models", []))
+            loaded = False
+            try:
+                ps = await client.get("/api/ps", timeout=HEALTH_CHECK_TIMEOUT)
+                if ps.status_code == 200:
+                    loaded = any(
+                        m.get("name", "").startswith(self.model) for m in ps.json().get("models", [])
                     )
-                return True
-        except Exception:
-            pass
+            except Exception:
+                pass  # /api/ps is missing on old Ollama versions; treat as not loaded
+        except Exception as exc:
+            health = OllamaHealth(
+                available=False,
+                checked_at=time.time(),
+                latency_ms=round((time.perf_counter() - start) * 1000, 3),
+                failures=prev.failures + 1,
+                error=str(exc) or type(exc).__name__,
+            )
+        else:
+            health = OllamaHealth(
+                available=True,
+                model_present=any(m.startswith(self.model) for m in models),
+                model_loaded=loaded,
+                models=models,
+                checked_at=time.time(),
+                latency_ms=round((time.perf_counter() - start) * 1000, 3),
+            )
+        self._publish(health)
+        return health
+
+    async def start_probe(self) -> bool:
+        """Probe once, then keep probing in the background (app lifespan)."""
+        health = await self.probe()
+        if not self.probing:
+            self._probe_task = asyncio.create_task(self._probe_loop(), name="ollama-health-probe")
+        return health.available is True
+
+    async def stop_probe(self) -> None:
+        task, self._probe_task = self._probe_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def warm(self) -> bool:
+        """Load the model into memory ahead of the first real request.
+
+        Sent with the same options as a real request: Ollama reloads the
+        model when ``num_ctx`` changes, which would waste the pre-load.
+        """
+        body = self._build_body("", None, False, None, None, stream=False)
+        start = time.perf_counter()
+        try:
+            client = await self._http()
+            resp = await client.post("/api/generate", json=body)
+        except Exception as exc:
+            logger.warning("Pre-warming %s failed: %s", self.model, exc)
+            return False
+        if resp.status_code != 200:
+            logger.warning("Pre-warming %s failed: HTTP %s", self.model, resp.status_code)
+            return False
+        logger.info("Model %s loaded in %.1fs", self.model, time.perf_counter() - start)
+        self._publish(replace(self._health, model_loaded=True))
+        return True
+
+    async def _probe_loop(self) -> None:
+        while True:
+            health = self._health
+            if health.available and health.model_present and not health.model_loaded and self.prewarm:
+                await self.warm()
+            if health.available:
+                delay = self.probe_interval
+            else:
+                delay = min(self.probe_max_backoff, PROBE_BACKOFF_BASE * 2 ** max(0, health.failures - 1))
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._probe_now.wait(), delay)
+            self._probe_now.clear()
+            try:
+                await self.probe()
+            except Exception:  # never let the loop die
+                logger.exception("Ollama health probe crashed")
+
+    def _publish(self, health: OllamaHealth) -> None:
+        # A single reference swap: readers always see one consistent snapshot.
+        prev, self._health = self._health, health
+        if health.available and not prev.available and prev.available is not None:
+            logger.info("Ollama is back at %s", self.base_url)
+        elif not health.available and prev.available:
+            logger.warning("Ollama went down at %s: %s", self.base_url, health.error)
+        if health.available and not health.model_present and health.models and (
+            prev.model_present or prev.available is not True
+        ):
+            logger.warning(
+                'Model "%s" not found. Available: %s. Run: ollama pull %s',
+                self.model,
+                ", ".join(health.models),
+                self.model,
+            )
 
-        self._is_available = False
-        self._last_health_check = now
-        return False
+    def _mark_down(self, error: str) -> None:
+        """A request couldn't connect: fail fast until the probe sees Ollama again.
 
-    @property
-    def available(self) -> bool:
-        return self._is_available is True
+        Going down wakes the probe at once, so a blip doesn't turn requests
+        away for a whole probe interval.
+        """
+        prev = self._health
+        self._publish(OllamaHealth(
+            available=False, checked_at=time.time(), failures=prev.failures + 1, error=error,
+        ))
+        if prev.available:
+            self._probe_now.set()
 
     # ── Generate ───────────────────────────────────────────────────────
 
@@ -103,20 +482,145 @@ class OllamaService:
         use_json: bool = False,
         temperature: float | None = None,
         max_tokens: int | None = None,
+        priority: str = "interactive",
+        context: list[int] | None = None,
+        keep_alive: str | None = None,
     ) -> OllamaResponse:
+        key = self._cache_key(prompt, system, use_json, temperature, max_tokens, context)
+        if key is not None:
+            hit = self.cache.get(key)  # type: ignore[union-attr]
+            if hit is not None:
+                return OllamaResponse(
+                    available=True,
+                    text=hit.text,
+                    json_data=_parse_json(hit.text) if use_json else None,
+                    model=self.model,
+                    token_count=hit.token_count,
+                    prompt_token_count=hit.prompt_token_count,
+                    cached=True,
+                )
+
         is_up = await self.check_health()
         if not is_up:
-            return OllamaResponse(
-                available=False,
-                model=self.model,
-                error=f"Ollama not available. Install from https://ollama.ai and run: ollama pull {self.model}",
-            )
+            return self._unavailable()
 
-        start = time.time()
+        try:
+            async with self.scheduler.slot(priority):
+                start = time.time()
+                body = self._build_body(
+                    prompt, system, use_json, temperature, max_tokens,
+                    stream=False, context=context, keep_alive=keep_alive,
+                )
+
+                try:
+                    client = await self._http()
+                    resp = await client.post("/api/generate", json=body)
+
+                    elapsed = int((time.time() - start) * 1000)
+
+                    if resp.status_code != 200:
+                        return OllamaResponse(
+                            available=True,
+                            model=self.model,
+                            duration_ms=elapsed,
+                            error=f"Ollama error {resp.status_code}: {resp.text}",
+                        )
+
+                    data = resp.json()
+                    text = (data.get("response") or "").strip()
+                    json_data = _parse_json(text) if use_json else None
+                    token_count = data.get("eval_count", 0)
+                    prompt_token_count = data.get("prompt_eval_count", 0)
+
+                    if key is not None and text and (json_data is not None or not use_json):
+                        self.cache.put(key, text, token_count, prompt_token_count)  # type: ignore[union-attr]
+
+                    return OllamaResponse(
+                        available=True,
+                        text=text,
+                        json_data=json_data,
+                        model=self.model,
+                        duration_ms=elapsed,
+                        token_count=token_count,
+                        prompt_token_count=prompt_token_count,
+                        context=data.get("context"),
+                    )
+
+                except httpx.TimeoutException:
+                    elapsed = int((time.time() - start) * 1000)
+                    return OllamaResponse(
+                        available=True,
+                        model=self.model,
+                        duration_ms=elapsed,
+                        error=f"Request timed out after {self.timeout}s",
+                    )
+                except httpx.ConnectError as exc:
+                    self._mark_down(str(exc))
+                    return OllamaResponse(
+                        available=False,
+                        model=self.model,
+                        duration_ms=int((time.time() - start) * 1000),
+                        error=f"Ollama request failed: {exc}",
+                    )
+                except Exception as exc:
+                    elapsed = int((time.time() - start) * 1000)
+                    return OllamaResponse(
+                        available=True,
+                        model=self.model,
+                        duration_ms=elapsed,
+                        error=f"Ollama request failed: {exc}",
+                    )
+        except OllamaBusyError as exc:
+            return OllamaResponse(available=True, model=self.model, error=str(exc), busy=True)
+
+    def _cache_key(
+        self,
+        prompt: str,
+        system: str | None,
+        use_json: bool,
+        temperature: float | None,
+        max_tokens: int | None,
+        context: list[int] | None = None,
+    ) -> str | None:
+        """Cache key for deterministic calls; None when the cache must be bypassed.
+
+        Continuations are never cached: the answer depends on the conversation
+        in ``context``, which the key doesn't cover.
+        """
+        if self.cache is None:
+            return None
+        if context:
+            self.cache.note_bypass()
+            return None
+        temp = temperature if temperature is not None else self.temperature
+        if not self.cache.cacheable(temp):
+            self.cache.note_bypass()
+            return None
+        return cache_key(self.model, system, prompt, temp, use_json, max_tokens)
+
+    def _unavailable(self) -> OllamaResponse:
+        return OllamaResponse(
+            available=False,
+            model=self.model,
+            error=f"Ollama not available. Install from https://ollama.ai and run: ollama pull {self.model}",
+        )
+
+    def _build_body(
+        self,
+        prompt: str,
+        system: str | None,
+        use_json: bool,
+        temperature: float | None,
+        max_tokens: int | None,
+        *,
+        stream: bool,
+        context: list[int] | None = None,
+        keep_alive: str | None = None,
+    ) -> dict[str, Any]:
         body: dict[str, Any] = {
             "model": self.model,
             "prompt": prompt,
-            "stream": False,
+            "stream": stream,
             "options": {
                 "temperature": temperature if temperature is not None else self.temperature,
                 "num_ctx": self.context_window,
@@ -128,64 +632,162 @@ class OllamaService:
             body["format"] = "json"
         if max_tokens:
             body["options"]["num_predict"] = max_tokens
+        if context:
+            body["context"] = context
+        keep_alive = keep_alive or self.keep_alive
+        if keep_alive:
+            body["keep_alive"] = keep_alive
+        return body
 
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                resp = await client.post(
-                    f"{self.base_url}/api/generate",
-                    json=body,
-                )
-
-            elapsed = int((time.time() - start) * 1000)
+    # ── Generate (streaming) ───────────────────────────────────────────
 
-            if resp.status_code != 200:
-                return OllamaResponse(
+    async def generate_stream(
+        self,
+        prompt: str,
+        system: str | None = None,
+        *,
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+        priority: str = "interactive",
+        context: list[int] | None = None,
+        keep_alive: str | None = None,
+    ) -> AsyncIterator[OllamaStreamChunk]:
+        """Yield tokens as Ollama produces them.
+
+        Always ends with exactly one ``done`` chunk whose ``final`` carries the
+        full text, eval counts and timings -- or the error, if the stream could
+        not be started or broke off midway.  Closing the iterator early aborts
+        the HTTP request, which stops generation on the Ollama side.
+        """
+        key = self._cache_key(prompt, system, False, temperature, max_tokens, context)
+        if key is not None:
+            hit = self.cache.get(key)  # type: ignore[union-attr]
+            if hit is not None:
+                yield OllamaStreamChunk(text=hit.text)
+                yield OllamaStreamChunk(done=True, final=OllamaResponse(
                     available=True,
+                    text=hit.text,
                     model=self.model,
-                    duration_ms=elapsed,
-                    error=f"Ollama error {resp.status_code}: {resp.text}",
-                )
+                    token_count=hit.token_count,
+                    prompt_token_count=hit.prompt_token_count,
+                    first_token_ms=0,
+                    cached=True,
+                ))
+                return
+
+        is_up = await self.check_health()
+        if not is_up:
+            yield OllamaStreamChunk(done=True, final=self._unavailable())
+            return
 
-            data = resp.json()
-            text = (data.get("response") or "").strip()
-            json_data: dict[str, Any] | None = None
+        start = time.time()
+        body = self._build_body(
+            prompt, system, False, temperature, max_tokens,
+            stream=True, context=context, keep_alive=keep_alive,
+        )
+        parts: list[str] = []
+        first_token_ms: int | None = None
+        final = OllamaResponse(available=True, model=self.model)
 
-            if use_json:
+        try:
+            async with self.scheduler.slot(priority):
                 try:
-                    json_data = json.loads(text)
-                except json.JSONDecodeError:
-                    match = re.search(r"\{[\s\S]*\}", text)
-                    if match:
-                        try:
-                            json_data = json.loads(match.group(0))
-                        except json.JSONDecodeError:
-                            logger.warning("Failed to parse JSON from Ollama response")
-
-            return OllamaResponse(
-                available=True,
-                text=text,
-                json_data=json_data,
-                model=self.model,
-                duration_ms=elapsed,
-                token_count=data.get("eval_count", 0),
-            )
+                    client = await self._http()
+                    async with client.stream("POST", "/api/generate", json=body) as resp:
+                        if resp.status_code != 200:
+                            await resp.aread()
+                            final.error = f"Ollama error {resp.status_code}: {resp.text}"
+                        else:
+                            async for line in resp.aiter_lines():
+                                if not line:
+                                    continue
+                                data = json.loads(line)
+                                if data.get("error"):
+                                    final.error = f"Ollama error: {data['error']}"
+                                    break
+                                token = data.get("response") or ""
+                                if token:
+                                    if first_token_ms is None:
+                                        first_token_ms = int((time.time() - start) * 1000)
+                                    parts.append(token)
+                                    yield OllamaStreamChunk(text=token)
+                                if data.get("done"):
+                                    final.token_count = data.get("eval_count", 0)
+                                    final.prompt_token_count = data.get("prompt_eval_count", 0)
+                                    final.context = data.get("context")
+                                    break
+                except httpx.TimeoutException:
+                    final.error = f"Request timed out after {self.timeout}s"
+                except httpx.ConnectError as exc:
+                    self._mark_down(str(exc))
+                    final.available = False
+                    final.error = f"Ollama request failed: {exc}"
+                except Exception as exc:
+                    final.error = f"Ollama request failed: {exc}"
+        except OllamaBusyError as exc:
+            final.error = str(exc)
+            final.busy = True
+
+        final.text = "".join(parts).strip()
+        final.duration_ms = int((time.time() - start) * 1000)
+        final.first_token_ms = first_token_ms
+        if key is not None and final.text and final.error is None:
+            self.cache.put(key, final.text, final.token_count, final.prompt_token_count)  # type: ignore[union-attr]
+        yield OllamaStreamChunk(done=True, final=final)
+
+    # ── Embeddings ─────────────────────────────────────────────────────
+
+    def has_model(self, name: str) -> bool:
+        """Whether the last probe saw *name* pulled (in /api/tags)."""
+        return any(m.startswith(name) for m in self._health.models)
+
+    async def embed(
+        self,
+        texts: list[str],
+        *,
+        model: str | None = None,
+        priority: str = "bulk",
+    ) -> OllamaEmbeddings:
+        """Embed *texts* with Ollama's /api/embed, OLLAMA_EMBED_BATCH inputs per request."""
+        model = model or OLLAMA_EMBED_MODEL
+        is_up = await self.check_health()
+        if not is_up:
+            return OllamaEmbeddings(available=False, model=model, error="Ollama not available")
 
+        start = time.time()
+        out = OllamaEmbeddings(available=True, model=model)
+        try:
+            async with self.scheduler.slot(priority):
+                client = await self._http()
+                for i in range(0, len(texts), OLLAMA_EMBED_BATCH):
+                    batch = texts[i:i + OLLAMA_EMBED_BATCH]
+                    body: dict[str, Any] = {"model": model, "input": batch}
+                    if self.keep_alive:
+                        body["keep_alive"] = self.keep_alive
+                    resp = await client.post("/api/embed", json=body)
+                    if resp.status_code != 200:
+                        out.error = f"Ollama error {resp.status_code}: {resp.text}"
+                        break
+                    vectors = resp.json().get("embeddings") or []
+                    if len(vectors) != len(batch):
+                        out.error = f"Ollama returned {len(vectors)} embeddings for {len(batch)} inputs"
+                        break
+                    out.vectors.extend(vectors)
+        except OllamaBusyError as exc:
+            out.error = str(exc)
+            out.busy = True
         except httpx.TimeoutException:
-            elapsed = int((time.time() - start) * 1000)
-            return OllamaResponse(
-                available=True,
-                model=self.model,
-                duration_ms=elapsed,
-                error=f"Request timed out after {self.timeout}s",
-            )
+            out.error = f"Request timed out after {self.timeout}s"
+        except httpx.ConnectError as exc:
+            self._mark_down(str(exc))
+            out.available = False
+            out.error = f"Ollama request failed: {exc}"
         except Exception as exc:
-            elapsed = int((time.time() - start) * 1000)
-            return OllamaResponse(
-                available=True,
-                model=self.model,
-                duration_ms=elapsed,
-                error=f"Ollama request failed: {exc}",
-            )
+            out.error = f"Ollama request failed: {exc}"
+        if out.error:
+            out.vectors = []
+        out.duration_ms = int((time.time() - start) * 1000)
+        return out
 
     # ── Convenience: generate JSON ─────────────────────────────────────
 
@@ -194,37 +796,59 @@ class OllamaService:
         system: str,
         prompt: str,
         temperature: float | None = None,
+        priority: str = "interactive",
     ) -> dict[str, Any]:
-        """Returns {available, data, error, duration_ms}."""
+        """Returns {available, data, error, duration_ms, busy}."""
         resp = await self.generate(
-            prompt, system, use_json=True, temperature=temperature
+            prompt, system, use_json=True, temperature=temperature, priority=priority
         )
         return {
             "available": resp.available,
             "data": resp.json_data,
             "error": resp.error,
             "duration_ms": resp.duration_ms,
+            "busy": resp.busy,
         }
 
     # ── Convenience: generate text ─────────────────────────────────────
 
     async def generate_text(
         self,
-        system: str,
+        system: str | None,
         prompt: str,
         temperature: float | None = None,
+        priority: str = "interactive",
+        context: list[int] | None = None,
+        keep_alive: str | None = None,
     ) -> dict[str, Any]:
-        """Returns {available, text, error, duration_ms}."""
+        """Returns {available, text, error, duration_ms, busy, context, prompt_eval_count}."""
         resp = await self.generate(
-            prompt, system, use_json=False, temperature=temperature
+            prompt, system, use_json=False, temperature=temperature, priority=priority,
+            context=context, keep_alive=keep_alive,
         )
         return {
             "available": resp.available,
             "text": resp.text,
             "error": resp.error,
             "duration_ms": resp.duration_ms,
+            "busy": resp.busy,
+            "context": resp.context,
+            "prompt_eval_count": resp.prompt_token_count,
         }
 
 
+def _parse_json(text: str) -> dict[str, Any] | None:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        match = re.search(r"\{[\s\S]*\}", text)
+        if match:
+            try:
+                return json.loads(match.group(0))
+            except json.JSONDecodeError:
+                logger.warning("Failed to parse JSON from Ollama response")
+    return None
+
+
 # Singleton — import this from anywhere
 ollama_service = OllamaService()
@@ -0,0 +1,173 @@
+"""Shared reference-data registry for ``src/data/*.json``.
+
+Every engine that needs a reference file asks the registry for a *view*:
+
+    _LASA = reference_data.view("lasa-pairs.json", _normalize_lasa)
+    pairs = _LASA.get()
+
+  - Each file is read and parsed once, no matter how many views use it.
+  - Each view pre-normalizes the raw JSON once into the lookup structure its
+    engine wants (lower-cased sets, dicts, compiled regexes …).
+  - Files are hot-reloaded when their mtime changes; the check is a single
+    ``stat`` throttled to once per ``CHECK_INTERVAL`` seconds per file.
+  - A missing or malformed file yields ``{}`` (or the last good copy) and a
+    warning, never an exception inside a request.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Generic, TypeVar
+
+logger = logging.getLogger("ai-copilot.reference-data")
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+CHECK_INTERVAL = 2.0  # seconds between mtime checks per file
+
+T = TypeVar("T")
+
+
+@dataclass
+class _FileEntry:
+    path: Path
+    raw: Any = None
+    mtime_ns: int | None = None
+    version: int = 0  # bumped on every successful (re)load
+    loaded_at: float = 0.0
+    checked_at: float = 0.0
+    load_count: int = 0
+    error: str | None = None
+
+
+@dataclass
+class ReferenceView(Generic[T]):
+    """Normalized, cached projection of one reference file."""
+
+    registry: ReferenceDataRegistry
+    filename: str
+    normalizer: Callable[[Any], T] | None = None
+    _value: Any = field(default=None, init=False, repr=False)
+    _version: int = field(default=-1, init=False, repr=False)
+
+    def get(self) -> T:
+        entry = self.registry._entry(self.filename)
+        if self._version != entry.version:
+            raw = entry.raw if entry.raw is not None else {}
+            try:
+                value = self.normalizer(raw) if self.normalizer else raw
+            except Exception as exc:  # keep the last good value
+                logger.warning("Normalizing %s failed: %s", self.filename, exc)
+                if self._version < 0:
+                    value = self.normalizer({}) if self.normalizer else {}
+                else:
+                    value = self._value
+            self._value = value
+            self._version = entry.version
+        return self._value
+
+
+class ReferenceDataRegistry:
+    def __init__(self, data_dir: Path = DATA_DIR, check_interval: float = CHECK_INTERVAL) -> None:
+        self.data_dir = data_dir
+        self.check_interval = check_interval
+        self._files: dict[str, _FileEntry] = {}
+        self._views: list[ReferenceView[Any]] = []
+        self._lock = threading.Lock()
+
+    # ── Public API ─────────────────────────────────────────────────────
+
+    def view(self, filename: str, normalizer: Callable[[Any], T] | None = None) -> ReferenceView[T]:
+        """Register interest in *filename* and return a cached normalized view."""
+        view = ReferenceView(self, filename, normalizer)
+        self._views.append(view)
+        return view
+
+    def load(self, filename: str) -> Any:
+        """Raw parsed JSON for *filename* (``{}`` if missing/invalid)."""
+        raw = self._entry(filename).raw
+        return raw if raw is not None else {}
+
+    def reload(self, filename: str | None = None) -> None:
+        """Force a re-read on next access (all files when *filename* is None)."""
+        with self._lock:
+            targets = [self._files[filename]] if filename in self._files else (
+                list(self._files.values()) if filename is None else []
+            )
+            for entry in targets:
+                entry.mtime_ns = None
+                entry.checked_at = 0.0
+
+    def preload(self) -> list[str]:
+        """Load every ``*.json`` in the data directory and normalize every
+        registered view; returns the file names."""
+        names = sorted(p.name for p in self.data_dir.glob("*.json"))
+        for name in names:
+            self._entry(name)
+        for view in self._views:
+            view.get()
+        return names
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            name: {
+                "loaded": e.raw is not None,
+                "version": e.version,
+                "loadCount": e.load_count,
+                "loadedAt": e.loaded_at,
+                "error": e.error,
+            }
+            for name, e in sorted(self._files.items())
+        }
+
+    # ── Internals ──────────────────────────────────────────────────────
+
+    def _entry(self, filename: str) -> _FileEntry:
+        entry = self._files.get(filename)
+        now = time.monotonic()
+        if entry is not None and now - entry.checked_at < self.check_interval:
+            return entry
+
+        with self._lock:
+            entry = self._files.get(filename)
+            if entry is None:
+                entry = self._files[filename] = _FileEntry(path=self.data_dir / filename)
+            entry.checked_at = now
+            try:
+                mtime_ns = os.stat(entry.path).st_mtime_ns
+            except OSError as exc:
+                if entry.error is None:
+                    logger.warning("Reference file %s unavailable: %s", filename, exc)
+                entry.error = str(exc)
+                return entry
+            if mtime_ns != entry.mtime_ns:
+                self._read(filename, entry, mtime_ns)
+        return entry
+
+    @staticmethod
+    def _read(filename: str, entry: _FileEntry, mtime_ns: int) -> None:
+        try:
+            with open(entry.path, encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError) as exc:
+            logger.warning("Failed to load reference file %s: %s", filename, exc)
+            entry.error = str(exc)
+            entry.mtime_ns = mtime_ns  # don't retry until the file changes again
+            return
+        if entry.version:
+            logger.info("Reloaded reference file %s", filename)
+        entry.raw = raw
+        entry.mtime_ns = mtime_ns
+        entry.version += 1
+        entry.loaded_at = time.time()
+        entry.load_count += 1
+        entry.error = None
+
+
+# Singleton
+reference_data = ReferenceDataRegistry()
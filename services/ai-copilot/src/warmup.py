@@ -0,0 +1,228 @@
+"""Startup warm-up — pay first-request costs before the first request.
+
+Endpoints import their engine modules lazily, and engines parse reference
+data on first use, so the first call to each endpoint used to carry the
+module import (module-level regexes and rule tables included) and the JSON
+load on top of its real work.  ``startup_warmup.run()``, called from the
+app's lifespan before it serves, does all of that up front:
+
+  - imports every module in the engine, collector, service and infra
+    packages, timing each one (a module's time includes whatever it
+    imported first, so shared dependencies count once, where first used)
+  - loads every reference file and builds every registered view
+    (``reference_data.preload``)
+  - with WARMUP_HEALTH_CHECK, runs the health-check engines once on a small
+    synthetic branch, so their code paths have run before a real request
+    and a broken engine shows up in the startup log
+
+Failures are logged and reported, never raised: a module that fails here
+fails the same way in its endpoint.  The report is logged at startup and
+served under ``warmup`` in ``/v1/infra/ai-status``.
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
+import pkgutil
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.config import WARMUP_HEALTH_CHECK
+from src.services.reference_data import reference_data
+
+logger = logging.getLogger("ai-copilot.warmup")
+
+PACKAGES = ("src.engines", "src.collectors", "src.services", "src.infra")
+REPORT_SLOWEST = 10  # modules listed in the startup log and stats
+
+
+@dataclass(slots=True)
+class WarmupReport:
+    modules: dict[str, float] = field(default_factory=dict)  # newly imported module -> ms
+    preloaded: int = 0  # modules already imported before the warm-up
+    reference_files: int = 0
+    reference_ms: float = 0.0
+    health_check_ms: float | None = None
+    total_ms: float = 0.0
+    errors: dict[str, str] = field(default_factory=dict)
+
+    def slowest(self, n: int = REPORT_SLOWEST) -> list[tuple[str, float]]:
+        return sorted(self.modules.items(), key=lambda kv: kv[1], reverse=True)[:n]
+
+
+class StartupWarmup:
+    def __init__(self, packages: tuple[str, ...] = PACKAGES) -> None:
+        self.packages = packages
+        self.report: WarmupReport | None = None
+
+    # ── Public API ─────────────────────────────────────────────────────
+
+    def run(self, health_check: bool = WARMUP_HEALTH_CHECK) -> WarmupReport:
+        report = WarmupReport()
+        started = time.perf_counter()
+        self._import_modules(report)
+
+        t0 = time.perf_counter()
+        try:
+            report.reference_files = len(reference_data.preload())
+        except Exception as exc:
+            report.errors["reference_data"] = str(exc)
+        report.reference_ms = (time.perf_counter() - t0) * 1000
+
+        if health_check:
+            t0 = time.perf_counter()
+            try:
+                _synthetic_health_check()
+                report.health_check_ms = (time.perf_counter() - t0) * 1000
+            except Exception as exc:
+                report.errors["health_check"] = str(exc)
+
+        report.total_ms = (time.perf_counter() - started) * 1000
+        self.report = report
+        self._log(report)
+        return report
+
+    def stats(self) -> dict[str, Any]:
+        r = self.report
+        if r is None:
+            return {"done": False}
+        return {
+            "done": True,
+            "totalMs": round(r.total_ms, 1),
+            "modulesImported": len(r.modules),
+            "modulesPreloaded": r.preloaded,
+            "importMs": round(sum(r.modules.values()), 1),
+            "slowestModules": {name: round(ms, 1) for name, ms in r.slowest()},
+            "referenceFiles": r.reference_files,
+            "referenceMs": round(r.reference_ms, 1),
+            "healthCheckMs": round(r.health_check_ms, 1) if r.health_check_ms is not None else None,
+            "errors": r.errors,
+        }
+
+    # ── Steps ──────────────────────────────────────────────────────────
+
+    def _import_modules(self, report: WarmupReport) -> None:
+        for name in self._module_names(report):
+            if name in sys.modules:
+                report.preloaded += 1
+                continue
+            t0 = time.perf_counter()
+            try:
+                importlib.import_module(name)
+            except Exception as exc:
+                report.errors[name] = f"{type(exc).__name__}: {exc}"
+                continue
+            report.modules[name] = (time.perf_counter() - t0) * 1000
+
+    def _module_names(self, report: WarmupReport) -> list[str]:
+        names = []
+        for package in self.packages:
+            try:
+                path = importlib.import_module(package).__path__
+            except Exception as exc:
+                report.errors[package] = f"{type(exc).__name__}: {exc}"
+                continue
+            names += [f"{package}.{m.name}" for m in pkgutil.iter_modules(path)]
+        return names
+
+    @staticmethod
+    def _log(report: WarmupReport) -> None:
+        breakdown = ", ".join(f"{name.removeprefix('src.')} {ms:.0f}" for name, ms in report.slowest())
+        logger.info(
+            "Warm-up done in %.0f ms: %d modules imported in %.0f ms (%d already loaded), "
+            "%d reference files in %.0f ms, synthetic health-check %s",
+            report.total_ms,
+            len(report.modules),
+            sum(report.modules.values()),
+            report.preloaded,
+            report.reference_files,
+            report.reference_ms,
+            f"{report.health_check_ms:.0f} ms" if report.health_check_ms is not None else "skipped",
+        )
+        if breakdown:
+            logger.info("Slowest imports (ms): %s", breakdown)
+        for name, error in report.errors.items():
+            logger.warning("Warm-up: %s failed: %s", name, error)
+
+
+# ── Synthetic branch ──────────────────────────────────────────────────────
+
+
+def _synthetic_health_check() -> None:
+    """The /v1/ai/health-check engines on a small made-up branch."""
+    from src.engines.consistency_checker import run_consistency_checks
+    from src.engines.go_live_scorer import compute_go_live_score
+    from src.engines.nabh_checker import run_nabh_checks
+    from src.engines.naming_enforcer import run_naming_check
+    from src.engines.pharmacy_checker import run_pharmacy_checks
+
+    ctx = _synthetic_branch()
+    consistency = run_consistency_checks(ctx)
+    nabh = run_nabh_checks(ctx)
+    run_naming_check(ctx, limit=0)
+    compute_go_live_score(consistency, nabh)
+    run_pharmacy_checks(ctx)
+
+
+def _synthetic_branch():
+    from src.collectors.models import (
+        BranchContext,
+        BranchSnapshot,
+        DepartmentDetail,
+        DepartmentSummary,
+        DrugSnapshot,
+        LocationSummary,
+        LocationTreeNode,
+        PharmacySummary,
+        PharmStoreSnapshot,
+        ResourceSummary,
+        RoomDetail,
+        UnitDetail,
+        UnitSummary,
+    )
+
+    floor = LocationTreeNode(id="loc-3", kind="FLOOR", code="B1F1", name="Floor 1", isActive=True, floorNumber=1,
+                             fireZone="FZ-1")
+    building = LocationTreeNode(id="loc-2", kind="BUILDING", code="B1", name="Main Block", isActive=True,
+                                children=[floor])
+    campus = LocationTreeNode(id="loc-1", kind="CAMPUS", code="C1", name="Campus", isActive=True,
+                              children=[building])
+    department = DepartmentDetail(id="dep-1", code="MED", name="General Medicine", hasHead=True, staffCount=4)
+
+    def _unit(code: str, type_code: str, room_type: str) -> UnitDetail:
+        rooms = [
+            RoomDetail(id=f"{code}-r{n}", code=f"{code}-R{n:02d}", name=f"{code} Room {n}", roomType=room_type,
+                       hasOxygen=True, hasSuction=type_code == "ICU")
+            for n in (1, 2)
+        ]
+        return UnitDetail(
+            id=f"unit-{code}", code=code, name=f"{code} Unit", typeName=type_code.title(), typeCode=type_code,
+            locationNodeId=floor.id, departmentId=department.id, departmentName=department.name, rooms=rooms,
+            resources=ResourceSummary(total=4, beds=4, byType={"BED": 4}, byState={"AVAILABLE": 4}),
+        )
+
+    units = [_unit("WARD1", "WARD", "WARD"), _unit("ICU1", "ICU", "ICU_BAY")]
+    drugs = [
+        DrugSnapshot(id="drug-1", drugCode="AMLO5", genericName="Amlodipine", strength="5 mg", route="ORAL"),
+        DrugSnapshot(id="drug-2", drugCode="AMIO200", genericName="Amiodarone", strength="200 mg", route="ORAL",
+                     isHighAlert=True),
+    ]
+    return BranchContext(
+        branch=BranchSnapshot(id="warmup", code="WARMUP", name="Warm-up Branch", bedCount=8),
+        location=LocationSummary(totalNodes=3, byKind={"CAMPUS": 1, "BUILDING": 1, "FLOOR": 1}, tree=[campus],
+                                 hasFireZones=True),
+        units=UnitSummary(totalUnits=len(units), activeUnits=len(units), units=units),
+        departments=DepartmentSummary(total=1, withHead=1, withStaff=1, departments=[department]),
+        pharmacy=PharmacySummary(
+            totalStores=1, activeStores=1, totalDrugs=len(drugs), activeDrugs=len(drugs), drugs=drugs,
+            stores=[PharmStoreSnapshot(id="store-1", storeCode="MAIN", storeName="Main Pharmacy",
+                                       storeType="MAIN", status="ACTIVE", canDispense=True)],
+        ),
+    )
+
+
+# Singleton
+startup_warmup = StartupWarmup()